@@ -1,9 +1,16 @@
-from .axi_stream import *
-from .axi_lite import *
-from .axi_stream_chunker import axis_chunker
-from .axi_stream_tdest_selector import axis_tdest_selector
-from .axi_stream_connector import axis_connector
-from .axi_stream_utils import (
-    axis_interface_attributes,
-    check_axi_stream_interfaces_identical,
-    check_axi_stream_interface_attributes)
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '.axi_stream': [
+        'AxiStreamInterface', 'AxiStreamMasterBFM', 'AxiStreamSlaveBFM',
+        'axi_stream_buffer', 'axi_master_playback'],
+    '.axi_lite': [
+        'OKAY', 'SLVERR', 'DECERR', 'AxiLiteInterface', 'optional_signals',
+        'AxiLiteMasterBFM'],
+    '.axi_stream_chunker': ['axis_chunker'],
+    '.axi_stream_tdest_selector': ['axis_tdest_selector'],
+    '.axi_stream_connector': ['axis_connector'],
+    '.axi_stream_utils': [
+        'axis_interface_attributes', 'check_axi_stream_interfaces_identical',
+        'check_axi_stream_interface_attributes']},
+    ['.axi_stream', '.axi_lite'])
@@ -350,11 +350,19 @@ class AxiStreamSlaveBFM(object):
 
         Currently ``TUSER`` is ignored.
 
+        The values on the interface on every cycle in which ``TREADY`` is
+        set are also recorded, and are available through the
+        ``signal_record`` property. The record grows with every such cycle,
+        so it can be turned off by setting ``record_signals`` to ``False``,
+        in which case only the packets are recorded.
+
         The MyHDL model is instantiated using the ``model`` method.
         '''
         self._completed_packets = {}
         self._current_packets = {}
 
+        self.record_signals = True
+
         self._signal_record = {
             'TDATA': deque([]),
             'TID': deque([]),
@@ -367,6 +375,33 @@ class AxiStreamSlaveBFM(object):
         '''
         self._completed_packets.clear()
 
+    def take_packets(self):
+        '''Returns a tuple of the completed packets and the current packets
+        (as would be returned by ``completed_packets`` and
+        ``current_packets``) and clears them from the BFM.
+
+        Unlike the properties, no copy is made; the dictionaries are handed
+        over to the caller and the BFM continues with new, empty
+        dictionaries.
+        '''
+        completed_packets = self.take_completed_packets()
+        current_packets = self._current_packets
+
+        self._current_packets = {}
+
+        return completed_packets, current_packets
+
+    def take_completed_packets(self):
+        '''Returns the completed packets (as would be returned by
+        ``completed_packets``) and clears them from the BFM, without making
+        a copy. Any packets that are currently being received are left in
+        place.
+        '''
+        completed_packets = self._completed_packets
+        self._completed_packets = {}
+
+        return completed_packets
+
     def reset(self):
         '''Clears the current set of completed and current packets.
         '''
@@ -458,7 +493,7 @@ class AxiStreamSlaveBFM(object):
         @always(clock.posedge)
         def model_inst():
 
-            if interface.TREADY:
+            if self.record_signals and interface.TREADY:
                 if interface.TVALID:
                     self._signal_record['TDATA'].append(
                         copy.copy(int(interface.TDATA.val)))
@@ -728,17 +763,15 @@ def axi_stream_buffer(
 
     return return_instances
 
-@block
-def axi_master_playback(
-    clock, axi_interface, signal_record, incomplete_last_packet=False):
-    '''A convertible block that plays back the signal_record over an AXI
-    stream interface.
-
-    If ``incomplete_last_packet`` is set to True, the final packet in the
-    signal_record will not trigger the ``TLAST`` to be asserted. This means
-    data streams for which ``TLAST`` is not meaningful can be modelled.
+def _axi_master_playback_values(
+    axi_interface, signal_record, incomplete_last_packet=False):
+    '''Checks the signal_record against the axi_interface and returns the
+    tuples of the TDATA, TVALID, TID, TDEST and TLAST values to be played
+    back by :func:`axi_master_playback`.
     '''
 
+    use_TLAST = hasattr(axi_interface, 'TLAST')
+
     if axi_interface.TID_width is not None:
         if len(signal_record['TDATA']) != len(signal_record['TID']):
             raise ValueError(
@@ -751,8 +784,6 @@ def axi_master_playback(
                 'The length of the TDEST signal_record must be equal to the '
                 'length of the TDATA signal_record')
 
-    use_TLAST = hasattr(axi_interface, 'TLAST')
-
     if use_TLAST:
         if len(signal_record['TDATA']) != len(signal_record['TLAST']):
             raise ValueError(
@@ -794,6 +825,24 @@ def axi_master_playback(
     TDESTs = tuple(val for val in signal_record['TDEST'])
     TLASTs = tuple(val for val in signal_record['TLAST'])
 
+    return TDATAs, TVALIDs, TIDs, TDESTs, TLASTs
+
+@block
+def axi_master_playback(
+    clock, axi_interface, signal_record, incomplete_last_packet=False):
+    '''A convertible block that plays back the signal_record over an AXI
+    stream interface.
+
+    If ``incomplete_last_packet`` is set to True, the final packet in the
+    signal_record will not trigger the ``TLAST`` to be asserted. This means
+    data streams for which ``TLAST`` is not meaningful can be modelled.
+    '''
+
+    use_TLAST = hasattr(axi_interface, 'TLAST')
+
+    TDATAs, TVALIDs, TIDs, TDESTs, TLASTs = _axi_master_playback_values(
+        axi_interface, signal_record, incomplete_last_packet)
+
     number_of_vals = len(TDATAs)
     value_index = Signal(intbv(0, min=0, max=number_of_vals + 1))
 
@@ -1 +1,4 @@
-from ._axis_chunker import axis_chunker
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._axis_chunker': ['axis_chunker']})
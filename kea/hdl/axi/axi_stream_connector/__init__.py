@@ -1 +1,4 @@
-from ._axis_connector import axis_connector
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._axis_connector': ['axis_connector']})
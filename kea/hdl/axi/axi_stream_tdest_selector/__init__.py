@@ -1 +1,4 @@
-from ._axis_tdest_selector import axis_tdest_selector
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._axis_tdest_selector': ['axis_tdest_selector']})
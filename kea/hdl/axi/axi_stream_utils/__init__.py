@@ -1,7 +1,9 @@
-from .axis_interface_checks import (
-    axis_interface_attributes,
-    check_axi_stream_interfaces_identical,
-    check_axi_stream_interface_attributes)
-from .test_axis_interface_checks import (
-    generate_random_axi_stream_interfaces_args,
-    generate_mismatched_axi_stream_interfaces)
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '.axis_interface_checks': [
+        'axis_interface_attributes', 'check_axi_stream_interfaces_identical',
+        'check_axi_stream_interface_attributes'],
+    '.test_axis_interface_checks': [
+        'generate_random_axi_stream_interfaces_args',
+        'generate_mismatched_axi_stream_interfaces']})
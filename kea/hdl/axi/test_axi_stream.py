@@ -1774,6 +1774,48 @@ class TestAxiStreamSlaveBFM(TestCase):
 
             self.test_sink.reset()
 
+    def test_record_signals(self):
+        '''If ``record_signals`` is set to ``False``, the signals should not
+        be recorded, but the packets should still be received.
+        '''
+        @block
+        def testbench(clock):
+
+            master = self.source_stream.model(clock, self.interface)
+            slave = self.test_sink.model(clock, self.interface)
+
+            enable_check = Signal(False)
+
+            @always(clock.posedge)
+            def checker():
+
+                self.assertEqual(
+                    len(self.test_sink._signal_record['TDATA']), 0)
+
+                if self.interface.TVALID and self.interface.TREADY:
+                    enable_check.next = True
+
+                if enable_check and not self.interface.TVALID:
+                    raise StopSimulation
+
+            return master, slave, checker
+
+        stream = (0, 0)
+        packet_list = {stream: deque([
+            deque([random.randrange(self.max_rand_val) for m in range(5)])
+            for n in range(10)])}
+        self.source_stream.add_data(packet_list[stream])
+
+        self.test_sink.record_signals = False
+
+        myhdl_cosimulation(None, None, testbench, self.args, self.arg_types)
+
+        self.assertEqual(self.test_sink.completed_packets, packet_list)
+        self.assertEqual(
+            self.test_sink.signal_record,
+            {'TDATA': deque([]), 'TID': deque([]), 'TDEST': deque([]),
+             'TLAST': deque([])})
+
     def test_TREADY_probability(self):
         '''There should be a TREADY_probability argument to the model
         that dictates the probability of TREADY being True.
@@ -2290,6 +2332,48 @@ class TestAxiStreamSlaveBFM(TestCase):
         self.assertEqual(self.test_sink.completed_packets,
                          added_trimmed_packet_list)
 
+    def test_take_packets_method(self):
+        '''There should be a take_packets method that returns the completed
+        and current packets without copying them and leaves the BFM with
+        no recorded packets.
+        '''
+        @block
+        def testbench(clock):
+
+            test_sink = self.test_sink
+
+            master = self.source_stream.model(clock, self.interface)
+            slave = test_sink.model(clock, self.interface)
+
+            return master, slave
+
+        self.source_stream = AxiStreamMasterBFM()
+        self.test_sink = AxiStreamSlaveBFM()
+
+        stream = (0, 0)
+
+        packet_list = {}
+        packet_list[stream] = _add_random_packets_to_stream(
+            self.source_stream, self.max_packet_length,
+            self.max_new_packets, self.max_rand_val)
+
+        trimmed_packet_list = trim_empty_packets_and_streams(packet_list)
+
+        cycles = sum(len(packet) for packet in packet_list[stream]) + 1
+
+        myhdl_cosimulation(
+            cycles, None, testbench, self.args, self.arg_types)
+
+        internal_completed_packets = self.test_sink._completed_packets
+        completed_packets, current_packets = self.test_sink.take_packets()
+
+        self.assertIs(completed_packets, internal_completed_packets)
+        self.assertEqual(completed_packets, trimmed_packet_list)
+        self.assertEqual(current_packets, {})
+
+        self.assertEqual(self.test_sink.completed_packets, {})
+        self.assertEqual(self.test_sink.current_packets, {})
+
     def test_multiple_stream_data(self):
         ''' It should be possible to receive data for multiple streams as
         defined by the ``TID`` and ``TDEST`` signals in the AXI stream
@@ -1,2 +1,5 @@
-from ._axi_lite_handler import axi_lite_handler
-from ._registers import Registers, Bitfields
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._axi_lite_handler': ['axi_lite_handler'],
+    '._registers': ['Registers', 'Bitfields']})
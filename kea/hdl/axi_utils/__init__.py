@@ -1,8 +1,12 @@
-from ._axis_buffer import axis_buffer
-from ._axis_constant_pad import axis_constant_pad
-from .axis_flexi_bit_interface import AxiStreamFlexiBitInterface
-from ._axis_packet_gate import axis_packet_gate
-from ._axis_periodic_enable import axis_periodic_enable
-from .axis_transaction_count import (
-    axis_count_valid_transactions, axis_count_sink_not_ready_transactions,
-    axis_count_source_not_valid_transactions)
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._axis_buffer': ['axis_buffer'],
+    '._axis_constant_pad': ['axis_constant_pad'],
+    '.axis_flexi_bit_interface': ['AxiStreamFlexiBitInterface'],
+    '._axis_packet_gate': ['axis_packet_gate'],
+    '._axis_periodic_enable': ['axis_periodic_enable'],
+    '.axis_transaction_count': [
+        'axis_count_valid_transactions',
+        'axis_count_sink_not_ready_transactions',
+        'axis_count_source_not_valid_transactions']})
@@ -1,4 +1,7 @@
-from ._double_buffer import double_buffer
-from ._pulse_synchroniser import pulse_synchroniser
-from .multiple_double_buffers import (
-    DoubleBufferArrayInterface, double_buffer_array)
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._double_buffer': ['double_buffer'],
+    '._pulse_synchroniser': ['pulse_synchroniser'],
+    '.multiple_double_buffers': [
+        'DoubleBufferArrayInterface', 'double_buffer_array']})
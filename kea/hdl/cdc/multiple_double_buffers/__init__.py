@@ -1,2 +1,5 @@
-from ._double_buffer_array import double_buffer_array
-from .interfaces import DoubleBufferArrayInterface
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._double_buffer_array': ['double_buffer_array'],
+    '.interfaces': ['DoubleBufferArrayInterface']})
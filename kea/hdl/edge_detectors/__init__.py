@@ -1,2 +1,5 @@
-from ._rising_edge_detector import rising_edge_detector
-from ._falling_edge_detector import falling_edge_detector
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._rising_edge_detector': ['rising_edge_detector'],
+    '._falling_edge_detector': ['falling_edge_detector']})
@@ -1 +1,4 @@
-from ._equality_detector import equality_detector
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._equality_detector': ['equality_detector']})
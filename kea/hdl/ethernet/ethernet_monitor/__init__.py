@@ -1,2 +1,5 @@
-from ._ethernet_monitor import ethernet_monitor
-from .interfaces import EthernetStatusInterface
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._ethernet_monitor': ['ethernet_monitor'],
+    '.interfaces': ['EthernetStatusInterface']})
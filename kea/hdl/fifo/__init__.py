@@ -1 +1,4 @@
-from ._starved_fifo_reader import starved_fifo_reader
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._starved_fifo_reader': ['starved_fifo_reader']})
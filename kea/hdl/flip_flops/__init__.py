@@ -1,2 +1,5 @@
-from ._sr_flip_flop import sr_flip_flop
-from ._toggle_flip_flop import toggle_flip_flop
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._sr_flip_flop': ['sr_flip_flop'],
+    '._toggle_flip_flop': ['toggle_flip_flop']})
@@ -1,10 +1,14 @@
-from .logic import (
-    and_gate, or_gate, not_gate, nand_gate, nor_gate, exor_gate, exnor_gate)
-from ._reducing_or import reducing_or
-from ._reducing_and import reducing_and
-from ._variable_width_and import variable_width_and
-from ._variable_width_or import variable_width_or
-from ._vector_not import vector_not
-from ._vector_and import vector_and
-from ._vector_or import vector_or
-from ._vector_xor import vector_xor
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '.logic': [
+        'and_gate', 'or_gate', 'not_gate', 'nand_gate', 'nor_gate',
+        'exor_gate', 'exnor_gate'],
+    '._reducing_or': ['reducing_or'],
+    '._reducing_and': ['reducing_and'],
+    '._variable_width_and': ['variable_width_and'],
+    '._variable_width_or': ['variable_width_or'],
+    '._vector_not': ['vector_not'],
+    '._vector_and': ['vector_and'],
+    '._vector_or': ['vector_or'],
+    '._vector_xor': ['vector_xor']})
@@ -1,4 +1,7 @@
-from .logic import (
-    synchronous_and_gate, synchronous_or_gate, synchronous_not_gate,
-    synchronous_nand_gate, synchronous_nor_gate, synchronous_exor_gate,
-    synchronous_exnor_gate)
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '.logic': [
+        'synchronous_and_gate', 'synchronous_or_gate', 'synchronous_not_gate',
+        'synchronous_nand_gate', 'synchronous_nor_gate',
+        'synchronous_exor_gate', 'synchronous_exnor_gate']})
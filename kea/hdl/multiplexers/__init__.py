@@ -1,2 +1,5 @@
-from ._synchronous_multiplexer import synchronous_multiplexer
-from .interfaces import MultiplexerInputInterface
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._synchronous_multiplexer': ['synchronous_multiplexer'],
+    '.interfaces': ['MultiplexerInputInterface']})
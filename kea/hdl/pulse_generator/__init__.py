@@ -1 +1,4 @@
-from ._pulse_generator import pulse_generator
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._pulse_generator': ['pulse_generator']})
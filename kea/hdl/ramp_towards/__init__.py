@@ -1 +1,4 @@
-from ._ramp_towards import ramp_towards
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._ramp_towards': ['ramp_towards']})
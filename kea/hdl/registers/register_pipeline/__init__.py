@@ -1 +1,4 @@
-from ._register_pipeline import register_pipeline
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._register_pipeline': ['register_pipeline']})
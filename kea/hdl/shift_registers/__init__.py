@@ -1,3 +1,6 @@
-from ._sipo_shift_register import sipo_shift_register
-from ._piso_shift_register import piso_shift_register
-from ._sipo_follower_shift_register import sipo_follower_shift_register
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._sipo_shift_register': ['sipo_shift_register'],
+    '._piso_shift_register': ['piso_shift_register'],
+    '._sipo_follower_shift_register': ['sipo_follower_shift_register']})
@@ -1 +1,4 @@
-from ._synchronous_sipo_follower import synchronous_sipo_follower
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._synchronous_sipo_follower': ['synchronous_sipo_follower']})
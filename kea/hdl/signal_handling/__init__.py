@@ -1,8 +1,12 @@
-from .asynchronous import (
-    signal_assigner, constant_assigner, combined_signal_assigner,
-    signal_slicer, integer_constant_signal, de_concatenator,
-    DeConcatenatorOutputInterface, sig_assigner, signed_sig_assigner)
-from .synchronous import (
-    synchronous_signal_assigner, synchronous_signal_slicer,
-    synchronous_saturating_rounding_slicer, sync_left_shift,
-    sync_sig_assigner, sync_sig_assigner_with_reset)
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '.asynchronous': [
+        'signal_assigner', 'constant_assigner', 'combined_signal_assigner',
+        'signal_slicer', 'integer_constant_signal', 'de_concatenator',
+        'DeConcatenatorOutputInterface', 'sig_assigner',
+        'signed_sig_assigner'],
+    '.synchronous': [
+        'synchronous_signal_assigner', 'synchronous_signal_slicer',
+        'synchronous_saturating_rounding_slicer', 'sync_left_shift',
+        'sync_sig_assigner', 'sync_sig_assigner_with_reset']})
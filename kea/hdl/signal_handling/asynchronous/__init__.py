@@ -1,10 +1,13 @@
-from ._constant_assigner import constant_assigner
-from ._combined_signal_assigner import combined_signal_assigner
-from .de_concatenator_block import (
-    de_concatenator, DeConcatenatorOutputInterface)
-from ._integer_constant_signal import integer_constant_signal
-from .left_shift_block import left_shift
-from ._signal_assigner import signal_assigner
-from ._signal_slicer import signal_slicer
-from .sig_assigner_block import sig_assigner
-from .signed_sig_assigner_block import signed_sig_assigner
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._constant_assigner': ['constant_assigner'],
+    '._combined_signal_assigner': ['combined_signal_assigner'],
+    '.de_concatenator_block': [
+        'de_concatenator', 'DeConcatenatorOutputInterface'],
+    '._integer_constant_signal': ['integer_constant_signal'],
+    '.left_shift_block': ['left_shift'],
+    '._signal_assigner': ['signal_assigner'],
+    '._signal_slicer': ['signal_slicer'],
+    '.sig_assigner_block': ['sig_assigner'],
+    '.signed_sig_assigner_block': ['signed_sig_assigner']})
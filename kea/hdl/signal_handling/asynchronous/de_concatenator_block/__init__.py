@@ -1,2 +1,5 @@
-from ._de_concatenator import de_concatenator
-from .interfaces import DeConcatenatorOutputInterface
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._de_concatenator': ['de_concatenator'],
+    '.interfaces': ['DeConcatenatorOutputInterface']})
@@ -1 +1,4 @@
-from ._left_shift import left_shift
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._left_shift': ['left_shift']})
@@ -1 +1,4 @@
-from ._sig_assigner import sig_assigner
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._sig_assigner': ['sig_assigner']})
@@ -1 +1,4 @@
-from ._signed_sig_assigner import signed_sig_assigner
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._signed_sig_assigner': ['signed_sig_assigner']})
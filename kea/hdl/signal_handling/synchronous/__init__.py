@@ -1,7 +1,10 @@
-from ._synchronous_signal_assigner import synchronous_signal_assigner
-from ._synchronous_signal_slicer import synchronous_signal_slicer
-from ._synchronous_saturating_rounding_slicer import (
-    synchronous_saturating_rounding_slicer)
-from .sync_left_shift_block import sync_left_shift
-from .sync_sig_assigner_block import sync_sig_assigner
-from .sync_sig_assigner_with_reset_block import sync_sig_assigner_with_reset
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._synchronous_signal_assigner': ['synchronous_signal_assigner'],
+    '._synchronous_signal_slicer': ['synchronous_signal_slicer'],
+    '._synchronous_saturating_rounding_slicer': [
+        'synchronous_saturating_rounding_slicer'],
+    '.sync_left_shift_block': ['sync_left_shift'],
+    '.sync_sig_assigner_block': ['sync_sig_assigner'],
+    '.sync_sig_assigner_with_reset_block': ['sync_sig_assigner_with_reset']})
@@ -1 +1,4 @@
-from ._sync_left_shift import sync_left_shift
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._sync_left_shift': ['sync_left_shift']})
@@ -1 +1,4 @@
-from ._sync_sig_assigner_with_reset import sync_sig_assigner_with_reset
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._sync_sig_assigner_with_reset': ['sync_sig_assigner_with_reset']})
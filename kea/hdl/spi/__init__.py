@@ -1 +1,4 @@
-from ._spi_slave import spi_slave
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._spi_slave': ['spi_slave']})
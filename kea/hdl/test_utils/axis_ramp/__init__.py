@@ -1 +1,4 @@
-from ._axis_ramp_driver import axis_ramp_driver
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._axis_ramp_driver': ['axis_ramp_driver']})
@@ -1 +1,4 @@
-from ._watchdog import watchdog
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._watchdog': ['watchdog']})
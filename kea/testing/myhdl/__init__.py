@@ -1,3 +1,6 @@
 from .cosimulation import *
 from .hdl_blocks import *
+from .streaming import *
+from .profiling import *
+from .seed_sweep import *
 from .utils import *
@@ -1,4 +1,7 @@
 from .hdl_blocks import *
+from .streaming import (
+    SignalChunks, SignalSpool, AxiStreamPacketSpool, packet_spool_drainer)
+from .profiling import CosimulationProfile, _profiled_waiters
 
 from myhdl import *
 
@@ -8,17 +11,17 @@ myhdl_vhdl_package_filename = "pck_myhdl_%s.vhd" % _shortversion
 
 import copy
 import os
+import functools
 import tempfile
 import re
+import time
 
 from string import Template
 import csv
 
 import random
+import numpy as np
 from collections.abc import MutableMapping, Sequence
-from collections import OrderedDict
-
-import inspect
 
 try:
     # Python 3
@@ -41,70 +44,92 @@ if sys.version_info < (3, 8):
     copy._deepcopy_dispatch[type(re.compile(''))] = lambda r, _: r
 
 __all__ = ['SynchronousTest', 'myhdl_cosimulation', 'SignalOutput',
-           'AxiStreamOutput']
+           'ReadOnlySignalOutput', 'AxiStreamOutput',
+           'CosimulationMismatchError']
 
 PERIOD = 10
 
-# This is a lot of a hack because we want to keep sane signal names in the
-# namespace that myhdl can find when populating v*_code (using the $name)
-# strategy. We can only really do this in globals().
-_quasi_signal_namespace = {}
+# The formats in which the convertible file writers can write the values.
+# 'binary' writes each value as a string of bits and writes every row to the
+# file as it is recorded. 'hex' writes each value as hex digits and buffers
+# the rows, writing them to the file every _file_writer_flush_interval rows
+# (and on the last cycle that is recorded).
+_file_writer_output_formats = ('binary', 'hex')
+_file_writer_flush_interval = 1024
+
+class _SignalNamespace(object):
+    '''The names by which the user-defined code of a convertible block
+    refers to its signals (as ``$name``).
+
+    MyHDL looks up the names in the user-defined code in the namespace in
+    which the instances of the block were created, which is the module
+    globals and the locals of the block function. Rather than adding the
+    signals to the module globals, each block registers its signals in a
+    namespace of its own and adds them to the namespace of its instance
+    with :meth:`add_to_instance`. The names are then the same on every
+    conversion, and the namespace goes with the block once it has been
+    converted.
+    '''
 
-def _add_local_signal_to_globals(name, signal):
+    def __init__(self):
+        self._signals = {}
 
-    # We use the calling stack for our quasi namespace
-    stack_hierarchy = [
-        hierarchy[3] for hierarchy in inspect.stack()[1:-1]][::-1]
+    def add(self, name, signal):
+        '''Registers ``signal`` as ``name`` and returns the name.
+        '''
+        if name in self._signals:
+            raise ValueError(
+                'A signal has already been registered as %s' % name)
 
-    modified_name = name
+        self._signals[name] = signal
 
-    if modified_name not in globals():
-        globals()[modified_name] = signal
+        return name
 
-    else:
-        while modified_name in globals():
-            modified_name = name + '_%06x' % random.randrange(16**6)
+    def __getitem__(self, name):
+        return self._signals[name]
 
-        globals()[modified_name] = signal
+    def __contains__(self, name):
+        return name in self._signals
 
-    containing_dict = _quasi_signal_namespace
-    for each_entry in stack_hierarchy:
-        try:
-            containing_dict = containing_dict[each_entry]
-        except KeyError:
-            containing_dict[each_entry] = {}
-            containing_dict = containing_dict[each_entry]
+    def add_to_instance(self, instance):
+        '''Adds the registered signals to the namespace of ``instance``,
+        the instance returned by the block function, from which the block
+        takes the namespace of its user-defined code.
+        '''
+        instance.callinfo.symdict.update(self._signals)
 
-    containing_dict[name] = modified_name
+        return instance
 
-    return modified_name
+def _check_file_writer_output_format(output_format):
 
-def _get_globals_signal_name(name):
-    # We assume we are accessing from the same function that has already
-    # added a signal to the globals
-    stack_hierarchy = [
-        hierarchy[3] for hierarchy in inspect.stack()[1:-1]][::-1]
+    if output_format not in _file_writer_output_formats:
+        raise ValueError(
+            'Invalid output format. Please select from: ' +
+            ', '.join(_file_writer_output_formats))
 
-    containing_dict = _quasi_signal_namespace
-    for each_entry in stack_hierarchy:
-        try:
-            containing_dict = containing_dict[each_entry]
-        except KeyError:
-            raise KeyError(
-                'Could not find local signal in the global quasi-namespace. '
-                'This is likely a bug in kea.testing.myhdl.')
+def _file_writer_flush_conditions(n_cycles):
+    '''Returns the VHDL and Verilog conditions on which the buffered rows
+    of the hex file writers are written out.
+    '''
+    vhdl_condition = 'buffered_rows = %d' % _file_writer_flush_interval
+    verilog_condition = 'buffered_rows == %d' % _file_writer_flush_interval
 
-    modified_name = containing_dict[name]
+    if n_cycles is not None:
+        vhdl_condition += ' or cycle_count = %d' % n_cycles
+        verilog_condition += ' || cycle_count == %d' % n_cycles
 
-    return modified_name
+    return vhdl_condition, verilog_condition
 
-def _get_local_signal_from_globals(name):
+@block
+def file_writer(filename, signal_list, clock, signal_names=None,
+                output_format='binary', n_cycles=None):
 
-    modified_name = _get_globals_signal_name(name)
-    return globals()[modified_name]
+    _check_file_writer_output_format(output_format)
 
-@block
-def file_writer(filename, signal_list, clock, signal_names=None):
+    if output_format == 'hex':
+        verilog_value_format = '%h'
+    else:
+        verilog_value_format = '%b'
 
     vhdl_signal_str_write_list = []
     vhdl_name_str_write_list = []
@@ -115,22 +140,35 @@ def file_writer(filename, signal_list, clock, signal_names=None):
     vhdl_annotations = ''
     verilog_annotations = ''
 
+    signal_namespace = _SignalNamespace()
+
     for n, each_signal in enumerate(signal_list):
-        modified_sig_name = (
-            _add_local_signal_to_globals('signal_' + str(n), each_signal))
+        modified_sig_name = signal_namespace.add(
+            'signal_' + str(n), each_signal)
         each_signal.read = True
 
+        if output_format == 'hex':
+            # The width of each signal cannot be inferred from the number of
+            # hex digits, so it is written in the header.
+            header_suffix = ':%d' % len(each_signal)
+        else:
+            header_suffix = ''
+
         if signal_names is None:
             vhdl_name_str_write_list.append(
-                'write(output_line, string\'(\"$%s\"));' % modified_sig_name)
+                'write(output_line, string\'(\"$%s%s\"));' %
+                (modified_sig_name, header_suffix))
             verilog_name_str_write_list.append(
-                '$$fwrite(output_file, \"$%s\");' % modified_sig_name)
+                '$$fwrite(output_file, \"$%s%s\");' %
+                (modified_sig_name, header_suffix))
         else:
             # We assign the signal headers from the signal names
             vhdl_name_str_write_list.append(
-                'write(output_line, string\'(\"%s\"));' % signal_names[n])
+                'write(output_line, string\'(\"%s%s\"));' %
+                (signal_names[n], header_suffix))
             verilog_name_str_write_list.append(
-                '$$fwrite(output_file, \"%s\");' % signal_names[n])
+                '$$fwrite(output_file, \"%s%s\");' %
+                (signal_names[n], header_suffix))
 
             port_name = signal_names[n].split()[-1]
             annotation = '<name_annotation> $%s %s' % (modified_sig_name,
@@ -141,13 +179,18 @@ def file_writer(filename, signal_list, clock, signal_names=None):
         if isinstance(each_signal._val, bool):
             vhdl_signal_str_write_list.append(
                 'write(output_line, std_logic($%s));' % modified_sig_name)
+        elif output_format == 'hex':
+            vhdl_signal_str_write_list.append(
+                'hwrite(output_line, std_logic_vector($%s));' %
+                modified_sig_name)
         else:
             vhdl_signal_str_write_list.append(
                 'write(output_line, std_logic_vector($%s));' %
                 modified_sig_name)
 
         verilog_signal_str_write_list.append(
-            '$$fwrite(output_file, \"%%b\", $%s);' % modified_sig_name)
+            '$$fwrite(output_file, \"%s\", $%s);' % (
+                verilog_value_format, modified_sig_name))
 
     vhdl_name_indent = ' ' * 12
     vhdl_name_str_write = (
@@ -173,7 +216,78 @@ def file_writer(filename, signal_list, clock, signal_names=None):
          (verilog_signal_indent, verilog_signal_indent))
         .join(verilog_signal_str_write_list))
 
-    file_writer.verilog_code = '''
+    if output_format == 'hex':
+        vhdl_flush_condition, verilog_flush_condition = (
+            _file_writer_flush_conditions(n_cycles))
+
+        file_writer.verilog_code = '''
+%s
+initial begin: write_to_file
+    integer output_file;
+    integer buffered_rows;
+    integer cycle_count;
+
+    output_file = $$fopen("%s", "w");
+    buffered_rows = 0;
+    cycle_count = 0;
+
+    %s
+    $$fwrite(output_file, "\\n");
+    $$fflush(output_file);
+
+    while (1'b1) begin
+        @(posedge $clock) begin
+            %s
+            $$fwrite(output_file, "\\n");
+            buffered_rows = buffered_rows + 1;
+            cycle_count = cycle_count + 1;
+
+            if (%s) begin
+                $$fflush(output_file);
+                buffered_rows = 0;
+            end
+        end
+    end
+end
+        ''' % (verilog_annotations, filename, verilog_name_str_write,
+               verilog_signal_str_write, verilog_flush_condition)
+
+        # The rows are buffered in output_line, separated by line feeds, and
+        # written out together.
+        file_writer.vhdl_code = '''
+%s
+write_to_file: process ($clock) is
+
+    file output_file : TEXT open WRITE_MODE is "%s";
+    variable output_line : LINE;
+    variable first_line_to_print : boolean := true;
+    variable buffered_rows : natural := 0;
+    variable cycle_count : natural := 0;
+begin
+    if rising_edge($clock) then
+        if first_line_to_print then
+            %s
+            writeLine(output_file, output_line);
+            first_line_to_print := false;
+        end if;
+        if buffered_rows > 0 then
+            write(output_line, LF);
+        end if;
+        %s
+        buffered_rows := buffered_rows + 1;
+        cycle_count := cycle_count + 1;
+
+        if %s then
+            writeline(output_file, output_line);
+            buffered_rows := 0;
+        end if;
+    end if;
+end process write_to_file;
+        ''' % (vhdl_annotations, filename, vhdl_name_str_write,
+               vhdl_signal_str_write, vhdl_flush_condition)
+
+    else:
+        file_writer.verilog_code = '''
 %s
 initial begin: write_to_file
     integer output_file;
@@ -192,10 +306,10 @@ initial begin: write_to_file
         end
     end
 end
-    ''' % (verilog_annotations, filename, verilog_name_str_write,
-           verilog_signal_str_write,)
+        ''' % (verilog_annotations, filename, verilog_name_str_write,
+               verilog_signal_str_write,)
 
-    file_writer.vhdl_code = '''
+        file_writer.vhdl_code = '''
 %s
 write_to_file: process ($clock) is
 
@@ -213,8 +327,8 @@ begin
         writeline(output_file, output_line);
     end if;
 end process write_to_file;
-    ''' % (vhdl_annotations, filename, vhdl_name_str_write,
-           vhdl_signal_str_write,)
+        ''' % (vhdl_annotations, filename, vhdl_name_str_write,
+               vhdl_signal_str_write,)
 
     @always(clock.posedge)
     def _dummy_file_writer():
@@ -222,13 +336,21 @@ end process write_to_file;
         # the dummy writer in order that the used signals can be inferred
         # correctly.
         for n in range(len(signal_list)):
-            print(_get_local_signal_from_globals('signal_' + str(n)))
+            print(signal_namespace['signal_' + str(n)])
 
-    return _dummy_file_writer
+    return signal_namespace.add_to_instance(_dummy_file_writer)
 
 @block
 def axi_stream_file_writer(
-    clock, axi_stream_interface, axi_writer_suffix, filename):
+    clock, axi_stream_interface, axi_writer_suffix, filename,
+    output_format='binary', n_cycles=None):
+
+    _check_file_writer_output_format(output_format)
+
+    if output_format == 'hex':
+        verilog_value_format = '%h'
+    else:
+        verilog_value_format = '%b'
 
     vhdl_signal_str_write_list = []
     vhdl_name_str_write_list = []
@@ -236,12 +358,14 @@ def axi_stream_file_writer(
     verilog_signal_str_write_list = []
     verilog_name_str_write_list = []
 
-    signal_TVALID_name = _add_local_signal_to_globals(
+    signal_namespace = _SignalNamespace()
+
+    signal_TVALID_name = signal_namespace.add(
         'signal_TVALID', axi_stream_interface.TVALID)
     axi_stream_interface.TVALID.read = True
 
 
-    signal_TREADY_name = _add_local_signal_to_globals(
+    signal_TREADY_name = signal_namespace.add(
         'signal_TREADY', axi_stream_interface.TREADY)
     axi_stream_interface.TREADY.driven = 'reg'
 
@@ -254,33 +378,47 @@ def axi_stream_file_writer(
             # Attribute not available, so ignore it.
             continue
 
-        modified_sig_name = _add_local_signal_to_globals(
+        modified_sig_name = signal_namespace.add(
             'signal_' + each_signal_name, each_signal)
         each_signal.read = True
 
+        if output_format == 'hex':
+            header_suffix = ':%d' % len(each_signal)
+        else:
+            header_suffix = ''
+
         if signal_names is None:
             vhdl_name_str_write_list.append(
-                'write(output_line, string\'(\"$%s\"));' % modified_sig_name)
+                'write(output_line, string\'(\"$%s%s\"));' %
+                (modified_sig_name, header_suffix))
             verilog_name_str_write_list.append(
-                '$$fwrite(output_file, \"$%s\");' % modified_sig_name)
+                '$$fwrite(output_file, \"$%s%s\");' %
+                (modified_sig_name, header_suffix))
         else:
             # We assign the signal headers from the signal names
             vhdl_name_str_write_list.append(
-                'write(output_line, string\'(\"%s\"));' % each_signal_name)
+                'write(output_line, string\'(\"%s%s\"));' %
+                (each_signal_name, header_suffix))
             verilog_name_str_write_list.append(
-                '$$fwrite(output_file, \"%s\");' % each_signal_name)
+                '$$fwrite(output_file, \"%s%s\");' %
+                (each_signal_name, header_suffix))
 
 
         if isinstance(each_signal._val, bool):
             vhdl_signal_str_write_list.append(
                 'write(output_line, std_logic($%s));' % modified_sig_name)
+        elif output_format == 'hex':
+            vhdl_signal_str_write_list.append(
+                'hwrite(output_line, std_logic_vector($%s));' %
+                modified_sig_name)
         else:
             vhdl_signal_str_write_list.append(
                 'write(output_line, std_logic_vector($%s));' %
                 modified_sig_name)
 
         verilog_signal_str_write_list.append(
-            '$$fwrite(output_file, \"%%b\", $%s);' % modified_sig_name)
+            '$$fwrite(output_file, \"%s\", $%s);' % (
+                verilog_value_format, modified_sig_name))
 
     vhdl_name_indent = ' ' * 16
     vhdl_name_str_write = (
@@ -306,11 +444,19 @@ def axi_stream_file_writer(
          (verilog_signal_indent, verilog_signal_indent))
         .join(verilog_signal_str_write_list))
 
-    axi_stream_file_writer.verilog_code = '''
+    if output_format == 'hex':
+        vhdl_flush_condition, verilog_flush_condition = (
+            _file_writer_flush_conditions(n_cycles))
+
+        axi_stream_file_writer.verilog_code = '''
 initial begin: write_to_file_%s
     integer output_file;
+    integer buffered_rows;
+    integer cycle_count;
 
     output_file = $$fopen("%s", "w");
+    buffered_rows = 0;
+    cycle_count = 0;
 
     %s
     $$fwrite(output_file, "\\n");
@@ -323,21 +469,30 @@ initial begin: write_to_file_%s
             if ($%s & $%s) begin
                 %s
                 $$fwrite(output_file, "\\n");
+                buffered_rows = buffered_rows + 1;
+            end
+
+            cycle_count = cycle_count + 1;
+
+            if (buffered_rows > 0 && (%s)) begin
                 $$fflush(output_file);
+                buffered_rows = 0;
             end
         end
     end
 end
-    ''' % (axi_writer_suffix, filename, verilog_name_str_write,
-           signal_TREADY_name, signal_TVALID_name, signal_TREADY_name,
-           verilog_signal_str_write,)
+        ''' % (axi_writer_suffix, filename, verilog_name_str_write,
+               signal_TREADY_name, signal_TVALID_name, signal_TREADY_name,
+               verilog_signal_str_write, verilog_flush_condition)
 
-    axi_stream_file_writer.vhdl_code = '''
+        axi_stream_file_writer.vhdl_code = '''
 write_to_file_%s: process ($clock) is
 
     file output_file : TEXT open WRITE_MODE is "%s";
     variable output_line : LINE;
     variable first_line_to_print : boolean := true;
+    variable buffered_rows : natural := 0;
+    variable cycle_count : natural := 0;
 begin
     if rising_edge($clock) then
         $%s <= '1';
@@ -348,14 +503,77 @@ begin
                 writeLine(output_file, output_line);
                 first_line_to_print := false;
             end if;
+            if buffered_rows > 0 then
+                write(output_line, LF);
+            end if;
             %s
+            buffered_rows := buffered_rows + 1;
+        end if;
+
+        cycle_count := cycle_count + 1;
+
+        if buffered_rows > 0 and (%s) then
             writeline(output_file, output_line);
+            buffered_rows := 0;
         end if;
     end if;
 end process write_to_file_%s;
-    ''' % (axi_writer_suffix, filename, signal_TREADY_name,
-           signal_TREADY_name, signal_TVALID_name, vhdl_name_str_write,
-           vhdl_signal_str_write, axi_writer_suffix)
+        ''' % (axi_writer_suffix, filename, signal_TREADY_name,
+               signal_TREADY_name, signal_TVALID_name, vhdl_name_str_write,
+               vhdl_signal_str_write, vhdl_flush_condition,
+               axi_writer_suffix)
+
+    else:
+        axi_stream_file_writer.verilog_code = '''
+initial begin: write_to_file_%s
+    integer output_file;
+
+    output_file = $$fopen("%s", "w");
+
+    %s
+    $$fwrite(output_file, "\\n");
+    $$fflush(output_file);
+
+    while (1'b1) begin
+        @(posedge $clock) begin
+            $%s <= 1;
+
+            if ($%s & $%s) begin
+                %s
+                $$fwrite(output_file, "\\n");
+                $$fflush(output_file);
+            end
+        end
+    end
+end
+        ''' % (axi_writer_suffix, filename, verilog_name_str_write,
+               signal_TREADY_name, signal_TVALID_name, signal_TREADY_name,
+               verilog_signal_str_write,)
+
+        axi_stream_file_writer.vhdl_code = '''
+write_to_file_%s: process ($clock) is
+
+    file output_file : TEXT open WRITE_MODE is "%s";
+    variable output_line : LINE;
+    variable first_line_to_print : boolean := true;
+begin
+    if rising_edge($clock) then
+        $%s <= '1';
+
+        if $%s='1' and $%s='1' then
+            if first_line_to_print then
+                %s
+                writeLine(output_file, output_line);
+                first_line_to_print := false;
+            end if;
+            %s
+            writeline(output_file, output_line);
+        end if;
+    end if;
+end process write_to_file_%s;
+        ''' % (axi_writer_suffix, filename, signal_TREADY_name,
+               signal_TREADY_name, signal_TVALID_name, vhdl_name_str_write,
+               vhdl_signal_str_write, axi_writer_suffix)
 
     @always(clock.posedge)
     def _dummy_file_writer():
@@ -366,10 +584,77 @@ end process write_to_file_%s;
 
         if axi_stream_interface.TVALID and axi_stream_interface.TREADY:
             for signal_name in signal_names:
-                print(_get_local_signal_from_globals('signal_' + signal_name))
+                if 'signal_' + signal_name in signal_namespace:
+                    print(signal_namespace['signal_' + signal_name])
+
+    return signal_namespace.add_to_instance(_dummy_file_writer)
+
+
+def _sim_values_equal(values_a, values_b):
+    '''Compares two sets of recorded values, either of which might be a
+    NumPy array (as recorded in columnar mode). Anything that is not an
+    array is compared with ``==`` as usual.
+    '''
+    if isinstance(values_b, SignalChunks):
+        values_a, values_b = values_b, values_a
 
-    return _dummy_file_writer
+    if isinstance(values_a, SignalChunks):
+        # Compared chunk by chunk
+        return values_a == values_b
 
+    a_is_array = isinstance(values_a, np.ndarray)
+    b_is_array = isinstance(values_b, np.ndarray)
+
+    if not a_is_array and not b_is_array:
+        return values_a == values_b
+
+    if len(values_a) != len(values_b):
+        return False
+
+    if a_is_array and b_is_array:
+        return bool(np.array_equal(values_a, values_b))
+
+    if a_is_array:
+        array_values, other_values = values_a, values_b
+    else:
+        array_values, other_values = values_b, values_a
+
+    # intbv looks like a sequence to NumPy, so we cannot simply convert the
+    # other values to an array. Instead we compare as python objects.
+    return all(array_value == other_value for array_value, other_value in
+               zip(array_values.tolist(), other_values))
+
+def _values_to_array(values):
+    '''Converts a sequence of recorded values to a NumPy array. Arrays are
+    returned as they are. Otherwise, bool values give a ``bool`` array,
+    integer values that fit in 64 bits give an ``int64`` or ``uint64`` array
+    and anything else gives an array of python objects.
+    '''
+    if isinstance(values, np.ndarray):
+        return values
+
+    if isinstance(values, SignalChunks):
+        return values.to_array()
+
+    if all(isinstance(value, bool) for value in values):
+        return np.array(values, dtype=bool)
+
+    try:
+        int_values = [int(value) for value in values]
+    except (TypeError, ValueError):
+        int_values = None
+
+    if int_values is not None and len(int_values) > 0:
+        if min(int_values) >= 0 and max(int_values) < 2**64:
+            return np.array(int_values, dtype=np.uint64)
+
+        elif min(int_values) >= -2**63 and max(int_values) < 2**63:
+            return np.array(int_values, dtype=np.int64)
+
+    values_array = np.empty(len(values), dtype=object)
+    values_array[:] = list(values)
+
+    return values_array
 
 class SimulationOutputGroup(Sequence):
 
@@ -387,101 +672,142 @@ class SimulationOutputGroup(Sequence):
                     raise ValueError(
                         'All the signal outputs need to be the same length')
 
-        self._setup_prototypes()
+        self._setup_row_builder()
+        self._records = None
 
     def __eq__(self, other):
         if not isinstance(other, SimulationOutputGroup):
             return False
 
-        return other._lookups == self._lookups
+        if set(other._lookups) != set(self._lookups):
+            return False
+
+        return all(_sim_values_equal(self._lookups[key], other._lookups[key])
+                   for key in self._lookups)
 
     def __repr__(self):
         return [each for each in self].__repr__()
 
-    def _setup_prototypes(self):
-        ''' Creates an ordered dictionary of objects that can be used to
-        create the necessary output.
+    def _setup_row_builder(self):
+        ''' Compiles a function that builds the output for a single index.
 
-        The ordered dictionary, when traversed in order, should produce a
-        coherent result. See __getitem__ for its usage.
+        The nested structure of dicts and lists implied by the lookup keys is
+        worked out once, here, rather than on every index. Each layer of the
+        structure is represented by a function that builds that layer from
+        the functions of the layer below, with the bottom layer simply
+        indexing the recorded values. See __getitem__ for its usage.
         '''
 
-        prototype_outputs = OrderedDict()
-
-        create_list = lambda n: [None] * n
-        create_dict = lambda keys: {key: None for key in keys}
-
-        for each_key in self._lookups.keys():
-            prototype_lookup = []
+        tree = {}
+        for each_key in self._lookups:
+            layer_tree = tree
+            for layer in each_key[:-1]:
+                layer_tree = layer_tree.setdefault(layer, {})
 
-            for layer in each_key:
-                tuple_lookup = tuple(prototype_lookup)
+            layer_tree[each_key[-1]] = self._lookups[each_key]
 
-                if isinstance(layer, str):
-                    # In the outputs, create or update the a representing the
-                    # interface type
-                    if tuple_lookup not in prototype_outputs:
-                        keys = set([layer])
-                    else:
-                        keys = prototype_outputs[tuple_lookup][1]
-                        keys.add(layer)
+        def compile_layer(layer_tree):
 
-                    prototype_outputs[tuple_lookup] = (create_dict, keys)
+            if not isinstance(layer_tree, dict):
+                # The leaf case: index the recorded values directly
+                return layer_tree.__getitem__
 
-                elif isinstance(layer, int):
-                    # In the outputs, create or update a list
-                    if tuple_lookup not in prototype_outputs:
-                        # The second arg gives the length
-                        prototype_outputs[tuple_lookup] = (
-                            create_list, layer + 1)
+            builders = [(layer, compile_layer(layer_tree[layer]))
+                        for layer in layer_tree]
 
-                    elif layer >= prototype_outputs[tuple_lookup][1]:
-                        # We need to make the length longer
-                        prototype_outputs[tuple_lookup] = (
-                            create_list, layer + 1)
+            if any(isinstance(layer, str) for layer, _ in builders):
+                def build_dict(index):
+                    return {layer: builder(index)
+                            for layer, builder in builders}
 
-                    else:
-                        # We can leave it as is
-                        pass
+                return build_dict
 
-                prototype_lookup.append(layer)
+            else:
+                # A list, with None in place of any indices that are not
+                # present.
+                list_length = max(layer for layer, _ in builders) + 1
+                list_builders = [None] * list_length
+                for layer, builder in builders:
+                    list_builders[layer] = builder
+
+                def build_list(index):
+                    return [None if builder is None else builder(index)
+                            for builder in list_builders]
+
+                return build_list
+
+        self._build_row = compile_layer(tree)
+
+    @staticmethod
+    def _key_to_field_name(key):
+        '''Converts a lookup key to the name in the form used to index
+        :class:`SimulationOutputs`, e.g. ``('a', 'b', 2)`` becomes
+        ``'a.b[2]'``.
+        '''
+        field_name = ''
+        for layer in key:
+            if isinstance(layer, int):
+                field_name += '[%d]' % layer
+            elif field_name == '':
+                field_name = layer
+            else:
+                field_name += '.' + layer
 
-        self._prototype_outputs = prototype_outputs
+        return field_name
 
-    def __getitem__(self, index):
+    def to_columns(self):
+        '''Returns a dictionary of the recorded values of every signal in
+        the group, keyed by the name of the signal relative to the group
+        (e.g. ``'a.b[2]'``). The values are not copied.
 
-        def get_int_indexed_value(index):
-            for each in self._prototype_outputs:
-                factory, arg = self._prototype_outputs[each]
+        This allows groups to be inspected and compared field by field,
+        without building the output for each index.
+        '''
+        return {self._key_to_field_name(key): self._lookups[key]
+                for key in self._lookups}
+
+    def to_records(self):
+        '''Returns the group as a NumPy structured array with one record
+        per index and one field per signal, named as in
+        :meth:`to_columns`.
+
+        Fields with values that fit in 64 bits are stored as ``bool``,
+        ``int64`` or ``uint64`` as appropriate. Other fields are stored as
+        python objects. The array is created on the first call and then
+        cached, so it should not be modified.
+        '''
+        if self._records is None:
+            columns = self.to_columns()
+            field_arrays = []
 
-                if each == ():
-                    # The base case
-                    output = factory(arg)
+            for field_name in columns:
+                field_arrays.append(
+                    (field_name, _values_to_array(columns[field_name])))
 
-                else:
-                    output_layer = output
-                    for layer in each[:-1]:
-                        output_layer = output_layer[layer]
+            records = np.empty(
+                self._output_length,
+                dtype=[(field_name, field_array.dtype)
+                       for field_name, field_array in field_arrays])
 
-                    output_layer[each[-1]] = factory(arg)
+            for field_name, field_array in field_arrays:
+                records[field_name] = field_array
 
-            for each in self._lookups:
-                output_layer = output
-                for layer in each[:-1]:
-                    output_layer = output_layer[layer]
+            records.flags.writeable = False
+            self._records = records
 
-                output_layer[each[-1]] = self._lookups[each][index]
+        return self._records
 
-            return output
+    def __getitem__(self, index):
 
         if isinstance(index, slice):
             start, stop, step = index.indices(self._output_length)
 
-            return [get_int_indexed_value(int_index)
+            build_row = self._build_row
+            return [build_row(int_index)
                     for int_index in range(start, stop, step)]
 
         elif isinstance(index, int):
-            return get_int_indexed_value(index)
+            return self._build_row(index)
 
         else:
             raise TypeError('list indices must be integers or slices')
@@ -493,6 +819,9 @@ class SimulationOutputs(MutableMapping):
     def __init__(self, init_dict=None):
         self._lookups = {}
         self._user_keys = set()
+        # Groups are cached so the row builder and records only need to be
+        # created once for each group.
+        self._groups = {}
         self._list_checker = re.compile(
             r'\A([a-zA-Z_][a-zA-Z0-9_]*)\[(\d+)\]\Z')
 
@@ -504,9 +833,35 @@ class SimulationOutputs(MutableMapping):
         user_key_dict = {each: self[each] for each in self._user_keys}
         return user_key_dict.__repr__()
 
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+
+        if set(self) != set(other):
+            return False
+
+        return all(_sim_values_equal(self[key], other[key]) for key in self)
+
     def __iter__(self):
         return iter(self._user_keys)
 
+    def __getstate__(self):
+        # The cached groups are not picklable (and are easily recreated).
+        state = self.__dict__.copy()
+        state['_groups'] = {}
+        return state
+
+    def copy(self):
+        '''Returns a shallow copy of the outputs. The new mapping can be
+        modified without affecting this one, but the recorded values
+        themselves are shared rather than copied.
+        '''
+        outputs_copy = SimulationOutputs()
+        outputs_copy._lookups = self._lookups.copy()
+        outputs_copy._user_keys = self._user_keys.copy()
+
+        return outputs_copy
+
     def _str_key_to_tuple_key(self, item_key):
         assert isinstance(item_key, str)
 
@@ -556,6 +911,7 @@ class SimulationOutputs(MutableMapping):
     def __setitem__(self, item, val):
         self._lookups[self._str_key_to_tuple_key(item)] = val
         self._user_keys.add(item)
+        self._groups.clear()
 
     def __getitem__(self, item):
         lookup = self._str_key_to_tuple_key(item)
@@ -563,10 +919,14 @@ class SimulationOutputs(MutableMapping):
         if lookup in self._lookups:
             return self._lookups[self._str_key_to_tuple_key(item)]
 
+        elif lookup in self._groups:
+            return self._groups[lookup]
+
         else:
             group = self._get_group_from_key(lookup)
             if group is not None:
-                return SimulationOutputGroup(group)
+                self._groups[lookup] = SimulationOutputGroup(group)
+                return self._groups[lookup]
 
             raise KeyError(
                 '"{}" not in the outputs, and no other way of accessing it is '
@@ -575,6 +935,7 @@ class SimulationOutputs(MutableMapping):
     def __delitem__(self, item):
         del self._lookups[self._str_key_to_tuple_key(item)]
         self._user_keys.discard(item)
+        self._groups.clear()
 
     def __len__(self):
         return len(self._lookups)
@@ -582,6 +943,258 @@ class SimulationOutputs(MutableMapping):
 class SignalOutput(list):
     pass
 
+class ReadOnlySignalOutput(SignalOutput):
+    '''The values recorded on a signal, as returned by
+    :meth:`SynchronousTest.cosimulate`. The recorded list is made read-only
+    in place rather than being copied, since the values are also the
+    stimulus from which the dut is converted. Any method that would modify
+    it raises a ``TypeError``.
+    '''
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('The recorded outputs are read-only.')
+
+    append = extend = insert = pop = remove = clear = sort = reverse = (
+        _read_only)
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        # Copies and unpickled objects are otherwise filled with append
+        return (type(self), (list(self),))
+
+class CosimulationMismatchError(AssertionError):
+    '''Raised by :meth:`SynchronousTest.cosimulate` when online comparison
+    is enabled and the dut diverges from the ref.
+
+    ``cycle`` is the cycle on which the divergence was detected and
+    ``signal_name`` is the name of the signal (or AXI stream interface) that
+    diverged. ``window_start`` is the cycle of the first value in
+    ``ref_values`` and ``dut_values``, which are the values recorded around
+    the divergence. For AXI stream interfaces, ``ref_values`` and
+    ``dut_values`` are the mismatched packets and ``window_start`` is
+    ``None``.
+
+    ``outputs`` is the pair of ``(dut_outputs, ref_outputs)`` that was
+    recorded up to the point the simulation was stopped.
+    '''
+
+    def __init__(self, message, cycle, signal_name, window_start,
+                 ref_values, dut_values, outputs):
+
+        super(CosimulationMismatchError, self).__init__(message)
+
+        self.cycle = cycle
+        self.signal_name = signal_name
+        self.window_start = window_start
+        self.ref_values = ref_values
+        self.dut_values = dut_values
+        self.outputs = outputs
+
+@block
+def _online_comparator(clock, signal_pairs, axi_stream_bfm_pairs,
+                       mismatch_window, mismatches):
+    '''Compares the ref and the dut on every positive clock edge.
+
+    ``signal_pairs`` is a list of ``(name, ref_signal, dut_signal)`` tuples
+    and ``axi_stream_bfm_pairs`` is a list of ``(name, ref_bfm, dut_bfm)``
+    tuples, in which the BFMs are the ``AxiStreamSlaveBFM`` objects recording
+    the ref and dut packets.
+
+    On the first divergence, a description of it is appended to
+    ``mismatches``. The simulation is then run on for ``mismatch_window``
+    cycles (so the values after the divergence are recorded) before
+    ``StopSimulation`` is raised.
+    '''
+
+    comparator_state = {
+        'cycle': 0,
+        'stop_cycle': None,
+        'checked_packets': {name: {} for name, _, _ in axi_stream_bfm_pairs}}
+
+    def first_packet_mismatch():
+        for name, ref_bfm, dut_bfm in axi_stream_bfm_pairs:
+            checked_packets = comparator_state['checked_packets'][name]
+
+            ref_packets = ref_bfm._completed_packets
+            dut_packets = dut_bfm._completed_packets
+
+            for stream in ref_packets:
+                if stream not in dut_packets:
+                    continue
+
+                n_checked = checked_packets.get(stream, 0)
+                n_comparable = min(
+                    len(ref_packets[stream]), len(dut_packets[stream]))
+
+                for n in range(n_checked, n_comparable):
+                    if ref_packets[stream][n] != dut_packets[stream][n]:
+                        return (name, stream, n, list(ref_packets[stream][n]),
+                                list(dut_packets[stream][n]))
+
+                checked_packets[stream] = n_comparable
+
+        return None
+
+    @always(clock.posedge)
+    def comparator():
+        cycle = comparator_state['cycle']
+        comparator_state['cycle'] += 1
+
+        if comparator_state['stop_cycle'] is not None:
+            if cycle >= comparator_state['stop_cycle']:
+                raise StopSimulation(
+                    'The dut diverged from the ref')
+
+            return
+
+        for name, ref_signal, dut_signal in signal_pairs:
+            if ref_signal.val != dut_signal.val:
+                mismatches.append(
+                    {'type': 'signal', 'name': name, 'cycle': cycle})
+                break
+
+        else:
+            packet_mismatch = first_packet_mismatch()
+
+            if packet_mismatch is not None:
+                name, stream, packet_index, ref_packet, dut_packet = (
+                    packet_mismatch)
+                mismatches.append(
+                    {'type': 'axi_stream', 'name': name, 'cycle': cycle,
+                     'stream': stream, 'packet_index': packet_index,
+                     'ref_packet': ref_packet, 'dut_packet': dut_packet})
+
+        if len(mismatches) > 0:
+            comparator_state['stop_cycle'] = cycle + mismatch_window
+
+            if mismatch_window == 0:
+                raise StopSimulation('The dut diverged from the ref')
+
+    return comparator
+
+def _restart_instances(block_instance):
+    '''Restarts every generator in ``block_instance`` (and the blocks
+    within it) from the beginning, so an already elaborated block can be
+    simulated again.
+    '''
+    for sub in block_instance.subs:
+        if isinstance(sub, myhdl._block._Block):
+            _restart_instances(sub)
+
+        elif isinstance(sub, myhdl._instance._Instantiator):
+            sub.gen = sub.genfunc()
+
+def _online_mismatch_error(mismatch, outputs, mismatch_window):
+    '''Creates a :class:`CosimulationMismatchError` from a mismatch found by
+    the online comparator.
+    '''
+    dut_outputs, ref_outputs = outputs
+
+    name = mismatch['name']
+    cycle = mismatch['cycle']
+
+    if mismatch['type'] == 'axi_stream':
+        message = (
+            'The dut diverged from the ref on AXI stream interface \'{}\' '
+            '(detected at cycle {}): packet {} on stream (TID, TDEST) = {} '
+            'differs.\n  ref: {}\n  dut: {}'.format(
+                name, cycle, mismatch['packet_index'], mismatch['stream'],
+                mismatch['ref_packet'], mismatch['dut_packet']))
+
+        return CosimulationMismatchError(
+            message, cycle, name, None, mismatch['ref_packet'],
+            mismatch['dut_packet'], outputs)
+
+    window_start = max(cycle - mismatch_window, 0)
+    window_stop = cycle + mismatch_window + 1
+
+    if name in ref_outputs:
+        ref_values = list(ref_outputs[name][window_start:window_stop])
+        dut_values = list(dut_outputs[name][window_start:window_stop])
+    else:
+        # The values were streamed to a handler, so are not available.
+        ref_values = []
+        dut_values = []
+
+    value_lines = []
+    for n, (ref_value, dut_value) in enumerate(zip(ref_values, dut_values)):
+        this_cycle = window_start + n
+        marker = '>' if this_cycle == cycle else ' '
+        value_lines.append('{} {:>10} {:>20} {:>20}'.format(
+            marker, this_cycle, str(ref_value), str(dut_value)))
+
+    message = (
+        'The dut diverged from the ref on \'{}\' at cycle {}.\n'
+        '{:>12} {:>20} {:>20}\n{}'.format(
+            name, cycle, 'cycle', 'ref', 'dut', '\n'.join(value_lines)))
+
+    return CosimulationMismatchError(
+        message, cycle, name, window_start, ref_values, dut_values, outputs)
+
+class SignalColumn(object):
+    '''A preallocated, growable NumPy store of the values recorded on a
+    single signal. This is used instead of :class:`SignalOutput` when a
+    :class:`SynchronousTest` records its outputs in columnar form.
+
+    The backing array doubles in size whenever it fills up, so appending is
+    amortised O(1). The recorded values are accessed through :attr:`array`,
+    which is a view onto the backing array, or through :attr:`readonly_array`.
+
+    ``dtype`` should be a NumPy dtype. Values are converted with ``int``
+    before being stored, unless ``dtype`` is ``object``, in which case a
+    copy of each value is stored.
+    '''
+
+    initial_capacity = 1024
+
+    def __init__(self, dtype, capacity=None):
+
+        if capacity is None:
+            capacity = self.initial_capacity
+
+        self._data = np.empty(max(capacity, 1), dtype=dtype)
+        self._length = 0
+
+        if self._data.dtype == object:
+            self._convert = copy.copy
+        else:
+            self._convert = int
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    @property
+    def array(self):
+        return self._data[:self._length]
+
+    @property
+    def readonly_array(self):
+        '''A read-only view onto the recorded values. No data is copied.
+        '''
+        view = self._data[:self._length]
+        view.flags.writeable = False
+        return view
+
+    def _grow(self):
+        new_data = np.empty(2 * len(self._data), dtype=self._data.dtype)
+        new_data[:self._length] = self._data[:self._length]
+        self._data = new_data
+
+    def append(self, val):
+        if self._length == len(self._data):
+            self._grow()
+
+        self._data[self._length] = self._convert(val)
+        self._length += 1
+
 class AxiStreamOutput(dict):
     pass
 
@@ -613,6 +1226,30 @@ class ObjectLookup(object):
             raise ValueError(
                 'Object is not a signal to have an associated signal type.')
 
+    @property
+    def sim_value_dtype(self):
+        '''The NumPy dtype used to record the values of the signal in
+        columnar form. Unsigned and signed signals that fit in 64 bits are
+        recorded as ``uint64`` and ``int64`` respectively. Anything wider,
+        or that is not an intbv or bool, is recorded as a python object.
+        '''
+        val = self.object.val
+
+        if isinstance(val, bool):
+            return np.dtype(bool)
+
+        elif isinstance(val, intbv):
+            if val.min is None or val.max is None:
+                return np.dtype(object)
+
+            elif val.min >= 0 and val.max <= 2**64:
+                return np.dtype(np.uint64)
+
+            elif val.min >= -2**63 and val.max <= 2**63:
+                return np.dtype(np.int64)
+
+        return np.dtype(object)
+
     def bump_uniqueifier(self):
         if self._uniqueifier is None:
             self._uniqueifier = 0
@@ -625,11 +1262,13 @@ class ObjectLookup(object):
         base_dict[self.name]['signals'].
 
         If base_dict[self.name] does not exist, a new list is created
-        to populate.
+        to populate. If it does exist, it can also be a
+        :class:`SignalColumn` or a :class:`SignalSpool`.
         '''
 
         if self.name in base_dict:
-            assert isinstance(base_dict[self.name], SignalOutput)
+            assert isinstance(base_dict[self.name],
+                              (SignalOutput, SignalColumn, SignalSpool))
 
         else:
             base_dict[self.name] = SignalOutput()
@@ -644,7 +1283,15 @@ class ObjectLookup(object):
 
         It assumes the signal is present in the dictionary.
         '''
-        return copy.copy(base_dict[self.name])
+        sim_values = base_dict[self.name]
+
+        if isinstance(sim_values, SignalColumn):
+            return sim_values.array.copy()
+
+        if isinstance(sim_values, SignalChunks):
+            return sim_values.to_array()
+
+        return copy.copy(sim_values)
 
     def clone(self):
         new_self = copy.copy(self)
@@ -1232,12 +1879,20 @@ class Args(object):
         self.arg_types = arg_types
 
 
+def _non_signals_equal(value, other_value):
+
+    if isinstance(value, np.ndarray) or isinstance(other_value, np.ndarray):
+        return bool(np.array_equal(value, other_value))
+
+    return bool(value == other_value)
+
 class SynchronousTest(object):
 
     def __init__(self, dut_factory, ref_factory, args, arg_types,
                  period=None, custom_sources=None,
                  enforce_convertible_top_level_interfaces=True,
-                 time_units='ns'):
+                 time_units='ns', columnar_outputs=False,
+                 random_source_batch_size=None, reuse_elaboration=False):
         '''Construct a synchronous test case for the pair of factories
         given by `dut_factory` and `ref_factory`. Each factory is constructed
         with the provided args (which probably corresponds to a signal list).
@@ -1316,6 +1971,35 @@ class SynchronousTest(object):
 
         ``time_units`` is used to define the units of the ``period`` argument.
         It is also used in cosimulate to create the ``timescale``.
+
+        If ``columnar_outputs`` is set to ``True``, each recorded signal is
+        stored in a preallocated, growable NumPy array (see
+        :class:`SignalColumn`) rather than in a list of ``intbv`` or ``bool``
+        objects. The outputs returned by :meth:`cosimulate` are then NumPy
+        arrays. Signals that fit in 64 bits are recorded as ``uint64``,
+        ``int64`` or ``bool`` values; wider signals are recorded as python
+        objects. This uses far less memory for long simulations and allows
+        the outputs to be compared in a vectorised way.
+
+        If ``random_source_batch_size`` is not ``None``, the `'random'` args
+        are driven with values drawn in batches of that size from seeded
+        NumPy generators (see the ``batch_size`` argument of
+        :func:`random_source`), which is much faster than the default. The
+        ref and the dut are still driven with identical values.
+
+        If ``reuse_elaboration`` is set to ``True``, the instances created by
+        the ref and dut factories are elaborated on the first call to
+        :meth:`cosimulate` and then reused (restarted from the beginning) on
+        every subsequent call, rather than being elaborated again. Combined
+        with :meth:`reseed`, this allows the same test bench to be rerun many
+        times with different random values, different data added to AXI
+        stream BFMs or different numbers of cycles, without the cost of
+        building and elaborating it each time. Everything else (the sources,
+        the custom sources and the recorder) is still created for each run.
+        For this to work, the ref and dut instances should hold all their
+        state in signals or in the local variables of ``@instance``
+        generators, which are reset when the instances are restarted. The
+        elaborated instances are not reused when a vcd file is requested.
         '''
 
         # Reset the clock source block count
@@ -1434,51 +2118,19 @@ class SynchronousTest(object):
 
         # Deal with random values
         # Create the random sources.
-        self.random_source_factories = []
-        for each_arg, each_dut_arg in zip(self.elaborated_args,
-                                          self.elaborated_dut_args):
-
-            if each_arg.type == 'random':
-                seed = random.randrange(0, 0x5EEDF00D)
-                self.random_source_factories.append(
-                    (random_source,
-                     (each_arg.object, self.clock, self.reset),
-                     {'seed': seed}))
-
-                if dut_factory is not None:
-                    self.random_source_factories.append(
-                        (random_source,
-                         (each_dut_arg.object, self.clock, self.reset),
-                         {'seed': seed}))
-
-
-        # Now create the recorder sinks for every signal
-        self.output_recorder_factories = []
-
-        def _add_recorder_sink(arg, output_dict):
-
-            if arg.type == 'non-signal':
-                # We don't record non-signals
-                return
-
-            handler = lambda val: arg.store_sim_value(output_dict, val)
-
-            val_handler_inst = (
-                handler_sink, (arg.object, self.clock, handler), {})
+        self._dut_factory = dut_factory
+        self._random_source_batch_size = random_source_batch_size
+        self._create_random_source_factories(random)
 
-            self.output_recorder_factories.append(val_handler_inst)
+        # Now create the recorder for every signal. This is recreated on
+        # every call to cosimulate, so each run records into fresh stores.
+        self.columnar_outputs = columnar_outputs
+        self._setup_output_recording()
 
-        ref_outputs = SimulationOutputs()
-        for arg in self.elaborated_args:
-            _add_recorder_sink(arg, ref_outputs)
+        self.reuse_elaboration = reuse_elaboration
+        self._elaborated_test_bench = None
 
-        if dut_factory is not None:
-            dut_outputs = SimulationOutputs()
-            for arg in self.elaborated_dut_args:
-                _add_recorder_sink(arg, dut_outputs)
-
-        else:
-            dut_outputs = None
+        self.profile_report = None
 
         # Now deal with the AXI interfaces
         ref_axi_stream_in_interfaces = (
@@ -1564,38 +2216,298 @@ class SynchronousTest(object):
         if dut_factory is not None:
             self.test_factories += [(dut_factory, (), self.dut_args)]
 
-        self._dut_factory = dut_factory
-
-        self._outputs = (dut_outputs, ref_outputs)
-
         # Note: self.ref_args is args
         self.args = args
         self.arg_types = arg_types
 
         self._simulator_run = False
 
-    def cosimulate(self, cycles, vcd_name=None):
+        # Set when the recorded values of the last run were only passed to a
+        # stream handler, so they cannot be played back.
+        self._outputs_handled_only = False
+
+    def _create_random_source_factories(self, rng):
+        '''Creates the factories for the random sources, drawing a seed for
+        each `'random'` arg from ``rng``. The ref and the dut are given the
+        same seed so they are driven with identical values.
+        '''
+        self.random_source_factories = []
+        for each_arg, each_dut_arg in zip(self.elaborated_args,
+                                          self.elaborated_dut_args):
+
+            if each_arg.type == 'random':
+                seed = rng.randrange(0, 0x5EEDF00D)
+                self.random_source_factories.append(
+                    (random_source,
+                     (each_arg.object, self.clock, self.reset),
+                     {'seed': seed,
+                      'batch_size': self._random_source_batch_size}))
+
+                if self._dut_factory is not None:
+                    self.random_source_factories.append(
+                        (random_source,
+                         (each_dut_arg.object, self.clock, self.reset),
+                         {'seed': seed,
+                          'batch_size': self._random_source_batch_size}))
+
+    def reseed(self, seed=None):
+        '''Sets new seeds for all the random sources, so that the next call
+        to :meth:`cosimulate` drives the `'random'` args with new values.
+
+        If ``seed`` is ``None``, the seeds are drawn from the ``random``
+        module, as they are on construction. Otherwise they are derived
+        deterministically from ``seed``.
+        '''
+        if seed is None:
+            rng = random
+        else:
+            rng = random.Random(seed)
+
+        self._create_random_source_factories(rng)
+
+    @block
+    def _test_bench(self):
+        '''Creates the instances from the ref and dut factories.
+        '''
+        test_instances = []
+        for name, (factory, args, kwargs) in zip(
+            ('ref', 'dut'), self.test_factories):
+
+            try:
+                test_instances.append(factory(*args, **kwargs))
+            except myhdl.BlockError as e:
+                raise myhdl.BlockError(
+                    'The %s factory returned an invalid object: %s' %
+                    (name, e))
+
+        return test_instances
+
+    def _setup_output_recording(self, stream_directory=None,
+                                stream_handler=None, stream_chunk_length=None):
+        '''Creates the stores into which the signals are recorded and
+        the factory of the block that records them.
+
+        If ``stream_directory`` or ``stream_handler`` is not ``None``, the
+        stores are :class:`SignalSpool` objects which stream the values out
+        in chunks of ``stream_chunk_length`` (see :meth:`cosimulate`).
+
+        All the signals, for both the ref and the dut, are recorded by a
+        single block so the simulator only needs to wake up one generator on
+        each clock edge. The stores are handed over to the caller at the end
+        of :meth:`cosimulate` without being copied, so new stores are created
+        for every run.
+        '''
+
+        recorded_signals = []
+        recorder_stores = []
+
+        streaming = stream_directory is not None or stream_handler is not None
+
+        def _spool_location(source):
+            if stream_directory is None:
+                spool_directory = None
+            else:
+                spool_directory = os.path.join(stream_directory, source)
+                os.makedirs(spool_directory, exist_ok=True)
+
+            if stream_handler is None:
+                spool_handler = None
+            else:
+                spool_handler = functools.partial(stream_handler, source)
+
+            return spool_directory, spool_handler
+
+        def _add_recorded_signal(arg, output_dict, source):
+
+            if arg.type == 'non-signal':
+                # We don't record non-signals
+                return
+
+            if streaming:
+                spool_directory, spool_handler = _spool_location(source)
+                store = SignalSpool(
+                    arg.name, arg.sim_value_dtype, stream_chunk_length,
+                    directory=spool_directory, handler=spool_handler)
+            elif self.columnar_outputs:
+                store = SignalColumn(arg.sim_value_dtype)
+            else:
+                store = SignalOutput()
+
+            output_dict[arg.name] = store
+
+            recorded_signals.append(arg.object)
+            recorder_stores.append(store)
+
+        ref_outputs = SimulationOutputs()
+        for arg in self.elaborated_args:
+            _add_recorded_signal(arg, ref_outputs, 'ref')
+
+        if self._dut_factory is not None:
+            dut_outputs = SimulationOutputs()
+            for arg in self.elaborated_dut_args:
+                _add_recorded_signal(arg, dut_outputs, 'dut')
+
+        else:
+            dut_outputs = None
+
+        store_functions = [store.append for store in recorder_stores]
+
+        def _store_recorded_values(values):
+            for store_value, value in zip(store_functions, values):
+                store_value(value)
+
+        # Columnar stores and spools convert (or copy) the values themselves,
+        # so there is no need to copy them in the recorder as well.
+        self.output_recorder_factories = [
+            (bulk_handler_sink,
+             (recorded_signals, self.clock, _store_recorded_values),
+             {'copy_values': not (self.columnar_outputs or streaming)})]
+
+        self._outputs = (dut_outputs, ref_outputs)
+
+        # The completed AXI stream packets are also streamed out.
+        self._packet_spools = {}
+        if streaming:
+            for source, bfms in (('ref', self.axi_stream_out_ref_bfms),
+                                 ('dut', self.axi_stream_out_dut_bfms)):
+                if bfms is None:
+                    continue
+
+                spool_directory, spool_handler = _spool_location(source)
+                for name in bfms:
+                    self._packet_spools[(source, name)] = (
+                        AxiStreamPacketSpool(
+                            name, bfms[name], directory=spool_directory,
+                            handler=spool_handler))
+
+    def _take_axi_stream_output(self, source, name, bfm):
+        '''Returns an :class:`AxiStreamOutput` of the packets received by
+        ``bfm``, taking them from the BFM without copying. If the packets
+        were streamed out, the packets are those returned by the spool.
+        '''
+        if (source, name) in self._packet_spools:
+            completed_packets = self._packet_spools[(source, name)].close()
+            _, current_packets = bfm.take_packets()
+
+            if completed_packets is None:
+                completed_packets = {}
+
+        else:
+            completed_packets, current_packets = bfm.take_packets()
+
+        return AxiStreamOutput({
+            'packets': completed_packets,
+            'incomplete_packet': current_packets})
+
+    def cosimulate(self, cycles, vcd_name=None, compare_online=False,
+                   mismatch_window=5, stream_directory=None,
+                   stream_handler=None, stream_chunk_length=65536,
+                   profile=False):
         '''Co-simulate the device under test and the reference design.
 
         Return a pair tuple of lists, each corresponding to the recorded
         signals (in the order they were passed) of respectively the
-        device under test and the reference design.
+        device under test and the reference design. The recorded values
+        are returned without being copied, so the lists of values are
+        read-only (:class:`ReadOnlySignalOutput`), as are the arrays in
+        columnar mode.
 
         if ``cycles`` is None, then the simulation continues until
         StopSimulation is raised.
 
         If ``vcd_name`` is not ``None``, a vcd file will be created of the
         waveform.
+
+        If ``compare_online`` is ``True``, the `'output'` signals and the
+        packets on the `'axi_stream_out'` interfaces of the dut are compared
+        with those of the ref on every cycle. On the first divergence, the
+        simulation is run on for ``mismatch_window`` cycles and then stopped,
+        and a :class:`CosimulationMismatchError` is raised. The error reports
+        the cycle, the name of the diverging signal and the values on it from
+        ``mismatch_window`` cycles before to ``mismatch_window`` cycles after
+        the divergence. ``compare_online`` requires a dut factory.
+
+        For very long simulations, the recorded values can be streamed out
+        as the simulation runs, so the memory used does not grow with the
+        number of cycles. This is enabled by setting ``stream_directory``
+        and/or ``stream_handler``. The values on every signal are buffered
+        and streamed out in chunks of ``stream_chunk_length`` cycles. The
+        completed packets on every `'axi_stream_out'` interface are streamed
+        out every ``stream_chunk_length`` cycles.
+
+        If ``stream_directory`` is not ``None``, it should be empty or not
+        exist, or a ``ValueError`` is raised, since the chunks of an earlier
+        run in it may still be in use. The chunks are written to files in
+        its ``ref`` and ``dut`` sub-directories, as ``.npy`` files
+        for the signals and ``.npz`` files for the packets. The returned
+        outputs then read the values back lazily from those files; each
+        signal is a :class:`SignalChunks` sequence (which memory maps the
+        files) and the ``'packets'`` of each AXI stream output is an
+        :class:`AxiStreamPacketChunks` mapping.
+
+        If ``stream_handler`` is not ``None``, it is called as
+        ``stream_handler(source, name, values)`` with each chunk, where
+        ``source`` is ``'ref'`` or ``'dut'``. For a signal, ``values`` is
+        a NumPy array of the values in the chunk. For an AXI stream
+        interface, ``values`` is a dict of the completed packets (in the form
+        of ``AxiStreamSlaveBFM.completed_packets``). If ``stream_directory``
+        is ``None``, the values are only passed to the handler and the
+        returned outputs contain only the incomplete AXI stream packets. The
+        stimulus is then not kept either, so :meth:`dut_convertible_top`
+        cannot be used until the simulator is run again.
+
+        Streaming cannot be used with ``compare_online`` if there are any
+        `'axi_stream_out'` interfaces.
+
+        If ``profile`` is ``True``, every generator in the simulation is
+        wrapped to count the number of times it is run and the wall time
+        spent in it. After the run, :attr:`profile_report` is set to a
+        :class:`CosimulationProfile` of the generators, grouped into
+        ``'ref'``, ``'dut'``, ``'random_sources'``, ``'output_recorders'``,
+        ``'custom_sources'``, ``'axi_stream_bfms'``, ``'clock'``,
+        ``'reset'``, ``'comparators'`` and ``'packet_drainers'``, along with
+        the number of cycles simulated per second. Profiling slows the
+        simulation, so the report is for comparing the parts of the
+        simulation with each other.
         '''
 
-        # And also clear the AXI sink BFMs
+        if compare_online and self._dut_factory is None:
+            raise ValueError(
+                'compare_online requires a dut, but the dut factory is None')
+
+        streaming = stream_directory is not None or stream_handler is not None
+
+        if (streaming and compare_online and
+            len(self.axi_stream_out_ref_bfms) > 0):
+            raise ValueError(
+                'compare_online cannot be used when streaming the outputs of '
+                'a test with axi_stream_out interfaces')
+
+        if (stream_directory is not None and
+            os.path.isdir(stream_directory) and
+            len(os.listdir(stream_directory)) > 0):
+            raise ValueError(
+                'The stream_directory should be empty, as the chunks of an '
+                'earlier run in it may still be in use: %s' % stream_directory)
+
+        # Each run records into new stores, which are then handed over to the
+        # caller.
+        if self._simulator_run or streaming:
+            self._setup_output_recording(
+                stream_directory, stream_handler, stream_chunk_length)
+
+        # And also clear the AXI sink BFMs. The signal records of the
+        # output BFMs are not used, so when streaming they are not kept, as
+        # they would grow with every cycle.
         if self.axi_stream_out_ref_bfms is not None:
             for bfm in self.axi_stream_out_ref_bfms.values():
                 bfm.reset()
+                bfm.record_signals = not streaming
 
         if self.axi_stream_out_dut_bfms is not None:
             for bfm in self.axi_stream_out_dut_bfms.values():
                 bfm.reset()
+                bfm.record_signals = not streaming
 
         if self.axi_stream_in_ref_bfms is not None:
             for bfm in self.axi_stream_in_ref_bfms.values():
@@ -1621,15 +2533,16 @@ class SynchronousTest(object):
                 self.output_recorder_factories]
 
             test_instances = []
-            for name, (factory, args, kwargs) in zip(
-                ('ref', 'dut'), self.test_factories):
+            if not reuse_test_bench:
+                for name, (factory, args, kwargs) in zip(
+                    ('ref', 'dut'), self.test_factories):
 
-                try:
-                    test_instances.append(factory(*args, **kwargs))
-                except myhdl.BlockError as e:
-                    raise myhdl.BlockError(
-                        'The %s factory returned an invalid object: %s' %
-                        (name, e))
+                    try:
+                        test_instances.append(factory(*args, **kwargs))
+                    except myhdl.BlockError as e:
+                        raise myhdl.BlockError(
+                            'The %s factory returned an invalid object: %s' %
+                            (name, e))
 
             custom_sources = [
                 factory(*args, **kwargs) for factory, args, kwargs in
@@ -1656,11 +2569,82 @@ class SynchronousTest(object):
             except IndexError:
                 init_reset = []
 
+            if compare_online:
+                signal_pairs = [
+                    (ref_each.name, ref_each.object, dut_each.object) for
+                    ref_each, dut_each in zip(
+                        self.elaborated_args, self.elaborated_dut_args)
+                    if ref_each.type == 'output']
+
+                axi_stream_bfm_pairs = [
+                    (name, self.axi_stream_out_ref_bfms[name],
+                     self.axi_stream_out_dut_bfms[name]) for
+                    name in self.axi_stream_out_ref_bfms]
+
+                comparators = [_online_comparator(
+                    self.clock, signal_pairs, axi_stream_bfm_pairs,
+                    mismatch_window, online_mismatches)]
+
+            else:
+                comparators = []
+
+            if len(self._packet_spools) > 0:
+                packet_drainers = [packet_spool_drainer(
+                    self.clock, list(self._packet_spools.values()),
+                    stream_chunk_length)]
+            else:
+                packet_drainers = []
+
+            profile_groups.extend(
+                zip(('ref', 'dut'), test_instances))
+            profile_groups.extend([
+                ('random_sources', random_sources),
+                ('output_recorders', output_recorders),
+                ('custom_sources', custom_sources),
+                ('axi_stream_bfms', axi_sources),
+                ('clock', clockgen),
+                ('reset', init_reset),
+                ('comparators', comparators),
+                ('packet_drainers', packet_drainers)])
+
             return [random_sources, output_recorders, test_instances,
-                    custom_sources, axi_sources, [clockgen, init_reset]]
+                    custom_sources, axi_sources, [clockgen, init_reset],
+                    comparators, packet_drainers]
+
+        online_mismatches = []
+        profile_groups = []
+
+        # The ref and dut instances are only reused when no vcd file is
+        # requested, as the trace is set up on the top level block.
+        reuse_test_bench = self.reuse_elaboration and vcd_name is None
 
         top_level_block = top()
 
+        if reuse_test_bench:
+            if self._elaborated_test_bench is None:
+                self._elaborated_test_bench = self._test_bench()
+            else:
+                _restart_instances(self._elaborated_test_bench)
+
+            profile_groups[:0] = zip(
+                ('ref', 'dut'), self._elaborated_test_bench.subs)
+
+        if profile:
+            # The simulation is constructed directly from the profiled
+            # waiters of every generator.
+            profiled_waiters = []
+            generator_profiles = []
+            for group, instances in profile_groups:
+                waiters, profiles = _profiled_waiters(instances, group, group)
+                profiled_waiters.extend(waiters)
+                generator_profiles.extend(profiles)
+
+            top_level_block.sim = Simulation(*profiled_waiters)
+
+        elif reuse_test_bench:
+            top_level_block.sim = Simulation(
+                top_level_block, self._elaborated_test_bench)
+
         if vcd_name is not None:
             traceSignals.name = vcd_name
             trace = True
@@ -1673,60 +2657,175 @@ class SynchronousTest(object):
 
         top_level_block.config_sim(trace=trace, timescale=timescale)
 
+        run_start = time.perf_counter()
+
         try:
             if cycles is not None:
                 top_level_block.run_sim(duration=cycles*self.period, quiet=1)
             else:
                 top_level_block.run_sim(duration=None, quiet=1)
 
+            run_time = time.perf_counter() - run_start
+            simulated_cycles = now() // self.period
+
         finally:
             top_level_block.quit_sim()
 
-        self._simulator_run = True
+        if profile:
+            self.profile_report = CosimulationProfile(
+                generator_profiles, simulated_cycles, run_time)
+        else:
+            self.profile_report = None
 
-        def axi_signals_from_name(name, output_set):
-            object_path = name.split('.')
+        self._simulator_run = True
+        self._outputs_handled_only = streaming and stream_directory is None
 
-            this_axi_signals = []
-            for each in output_set[object_path[0]]:
+        if streaming:
+            # Write out whatever is left in the spools, and replace them with
+            # the chunks from which the values can be read.
+            for each_outputs in self._outputs:
+                if each_outputs is None:
+                    continue
 
-                layer = each
-                for layer_name in object_path[1:]:
-                    layer = layer[layer_name]
+                for each_signal in list(each_outputs):
+                    if isinstance(each_outputs[each_signal], SignalSpool):
+                        signal_chunks = each_outputs[each_signal].close()
+
+                        if signal_chunks is None:
+                            del each_outputs[each_signal]
+                        else:
+                            each_outputs[each_signal] = signal_chunks
+
+        # The recorded stores are handed over without copying. A fresh set of
+        # stores is created for the next run, so the only copying needed is
+        # of the (shallow) mappings, on which we do some munging. The stores
+        # are still the stimulus of the dut conversion, so they are handed
+        # over read-only.
+        outputs = tuple(
+            None if each_outputs is None else each_outputs.copy()
+            for each_outputs in self._outputs)
+
+        for each_outputs in outputs:
+            if each_outputs is None:
+                continue
 
-                this_axi_signals.append(layer)
+            for each_signal in each_outputs:
+                values = each_outputs[each_signal]
 
-            return this_axi_signals
+                if isinstance(values, SignalColumn):
+                    each_outputs[each_signal] = values.readonly_array
 
-        # We do some munging, so we do it on a copy of the outputs
-        outputs = copy.deepcopy(self._outputs)
+                elif type(values) is SignalOutput:
+                    values.__class__ = ReadOnlySignalOutput
 
-        # Finally write the AXI outputs as necessary
+        # Finally write the AXI outputs as necessary. The packets are taken
+        # from the BFMs, which start again with empty records.
         for each_axi_interface in self.axi_stream_out_ref_bfms:
 
-            ref_axi_signals = axi_signals_from_name(
-                each_axi_interface, outputs[1])
             ref_bfm = self.axi_stream_out_ref_bfms[each_axi_interface]
-
-            outputs[1][each_axi_interface] = AxiStreamOutput({
-                'packets': ref_bfm.completed_packets,
-                'incomplete_packet': ref_bfm.current_packets})
+            outputs[1][each_axi_interface] = self._take_axi_stream_output(
+                'ref', each_axi_interface, ref_bfm)
 
             if self.axi_stream_out_dut_bfms is not None:
-                dut_axi_signals = axi_signals_from_name(
-                    each_axi_interface, outputs[0])
                 dut_bfm = self.axi_stream_out_dut_bfms[each_axi_interface]
+                outputs[0][each_axi_interface] = (
+                    self._take_axi_stream_output(
+                        'dut', each_axi_interface, dut_bfm))
 
-                outputs[0][each_axi_interface] = AxiStreamOutput({
-                    'packets': dut_bfm.completed_packets,
-                    'incomplete_packet': dut_bfm.current_packets})
+        if len(online_mismatches) > 0:
+            raise _online_mismatch_error(
+                online_mismatches[0], outputs, mismatch_window)
 
         return outputs
 
+    def _batch_stimulus(self, stimulus_tests, reset_cycles_between_tests):
+        '''Returns the stimulus of each of ``stimulus_tests`` one after
+        another, with the reset held active for
+        ``reset_cycles_between_tests`` cycles between them, in the form of
+        the flattened ref outputs used by :meth:`dut_convertible_top`.
+        '''
+        convertible_names = [
+            each.convertible_name for each in self.elaborated_args]
+
+        if reset_cycles_between_tests < 1 and len(stimulus_tests) > 1:
+            raise ValueError(
+                'reset_cycles_between_tests should be at least 1')
+
+        reset_types = ('init_reset', 'custom_reset')
+
+        for each_test in stimulus_tests:
+            if not each_test._simulator_run:
+                raise RuntimeError(
+                    'The simulator should be run for every one of the '
+                    'stimulus_tests before dut_convertible_top')
+
+            if each_test._outputs_handled_only:
+                raise RuntimeError(
+                    'The recorded values of the last run of one of the '
+                    'stimulus_tests were only passed to the stream_handler, '
+                    'so there is no stimulus to convert')
+
+            if [each.convertible_name for each in each_test.elaborated_args
+                ] != convertible_names:
+                raise ValueError(
+                    'The stimulus_tests should all have the same arguments')
+
+            # Only the dut of this test is converted, so the non-signal
+            # arguments, which configure the dut, should be the same for
+            # every test.
+            for each, each_test_arg in zip(
+                self.elaborated_args, each_test.elaborated_args):
+
+                if each.type == 'non-signal' and not _non_signals_equal(
+                    each.object, each_test_arg.object):
+
+                    raise ValueError(
+                        'The stimulus_tests should all have the same '
+                        'non-signal arguments, but %s differs' % each.name)
+
+            if (len(each_test.elaborated_args.axi_stream_in_interfaces) > 0 or
+                len(each_test.elaborated_args.axi_stream_out_interfaces) >
+                0):
+                raise ValueError(
+                    'AXI stream interfaces are not supported with '
+                    'stimulus_tests')
+
+        if len(stimulus_tests) > 1 and not any(
+            each.type in reset_types for each in self.elaborated_args):
+
+            raise ValueError(
+                'The dut should have a reset to be run with more than one '
+                'of the stimulus_tests')
+
+        batch_stimulus = {}
+        for n, each_test in enumerate(stimulus_tests):
+            for each in each_test.elaborated_args:
+                if each.type == 'non-signal':
+                    continue
+
+                values = list(each.extract_sim_values(each_test._outputs[1]))
+                stimulus = batch_stimulus.setdefault(each.convertible_name, [])
+
+                if n > 0:
+                    if each.type in reset_types:
+                        gap_value = self.reset.active
+                    else:
+                        # The other signals are held at their first value
+                        # in the test.
+                        gap_value = values[0]
+
+                    stimulus.extend([gap_value] * reset_cycles_between_tests)
+
+                stimulus.extend(values)
+
+        return batch_stimulus
+
     @block
     def dut_convertible_top(
         self, output_path, signal_output_filename='signal_outputs',
-        axi_stream_packets_filename_prefix='axi_stream_out'):
+        axi_stream_packets_filename_prefix='axi_stream_out',
+        output_format='binary', stimulus_filename_prefix=None,
+        stimulus_tests=None, reset_cycles_between_tests=2):
         '''Acts as a top-level MyHDL method, implementing a portable,
         convertible version of the SynchronousTest object wrapping the
         device under test.
@@ -1737,11 +2836,50 @@ class SynchronousTest(object):
         the simulation of :meth:`dut_convertible_top`. If
         cosimulate is run for fewer cycles than :meth:`dut_convertible_top`,
         the result is undefined.
+
+        ``output_format`` sets the format in which the recorded values are
+        written to file. With ``'binary'`` each value is written as a
+        string of bits and every row is written to the file as it is
+        recorded. With ``'hex'`` each value is written as hex digits and the
+        rows are buffered, so the file is smaller and the simulation spends
+        less time writing it. In both cases the values are undefined if any
+        bit is not ``0`` or ``1``.
+
+        By default, the stimulus is written into the converted code as
+        look-up tables, so the size of the converted code grows with the
+        number of cycles. If ``stimulus_filename_prefix`` is set, the
+        stimulus is instead written to files in ``output_path`` with names
+        beginning with ``stimulus_filename_prefix``, and the converted code
+        reads it from those files when it is simulated (see
+        :func:`file_signal_driver` and :func:`axi_master_file_playback`).
+
+        If ``stimulus_tests`` is not ``None``, it should be a list of
+        :class:`SynchronousTest` objects of the same dut with the same
+        arguments as this one, each of which has been run. The values of
+        the non-signal arguments, which configure the dut, should be the
+        same for every test, or a ``ValueError`` is raised. The stimulus of
+        each is played back in turn, in place of the stimulus of this test,
+        so a single simulation of the converted code runs every test.
+        Before the stimulus of each test after the first, the reset is held
+        active for ``reset_cycles_between_tests`` cycles, so each test
+        starts from the reset state of the dut. The values recorded for
+        each test then start ``reset_cycles_between_tests`` cycles after the
+        end of those of the previous test. AXI stream interfaces are not
+        supported in a batch of tests.
         '''
+        _check_file_writer_output_format(output_format)
+
         if not self._simulator_run:
             raise RuntimeError('The simulator should be run before '
                                'dut_convertible_top')
 
+        if self._outputs_handled_only:
+            raise RuntimeError(
+                'The recorded values of the last run were only passed to the '
+                'stream_handler, so there is no stimulus to convert. The '
+                'simulator should be run without streaming or with a '
+                'stream_directory before dut_convertible_top')
+
         if self._dut_factory is None:
             raise RuntimeError('The dut was configured to be None in '
                                'construction, so no meaningful conversion '
@@ -1768,16 +2906,43 @@ class SynchronousTest(object):
 
         dut_args = self.elaborated_dut_args.args
 
-        flattened_ref_outputs = {}
-        for each in self.elaborated_args:
-            # Only work with signals
-            if each.type != 'non-signal':
-                flattened_ref_outputs[each.convertible_name] = (
-                    each.extract_sim_values(ref_outputs))
+        if stimulus_tests is None:
+            flattened_ref_outputs = {}
+            for each in self.elaborated_args:
+                # Only work with signals
+                if each.type != 'non-signal':
+                    flattened_ref_outputs[each.convertible_name] = (
+                        each.extract_sim_values(ref_outputs))
+
+        else:
+            flattened_ref_outputs = self._batch_stimulus(
+                stimulus_tests, reset_cycles_between_tests)
+
+        # The file writers make sure every recorded cycle is written out by
+        # the end of the last cycle.
+        n_cycles = None
+        for each_values in flattened_ref_outputs.values():
+            n_cycles = len(each_values)
+            break
 
         instances = []
         signals_to_record = []
 
+        # The stimulus is played back either from look-up tables or from
+        # files, which need a filename for each signal.
+        if stimulus_filename_prefix is None:
+            signal_driver = lut_signal_driver
+        else:
+            signal_driver = file_signal_driver
+
+        def signal_driver_kwargs():
+            if stimulus_filename_prefix is None:
+                return {}
+
+            return {'filename': os.path.join(
+                output_path, '%s_%d' % (stimulus_filename_prefix,
+                                        len(instances)))}
+
         # Generate all the convertible blocks for handling the signals.
         for each_signal in self.elaborated_dut_args:
 
@@ -1797,9 +2962,9 @@ class SynchronousTest(object):
             elif each_signal.type == 'init_reset':
                 # This should be played back
                 drive_list = tuple(flattened_ref_outputs[convertible_name])
-                instances.append(lut_signal_driver(
-                    reset, drive_list, clock,
-                    signal_name=each_signal.name))
+                instances.append(signal_driver(
+                    reset, drive_list, clock, signal_name=each_signal.name,
+                    **signal_driver_kwargs()))
 
             elif each_signal.type == 'output':
                 # We need to record it
@@ -1808,8 +2973,9 @@ class SynchronousTest(object):
             elif each_signal.type == 'custom_reset':
                 # This should be played back
                 drive_list = tuple(flattened_ref_outputs[convertible_name])
-                instances.append(lut_signal_driver(
-                    reset, drive_list, clock, signal_name=each_signal.name))
+                instances.append(signal_driver(
+                    reset, drive_list, clock, signal_name=each_signal.name,
+                    **signal_driver_kwargs()))
 
             elif each_signal.type == 'axi_stream_out':
                 # We record all the axi signals
@@ -1822,9 +2988,9 @@ class SynchronousTest(object):
             else:
                 # This should be played back too
                 drive_list = tuple(flattened_ref_outputs[convertible_name])
-                instances.append(lut_signal_driver(
+                instances.append(signal_driver(
                     each_signal.object, drive_list, clock,
-                    signal_name=each_signal.name))
+                    signal_name=each_signal.name, **signal_driver_kwargs()))
 
 #        # FIXME
 #        # The following code should ideally not be necessary. For some reason
@@ -1874,7 +3040,8 @@ class SynchronousTest(object):
         signal_output_file = os.path.join(output_path, signal_output_filename)
         # Setup the output writer and add it to the instances list
         instances.append(file_writer(
-            signal_output_file, recorded_list, clock, recorded_list_names))
+            signal_output_file, recorded_list, clock, recorded_list_names,
+            output_format=output_format, n_cycles=n_cycles))
 
         axi_stream_in_dut_interfaces = (
             self.elaborated_dut_args.axi_stream_in_interfaces)
@@ -1882,17 +3049,28 @@ class SynchronousTest(object):
         axi_stream_out_dut_interfaces = (
             self.elaborated_dut_args.axi_stream_out_interfaces)
 
-        for axi_interface_name in axi_stream_in_dut_interfaces:
+        for n, axi_interface_name in enumerate(axi_stream_in_dut_interfaces):
 
             axi_bfm = self.axi_stream_in_ref_bfms[axi_interface_name]
             axi_interface = axi_stream_in_dut_interfaces[
                 axi_interface_name]
             signal_record = axi_bfm.signal_record
 
-            from kea.hdl.axi import axi_master_playback
+            if stimulus_filename_prefix is None:
+                from kea.hdl.axi import axi_master_playback
 
-            instances.append(
-                axi_master_playback(clock, axi_interface, signal_record))
+                instances.append(
+                    axi_master_playback(clock, axi_interface, signal_record))
+
+            else:
+                playback_filename_prefix = os.path.join(
+                    output_path, '%s_axi_stream_in_%d_' % (
+                        stimulus_filename_prefix, n))
+
+                instances.append(
+                    axi_master_file_playback(
+                        clock, axi_interface, signal_record,
+                        playback_filename_prefix))
 
         used_file_writer_names = set()
         for n, axi_interface_name in enumerate(axi_stream_out_dut_interfaces):
@@ -1921,7 +3099,9 @@ class SynchronousTest(object):
                 os.path.join(output_path, axi_stream_file_writer_filename))
 
             instances.append(
-                axi_stream_file_writer(*axi_stream_file_writer_args))
+                axi_stream_file_writer(
+                    *axi_stream_file_writer_args,
+                    output_format=output_format, n_cycles=n_cycles))
 
         # Finally, add the device under test
         instances.append(self._dut_factory(**dut_args))
@@ -1931,20 +3111,28 @@ class SynchronousTest(object):
 def myhdl_cosimulation(cycles, dut_factory, ref_factory, args, arg_types,
                        period=None, custom_sources=None,
                        enforce_convertible_top_level_interfaces=True,
-                       vcd_name=None, time_units='ns'):
+                       vcd_name=None, time_units='ns', columnar_outputs=False,
+                       compare_online=False, mismatch_window=5,
+                       random_source_batch_size=None):
     '''Run a cosimulation of a pair of MyHDL instances. This is a thin
     wrapper around a :class:`SynchronousTest` object, in which the object
     is created and then the cosimulate method is run, with the ``cycles``
     argument. See the documentation for :class:`SynchronousTest` for the
-    definition of all the arguments except ``cycles``.
+    definition of all the arguments except ``cycles``, ``vcd_name``,
+    ``compare_online`` and ``mismatch_window``, which are passed to
+    :meth:`SynchronousTest.cosimulate`.
 
     What is returned is what is returned from
     :meth:`SynchronousTest.cosimulate`.
     '''
     sim_object = SynchronousTest(
         dut_factory, ref_factory, args, arg_types, period, custom_sources,
-        enforce_convertible_top_level_interfaces, time_units=time_units)
+        enforce_convertible_top_level_interfaces, time_units=time_units,
+        columnar_outputs=columnar_outputs,
+        random_source_batch_size=random_source_batch_size)
 
-    return sim_object.cosimulate(cycles, vcd_name=vcd_name)
+    return sim_object.cosimulate(
+        cycles, vcd_name=vcd_name, compare_online=compare_online,
+        mismatch_window=mismatch_window)
 
 
@@ -4,14 +4,18 @@ import myhdl
 from random import randrange
 import random
 import copy
+import re
+
+import numpy as np
 
 from math import log, floor
 
 from .utils import check_reset_signal
 
 __all__ = ['random_source', 'clock_source', 'init_reset_source',
-           'recorder_sink', 'handler_sink', 'copy_signal',
-           'lut_signal_driver', 'AVAILABLE_TIME_UNITS']
+           'recorder_sink', 'handler_sink', 'bulk_handler_sink', 'copy_signal',
+           'lut_signal_driver', 'file_rom', 'file_signal_driver',
+           'axi_master_file_playback', 'AVAILABLE_TIME_UNITS']
 
 # These are the available time units. VHDL can also handle 'hr', 'min', 'sec'
 # and 'fs'. These extra time units can be added if required.
@@ -215,9 +219,105 @@ def _signal_random_source(output_signal, clock, reset,
 
     return source
 
+def _random_wide_integers(rng, min_val, max_val, n):
+    '''Returns a list of ``n`` integers drawn uniformly from
+    ``[min_val, max_val)`` using the NumPy generator ``rng``. Any range is
+    supported (in particular, ranges that do not fit in 64 bits), by
+    building the integers from random bytes and rejecting those that are
+    out of range.
+    '''
+    span = max_val - min_val
+    n_bits = max((span - 1).bit_length(), 1)
+    n_bytes = (n_bits + 7) // 8
+    mask = (1 << n_bits) - 1
+
+    values = []
+    while len(values) < n:
+        random_bytes = rng.bytes(n_bytes * (n - len(values)))
+
+        for offset in range(0, len(random_bytes), n_bytes):
+            value = int.from_bytes(
+                random_bytes[offset:offset + n_bytes], 'little') & mask
+
+            if value < span:
+                values.append(min_val + value)
+
+    return values
+
+def _batched_random_values(output_signal, seed, batch_size):
+    '''Returns an iterator that yields random values suitable for
+    ``output_signal`` indefinitely. The values are drawn in batches of
+    ``batch_size`` from a NumPy generator seeded with ``seed``.
+    '''
+
+    rng = np.random.default_rng(seed)
+
+    if isinstance(output_signal.val, intbv):
+
+        min_val = output_signal.val.min
+        max_val = output_signal.val.max
+
+        if min_val is None or max_val is None:
+            raise ValueError('Invalid signal type: The random source '
+                             'requires intbv signals to be bounded.')
+
+        if min_val >= 0 and max_val <= 2**64:
+            draw_batch = lambda: rng.integers(
+                min_val, max_val, size=batch_size, dtype=np.uint64).tolist()
+
+        elif min_val >= -2**63 and max_val <= 2**63:
+            draw_batch = lambda: rng.integers(
+                min_val, max_val, size=batch_size, dtype=np.int64).tolist()
+
+        else:
+            draw_batch = lambda: _random_wide_integers(
+                rng, min_val, max_val, batch_size)
+
+    elif isinstance(output_signal._init, bool):
+        draw_batch = lambda: rng.integers(
+            0, 2, size=batch_size, dtype=np.uint8).astype(bool).tolist()
+
+    elif isinstance(output_signal.val, EnumItemType):
+
+        _enum = output_signal.val._type
+        enum_items = [getattr(_enum, name) for name in _enum._names]
+
+        draw_batch = lambda: [
+            enum_items[n] for n in
+            rng.integers(0, len(enum_items), size=batch_size).tolist()]
+
+    else:
+        raise ValueError('Invalid signal type: The signal type is not '
+                         'supported by the random source.')
+
+    def random_values():
+        while True:
+            yield from draw_batch()
+
+    return random_values()
+
+@block
+def _signal_batched_random_source(output_signal, clock, reset, seed,
+                                  batch_size, edge_sensitivity='posedge'):
+
+    if edge_sensitivity == 'posedge':
+        edge = clock.posedge
+    elif edge_sensitivity == 'negedge':
+        edge = clock.negedge
+    else:
+        raise ValueError('Invalid edge sensitivity')
+
+    random_values = _batched_random_values(output_signal, seed, batch_size)
+
+    @always_seq(edge, reset)
+    def source():
+        output_signal.next = next(random_values)
+
+    return source
+
 @block
 def random_source(output_signal, clock, reset, seed=None,
-                  edge_sensitivity='posedge'):
+                  edge_sensitivity='posedge', batch_size=None):
     '''Generate random signals on each clock edge - the specific
     clock edge to use is given by ``edge_sensitivity`` and can be either
     `posedge` for positive edge or `negedge` for negative edge.
@@ -226,8 +326,20 @@ def random_source(output_signal, clock, reset, seed=None,
 
     Interfaces are supported and the output should be deterministic if
     seed is specified.
+
+    By default, the values are generated by python's ``random`` module. If
+    ``batch_size`` is set, the values are instead drawn ``batch_size`` at a
+    time from a NumPy generator owned by each signal, which is much faster.
+    The output is then still deterministic if seed is specified, but it is
+    a different sequence to that generated when ``batch_size`` is
+    ``None``. In this case, the state of the ``random`` module is not
+    changed unless ``seed`` is ``None``.
     '''
 
+    if batch_size is not None:
+        return _batched_random_source(
+            output_signal, clock, reset, seed, batch_size, edge_sensitivity)
+
     if seed is not None:
         random.seed(seed)
     else:
@@ -275,6 +387,47 @@ def random_source(output_signal, clock, reset, seed=None,
 
         return sources
 
+@block
+def _batched_random_source(output_signal, clock, reset, seed, batch_size,
+                           edge_sensitivity):
+
+    if batch_size < 1:
+        raise ValueError('batch_size should be a positive integer')
+
+    if seed is None:
+        seed = randrange(0, 0x5EEDF00D)
+
+    if isinstance(output_signal, myhdl._Signal._Signal):
+        return _signal_batched_random_source(
+            output_signal, clock, reset, seed, batch_size,
+            edge_sensitivity=edge_sensitivity)
+
+    signal_list = []
+
+    if isinstance(output_signal, list):
+        for each_signal in output_signal:
+            if isinstance(each_signal, myhdl._Signal._Signal):
+                signal_list.append(each_signal)
+
+    else:
+        attribute_names = sorted(output_signal.__dict__)
+        for attribute_name in attribute_names:
+            attribute = getattr(output_signal, attribute_name)
+            if isinstance(attribute, myhdl._Signal._Signal):
+                signal_list.append(attribute)
+
+    # Each signal gets its own, independent, stream derived from the seed.
+    signal_seeds = np.random.SeedSequence(seed).spawn(len(signal_list))
+
+    sources = []
+    for each_signal, signal_seed in zip(signal_list, signal_seeds):
+        sources.append(
+            _signal_batched_random_source(
+                each_signal, clock, reset, signal_seed, batch_size,
+                edge_sensitivity=edge_sensitivity))
+
+    return sources
+
 @block
 def recorder_sink(signal, clock, recorded_output_list,
                   edge_sensitivity='posedge'):
@@ -365,6 +518,56 @@ def handler_sink(
 
     return signal_handler
 
+@block
+def bulk_handler_sink(
+    signals, clock, handler, edge_sensitivity='posedge', copy_values=True):
+    '''Passes the values on every signal in `signals` to a handler on each
+    clock edge. The edge sensitivity is given by `edge_sensitivity` and can be
+    either `posedge` for positive edge or `negedge` for negative edge.
+
+    This is like `handler_sink`, but every signal is sampled in a single
+    wakeup of the simulator, rather than needing one block per signal.
+
+    On each clock edge, `handler` will be called with a single argument,
+    which is a list of the signal values on that clock cycle, in the same
+    order as `signals`.
+
+    If `copy_values` is `True` (the default), each value is copied before
+    being passed to the handler. If it is `False`, the handler is passed the
+    values on the signals directly. In that case the handler should not
+    hold on to mutable values (like `intbv`) as they will be updated in place
+    by the simulator.
+
+    If any of `signals` is not an instance of `Signal`, a ValueError will be
+    raised.
+    '''
+
+    if edge_sensitivity == 'posedge':
+        edge = clock.posedge
+    elif edge_sensitivity == 'negedge':
+        edge = clock.negedge
+    else:
+        raise ValueError('Invalid edge sensitivity')
+
+    signals = list(signals)
+
+    for each_signal in signals:
+        if not isinstance(each_signal, myhdl._Signal._Signal):
+            raise ValueError('All the signals passed to bulk_handler_sink '
+                             'should be instances of Signal')
+
+    if copy_values:
+        @always(edge)
+        def signals_handler():
+            handler([copy.copy(each_signal.val) for each_signal in signals])
+
+    else:
+        @always(edge)
+        def signals_handler():
+            handler([each_signal.val for each_signal in signals])
+
+    return signals_handler
+
 @block
 def _signal_driver_name_annotation(signal, name):
 
@@ -378,6 +581,21 @@ def _signal_driver_name_annotation(signal, name):
 
     return non_block
 
+def _get_signal_names_to_port_names(code, comment_string):
+    '''Returns a dict from the internal name of each signal annotated in
+    ``code`` by a signal driver (see :func:`lut_signal_driver`) to the name
+    of the signal. ``comment_string`` is the string that starts a comment in
+    the language of ``code``.
+    '''
+    signal_name_mappings = {}
+    for each in re.finditer(
+        '^%s <name_annotation>.*?$' % comment_string, code, re.MULTILINE):
+
+        vals = each.group().split()
+        signal_name_mappings[vals[2]] = vals[3]
+
+    return signal_name_mappings
+
 @block
 def lut_signal_driver(sig, drive_lut, clock, edge_sensitivity='posedge',
                      signal_name=None):
@@ -442,3 +660,347 @@ def lut_signal_driver(sig, drive_lut, clock, edge_sensitivity='posedge',
     else:
         return lut_driver
 
+
+file_rom_block_count = 0
+
+def _write_rom_file(filename, values, width):
+    '''Writes ``values`` to ``filename`` as hex, one value per line, in the
+    two's complement form of ``width`` bits. Every value is written with
+    the same number of digits, as required by VHDL ``hread``. Returns the
+    number of bits in the written values.
+    '''
+    n_digits = max(-(-width // 4), 1)
+    value_format = '0%dx' % n_digits
+    mask = (1 << width) - 1
+
+    with open(filename, 'w') as f:
+        f.write(''.join(
+            format(int(value) & mask, value_format) + '\n'
+            for value in values))
+
+    return n_digits * 4
+
+def _file_rom_code(sig, values, filename):
+    '''Writes ``values`` to ``filename`` and returns the VHDL declarations
+    of a ``rom`` variable loaded from the file, the VHDL expression that
+    converts ``rom(%s)`` to the type of ``sig``, the Verilog declaration of
+    the ``rom`` memory and the Verilog statement that loads it.
+    '''
+    n_values = len(values)
+
+    if isinstance(sig._val, bool):
+        width = 1
+        vhdl_rom_value = 'rom(%s)(0)'
+
+    else:
+        width = len(sig)
+        if sig.min is not None and sig.min < 0:
+            vhdl_rom_value = 'signed(rom(%%s)(%d downto 0))' % (width - 1)
+        else:
+            vhdl_rom_value = 'unsigned(rom(%%s)(%d downto 0))' % (width - 1)
+
+    rom_width = _write_rom_file(filename, values, width)
+
+    vhdl_rom_declarations = '''
+    type rom_type is array (0 to %d) of std_logic_vector(%d downto 0);
+
+    impure function load_rom return rom_type is
+        file rom_file : TEXT open READ_MODE is "%s";
+        variable rom_line : LINE;
+        variable rom_values : rom_type;
+    begin
+        for n in rom_type'range loop
+            readline(rom_file, rom_line);
+            hread(rom_line, rom_values(n));
+        end loop;
+        return rom_values;
+    end function load_rom;
+
+    variable rom : rom_type := load_rom;''' % (
+        n_values - 1, rom_width - 1, filename)
+
+    verilog_rom_declaration = 'reg [%d:0] rom [0:%d];' % (
+        rom_width - 1, n_values - 1)
+    verilog_rom_load = '$$readmemh("%s", rom);' % filename
+
+    return (vhdl_rom_declarations, vhdl_rom_value, verilog_rom_declaration,
+            verilog_rom_load)
+
+@block
+def file_rom(address, data, values, filename):
+    '''A read-only memory of ``values``, which ``data`` reads combinatorially
+    from the location given by ``address``. If ``address`` is beyond the end
+    of ``values``, ``data`` is left unchanged.
+
+    On conversion, the values are not written into the HDL. Instead, they
+    are written to ``filename`` when the block is created and the converted
+    code loads them from that file at the start of the simulation (using
+    ``textio`` in VHDL and ``$readmemh`` in Verilog). This means the size of
+    the converted code does not depend on the number of values.
+    '''
+
+    values = tuple(int(each) for each in values)
+
+    if len(values) == 0:
+        raise ValueError('Invalid zero length values: The values should not '
+                         'be empty')
+
+    global file_rom_block_count
+
+    inst_count = file_rom_block_count
+    file_rom_block_count += 1
+
+    n_values = len(values)
+
+    (vhdl_rom_declarations, vhdl_rom_value, verilog_rom_declaration,
+     verilog_rom_load) = _file_rom_code(data, values, filename)
+
+    @always_comb
+    def rom_lookup():
+        if address < n_values:
+            data.next = values[address]
+
+    file_rom.verilog_code = '''
+initial begin: FILE_ROM_%d
+    %s
+
+    %s
+
+    while (1'b1) begin
+        if ($address < %d) begin
+            $data <= rom[$address];
+        end
+        @($address);
+    end
+end
+''' % (inst_count, verilog_rom_declaration, verilog_rom_load, n_values)
+
+    file_rom.vhdl_code = '''
+FILE_ROM_%d: process ($address) is
+%s
+begin
+    if to_integer($address) < %d then
+        $data <= %s;
+    end if;
+end process FILE_ROM_%d;
+''' % (inst_count, vhdl_rom_declarations, n_values,
+       vhdl_rom_value % 'to_integer($address)', inst_count)
+
+    # These tell myhdl that data is driven and address is read by the
+    # verilog and vhdl code
+    data.driven = 'reg'
+    address.read = True
+
+    return rom_lookup
+
+@block
+def _file_signal_driver(sig, drive_lut, clock, filename, edge_sensitivity):
+
+    global file_rom_block_count
+
+    inst_count = file_rom_block_count
+    file_rom_block_count += 1
+
+    lut_length = len(drive_lut)
+
+    (vhdl_rom_declarations, vhdl_rom_value, verilog_rom_declaration,
+     verilog_rom_load) = _file_rom_code(sig, drive_lut, filename)
+
+    if edge_sensitivity == 'posedge':
+        edge = clock.posedge
+        vhdl_edge = 'rising_edge'
+    else:
+        edge = clock.negedge
+        vhdl_edge = 'falling_edge'
+
+    @instance
+    def lut_driver():
+        lut_idx = 0
+        while True:
+            sig.next = drive_lut[lut_idx]
+            yield edge
+            if lut_idx + 1 >= lut_length:
+                lut_idx = 0
+            else:
+                lut_idx = lut_idx + 1
+
+    # This mirrors the conversion of lut_signal_driver, with the look-up
+    # table loaded from the file.
+    _file_signal_driver.verilog_code = '''
+initial begin: FILE_SIGNAL_DRIVER_%d
+    integer lut_idx;
+    %s
+
+    %s
+    lut_idx = 0;
+
+    while (1'b1) begin
+        $sig <= rom[lut_idx];
+        @(%s $clock);
+        if ((lut_idx + 1) >= %d) begin
+            lut_idx = 0;
+        end
+        else begin
+            lut_idx = lut_idx + 1;
+        end
+    end
+end
+''' % (inst_count, verilog_rom_declaration, verilog_rom_load,
+       edge_sensitivity, lut_length)
+
+    _file_signal_driver.vhdl_code = '''
+FILE_SIGNAL_DRIVER_%d: process is
+%s
+    variable lut_idx : natural := 0;
+begin
+    while True loop
+        $sig <= %s;
+        wait until %s($clock);
+        if ((lut_idx + 1) >= %d) then
+            lut_idx := 0;
+        else
+            lut_idx := lut_idx + 1;
+        end if;
+    end loop;
+    wait;
+end process FILE_SIGNAL_DRIVER_%d;
+''' % (inst_count, vhdl_rom_declarations, vhdl_rom_value % 'lut_idx',
+       vhdl_edge, lut_length, inst_count)
+
+    # These tell myhdl that sig is driven and clock is read by the verilog
+    # and vhdl code
+    sig.driven = 'reg'
+    clock.read = True
+
+    return lut_driver
+
+@block
+def file_signal_driver(sig, drive_lut, clock, filename,
+                       edge_sensitivity='posedge', signal_name=None):
+    '''Drive the output from a look-up table, in the same way as
+    :func:`lut_signal_driver`, except that on conversion the look-up table is
+    not written into the HDL. Instead, it is written to ``filename`` when the
+    block is created and the converted code loads it from that file at the
+    start of the simulation (using ``textio`` in VHDL and ``$readmemh`` in
+    Verilog). This means the size of the converted code does not depend on
+    the length of the look-up table.
+    '''
+
+    if edge_sensitivity not in ('posedge', 'negedge'):
+        raise ValueError('Invalid edge sensitivity')
+
+    drive_lut = tuple(int(each) for each in drive_lut)
+
+    if len(drive_lut) == 0:
+        raise ValueError('Invalid zero length lut: The lut should not be '
+                         'empty')
+
+    lut_driver = _file_signal_driver(
+        sig, drive_lut, clock, filename, edge_sensitivity)
+
+    if signal_name is not None:
+        return _signal_driver_name_annotation(sig, signal_name), lut_driver
+    else:
+        return lut_driver
+
+@block
+def axi_master_file_playback(
+    clock, axi_interface, signal_record, filename_prefix,
+    incomplete_last_packet=False):
+    '''Plays back the signal_record over an AXI stream interface in the
+    same way as :func:`kea.hdl.axi.axi_master_playback`, but with the
+    values held in a :func:`file_rom` for each of the signals. The files
+    are written to ``filename_prefix`` followed by the name of the signal.
+    '''
+
+    from kea.hdl.axi.axi_stream import _axi_master_playback_values
+
+    use_TLAST = hasattr(axi_interface, 'TLAST')
+
+    TDATAs, TVALIDs, TIDs, TDESTs, TLASTs = _axi_master_playback_values(
+        axi_interface, signal_record, incomplete_last_packet)
+
+    number_of_vals = len(TDATAs)
+    value_index = Signal(intbv(0, min=0, max=number_of_vals + 1))
+
+    internal_TVALID = Signal(False)
+
+    rom_TDATA = Signal(intbv(0)[len(axi_interface.TDATA):])
+    rom_TVALID = Signal(False)
+
+    return_instances = [
+        file_rom(value_index, rom_TDATA, TDATAs, filename_prefix + 'TDATA'),
+        file_rom(value_index, rom_TVALID, TVALIDs,
+                 filename_prefix + 'TVALID')]
+
+    if use_TLAST:
+        rom_TLAST = Signal(False)
+        return_instances.append(
+            file_rom(value_index, rom_TLAST, TLASTs,
+                     filename_prefix + 'TLAST'))
+
+        @always(clock.posedge)
+        def playback_TLAST():
+            if ((axi_interface.TREADY and internal_TVALID) or
+                not internal_TVALID):
+
+                if value_index < number_of_vals:
+                    axi_interface.TLAST.next = rom_TLAST
+
+        return_instances.append(playback_TLAST)
+
+    if axi_interface.TID_width is not None:
+        rom_TID = Signal(intbv(0)[axi_interface.TID_width:])
+        return_instances.append(
+            file_rom(value_index, rom_TID, TIDs, filename_prefix + 'TID'))
+
+        @always(clock.posedge)
+        def playback_TID():
+            if ((axi_interface.TREADY and internal_TVALID) or
+                not internal_TVALID):
+
+                if value_index < number_of_vals:
+                    axi_interface.TID.next = rom_TID
+
+        return_instances.append(playback_TID)
+
+    if axi_interface.TDEST_width is not None:
+        rom_TDEST = Signal(intbv(0)[axi_interface.TDEST_width:])
+        return_instances.append(
+            file_rom(value_index, rom_TDEST, TDESTs,
+                     filename_prefix + 'TDEST'))
+
+        @always(clock.posedge)
+        def playback_TDEST():
+            if ((axi_interface.TREADY and internal_TVALID) or
+                not internal_TVALID):
+
+                if value_index < number_of_vals:
+                    axi_interface.TDEST.next = rom_TDEST
+
+        return_instances.append(playback_TDEST)
+
+    @always(clock.posedge)
+    def playback_core():
+
+        if ((axi_interface.TREADY and internal_TVALID) or
+            not internal_TVALID):
+
+            if value_index < number_of_vals:
+                axi_interface.TDATA.next = rom_TDATA
+
+                internal_TVALID.next = rom_TVALID
+                axi_interface.TVALID.next = rom_TVALID
+
+                value_index.next = value_index + 1
+            else:
+                # The last output word
+                if (axi_interface.TREADY and internal_TVALID):
+                    internal_TVALID.next = 0
+                    axi_interface.TVALID.next = 0
+
+                value_index.next = value_index
+
+    return_instances.append(playback_core)
+
+    return return_instances
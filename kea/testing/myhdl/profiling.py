@@ -0,0 +1,179 @@
+import time
+
+from myhdl._block import _Block
+from myhdl._instance import _Instantiator
+
+__all__ = ['CosimulationProfile', 'GeneratorProfile']
+
+class GeneratorProfile(object):
+    '''The profile of a single generator in a profiled cosimulation.
+
+    ``group`` is the part of the test bench to which the generator belongs
+    (for example ``'ref'``, ``'dut'`` or ``'random_sources'``) and ``path``
+    is the ``/`` separated group and names of the blocks that contain it,
+    ending with the name of the generator itself.
+
+    ``calls`` is the number of times the generator was run by the simulator
+    and ``time`` is the cumulative wall time in seconds spent running it.
+    '''
+
+    def __init__(self, group, path):
+        self.group = group
+        self.path = path
+        self.calls = 0
+        self.time = 0.0
+
+    def __repr__(self):
+        return (
+            'GeneratorProfile(group={!r}, path={!r}, calls={}, '
+            'time={:.6f})'.format(
+                self.group, self.path, self.calls, self.time))
+
+
+class _ProfiledGenerator(object):
+    '''Wraps a generator, counting the calls to it and accumulating the time
+    spent in it into ``profile``.
+    '''
+
+    __slots__ = ('generator', 'profile')
+
+    def __init__(self, generator, profile):
+        self.generator = generator
+        self.profile = profile
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        profile = self.profile
+        start = time.perf_counter()
+
+        try:
+            return next(self.generator)
+
+        finally:
+            profile.time += time.perf_counter() - start
+            profile.calls += 1
+
+
+class CosimulationProfile(object):
+    '''The report of a profiled cosimulation (see
+    :meth:`SynchronousTest.cosimulate`).
+
+    ``generators`` is a list of :class:`GeneratorProfile`, one for every
+    generator in the simulation. ``cycles`` is the number of clock cycles
+    that were simulated and ``wall_time`` is the wall time in seconds of the
+    whole simulation.
+    '''
+
+    def __init__(self, generators, cycles, wall_time):
+        self.generators = generators
+        self.cycles = cycles
+        self.wall_time = wall_time
+
+    @property
+    def cycles_per_second(self):
+        '''The number of simulated clock cycles per second of wall time.
+        '''
+        if self.wall_time == 0:
+            return float('inf')
+
+        return self.cycles / self.wall_time
+
+    def _totals(self, key):
+        totals = {}
+
+        for generator in self.generators:
+            for each_key in key(generator):
+                calls, total_time = totals.get(each_key, (0, 0.0))
+                totals[each_key] = (
+                    calls + generator.calls, total_time + generator.time)
+
+        return totals
+
+    @property
+    def groups(self):
+        '''A dict of the total ``(calls, time)`` of the generators in each
+        group.
+        '''
+        return self._totals(lambda generator: (generator.group,))
+
+    @property
+    def blocks(self):
+        '''A dict of the total ``(calls, time)`` of the generators in each
+        block, keyed by the path of the block. Every level of the hierarchy
+        is included, so the time of a block includes the time of all the
+        blocks it contains.
+        '''
+        def block_paths(generator):
+            path = generator.path.split('/')[:-1]
+            return ['/'.join(path[:n+1]) for n in range(len(path))]
+
+        return self._totals(block_paths)
+
+    def summary(self):
+        '''Returns a string of a table of the generators, ordered by the
+        time spent in each.
+        '''
+        lines = [
+            'Simulated {} cycles in {:.3f}s ({:.1f} cycles per '
+            'second)'.format(
+                self.cycles, self.wall_time, self.cycles_per_second),
+            '{:>10} {:>12}  {:<18} {}'.format(
+                'calls', 'time (s)', 'group', 'generator')]
+
+        for generator in sorted(
+            self.generators, key=lambda generator: -generator.time):
+
+            lines.append('{:>10} {:>12.6f}  {:<18} {}'.format(
+                generator.calls, generator.time, generator.group,
+                generator.path))
+
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return (
+            'CosimulationProfile(generators={}, cycles={}, '
+            'wall_time={:.6f})'.format(
+                len(self.generators), self.cycles, self.wall_time))
+
+def _profiled_waiters(instances, group, path):
+    '''Returns a pair of lists. The first is of the simulator waiters of
+    each generator in ``instances`` (which can be arbitrarily nested lists
+    of blocks and generators), each wrapped in a :class:`_ProfiledGenerator`.
+    The second is the list of the :class:`GeneratorProfile` objects into
+    which they record, the paths of which start with ``path``.
+
+    Anything that is not a block or a generator is passed through unchanged
+    in the list of waiters.
+    '''
+    waiters = []
+    profiles = []
+
+    if isinstance(instances, (list, tuple)):
+        for each_instance in instances:
+            each_waiters, each_profiles = _profiled_waiters(
+                each_instance, group, path)
+            waiters.extend(each_waiters)
+            profiles.extend(each_profiles)
+
+    elif isinstance(instances, _Block):
+        waiters, profiles = _profiled_waiters(
+            instances.subs, group, path + '/' + instances.name)
+
+    elif isinstance(instances, _Instantiator):
+        profile = GeneratorProfile(group, path + '/' + instances.name)
+
+        # The waiter is inferred from the original generator, so the
+        # profiled simulation schedules the generator the same way as
+        # an unprofiled simulation would.
+        waiter = instances.waiter
+        waiter.generator = _ProfiledGenerator(waiter.generator, profile)
+
+        waiters.append(waiter)
+        profiles.append(profile)
+
+    else:
+        waiters.append(instances)
+
+    return waiters, profiles
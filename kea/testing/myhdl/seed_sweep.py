@@ -0,0 +1,179 @@
+import pickle
+import random
+import traceback
+
+import numpy as np
+
+import myhdl
+import myhdl._simulator
+import myhdl._Simulation
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .cosimulation import myhdl_cosimulation
+
+__all__ = ['myhdl_cosimulation_sweep', 'SeedSweepResult']
+
+def _reset_myhdl_simulator_state():
+    '''Clears the global state that MyHDL keeps between simulations, so each
+    run in a worker process starts from the same clean state.
+
+    The lists are cleared in place, as they are imported by name into other
+    MyHDL modules.
+    '''
+    del myhdl._simulator._signals[:]
+    del myhdl._simulator._blocks[:]
+    del myhdl._simulator._siglist[:]
+    del myhdl._simulator._futureEvents[:]
+    myhdl._simulator._time = 0
+    myhdl._simulator._cosim = 0
+    myhdl._simulator._tracing = 0
+    myhdl._simulator._tf = None
+    myhdl._Simulation.Simulation._no_of_instances = 0
+
+class SeedSweepResult(object):
+    '''The result of a single cosimulation run by
+    :func:`myhdl_cosimulation_sweep`.
+
+    ``random_state`` is the ``(numpy_seed, random_seed)`` pair with which
+    the run was seeded. ``passed`` is ``True`` if the run passed.
+
+    For a failing run, ``outputs`` is the ``(dut_outputs, ref_outputs)``
+    pair returned by the cosimulation (or ``None`` if the cosimulation
+    itself raised an error, or if the outputs cannot be pickled to be
+    returned from the worker process) and ``error`` is the formatted
+    traceback of the failure (or ``None`` if the outputs simply differed).
+    Both are ``None`` for a passing run.
+    '''
+
+    def __init__(self, random_state, passed, outputs=None, error=None):
+        self.random_state = random_state
+        self.passed = passed
+        self.outputs = outputs
+        self.error = error
+
+    def __repr__(self):
+        return 'SeedSweepResult(random_state={}, passed={})'.format(
+            self.random_state, self.passed)
+
+    @property
+    def reproduction_message(self):
+        '''The message that ``KeaTestCase`` prints on a failure, giving the
+        ``random_state`` with which to repeat the run.
+        '''
+        return (
+            'To repeat random tests exactly, set self.random_state on the '
+            'class with:\nrandom_state = (%d, %d)\n' % self.random_state)
+
+def _run_seed(setup, random_state, cycles, check, cosimulation_kwargs):
+    '''Runs a single cosimulation of the sweep. This is run in a worker
+    process.
+    '''
+
+    _reset_myhdl_simulator_state()
+
+    numpy_seed, random_seed = random_state
+    np.random.seed(numpy_seed)
+    random.seed(random_seed)
+
+    outputs = None
+
+    try:
+        kwargs = dict(setup())
+        kwargs.update(cosimulation_kwargs)
+
+        outputs = myhdl_cosimulation(cycles, **kwargs)
+
+        if check is None:
+            dut_outputs, ref_outputs = outputs
+            passed = dut_outputs == ref_outputs
+        else:
+            passed = check(*outputs) is not False
+
+        error = None
+
+    except AssertionError as e:
+        if outputs is None:
+            # e.g. an online comparison mismatch, which carries the outputs
+            outputs = getattr(e, 'outputs', None)
+
+        passed = False
+        error = traceback.format_exc()
+
+    except Exception:
+        passed = False
+        error = traceback.format_exc()
+
+    if passed:
+        outputs = None
+
+    elif outputs is not None:
+        # The result is pickled to be returned from the worker, so outputs
+        # that cannot be pickled (such as those of MyHDL enum signals) would
+        # fail the whole sweep.
+        try:
+            pickle.dumps(outputs)
+
+        except Exception:
+            outputs = None
+            error = (error or '') + (
+                'The outputs could not be returned from the worker '
+                'process:\n' + traceback.format_exc())
+
+    return SeedSweepResult(random_state, passed, outputs, error)
+
+def myhdl_cosimulation_sweep(setup, seeds, cycles, check=None,
+                             max_workers=None, **kwargs):
+    '''Runs many cosimulations of the same test configuration, each seeded
+    differently, in parallel across a pool of worker processes.
+
+    ``setup`` is a callable that takes no arguments and returns a dict of
+    the arguments (other than ``cycles``) to pass to
+    :func:`myhdl_cosimulation`, i.e. ``dut_factory``, ``ref_factory``,
+    ``args``, ``arg_types`` and any others. It is called in the worker
+    process after seeding, so any random data it generates (for example the
+    packets added to an ``AxiStreamMasterBFM``) is reproducible. As it is
+    sent to the workers, ``setup`` should be picklable (for example, a
+    function defined at the top level of a module). ``kwargs`` are also
+    passed to :func:`myhdl_cosimulation`, overriding those from ``setup``.
+
+    ``seeds`` is either the number of runs, in which case a random state
+    is generated for each run, or a list giving the random state of each
+    run. A random state is a ``(numpy_seed, random_seed)`` pair, as used
+    by ``KeaTestCase.random_state``, or a single integer used for both.
+    Before each run, ``numpy.random`` and ``random`` are seeded as
+    ``KeaTestCase`` does.
+
+    By default, a run passes if the dut outputs are the same as the ref
+    outputs. If ``check`` is not ``None``, it is called instead with the
+    dut outputs and the ref outputs, and the run fails if it raises an
+    ``AssertionError`` or returns ``False``. A run that raises any other
+    error also fails. ``check`` should be picklable too.
+
+    ``max_workers`` sets the number of worker processes, defaulting to the
+    number of processors. Each run starts from a clean MyHDL simulator
+    state in its worker.
+
+    A list of :class:`SeedSweepResult` is returned, in the order of the
+    seeds. The outputs of failing runs are returned with the result.
+    '''
+
+    if isinstance(seeds, int):
+        random_states = [
+            (random.randrange(0, 2**32-1), random.randrange(0, 2**32-1))
+            for n in range(seeds)]
+
+    else:
+        random_states = [
+            (seed, seed) if isinstance(seed, int) else tuple(seed)
+            for seed in seeds]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _run_seed, setup, random_state, cycles, check, kwargs)
+            for random_state in random_states]
+
+        results = [future.result() for future in futures]
+
+    return results
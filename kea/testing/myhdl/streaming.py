@@ -0,0 +1,539 @@
+import copy
+import os
+
+import numpy as np
+
+from collections.abc import Mapping, Sequence
+
+from myhdl import block, always, enum
+from myhdl._enum import EnumItemType
+
+__all__ = ['SignalChunks', 'AxiStreamPacketChunks']
+
+def _chunk_values_equal(chunk, other_values):
+    '''Compares a chunk of recorded values (a NumPy array) with a sequence of
+    the same length.
+    '''
+    if isinstance(other_values, np.ndarray):
+        return bool(np.array_equal(chunk, other_values))
+
+    # intbv looks like a sequence to NumPy, so we compare as python objects.
+    return all(chunk_value == other_value for chunk_value, other_value in
+               zip(chunk.tolist(), other_values))
+
+class SignalChunks(Sequence):
+    '''A read-only sequence of the values recorded on a single signal, which
+    have been written to disk as a set of ``.npy`` chunks by a
+    :class:`SignalSpool`.
+
+    Nothing is read from disk until it is accessed, and then only the chunks
+    that are needed are read. Chunks of integer or bool values are memory
+    mapped. Indexing with an integer returns a single value and indexing
+    with a slice returns a NumPy array.
+
+    :meth:`chunks` iterates over the chunks as arrays, which allows the
+    values to be processed without ever holding more than one chunk in
+    memory. :meth:`to_array` reads every value into a single array.
+
+    MyHDL enum items cannot be pickled, so the values of an enum signal are
+    written as the indices of the items. If ``enum_type`` is not ``None``,
+    the chunks hold such indices and are read back as the items of
+    ``enum_type``. Only the names and encoding of the enum are kept when the
+    object is pickled, so once unpickled the items are those of an
+    equivalent enum, which do not compare equal to the original items.
+    '''
+
+    def __init__(self, chunk_paths, chunk_lengths, dtype, enum_type=None):
+        self._chunk_paths = list(chunk_paths)
+        self._chunk_lengths = list(chunk_lengths)
+        self._dtype = np.dtype(dtype)
+
+        # The index of the first value in each chunk, and the total length
+        self._chunk_offsets = np.cumsum([0] + self._chunk_lengths)
+
+        if enum_type is None:
+            self._enum_names = None
+            self._enum_encoding = None
+        else:
+            self._enum_names = tuple(enum_type._names)
+            self._enum_encoding = enum_type._encoding
+
+        self._set_enum_items(enum_type)
+
+    def _set_enum_items(self, enum_type):
+
+        if enum_type is None:
+            self._enum_items = None
+
+        else:
+            self._enum_items = np.empty(len(self._enum_names), dtype=object)
+            self._enum_items[:] = [
+                getattr(enum_type, name) for name in self._enum_names]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_enum_items']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        if self._enum_names is None:
+            self._set_enum_items(None)
+        else:
+            self._set_enum_items(
+                enum(*self._enum_names, encoding=self._enum_encoding))
+
+    def __len__(self):
+        return int(self._chunk_offsets[-1])
+
+    def __repr__(self):
+        return 'SignalChunks(length={}, chunks={}, dtype={})'.format(
+            len(self), len(self._chunk_paths), self._dtype)
+
+    @property
+    def dtype(self):
+        return self._dtype
+
+    @property
+    def chunk_paths(self):
+        return list(self._chunk_paths)
+
+    def _load_chunk(self, chunk_index):
+        chunk_path = self._chunk_paths[chunk_index]
+
+        if self._enum_items is not None:
+            chunk = self._enum_items[np.load(chunk_path)]
+            chunk.flags.writeable = False
+            return chunk
+
+        elif self._dtype == object:
+            # Python objects cannot be memory mapped.
+            chunk = np.load(chunk_path, allow_pickle=True)
+            chunk.flags.writeable = False
+            return chunk
+
+        return np.load(chunk_path, mmap_mode='r')
+
+    def chunks(self):
+        '''Yields each chunk of the recorded values in turn as a read-only
+        NumPy array.
+        '''
+        for chunk_index in range(len(self._chunk_paths)):
+            yield self._load_chunk(chunk_index)
+
+    def to_array(self):
+        '''Returns all the recorded values as a single NumPy array.
+        '''
+        if len(self._chunk_paths) == 0:
+            return np.empty(0, dtype=self._dtype)
+
+        return np.concatenate(list(self.chunks()))
+
+    def __array__(self, dtype=None):
+        values = self.to_array()
+
+        if dtype is not None:
+            values = values.astype(dtype)
+
+        return values
+
+    def _values_in_range(self, start, stop):
+        '''Returns the values from ``start`` to ``stop`` as a single array,
+        reading only the chunks that overlap the range.
+        '''
+        first_chunk = int(
+            np.searchsorted(self._chunk_offsets, start, side='right')) - 1
+        last_chunk = int(
+            np.searchsorted(self._chunk_offsets, stop, side='left'))
+
+        pieces = []
+        for chunk_index in range(first_chunk, last_chunk):
+            chunk_offset = self._chunk_offsets[chunk_index]
+            chunk = self._load_chunk(chunk_index)
+
+            pieces.append(chunk[
+                max(start - chunk_offset, 0):stop - chunk_offset])
+
+        if len(pieces) == 0:
+            return np.empty(0, dtype=self._dtype)
+
+        return np.concatenate(pieces)
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(self)))
+
+            if len(indices) == 0:
+                return np.empty(0, dtype=self._dtype)
+
+            lowest = min(indices[0], indices[-1])
+            highest = max(indices[0], indices[-1])
+
+            values = self._values_in_range(lowest, highest + 1)
+
+            # The values are in ascending order, so a negative step starts
+            # from the end, as it should.
+            return values[::indices.step]
+
+        elif isinstance(index, (int, np.integer)):
+            length = len(self)
+
+            if index < 0:
+                index += length
+
+            if index < 0 or index >= length:
+                raise IndexError('SignalChunks index out of range')
+
+            chunk_index = int(
+                np.searchsorted(self._chunk_offsets, index, side='right')) - 1
+
+            return self._load_chunk(chunk_index)[
+                index - self._chunk_offsets[chunk_index]]
+
+        else:
+            raise TypeError('indices must be integers or slices')
+
+    def __iter__(self):
+        for chunk in self.chunks():
+            yield from chunk
+
+    def __eq__(self, other):
+        if not isinstance(other, (Sequence, np.ndarray)):
+            return NotImplemented
+
+        if len(self) != len(other):
+            return False
+
+        for chunk_offset, chunk in zip(self._chunk_offsets, self.chunks()):
+            other_values = other[chunk_offset:chunk_offset + len(chunk)]
+
+            if isinstance(other, SignalChunks):
+                equal = bool(np.array_equal(chunk, other_values))
+            else:
+                equal = _chunk_values_equal(chunk, other_values)
+
+            if not equal:
+                return False
+
+        return True
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+
+        if equal is NotImplemented:
+            return equal
+
+        return not equal
+
+class SignalSpool(object):
+    '''A bounded-memory store of the values recorded on a single signal. The
+    values are held in a buffer of ``chunk_length`` values. Each time the
+    buffer fills, the values in it are written to disk and/or passed on,
+    and the buffer is reused.
+
+    If ``directory`` is not ``None``, each chunk is saved to a ``.npy`` file
+    in it, named from ``name`` and the index of the chunk. If ``handler``
+    is not ``None``, it is called with ``name`` and each chunk (as a NumPy
+    array) as it is completed.
+
+    ``dtype`` should be a NumPy dtype, and values are converted as they are
+    by :class:`SignalColumn`. The values of enum signals are written to disk
+    as the indices of the items (see :class:`SignalChunks`).
+
+    :meth:`close` should be called once everything has been recorded. It
+    returns a :class:`SignalChunks` object from which the recorded values
+    can be read (or ``None`` if ``directory`` is ``None``).
+    '''
+
+    def __init__(self, name, dtype, chunk_length, directory=None,
+                 handler=None):
+
+        if chunk_length < 1:
+            raise ValueError('chunk_length should be a positive integer')
+
+        self._name = name
+        self._directory = directory
+        self._handler = handler
+
+        self._buffer = np.empty(chunk_length, dtype=dtype)
+        self._buffer_length = 0
+
+        if self._buffer.dtype == object:
+            self._convert = copy.copy
+        else:
+            self._convert = int
+
+        self._chunk_paths = []
+        self._chunk_lengths = []
+        self._n_flushed = 0
+
+        self._enum_type = None
+
+    def __len__(self):
+        return self._n_flushed + self._buffer_length
+
+    @property
+    def dtype(self):
+        return self._buffer.dtype
+
+    def append(self, val):
+        self._buffer[self._buffer_length] = self._convert(val)
+        self._buffer_length += 1
+
+        if self._buffer_length == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        '''Writes out and/or passes on the values currently in the buffer,
+        and then empties it.
+        '''
+        if self._buffer_length == 0:
+            return
+
+        chunk = self._buffer[:self._buffer_length]
+
+        if self._directory is not None:
+            chunk_path = os.path.join(
+                self._directory, '{}.{:06d}.npy'.format(
+                    self._name, len(self._chunk_paths)))
+
+            if chunk.dtype == object and isinstance(chunk[0], EnumItemType):
+                # Enum items cannot be pickled, so their indices are saved.
+                self._enum_type = chunk[0]._type
+                saved_chunk = np.fromiter(
+                    (value._index for value in chunk), dtype=np.int64,
+                    count=len(chunk))
+
+            else:
+                saved_chunk = chunk
+
+            np.save(chunk_path, saved_chunk,
+                    allow_pickle=(saved_chunk.dtype == object))
+
+            self._chunk_paths.append(chunk_path)
+            self._chunk_lengths.append(self._buffer_length)
+
+        if self._handler is not None:
+            # The buffer is reused, so the handler gets its own copy.
+            self._handler(self._name, chunk.copy())
+
+        self._n_flushed += self._buffer_length
+        self._buffer_length = 0
+
+    def close(self):
+        '''Flushes any values left in the buffer and returns a
+        :class:`SignalChunks` object of everything that was written to disk,
+        or ``None`` if nothing was written to disk.
+        '''
+        self.flush()
+
+        if self._directory is None:
+            return None
+
+        return SignalChunks(
+            self._chunk_paths, self._chunk_lengths, self._buffer.dtype,
+            self._enum_type)
+
+def _packets_to_arrays(packets):
+    '''Converts a deque of packets to a pair of arrays: the data of all the
+    packets concatenated, and the length of each packet.
+    '''
+    lengths = np.array([len(packet) for packet in packets], dtype=np.int64)
+    data = [int(value) for packet in packets for value in packet]
+
+    if len(data) > 0 and min(data) >= 0 and max(data) < 2**64:
+        data = np.array(data, dtype=np.uint64)
+
+    else:
+        data_array = np.empty(len(data), dtype=object)
+        data_array[:] = data
+        data = data_array
+
+    return data, lengths
+
+class _StreamPacketChunks(Sequence):
+    '''The packets received on a single stream, as stored in the chunks of an
+    :class:`AxiStreamPacketChunks`. Iterating reads one chunk at a time.
+    '''
+
+    def __init__(self, chunk_paths, stream_key, n_packets):
+        self._chunk_paths = chunk_paths
+        self._stream_key = stream_key
+        self._n_packets = n_packets
+
+    def __len__(self):
+        return self._n_packets
+
+    def __iter__(self):
+        for chunk_path in self._chunk_paths:
+            with np.load(chunk_path, allow_pickle=True) as chunk:
+                if 'data_' + self._stream_key not in chunk:
+                    continue
+
+                data = chunk['data_' + self._stream_key].tolist()
+                lengths = chunk['lengths_' + self._stream_key].tolist()
+
+            offset = 0
+            for length in lengths:
+                yield data[offset:offset + length]
+                offset += length
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return list(self)[index]
+
+        if index < 0:
+            index += self._n_packets
+
+        if index < 0 or index >= self._n_packets:
+            raise IndexError('packet index out of range')
+
+        for n, packet in enumerate(self):
+            if n == index:
+                return packet
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+
+        if len(self) != len(other):
+            return False
+
+        return all(packet == list(other_packet)
+                   for packet, other_packet in zip(self, other))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+
+        if equal is NotImplemented:
+            return equal
+
+        return not equal
+
+class AxiStreamPacketChunks(Mapping):
+    '''A read-only mapping of the completed packets received by an AXI stream
+    slave BFM, which have been written to disk as a set of ``.npz`` chunks by
+    an :class:`AxiStreamPacketSpool`.
+
+    As for ``AxiStreamSlaveBFM.completed_packets``, the keys are
+    ``(TID, TDEST)`` tuples. Each value is a sequence of the packets received
+    on that stream, with each packet a list of the ``TDATA`` values. The
+    chunks are only read when the packets are accessed.
+    '''
+
+    def __init__(self, chunk_paths, packet_counts):
+        self._chunk_paths = list(chunk_paths)
+        self._packet_counts = dict(packet_counts)
+
+    def __repr__(self):
+        return 'AxiStreamPacketChunks(packets={})'.format(
+            self._packet_counts)
+
+    @property
+    def chunk_paths(self):
+        return list(self._chunk_paths)
+
+    def __getitem__(self, stream):
+        if stream not in self._packet_counts:
+            raise KeyError(stream)
+
+        return _StreamPacketChunks(
+            self._chunk_paths, '{}_{}'.format(*stream),
+            self._packet_counts[stream])
+
+    def __iter__(self):
+        return iter(self._packet_counts)
+
+    def __len__(self):
+        return len(self._packet_counts)
+
+class AxiStreamPacketSpool(object):
+    '''A bounded-memory store of the packets received by the AXI stream slave
+    BFM ``bfm``. Each call to :meth:`drain` takes the completed packets from
+    the BFM and writes them to disk and/or passes them on.
+
+    If ``directory`` is not ``None``, the packets are saved to a ``.npz``
+    file in it, named from ``name`` and the index of the chunk. If
+    ``handler`` is not ``None``, it is called with ``name`` and the dict of
+    completed packets that was taken from the BFM.
+
+    :meth:`close` should be called once the simulation has finished. It
+    returns an :class:`AxiStreamPacketChunks` object from which the
+    packets can be read (or ``None`` if ``directory`` is ``None``).
+    '''
+
+    def __init__(self, name, bfm, directory=None, handler=None):
+        self._name = name
+        self._bfm = bfm
+        self._directory = directory
+        self._handler = handler
+
+        self._chunk_paths = []
+        self._packet_counts = {}
+
+    def drain(self):
+        '''Takes the completed packets from the BFM and writes them to disk
+        and/or passes them on.
+        '''
+        completed_packets = self._bfm.take_completed_packets()
+
+        if len(completed_packets) == 0:
+            return
+
+        if self._directory is not None:
+            chunk_arrays = {}
+            for stream in completed_packets:
+                stream_key = '{}_{}'.format(*stream)
+                data, lengths = _packets_to_arrays(completed_packets[stream])
+
+                chunk_arrays['data_' + stream_key] = data
+                chunk_arrays['lengths_' + stream_key] = lengths
+
+                self._packet_counts[stream] = (
+                    self._packet_counts.get(stream, 0) + len(lengths))
+
+            chunk_path = os.path.join(
+                self._directory, '{}.packets.{:06d}.npz'.format(
+                    self._name, len(self._chunk_paths)))
+
+            np.savez(chunk_path, **chunk_arrays)
+            self._chunk_paths.append(chunk_path)
+
+        if self._handler is not None:
+            self._handler(self._name, completed_packets)
+
+    def close(self):
+        '''Drains any packets left in the BFM and returns an
+        :class:`AxiStreamPacketChunks` object of everything that was written
+        to disk, or ``None`` if nothing was written to disk.
+        '''
+        self.drain()
+
+        if self._directory is None:
+            return None
+
+        return AxiStreamPacketChunks(self._chunk_paths, self._packet_counts)
+
+@block
+def packet_spool_drainer(clock, packet_spools, chunk_length):
+    '''Drains every :class:`AxiStreamPacketSpool` in ``packet_spools`` once
+    every ``chunk_length`` cycles of ``clock``.
+    '''
+
+    drainer_state = {'cycle': 0}
+
+    @always(clock.posedge)
+    def drainer():
+        drainer_state['cycle'] += 1
+
+        if drainer_state['cycle'] == chunk_length:
+            drainer_state['cycle'] = 0
+
+            for packet_spool in packet_spools:
+                packet_spool.drain()
+
+    return drainer
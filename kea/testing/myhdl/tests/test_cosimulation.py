@@ -11,6 +11,7 @@ from myhdl import (intbv, modbv, enum, Signal, ResetSignal, instance,
 import unittest
 import copy
 import random
+import numpy as np
 from itertools import chain
 from random import randrange
 from collections import deque
@@ -22,7 +23,9 @@ import shutil
 from unittest import mock
 
 from kea.testing.myhdl import (
-    SynchronousTest, myhdl_cosimulation, random_source)
+    SynchronousTest, myhdl_cosimulation, random_source, CosimulationProfile,
+    GeneratorProfile, ReadOnlySignalOutput)
+from kea.testing.myhdl import cosimulation
 
 
 class CosimulationTestMixin(object):
@@ -3147,6 +3150,279 @@ class TestSynchronousTestClass(CosimulationTestMixin, TestCase):
         finally:
             shutil.rmtree(tmp_dir)
 
+    def test_dut_convertible_top_hex_output_format(self):
+        '''It should be possible to set the output_format of
+        dut_convertible_top to 'hex', in which case the outputs should be
+        written as hex with the width of each signal in the header, and
+        flushed to the file periodically and after the last cycle.
+
+        Any other output_format should raise a ValueError.
+        '''
+        simulated_input_cycles = 20
+
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory,
+            self.default_args, self.default_arg_types)
+
+        test_obj.cosimulate(simulated_input_cycles)
+
+        tmp_dir = tempfile.mkdtemp()
+
+        try:
+            for hdl, extension, write_call, flush_condition in (
+                ('VHDL', '.vhd', 'hwrite(', 'cycle_count = %d'),
+                ('Verilog', '.v', '%h', 'cycle_count == %d')):
+
+                top = test_obj.dut_convertible_top(
+                    tmp_dir, output_format='hex')
+                top.convert(hdl=hdl, path=tmp_dir)
+
+                with open(os.path.join(
+                    tmp_dir, 'dut_convertible_top' + extension)) as f:
+                    converted = f.read()
+
+                self.assertIn(write_call, converted)
+                self.assertIn('unsigned test_output:16', converted)
+                self.assertIn(
+                    flush_condition % simulated_input_cycles, converted)
+
+                top = test_obj.dut_convertible_top(tmp_dir)
+                top.convert(hdl=hdl, path=tmp_dir)
+
+                with open(os.path.join(
+                    tmp_dir, 'dut_convertible_top' + extension)) as f:
+                    converted = f.read()
+
+                self.assertNotIn(write_call, converted)
+                self.assertNotIn('test_output:16', converted)
+
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        self.assertRaisesRegex(
+            ValueError, 'Invalid output format',
+            test_obj.dut_convertible_top, 'foobarfile',
+            output_format='octal')
+
+    def test_dut_convertible_top_file_stimulus(self):
+        '''If stimulus_filename_prefix is set, the stimulus should be
+        written to files beginning with the prefix in the output path, and
+        the converted code should read it from those files. The size of the
+        converted code should then not depend on the number of cycles.
+        '''
+        for hdl, extension in (('VHDL', '.vhd'), ('Verilog', '.v')):
+
+            converted = []
+            for simulated_input_cycles in (20, 2000):
+
+                test_obj = SynchronousTest(
+                    self.identity_factory, self.identity_factory,
+                    self.default_args, self.default_arg_types)
+
+                test_obj.cosimulate(simulated_input_cycles)
+
+                tmp_dir = tempfile.mkdtemp()
+
+                try:
+                    top = test_obj.dut_convertible_top(
+                        tmp_dir, stimulus_filename_prefix='stimulus')
+                    top.convert(hdl=hdl, path=tmp_dir)
+
+                    stimulus_files = sorted(
+                        filename for filename in os.listdir(tmp_dir)
+                        if filename.startswith('stimulus'))
+
+                    # The input and the reset are played back
+                    self.assertEqual(len(stimulus_files), 2)
+
+                    with open(os.path.join(
+                        tmp_dir, 'dut_convertible_top' + extension)) as f:
+                        code = f.read()
+
+                    for filename in stimulus_files:
+                        self.assertIn(os.path.join(tmp_dir, filename), code)
+
+                        with open(os.path.join(tmp_dir, filename)) as f:
+                            self.assertEqual(
+                                len(f.readlines()), simulated_input_cycles)
+
+                    converted.append(code)
+
+                finally:
+                    shutil.rmtree(tmp_dir)
+
+            # Only names and constants should differ
+            self.assertEqual(
+                len(converted[0].splitlines()),
+                len(converted[1].splitlines()))
+
+    def test_dut_convertible_top_repeated_conversion(self):
+        '''Converting the convertible top level again should not add
+        anything to the namespace of the cosimulation module.
+        '''
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory,
+            self.default_args, self.default_arg_types)
+
+        test_obj.cosimulate(20)
+
+        module_names = set(vars(cosimulation))
+
+        for hdl in ('VHDL', 'Verilog'):
+            for n in range(2):
+                tmp_dir = tempfile.mkdtemp()
+
+                try:
+                    top = test_obj.dut_convertible_top(tmp_dir)
+                    top.convert(hdl=hdl, path=tmp_dir)
+
+                finally:
+                    shutil.rmtree(tmp_dir)
+
+                self.assertEqual(set(vars(cosimulation)), module_names)
+
+    def test_dut_convertible_top_stimulus_tests(self):
+        '''If stimulus_tests is set, the stimulus of each of the tests
+        should be played back in turn, with the reset held active for
+        reset_cycles_between_tests cycles before each test after the first.
+        '''
+        test_objs = []
+        for simulated_input_cycles in (20, 30):
+            test_obj = SynchronousTest(
+                self.identity_factory, self.identity_factory,
+                self.default_args, self.default_arg_types)
+
+            test_obj.cosimulate(simulated_input_cycles)
+            test_objs.append(test_obj)
+
+        stimulus = test_objs[0]._batch_stimulus(test_objs, 3)
+
+        input_values = [
+            list(test_obj.elaborated_args['test_input'].extract_sim_values(
+                test_obj._outputs[1])) for test_obj in test_objs]
+
+        self.assertEqual(
+            stimulus['test_input'],
+            input_values[0] + [input_values[1][0]] * 3 + input_values[1])
+        self.assertEqual(stimulus['reset'][20:23], [True] * 3)
+        self.assertEqual(len(stimulus['test_output']), 53)
+
+        for hdl, extension in (('VHDL', '.vhd'), ('Verilog', '.v')):
+            tmp_dir = tempfile.mkdtemp()
+
+            try:
+                top = test_objs[0].dut_convertible_top(
+                    tmp_dir, stimulus_filename_prefix='stimulus',
+                    stimulus_tests=test_objs, reset_cycles_between_tests=3)
+                top.convert(hdl=hdl, path=tmp_dir)
+
+                stimulus_files = [
+                    filename for filename in os.listdir(tmp_dir)
+                    if filename.startswith('stimulus')]
+
+                self.assertEqual(len(stimulus_files), 2)
+
+                for filename in stimulus_files:
+                    with open(os.path.join(tmp_dir, filename)) as f:
+                        self.assertEqual(len(f.readlines()), 53)
+
+            finally:
+                shutil.rmtree(tmp_dir)
+
+    def test_dut_convertible_top_invalid_stimulus_tests(self):
+        '''stimulus_tests that have not been run, that have different
+        arguments or that have no reset should raise an error, as should
+        fewer than one reset cycle between the tests.
+        '''
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory,
+            self.default_args, self.default_arg_types)
+        test_obj.cosimulate(20)
+
+        not_run_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory,
+            self.default_args, self.default_arg_types)
+
+        self.assertRaisesRegex(
+            RuntimeError, 'The simulator should be run',
+            test_obj._batch_stimulus, [test_obj, not_run_obj], 2)
+
+        self.assertRaisesRegex(
+            ValueError, 'reset_cycles_between_tests',
+            test_obj._batch_stimulus, [test_obj, test_obj], 0)
+
+        args = self.default_args.copy()
+        arg_types = self.default_arg_types.copy()
+        arg_types['reset'] = 'custom'
+
+        no_reset_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, args, arg_types)
+        no_reset_obj.cosimulate(20)
+
+        self.assertRaisesRegex(
+            ValueError, 'should have a reset',
+            no_reset_obj._batch_stimulus, [no_reset_obj, no_reset_obj], 2)
+
+        args = {'test_output': Signal(intbv(0)[16:]),
+                'reset': self.reset,
+                'clock': self.clock}
+        arg_types = {'test_output': 'output',
+                     'reset': 'init_reset',
+                     'clock': 'clock'}
+
+        @block
+        def constant(test_output, reset, clock):
+
+            @always_seq(clock.posedge, reset)
+            def test_dut():
+                test_output.next = 1
+
+            return test_dut
+
+        other_args_obj = SynchronousTest(constant, constant, args, arg_types)
+        other_args_obj.cosimulate(20)
+
+        self.assertRaisesRegex(
+            ValueError, 'same arguments',
+            test_obj._batch_stimulus, [test_obj, other_args_obj], 2)
+
+    def test_dut_convertible_top_stimulus_tests_non_signals(self):
+        '''stimulus_tests with different values of a non-signal argument
+        should raise a ValueError, as only one dut is converted. The same
+        values should be accepted.
+        '''
+        @block
+        def offset_identity(test_input, test_output, reset, clock, offset):
+
+            @always_seq(clock.posedge, reset)
+            def test_dut():
+                test_output.next = test_input + offset
+
+            return test_dut
+
+        arg_types = self.default_arg_types.copy()
+        arg_types['offset'] = 'non-signal'
+
+        def run_test(offset):
+            args = self.default_args.copy()
+            args['offset'] = offset
+
+            test_obj = SynchronousTest(
+                offset_identity, offset_identity, args, arg_types)
+            test_obj.cosimulate(20)
+
+            return test_obj
+
+        test_obj = run_test(1)
+
+        self.assertRaisesRegex(
+            ValueError, 'non-signal arguments, but offset differs',
+            test_obj._batch_stimulus, [test_obj, run_test(7)], 2)
+
+        batch_stimulus = test_obj._batch_stimulus(
+            [test_obj, run_test(1)], 2)
+        self.assertEqual(len(batch_stimulus['test_input']), 42)
+
     def test_dut_convertible_top_with_long_boolean_output(self):
         '''Output booleans with long type vals (0, 1) should be handled.
 
@@ -3408,55 +3684,1252 @@ class TestSynchronousTestClass(CosimulationTestMixin, TestCase):
         finally:
             shutil.rmtree(tmp_dir)
 
+    def test_single_recorder_block(self):
+        '''All the signals, for both the dut and the ref, should be recorded
+        by a single recorder block.
+        '''
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
 
-class TestSimulationOutputGroup(TestCase):
+        self.assertEqual(len(test_obj.output_recorder_factories), 1)
 
-    def test_equality(self):
-        '''The SimulationOutputGroup should be able to test for equality
-        against other instances of SimulationOutputGroup.
+        recorder_factory, recorder_args, recorder_kwargs = (
+            test_obj.output_recorder_factories[0])
 
-        If the item being compared to is not another instance of
-        SimulationOutputGroup then the the equality test should be False.
+        recorded_signals = recorder_args[0]
+        expected_signals = (
+            test_obj.elaborated_args.objects +
+            test_obj.elaborated_dut_args.objects)
+
+        self.assertEqual(len(recorded_signals), len(expected_signals))
+
+        for recorded_signal, expected_signal in zip(
+            recorded_signals, expected_signals):
+            self.assertIs(recorded_signal, expected_signal)
+
+    def test_compare_online_matching(self):
+        '''If ``compare_online`` is set and the dut matches the ref, the
+        simulation should run for the full number of cycles and return the
+        same outputs as it would without online comparison.
         '''
-        from kea.testing.myhdl.cosimulation import SimulationOutputGroup
+        sim_cycles = 40
+        seed = random.randrange(0, 0x5EEDF00D)
 
-        test_dict = {'a': [1, 2, 3], 'b': [4, 5, 6]}
-        test_dict2 = {'a': [1, 2, 3], 'b': [4, 5, 6]}
-        a = SimulationOutputGroup(test_dict)
-        b = SimulationOutputGroup(test_dict2)
+        random.seed(seed)
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+        expected_dut_results, expected_ref_results = test_obj.cosimulate(
+            sim_cycles)
 
-        self.assertTrue(a == b)
-        self.assertTrue(test_dict != b)
+        random.seed(seed)
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+        dut_results, ref_results = test_obj.cosimulate(
+            sim_cycles, compare_online=True)
+
+        self.assertEqual(len(ref_results['test_output']), sim_cycles)
+        self.assertEqual(dut_results, expected_dut_results)
+        self.assertEqual(ref_results, expected_ref_results)
+
+    def test_compare_online_stops_at_divergence(self):
+        '''If ``compare_online`` is set, the simulation should stop shortly
+        after the first cycle on which a dut `'output'` signal diverges from
+        the ref, and a CosimulationMismatchError should be raised that
+        reports the cycle, the signal name and the values around the
+        divergence.
+        '''
+        from kea.testing.myhdl import CosimulationMismatchError
 
-        test_dict = {'a': [1, 2, 4], 'b': [4, 5, 6]}
-        a = SimulationOutputGroup(test_dict)
+        diverge_count = 20
+        mismatch_window = 4
 
-        self.assertTrue(a != b)
+        @block
+        def diverging_factory(test_input, test_output, reset, clock):
 
-class TestSimulationOutputs(TestCase):
+            count = [0]
 
-    def test_equality(self):
-        '''The SimulationOutputs should be able to test for equality
-        against other instances of SimulationOutputs.
+            @always_seq(clock.posedge, reset=reset)
+            def diverging_identity():
+                count[0] += 1
 
-        The equality check should be also return True on instances of dict
-        that contain the same data.
+                if count[0] == diverge_count:
+                    test_output.next = test_input + 1
+                else:
+                    test_output.next = test_input
+
+            return diverging_identity
+
+        sim_cycles = 1000
+
+        test_obj = SynchronousTest(
+            diverging_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+
+        with self.assertRaises(CosimulationMismatchError) as cm:
+            test_obj.cosimulate(
+                sim_cycles, compare_online=True,
+                mismatch_window=mismatch_window)
+
+        error = cm.exception
+        dut_results, ref_results = error.outputs
+
+        dut_output = [int(each) for each in dut_results['test_output']]
+        ref_output = [int(each) for each in ref_results['test_output']]
+
+        first_divergence = [
+            n for n, (dut_val, ref_val) in enumerate(
+                zip(dut_output, ref_output)) if dut_val != ref_val][0]
+
+        self.assertEqual(error.signal_name, 'test_output')
+        self.assertEqual(error.cycle, first_divergence)
+        self.assertIn('test_output', str(error))
+        self.assertIn(str(first_divergence), str(error))
+
+        window_stop = first_divergence + mismatch_window + 1
+
+        # The simulation should have stopped soon after the divergence
+        self.assertTrue(len(ref_output) <= window_stop)
+
+        self.assertEqual(
+            error.window_start, first_divergence - mismatch_window)
+        self.assertEqual(
+            [int(each) for each in error.ref_values],
+            ref_output[error.window_start:window_stop])
+        self.assertEqual(
+            [int(each) for each in error.dut_values],
+            dut_output[error.window_start:window_stop])
+
+    def test_compare_online_axi_stream_packets(self):
+        '''If ``compare_online`` is set, the packets on `'axi_stream_out'`
+        interfaces should be compared as they complete, with a
+        CosimulationMismatchError raised on the first mismatched packet.
         '''
+        from kea.testing.myhdl import CosimulationMismatchError
 
-        from kea.testing.myhdl.cosimulation import SimulationOutputs
+        stream = (0, 0)
+        packet_list = {stream: deque([
+            deque([random.randrange(0, 2**16) for m in range(5)])
+            for n in range(20)])}
 
-        test_dict = {'a': [1, 2, 3], 'b': [4, 5, 6]}
-        test_dict2 = {'a': [1, 2, 3], 'b': [4, 5, 6]}
-        a = SimulationOutputs(test_dict)
-        b = SimulationOutputs(test_dict2)
+        args = {'axi_interface_in': AxiStreamInterface(),
+                'axi_interface_out': AxiStreamInterface(),
+                'clock': self.clock}
 
-        self.assertTrue(a == b)
-        self.assertTrue(test_dict == b)
+        arg_types = {'axi_interface_in': 'axi_stream_in',
+                     'axi_interface_out': 'axi_stream_out',
+                     'clock': 'clock'}
 
-        test_dict = {'a': [1, 2, 4], 'b': [4, 5, 6]}
-        a = SimulationOutputs(test_dict)
+        def axi_factory(increment):
 
-        self.assertTrue(a != b)
+            @block
+            def axi_identity(clock, axi_interface_in, axi_interface_out):
+
+                @always_comb
+                def assign_signals():
+                    axi_interface_in.TREADY.next = axi_interface_out.TREADY
+                    axi_interface_out.TVALID.next = axi_interface_in.TVALID
+                    axi_interface_out.TLAST.next = axi_interface_in.TLAST
+                    axi_interface_out.TDATA.next = (
+                        axi_interface_in.TDATA + increment)
+
+                return assign_signals
+
+            return axi_identity
+
+        master_bfm = AxiStreamMasterBFM()
+        master_bfm.add_data(packet_list[stream])
+        custom_sources = [
+            (master_bfm.model, (self.clock, args['axi_interface_in']), {})]
+
+        sim_cycles = 1000
+
+        test_obj = SynchronousTest(
+            axi_factory(1), axi_factory(0), args, arg_types,
+            custom_sources=custom_sources)
+
+        with self.assertRaises(CosimulationMismatchError) as cm:
+            test_obj.cosimulate(
+                sim_cycles, compare_online=True, mismatch_window=0)
+
+        error = cm.exception
+
+        self.assertEqual(error.signal_name, 'axi_interface_out')
+        self.assertEqual(error.ref_values, list(packet_list[stream][0]))
+        self.assertEqual(
+            error.dut_values, [val + 1 for val in packet_list[stream][0]])
+
+        # We should have stopped after the first packet
+        self.assertTrue(error.cycle < sim_cycles // 10)
+
+    def test_compare_online_with_None_dut_raises(self):
+        '''``compare_online`` requires a dut, so should raise a ValueError if
+        the dut factory is None.
+        '''
+        test_obj = SynchronousTest(
+            None, self.identity_factory, self.default_args,
+            self.default_arg_types)
+
+        self.assertRaisesRegex(
+            ValueError, 'compare_online requires a dut',
+            test_obj.cosimulate, 20, compare_online=True)
+
+    def test_columnar_outputs(self):
+        '''If ``columnar_outputs`` is set to ``True``, every recorded signal
+        should be returned as a NumPy array containing the same values as
+        would be recorded in the default (list) mode.
+        '''
+        sim_cycles = 40
+        seed = random.randrange(0, 0x5EEDF00D)
+
+        random.seed(seed)
+        list_test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+        list_dut_results, list_ref_results = list_test_obj.cosimulate(
+            sim_cycles)
+
+        random.seed(seed)
+        columnar_test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types, columnar_outputs=True)
+        dut_results, ref_results = columnar_test_obj.cosimulate(sim_cycles)
+
+        for signal in ref_results:
+            self.assertIsInstance(ref_results[signal], np.ndarray)
+            self.assertIsInstance(dut_results[signal], np.ndarray)
+            self.assertEqual(len(ref_results[signal]), sim_cycles)
+
+            self.assertEqual(
+                ref_results[signal].tolist(),
+                [int(each) for each in list_ref_results[signal]])
+            self.assertEqual(
+                dut_results[signal].tolist(),
+                [int(each) for each in list_dut_results[signal]])
+
+        self.assertEqual(dut_results, ref_results)
+        self.assertEqual(ref_results, list_ref_results)
+
+    def test_columnar_output_dtypes(self):
+        '''In columnar mode, unsigned and signed signals up to 64 bits wide
+        should be recorded as ``uint64`` and ``int64`` arrays respectively
+        and bool signals as ``bool`` arrays. Wider signals should be recorded
+        as arrays of python objects.
+        '''
+
+        @block
+        def identity_factory(
+            unsigned_in, unsigned_out, signed_in, signed_out, wide_in,
+            wide_out, bool_in, bool_out, reset, clock):
+
+            @always_seq(clock.posedge, reset=reset)
+            def identity():
+                unsigned_out.next = unsigned_in
+                signed_out.next = signed_in
+                wide_out.next = wide_in
+                bool_out.next = bool_in
+
+            return identity
+
+        args = {
+            'unsigned_in': Signal(intbv(0)[64:]),
+            'unsigned_out': Signal(intbv(0)[64:]),
+            'signed_in': Signal(intbv(0, min=-2**63, max=2**63)),
+            'signed_out': Signal(intbv(0, min=-2**63, max=2**63)),
+            'wide_in': Signal(intbv(0)[65:]),
+            'wide_out': Signal(intbv(0)[65:]),
+            'bool_in': Signal(bool(0)),
+            'bool_out': Signal(bool(0)),
+            'reset': self.reset,
+            'clock': self.clock}
+
+        arg_types = {
+            'unsigned_in': 'random', 'unsigned_out': 'output',
+            'signed_in': 'random', 'signed_out': 'output',
+            'wide_in': 'random', 'wide_out': 'output',
+            'bool_in': 'random', 'bool_out': 'output',
+            'reset': 'init_reset', 'clock': 'clock'}
+
+        sim_cycles = 30
+
+        test_obj = SynchronousTest(
+            identity_factory, identity_factory, args, arg_types,
+            columnar_outputs=True)
+        dut_results, ref_results = test_obj.cosimulate(sim_cycles)
+
+        expected_dtypes = {
+            'unsigned_out': np.dtype(np.uint64),
+            'signed_out': np.dtype(np.int64),
+            'wide_out': np.dtype(object),
+            'bool_out': np.dtype(bool)}
+
+        for signal in expected_dtypes:
+            self.assertEqual(
+                ref_results[signal].dtype, expected_dtypes[signal])
+            self.assertEqual(
+                dut_results[signal].dtype, expected_dtypes[signal])
+
+        # Check the values make it through the identity intact
+        for in_signal, out_signal in (
+            ('unsigned_in', 'unsigned_out'), ('signed_in', 'signed_out'),
+            ('wide_in', 'wide_out'), ('bool_in', 'bool_out')):
+
+            self.assertEqual(
+                ref_results[in_signal][self.reset_cycles:-1].tolist(),
+                ref_results[out_signal][self.reset_cycles + 1:].tolist())
+
+        self.assertEqual(dut_results, ref_results)
+
+    def test_columnar_interface_outputs(self):
+        '''In columnar mode, interfaces should still be accessible as a
+        group, with each value in the group coming from the arrays recorded
+        for the interface signals.
+        '''
+        class Interface(object):
+            def __init__(self):
+                self.a = Signal(intbv(0, min=-1000, max=1000))
+                self.b = Signal(bool(0))
+
+        @block
+        def identity_factory(test_input, test_output, reset, clock):
+            @always_seq(clock.posedge, reset=reset)
+            def identity():
+                test_output.a.next = test_input.a
+                test_output.b.next = test_input.b
+
+            return identity
+
+        args = self.default_args.copy()
+        args['test_input'] = Interface()
+        args['test_output'] = Interface()
+
+        sim_cycles = 30
+
+        test_obj = SynchronousTest(
+            identity_factory, identity_factory, args,
+            self.default_arg_types, columnar_outputs=True)
+        dut_results, ref_results = test_obj.cosimulate(sim_cycles)
+
+        self.assertIsInstance(ref_results['test_output.a'], np.ndarray)
+        self.assertEqual(len(ref_results['test_output']), sim_cycles)
+
+        for n, each in enumerate(ref_results['test_output']):
+            self.assertEqual(each['a'], ref_results['test_output.a'][n])
+            self.assertEqual(each['b'], ref_results['test_output.b'][n])
+
+        self.assertEqual(dut_results['test_output'],
+                         ref_results['test_output'])
+
+    def test_batched_random_sources(self):
+        '''If ``random_source_batch_size`` is set, the random args should be
+        driven by batched random sources, with the ref and the dut driven
+        with identical values, and the values determined by the state of
+        ``random`` when the SynchronousTest is created.
+        '''
+        sim_cycles = 40
+        seed = random.randrange(0, 0x5EEDF00D)
+
+        random.seed(seed)
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types, random_source_batch_size=16)
+
+        for factory, args, kwargs in test_obj.random_source_factories:
+            self.assertEqual(kwargs['batch_size'], 16)
+
+        dut_results, ref_results = test_obj.cosimulate(sim_cycles)
+
+        self.assertEqual(dut_results, ref_results)
+        self.assertTrue(len(set(
+            int(each) for each in ref_results['test_input'])) > 1)
+
+        random.seed(seed)
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types, random_source_batch_size=1000)
+
+        self.assertEqual(test_obj.cosimulate(sim_cycles)[1], ref_results)
+
+    def test_outputs_not_copied(self):
+        '''The recorded outputs should be handed over to the caller without
+        being copied, and each call to ``cosimulate`` should record into a
+        new set of outputs, leaving the outputs from earlier calls
+        unchanged.
+        '''
+        sim_cycles = 20
+
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+
+        dut_results, ref_results = test_obj.cosimulate(sim_cycles)
+
+        for signal in ref_results:
+            self.assertIs(ref_results[signal], test_obj._outputs[1][signal])
+            self.assertIs(dut_results[signal], test_obj._outputs[0][signal])
+            self.assertIsInstance(ref_results[signal], ReadOnlySignalOutput)
+
+        first_ref_results = copy.deepcopy(ref_results)
+
+        new_dut_results, new_ref_results = test_obj.cosimulate(sim_cycles)
+
+        for signal in ref_results:
+            self.assertIsNot(new_ref_results[signal], ref_results[signal])
+            self.assertEqual(len(new_ref_results[signal]), sim_cycles)
+
+        self.assertEqual(ref_results, first_ref_results)
+
+    def test_outputs_read_only(self):
+        '''The returned lists of values should be read-only, so that
+        changing the returned outputs does not change the stimulus from
+        which the dut is converted.
+        '''
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+        dut_results, ref_results = test_obj.cosimulate(20)
+
+        def stimulus():
+            return {
+                arg.name: list(arg.extract_sim_values(test_obj._outputs[1]))
+                for arg in test_obj.elaborated_args
+                if arg.type != 'non-signal'}
+
+        original_stimulus = copy.deepcopy(stimulus())
+
+        for signal in ref_results:
+            values = ref_results[signal]
+
+            self.assertEqual(values, original_stimulus[signal])
+
+            for modify in (
+                lambda: values.append(values[0]),
+                lambda: values.extend(values),
+                lambda: values.insert(0, values[0]),
+                lambda: values.pop(),
+                lambda: values.remove(values[0]),
+                lambda: values.clear(),
+                lambda: values.sort(),
+                lambda: values.reverse(),
+                lambda: values.__setitem__(0, values[1]),
+                lambda: values.__delitem__(slice(None)),
+                lambda: values.__iadd__(values),
+                lambda: values.__imul__(2)):
+
+                self.assertRaises(TypeError, modify)
+
+            # The mapping is a copy, so its values can be replaced
+            ref_results[signal] = []
+
+        self.assertEqual(stimulus(), original_stimulus)
+
+        # Copies of the outputs are read-only as well
+        ref_copy = copy.deepcopy(test_obj._outputs[1])
+        for signal in ref_copy:
+            self.assertIsInstance(ref_copy[signal], ReadOnlySignalOutput)
+            self.assertEqual(ref_copy[signal], original_stimulus[signal])
+
+    def test_columnar_outputs_read_only(self):
+        '''In columnar mode, the returned arrays should be read-only views
+        onto the recorded data.
+        '''
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types, columnar_outputs=True)
+        dut_results, ref_results = test_obj.cosimulate(20)
+
+        for signal in ref_results:
+            self.assertFalse(ref_results[signal].flags.writeable)
+            self.assertFalse(dut_results[signal].flags.writeable)
+
+            with self.assertRaises(ValueError):
+                ref_results[signal][0] = 0
+
+    def test_stream_to_directory(self):
+        '''If ``stream_directory`` is set, the recorded values should be
+        written to chunked files in it as the simulation runs, and returned as
+        SignalChunks objects that read the same values back from those files.
+        '''
+        from kea.testing.myhdl import SignalChunks
+
+        sim_cycles = 40
+        seed = random.randrange(0, 0x5EEDF00D)
+
+        random.seed(seed)
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+        expected_dut_results, expected_ref_results = test_obj.cosimulate(
+            sim_cycles)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            random.seed(seed)
+            test_obj = SynchronousTest(
+                self.identity_factory, self.identity_factory,
+                self.default_args, self.default_arg_types)
+            dut_results, ref_results = test_obj.cosimulate(
+                sim_cycles, stream_directory=tmp_dir, stream_chunk_length=7)
+
+            self.assertEqual(sorted(os.listdir(tmp_dir)), ['dut', 'ref'])
+
+            for signal in expected_ref_results:
+                self.assertIsInstance(ref_results[signal], SignalChunks)
+                self.assertIsInstance(dut_results[signal], SignalChunks)
+                self.assertEqual(
+                    len(ref_results[signal].chunk_paths),
+                    -(-sim_cycles // 7))
+
+            self.assertEqual(ref_results, expected_ref_results)
+            self.assertEqual(dut_results, expected_dut_results)
+
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_stream_enum_signals(self):
+        '''Enum signals should be streamed to the directory, and read back
+        as the items of the enum.
+        '''
+        from kea.testing.myhdl import SignalChunks
+
+        states = enum('A', 'B', 'C')
+
+        args = {'state': Signal(states.A), 'reset': self.reset,
+                'clock': self.clock}
+        arg_types = {'state': 'output', 'reset': 'init_reset',
+                     'clock': 'clock'}
+
+        @block
+        def state_machine(state, reset, clock):
+
+            @always_seq(clock.posedge, reset=reset)
+            def transitions():
+                if state == states.A:
+                    state.next = states.B
+                elif state == states.B:
+                    state.next = states.C
+                else:
+                    state.next = states.A
+
+            return transitions
+
+        expected_dut_results, expected_ref_results = SynchronousTest(
+            state_machine, state_machine, args, arg_types).cosimulate(20)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            dut_results, ref_results = SynchronousTest(
+                state_machine, state_machine, args, arg_types).cosimulate(
+                    20, stream_directory=tmp_dir, stream_chunk_length=8)
+
+            self.assertIsInstance(ref_results['state'], SignalChunks)
+            self.assertEqual(len(ref_results['state'].chunk_paths), 3)
+
+            self.assertEqual(ref_results, expected_ref_results)
+            self.assertEqual(dut_results, expected_dut_results)
+            self.assertEqual(dut_results, ref_results)
+
+            self.assertIs(
+                ref_results['state'][-1], expected_ref_results['state'][-1])
+
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_stream_handler(self):
+        '''If ``stream_handler`` is set and ``stream_directory`` is not, the
+        recorded values should only be passed to the handler, in chunks, and
+        not returned.
+        '''
+        sim_cycles = 40
+        seed = random.randrange(0, 0x5EEDF00D)
+
+        random.seed(seed)
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+        expected_results = dict(zip(
+            ('dut', 'ref'), test_obj.cosimulate(sim_cycles)))
+
+        handled_chunks = {'dut': {}, 'ref': {}}
+
+        def handler(source, name, values):
+            self.assertTrue(len(values) <= 16)
+            handled_chunks[source].setdefault(name, []).append(values)
+
+        random.seed(seed)
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+        dut_results, ref_results = test_obj.cosimulate(
+            sim_cycles, stream_handler=handler, stream_chunk_length=16)
+
+        self.assertEqual(len(ref_results), 0)
+        self.assertEqual(len(dut_results), 0)
+
+        for source in ('dut', 'ref'):
+            self.assertEqual(
+                set(handled_chunks[source]), set(expected_results[source]))
+
+            for name in handled_chunks[source]:
+                self.assertEqual(
+                    np.concatenate(handled_chunks[source][name]).tolist(),
+                    [int(val) for val in expected_results[source][name]])
+
+    def test_stream_handler_dut_convertible_top_raises(self):
+        '''After a run in which the recorded values were only passed to the
+        ``stream_handler``, ``dut_convertible_top`` should raise a
+        RuntimeError, as there is no stimulus to convert. It should work
+        again after a run that keeps the values.
+        '''
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+        test_obj.cosimulate(
+            20, stream_handler=lambda source, name, values: None)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            self.assertRaisesRegex(
+                RuntimeError, 'only passed to the stream_handler',
+                test_obj.dut_convertible_top, tmp_dir)
+
+            other_test_obj = SynchronousTest(
+                self.identity_factory, self.identity_factory,
+                self.default_args, self.default_arg_types)
+            other_test_obj.cosimulate(20)
+
+            self.assertRaisesRegex(
+                RuntimeError, 'only passed to the stream_handler',
+                other_test_obj.dut_convertible_top,
+                tmp_dir, stimulus_tests=[other_test_obj, test_obj])
+
+            test_obj.cosimulate(20)
+            test_obj.dut_convertible_top(tmp_dir).convert(
+                hdl='VHDL', path=tmp_dir)
+
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_stream_directory_not_empty_raises(self):
+        '''Streaming into a ``stream_directory`` that is not empty should
+        raise a ValueError, as the chunks of an earlier run in it may still
+        be in use.
+        '''
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            stream_directory = os.path.join(tmp_dir, 'stream')
+            dut_results, ref_results = test_obj.cosimulate(
+                20, stream_directory=stream_directory, stream_chunk_length=8)
+
+            expected_ref_results = copy.deepcopy(list(ref_results.values()))
+
+            self.assertRaisesRegex(
+                ValueError, 'stream_directory should be empty',
+                test_obj.cosimulate, 20, stream_directory=stream_directory)
+
+            self.assertEqual(
+                list(ref_results.values()), expected_ref_results)
+
+            # An empty directory is fine
+            empty_directory = os.path.join(tmp_dir, 'empty')
+            os.mkdir(empty_directory)
+            test_obj.cosimulate(20, stream_directory=empty_directory)
+
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_stream_axi_stream_packets(self):
+        '''When streaming, the completed packets on the `'axi_stream_out'`
+        interfaces should be streamed out as well, and returned as an
+        AxiStreamPacketChunks mapping.
+        '''
+        from kea.testing.myhdl import AxiStreamPacketChunks
+
+        stream = (0, 0)
+        packet_list = {stream: deque([
+            deque([random.randrange(0, 2**16) for m in range(5)])
+            for n in range(20)])}
+
+        args = {'axi_interface_in': AxiStreamInterface(),
+                'axi_interface_out': AxiStreamInterface(),
+                'clock': self.clock}
+
+        arg_types = {'axi_interface_in': 'axi_stream_in',
+                     'axi_interface_out': 'axi_stream_out',
+                     'clock': 'clock'}
+
+        @block
+        def axi_identity(clock, axi_interface_in, axi_interface_out):
+
+            @always_comb
+            def assign_signals():
+                axi_interface_in.TREADY.next = axi_interface_out.TREADY
+                axi_interface_out.TVALID.next = axi_interface_in.TVALID
+                axi_interface_out.TLAST.next = axi_interface_in.TLAST
+                axi_interface_out.TDATA.next = axi_interface_in.TDATA
+
+            return assign_signals
+
+        master_bfm = AxiStreamMasterBFM()
+        master_bfm.add_data(packet_list[stream])
+        custom_sources = [
+            (master_bfm.model, (self.clock, args['axi_interface_in']), {})]
+
+        test_obj = SynchronousTest(
+            axi_identity, axi_identity, args, arg_types,
+            custom_sources=custom_sources)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            dut_results, ref_results = test_obj.cosimulate(
+                200, stream_directory=tmp_dir, stream_chunk_length=16)
+
+            for results in (ref_results, dut_results):
+                packets = results['axi_interface_out']['packets']
+
+                self.assertIsInstance(packets, AxiStreamPacketChunks)
+                self.assertTrue(len(packets.chunk_paths) > 1)
+                self.assertEqual(packets, packet_list)
+                self.assertEqual(
+                    results['axi_interface_out']['incomplete_packet'], {})
+
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_stream_axi_stream_bfm_records_bounded(self):
+        '''When streaming, the signal records of the BFMs on the
+        `'axi_stream_out'` interfaces should not grow with the number of
+        cycles. They should be recorded again on a run that does not
+        stream.
+        '''
+        stream = (0, 0)
+        packet_list = {stream: deque([
+            deque([random.randrange(0, 2**16) for m in range(5)])
+            for n in range(200)])}
+
+        args = {'axi_interface_in': AxiStreamInterface(),
+                'axi_interface_out': AxiStreamInterface(),
+                'clock': self.clock}
+
+        arg_types = {'axi_interface_in': 'axi_stream_in',
+                     'axi_interface_out': 'axi_stream_out',
+                     'clock': 'clock'}
+
+        @block
+        def axi_identity(clock, axi_interface_in, axi_interface_out):
+
+            @always_comb
+            def assign_signals():
+                axi_interface_in.TREADY.next = axi_interface_out.TREADY
+                axi_interface_out.TVALID.next = axi_interface_in.TVALID
+                axi_interface_out.TLAST.next = axi_interface_in.TLAST
+                axi_interface_out.TDATA.next = axi_interface_in.TDATA
+
+            return assign_signals
+
+        record_lengths = []
+
+        def out_bfms():
+            return (list(test_obj.axi_stream_out_ref_bfms.values()) +
+                    list(test_obj.axi_stream_out_dut_bfms.values()))
+
+        @block
+        def record_length_monitor(clock):
+
+            @always(clock.posedge)
+            def monitor():
+                record_lengths.append(max(
+                    len(each) for bfm in out_bfms()
+                    for each in bfm._signal_record.values()))
+
+            return monitor
+
+        master_bfm = AxiStreamMasterBFM()
+        master_bfm.add_data(packet_list[stream])
+        custom_sources = [
+            (master_bfm.model, (self.clock, args['axi_interface_in']), {}),
+            (record_length_monitor, (self.clock,), {})]
+
+        test_obj = SynchronousTest(
+            axi_identity, axi_identity, args, arg_types,
+            custom_sources=custom_sources)
+
+        handled_packets = []
+        def handler(source, name, values):
+            if source == 'ref' and name == 'axi_interface_out':
+                handled_packets.extend(values.get(stream, []))
+
+        test_obj.cosimulate(
+            2000, stream_handler=handler, stream_chunk_length=64)
+
+        self.assertEqual(len(record_lengths), 2000)
+        self.assertEqual(max(record_lengths), 0)
+        self.assertEqual(deque(handled_packets), packet_list[stream])
+
+        del record_lengths[:]
+        test_obj.cosimulate(100)
+
+        self.assertGreater(max(record_lengths), 90)
+
+    def test_stream_compare_online_axi_stream_raises(self):
+        '''Streaming should raise a ValueError if used with
+        ``compare_online`` when there are `'axi_stream_out'` interfaces.
+        '''
+        args = {'axi_interface_in': AxiStreamInterface(),
+                'axi_interface_out': AxiStreamInterface(),
+                'clock': self.clock}
+
+        arg_types = {'axi_interface_in': 'axi_stream_in',
+                     'axi_interface_out': 'axi_stream_out',
+                     'clock': 'clock'}
+
+        @block
+        def axi_identity(clock, axi_interface_in, axi_interface_out):
+
+            @always_comb
+            def assign_signals():
+                axi_interface_in.TREADY.next = axi_interface_out.TREADY
+                axi_interface_out.TVALID.next = axi_interface_in.TVALID
+                axi_interface_out.TLAST.next = axi_interface_in.TLAST
+                axi_interface_out.TDATA.next = axi_interface_in.TDATA
+
+            return assign_signals
+
+        test_obj = SynchronousTest(axi_identity, axi_identity, args, arg_types)
+
+        self.assertRaisesRegex(
+            ValueError, 'compare_online cannot be used when streaming',
+            test_obj.cosimulate, 20, compare_online=True,
+            stream_handler=lambda source, name, values: None)
+
+    def test_reseed(self):
+        '''The reseed method should set new seeds for the random sources.
+        Reseeding with the same seed should give the same random values.
+        '''
+        sim_cycles = 30
+        test_obj = SynchronousTest(
+            self.identity_factory, self.identity_factory, self.default_args,
+            self.default_arg_types)
+
+        test_obj.reseed(10)
+        dut_results_a, ref_results_a = test_obj.cosimulate(sim_cycles)
+
+        test_obj.reseed(11)
+        dut_results_b, ref_results_b = test_obj.cosimulate(sim_cycles)
+
+        test_obj.reseed(10)
+        dut_results_c, ref_results_c = test_obj.cosimulate(sim_cycles)
+
+        self.assertEqual(ref_results_a, dut_results_a)
+        self.assertEqual(ref_results_a, ref_results_c)
+        self.assertNotEqual(
+            ref_results_a['test_input'], ref_results_b['test_input'])
+
+    def test_reuse_elaboration(self):
+        '''If ``reuse_elaboration`` is set, the ref and dut instances should
+        be elaborated only on the first call to cosimulate, and then be
+        restarted from the beginning on each subsequent call, giving the same
+        outputs as a newly elaborated test with the same seed.
+        '''
+        factory_calls = []
+
+        @block
+        def accumulator(test_input, test_output, reset, clock):
+
+            factory_calls.append(None)
+            total = Signal(intbv(0)[40:])
+
+            @always_seq(clock.posedge, reset=reset)
+            def accumulate():
+                total.next = total + test_input
+                test_output.next = total[32:]
+
+            @instance
+            def count_cycles():
+                # Local state, which is reset when the instance is restarted
+                cycles = 0
+                while True:
+                    yield clock.posedge
+                    cycles += 1
+
+            return accumulate, count_cycles
+
+        test_obj = SynchronousTest(
+            accumulator, accumulator, self.default_args,
+            self.default_arg_types, reuse_elaboration=True)
+
+        reused_results = []
+        for seed, sim_cycles in ((1, 30), (2, 45), (1, 20)):
+            test_obj.reseed(seed)
+            reused_results.append(test_obj.cosimulate(sim_cycles))
+
+        # The ref and dut are only elaborated once
+        self.assertEqual(len(factory_calls), 2)
+
+        for (seed, sim_cycles), (dut_results, ref_results) in zip(
+            ((1, 30), (2, 45), (1, 20)), reused_results):
+
+            fresh_test_obj = SynchronousTest(
+                accumulator, accumulator, self.default_args,
+                self.default_arg_types)
+            fresh_test_obj.reseed(seed)
+
+            expected_dut_results, expected_ref_results = (
+                fresh_test_obj.cosimulate(sim_cycles))
+
+            self.assertEqual(len(ref_results['test_output']), sim_cycles)
+            self.assertEqual(ref_results, expected_ref_results)
+            self.assertEqual(dut_results, expected_dut_results)
+
+    def test_profile(self):
+        '''If ``profile`` is ``True``, ``profile_report`` should be set to a
+        CosimulationProfile giving the number of calls to and the time spent
+        in every generator, grouped into the parts of the test bench, and the
+        number of cycles simulated. Profiling should not change the outputs.
+        '''
+        @block
+        def two_stage(test_input, test_output, reset, clock):
+
+            intermediate = Signal(intbv(0)[16:])
+
+            @always_seq(clock.posedge, reset=reset)
+            def first_stage():
+                intermediate.next = test_input
+
+            @always_seq(clock.posedge, reset=reset)
+            def second_stage():
+                test_output.next = intermediate
+
+            return first_stage, second_stage
+
+        sim_cycles = 40
+
+        for reuse_elaboration in (False, True):
+            test_obj = SynchronousTest(
+                two_stage, self.identity_factory, self.default_args,
+                self.default_arg_types, reuse_elaboration=reuse_elaboration)
+            self.assertIsNone(test_obj.profile_report)
+
+            for n in range(2):
+                test_obj.reseed(n)
+                dut_results, ref_results = test_obj.cosimulate(
+                    sim_cycles, profile=True)
+
+                test_obj.reseed(n)
+                expected_results = test_obj.cosimulate(sim_cycles)
+
+                self.assertEqual(
+                    (dut_results, ref_results), expected_results)
+
+                test_obj.reseed(n)
+                test_obj.cosimulate(sim_cycles, profile=True)
+                report = test_obj.profile_report
+
+                self.assertIsInstance(report, CosimulationProfile)
+                self.assertEqual(report.cycles, sim_cycles)
+                self.assertTrue(report.wall_time > 0)
+                self.assertEqual(report.cycles_per_second,
+                                 sim_cycles / report.wall_time)
+
+                self.assertEqual(
+                    set(report.groups),
+                    {'ref', 'dut', 'random_sources', 'output_recorders',
+                     'clock', 'reset'})
+
+                dut_profiles = [
+                    generator for generator in report.generators
+                    if generator.group == 'dut']
+
+                self.assertEqual(
+                    sorted(generator.path.split('/')[-1]
+                           for generator in dut_profiles),
+                    ['first_stage', 'second_stage'])
+
+                for generator in report.generators:
+                    self.assertIsInstance(generator, GeneratorProfile)
+                    self.assertTrue(generator.path.startswith(
+                        generator.group + '/'))
+
+                    # Every generator is run once per cycle (plus once at
+                    # the start), except the clock which is run twice.
+                    if generator.group == 'clock':
+                        self.assertEqual(generator.calls, 2 * sim_cycles + 1)
+                    else:
+                        self.assertEqual(generator.calls, sim_cycles + 1)
+
+                dut_calls, dut_time = report.groups['dut']
+                self.assertEqual(dut_calls, 2 * (sim_cycles + 1))
+                self.assertEqual(
+                    dut_time, sum(generator.time for generator in
+                                  dut_profiles))
+
+                dut_block_path = dut_profiles[0].path.rsplit('/', 1)[0]
+                self.assertEqual(
+                    report.blocks[dut_block_path], report.groups['dut'])
+
+                self.assertIn('dut', report.summary())
+
+            # A run without profiling clears the report
+            test_obj.cosimulate(sim_cycles)
+            self.assertIsNone(test_obj.profile_report)
+
+    def test_reuse_elaboration_with_new_axi_stream_data(self):
+        '''With ``reuse_elaboration`` set, it should be possible to add new
+        data to an AXI stream master BFM between runs.
+        '''
+        stream = (0, 0)
+
+        args = {'axi_interface_in': AxiStreamInterface(),
+                'axi_interface_out': AxiStreamInterface(),
+                'clock': self.clock}
+
+        arg_types = {'axi_interface_in': 'axi_stream_in',
+                     'axi_interface_out': 'axi_stream_out',
+                     'clock': 'clock'}
+
+        @block
+        def axi_identity(clock, axi_interface_in, axi_interface_out):
+
+            @always_comb
+            def assign_signals():
+                axi_interface_in.TREADY.next = axi_interface_out.TREADY
+                axi_interface_out.TVALID.next = axi_interface_in.TVALID
+                axi_interface_out.TLAST.next = axi_interface_in.TLAST
+                axi_interface_out.TDATA.next = axi_interface_in.TDATA
+
+            return assign_signals
+
+        master_bfm = AxiStreamMasterBFM()
+        custom_sources = [
+            (master_bfm.model, (self.clock, args['axi_interface_in']), {})]
+
+        test_obj = SynchronousTest(
+            axi_identity, axi_identity, args, arg_types,
+            custom_sources=custom_sources, reuse_elaboration=True)
+
+        for n in range(3):
+            packet_list = {stream: deque([
+                deque([random.randrange(0, 2**16) for m in range(5)])
+                for n in range(random.randrange(1, 10))])}
+
+            master_bfm.add_data(packet_list[stream])
+
+            dut_results, ref_results = test_obj.cosimulate(100)
+
+            self.assertEqual(
+                ref_results['axi_interface_out']['packets'], packet_list)
+            self.assertEqual(
+                dut_results['axi_interface_out']['packets'], packet_list)
+
+
+class TestSignalColumn(TestCase):
+    '''There should be a growable NumPy backed store for the values recorded
+    on a signal.
+    '''
+
+    def test_append_and_grow(self):
+        '''It should be possible to append beyond the initial capacity, with
+        the backing array growing as necessary.
+        '''
+        from kea.testing.myhdl.cosimulation import SignalColumn
+
+        column = SignalColumn(np.uint64, capacity=4)
+        test_values = [random.randrange(0, 2**64) for n in range(37)]
+
+        for each in test_values:
+            column.append(intbv(each)[64:])
+
+        self.assertEqual(len(column), len(test_values))
+        self.assertTrue(column.capacity >= len(test_values))
+        self.assertEqual(column.array.dtype, np.dtype(np.uint64))
+        self.assertEqual(column.array.tolist(), test_values)
+
+    def test_object_dtype(self):
+        '''A copy of each value should be stored in an object column, so
+        that changing a value in place after it is appended does not change
+        what was recorded.
+        '''
+        from kea.testing.myhdl.cosimulation import SignalColumn
+
+        column = SignalColumn(object)
+        test_values = [intbv(random.randrange(0, 2**100))[100:]
+                       for n in range(10)]
+        expected_values = [int(each) for each in test_values]
+
+        for each in test_values:
+            column.append(each)
+            each[:] = 0
+
+        self.assertEqual(column.array.tolist(), expected_values)
+
+
+class TestSimulationOutputGroup(TestCase):
+
+    def test_equality(self):
+        '''The SimulationOutputGroup should be able to test for equality
+        against other instances of SimulationOutputGroup.
+
+        If the item being compared to is not another instance of
+        SimulationOutputGroup then the the equality test should be False.
+        '''
+        from kea.testing.myhdl.cosimulation import SimulationOutputGroup
+
+        test_dict = {'a': [1, 2, 3], 'b': [4, 5, 6]}
+        test_dict2 = {'a': [1, 2, 3], 'b': [4, 5, 6]}
+        a = SimulationOutputGroup(test_dict)
+        b = SimulationOutputGroup(test_dict2)
+
+        self.assertTrue(a == b)
+        self.assertTrue(test_dict != b)
+
+        test_dict = {'a': [1, 2, 4], 'b': [4, 5, 6]}
+        a = SimulationOutputGroup(test_dict)
+
+        self.assertTrue(a != b)
+
+    def test_indexing(self):
+        '''Indexing the SimulationOutputGroup should return the nested
+        structure of dicts and lists given by the keys, with the values at
+        that index. Missing list entries should be None.
+        '''
+        from kea.testing.myhdl.cosimulation import SimulationOutputGroup
+
+        test_dict = {
+            ('a',): [1, 2, 3],
+            ('b', 'c'): [4, 5, 6],
+            ('b', 'd', 0): [7, 8, 9],
+            ('b', 'd', 2): [10, 11, 12]}
+
+        group = SimulationOutputGroup(test_dict)
+
+        self.assertEqual(len(group), 3)
+        self.assertEqual(
+            group[1], {'a': 2, 'b': {'c': 5, 'd': [8, None, 11]}})
+        self.assertEqual(group[-1], group[2])
+        self.assertEqual(group[::2], [group[0], group[2]])
+
+        with self.assertRaises(TypeError):
+            group['a']
+
+    def test_to_columns(self):
+        '''The to_columns method should return the recorded values of each
+        signal in the group, without copying them, keyed by the name of the
+        signal relative to the group.
+        '''
+        from kea.testing.myhdl.cosimulation import SimulationOutputGroup
+
+        test_dict = {
+            ('a',): [1, 2, 3],
+            ('b', 'c'): [4, 5, 6],
+            ('b', 'd', 1): [7, 8, 9]}
+
+        columns = SimulationOutputGroup(test_dict).to_columns()
+
+        self.assertEqual(set(columns), {'a', 'b.c', 'b.d[1]'})
+        self.assertIs(columns['a'], test_dict[('a',)])
+        self.assertIs(columns['b.c'], test_dict[('b', 'c')])
+        self.assertIs(columns['b.d[1]'], test_dict[('b', 'd', 1)])
+
+    def test_to_records(self):
+        '''The to_records method should return a read-only NumPy
+        structured array with one record per index and one field per
+        signal. The field dtypes should depend on the recorded values.
+        '''
+        from kea.testing.myhdl.cosimulation import SimulationOutputGroup
+
+        test_dict = {
+            ('a',): [True, False, True],
+            ('b', 'c'): [intbv(-4, min=-8, max=8), 5, 6],
+            ('b', 'd', 0): [intbv(2**63, min=0, max=2**64), 8, 9],
+            ('e',): [2**70, 0, 1]}
+
+        group = SimulationOutputGroup(test_dict)
+        records = group.to_records()
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records.dtype['a'], np.dtype(bool))
+        self.assertEqual(records.dtype['b.c'], np.dtype(np.int64))
+        self.assertEqual(records.dtype['b.d[0]'], np.dtype(np.uint64))
+        self.assertEqual(records.dtype['e'], np.dtype(object))
+
+        self.assertEqual(records['a'].tolist(), [True, False, True])
+        self.assertEqual(records['b.c'].tolist(), [-4, 5, 6])
+        self.assertEqual(records['b.d[0]'].tolist(), [2**63, 8, 9])
+        self.assertEqual(records['e'].tolist(), [2**70, 0, 1])
+
+        self.assertFalse(records.flags.writeable)
+        self.assertIs(group.to_records(), records)
+
+class TestSimulationOutputs(TestCase):
+
+    def test_equality(self):
+        '''The SimulationOutputs should be able to test for equality
+        against other instances of SimulationOutputs.
+
+        The equality check should be also return True on instances of dict
+        that contain the same data.
+        '''
+
+        from kea.testing.myhdl.cosimulation import SimulationOutputs
+
+        test_dict = {'a': [1, 2, 3], 'b': [4, 5, 6]}
+        test_dict2 = {'a': [1, 2, 3], 'b': [4, 5, 6]}
+        a = SimulationOutputs(test_dict)
+        b = SimulationOutputs(test_dict2)
+
+        self.assertTrue(a == b)
+        self.assertTrue(test_dict == b)
+
+        test_dict = {'a': [1, 2, 4], 'b': [4, 5, 6]}
+        a = SimulationOutputs(test_dict)
+
+        self.assertTrue(a != b)
+
+    def test_copy(self):
+        '''The copy method should return a new SimulationOutputs that can
+        be modified without changing the original, but which shares the
+        recorded values with it.
+        '''
+
+        from kea.testing.myhdl.cosimulation import SimulationOutputs
+
+        a = SimulationOutputs({'a': [1, 2, 3], 'b.c': [4, 5, 6]})
+        b = a.copy()
+
+        self.assertEqual(a, b)
+        self.assertIs(a['a'], b['a'])
+        self.assertIs(a['b.c'], b['b.c'])
+
+        b['a'] = [7, 8, 9]
+        del b['b.c']
+
+        self.assertEqual(a['a'], [1, 2, 3])
+        self.assertEqual(a['b.c'], [4, 5, 6])
+        self.assertEqual(set(b), {'a'})
+
+    def test_groups_cached(self):
+        '''Accessing a group should return the same SimulationOutputGroup
+        each time, until the outputs are modified.
+        '''
+
+        from kea.testing.myhdl.cosimulation import SimulationOutputs
+
+        outputs = SimulationOutputs({'a.b': [1, 2, 3], 'a.c': [4, 5, 6]})
+
+        group = outputs['a']
+        self.assertIs(outputs['a'], group)
+        self.assertEqual(group[0], {'b': 1, 'c': 4})
+
+        outputs['a.d'] = [7, 8, 9]
+
+        self.assertIsNot(outputs['a'], group)
+        self.assertEqual(outputs['a'][0], {'b': 1, 'c': 4, 'd': 7})
 
 
 class TestCosimulationFunction(CosimulationTestMixin, TestCase):
@@ -15,6 +15,8 @@ from math import log
 import warnings
 import os
 
+import numpy as np
+
 
 class TestSignalCopy(TestCase):
     '''There should be a function that returns a copy of its argument,
@@ -1058,6 +1060,165 @@ class TestRandomSource(TestCase):
                                reset_signal, seed)
 
 
+class TestBatchedRandomSource(TestCase):
+    '''If ``batch_size`` is passed to the random source factory, the random
+    values should be drawn in batches from a seeded NumPy generator.
+    '''
+    def setUp(self):
+        self.clock = Signal(bool(1))
+        self.clock_period = 10
+        self.reset = ResetSignal(intbv(0), active=1, isasync=False)
+
+    def tearDown(self):
+        random.seed(None)
+
+    def run_source(self, signals, cycles, seed, batch_size):
+        '''Runs a batched random source on ``signals`` for ``cycles``
+        cycles and returns the values recorded on each signal.
+        '''
+        recorded = [[] for each in signals]
+
+        @always_seq(self.clock.posedge, self.reset)
+        def recorder():
+            for each_signal, each_record in zip(signals, recorded):
+                each_record.append(copy.copy(each_signal.val))
+
+        if len(signals) == 1:
+            source_signal = signals[0]
+        else:
+            source_signal = list(signals)
+
+        dut = random_source(source_signal, self.clock, self.reset, seed,
+                            batch_size=batch_size)
+        clockgen = clock_source(self.clock, self.clock_period)
+
+        sim = Simulation(clockgen, dut, recorder)
+        sim.run(cycles * self.clock_period, quiet=1)
+        sim.quit()
+
+        return recorded
+
+    def test_output_from_numpy_generator(self):
+        '''The output should be the values drawn in batches from a NumPy
+        generator seeded with ``seed``.
+        '''
+        min_val = -1000
+        max_val = 1024
+        batch_size = 16
+        cycles = 100
+
+        seed = randrange(0, 0x5EEDF00D)
+
+        rng = np.random.default_rng(seed)
+        expected_output = []
+        while len(expected_output) < cycles:
+            expected_output += rng.integers(
+                min_val, max_val, size=batch_size, dtype=np.int64).tolist()
+
+        test_signal = Signal(intbv(0, min=min_val, max=max_val))
+        recorded, = self.run_source([test_signal], cycles, seed, batch_size)
+
+        # The first value is not defined yet.
+        self.assertEqual(recorded[1:], expected_output[:len(recorded) - 1])
+
+    def test_output_repeatable(self):
+        '''The output should depend only on the seed, not on the batch size
+        or on the state of the ``random`` module, which should not be
+        changed.
+        '''
+        seed = randrange(0, 0x5EEDF00D)
+        cycles = 50
+
+        random_state = random.getstate()
+
+        output_a = self.run_source(
+            [Signal(intbv(0)[20:])], cycles, seed, batch_size=7)
+
+        random.random()
+
+        output_b = self.run_source(
+            [Signal(intbv(0)[20:])], cycles, seed, batch_size=1000)
+
+        self.assertEqual(output_a, output_b)
+
+        random.setstate(random_state)
+        output_c = self.run_source(
+            [Signal(intbv(0)[20:])], cycles, seed, batch_size=7)
+        self.assertEqual(random.getstate(), random_state)
+        self.assertEqual(output_a, output_c)
+
+    def test_signal_types(self):
+        '''It should be possible to generate bool, enum and intbv signals,
+        including intbv signals wider than 64 bits.
+        '''
+        enum_vals = enum('a', 'b', 'c', 'd', 'e')
+
+        signals = [
+            Signal(bool(0)),
+            Signal(enum_vals.a),
+            Signal(intbv(0)[64:]),
+            Signal(intbv(0, min=-2**63, max=2**63)),
+            Signal(intbv(0)[100:]),
+            Signal(intbv(0, min=-2**80 - 3, max=2**70 + 5))]
+
+        cycles = 200
+        recorded = self.run_source(
+            signals, cycles, randrange(0, 0x5EEDF00D), batch_size=32)
+
+        for each_signal, each_record in zip(signals, recorded):
+            # The first value is not defined yet.
+            values = each_record[1:]
+            self.assertTrue(len(values) > cycles // 2)
+
+            if isinstance(each_signal.val, intbv):
+                for value in values:
+                    self.assertTrue(each_signal.min <= value < each_signal.max)
+
+            # The values should actually be random
+            self.assertTrue(len(set(int(value) if isinstance(value, intbv)
+                                    else value for value in values)) > 1)
+
+        self.assertTrue(all(isinstance(value, bool) for value in recorded[0]))
+        self.assertTrue(
+            all(value in [getattr(enum_vals, name) for name in 'abcde']
+                for value in recorded[1]))
+
+    def test_independent_signal_streams(self):
+        '''Each signal in a list or interface should be driven by its own
+        stream of values.
+        '''
+        signals = [Signal(intbv(0)[32:]), Signal(intbv(0)[32:])]
+
+        recorded = self.run_source(
+            signals, 50, randrange(0, 0x5EEDF00D), batch_size=8)
+
+        self.assertNotEqual(recorded[0], recorded[1])
+
+    def test_invalid_batch_size(self):
+        '''A batch size less than 1 should raise a ValueError.
+        '''
+        test_signal = Signal(intbv(0, min=-100, max=100))
+        self.assertRaisesRegex(ValueError, 'batch_size',
+                               random_source, test_signal, self.clock,
+                               self.reset, batch_size=0)
+
+    def test_unsupported_signal(self):
+        '''Unsupported signals should fail
+        '''
+        for test_signal in (Signal('a string'), Signal(intbv(0))):
+            self.assertRaisesRegex(ValueError, 'Invalid signal type',
+                                   random_source, test_signal, self.clock,
+                                   self.reset, batch_size=10)
+
+    def test_invalid_sensitivity(self):
+        '''An invalid sensitivity should raise a ValueError.
+        '''
+        test_signal = Signal(intbv(0, min=-100, max=100))
+        self.assertRaisesRegex(ValueError, 'Invalid edge sensitivity',
+                               random_source, test_signal, self.clock,
+                               self.reset, edge_sensitivity='foobar',
+                               batch_size=10)
+
 class TestHandlerSink(TestCase):
     '''There should be a block that calls a signal handler on every cycle
     '''
@@ -1214,6 +1375,157 @@ class TestHandlerSink(TestCase):
             test_signal, self.clock, self.handler, edge_sensitivity='INVALID')
 
 
+class TestBulkHandlerSink(TestCase):
+    '''There should be a block that calls a handler with the values on
+    several signals on every cycle, sampling them all in a single wakeup.
+    '''
+    def setUp(self):
+        self.clock = Signal(bool(1))
+        self.reset = ResetSignal(intbv(0), active=1, isasync=False)
+        self.clock_period = 10
+
+        self.recorded_output = []
+        self.handler = lambda vals: self.recorded_output.append(vals)
+
+    def tearDown(self):
+        random.seed(None)
+
+    def test_correct_handling(self):
+        '''It should pass the values on all the signals to the handler in a
+        single call, in the same order as the signals were passed.
+        '''
+        enum_names = ('a', 'b', 'c', 'd', 'e')
+        enum_vals = enum(*enum_names)
+
+        test_signals = [
+            Signal(intbv(0, min=-999, max=999)),
+            Signal(bool(0)),
+            Signal(intbv(0)[100:]),
+            Signal(enum_vals.a)]
+
+        test_output = []
+
+        @block
+        def top():
+            @always_seq(self.clock.posedge, reset=self.reset)
+            def test_recorder():
+                test_output.append(
+                    [copy.copy(each.val) for each in test_signals])
+
+            sources = [random_source(each, self.clock, self.reset)
+                       for each in test_signals]
+            sink = bulk_handler_sink(test_signals, self.clock, self.handler)
+            clockgen = clock_source(self.clock, self.clock_period)
+
+            return clockgen, sources, sink, test_recorder
+
+        top_level_block = top()
+        top_level_block.run_sim(duration=30*self.clock_period, quiet=1)
+        top_level_block.quit_sim()
+
+        self.assertEqual(test_output, self.recorded_output)
+
+    def test_values_copied(self):
+        '''By default, the values passed to the handler should be copies, so
+        they do not change as the simulation continues. If ``copy_values`` is
+        ``False``, the values on the signals should be passed directly.
+        '''
+        test_signal = Signal(intbv(0, min=-999, max=999))
+
+        copied_output = []
+        uncopied_output = []
+
+        @block
+        def top():
+            source = random_source(test_signal, self.clock, self.reset)
+            copied_sink = bulk_handler_sink(
+                [test_signal], self.clock,
+                lambda vals: copied_output.append(vals[0]))
+            uncopied_sink = bulk_handler_sink(
+                [test_signal], self.clock,
+                lambda vals: uncopied_output.append(vals[0]),
+                copy_values=False)
+            clockgen = clock_source(self.clock, self.clock_period)
+
+            return clockgen, source, copied_sink, uncopied_sink
+
+        top_level_block = top()
+        top_level_block.run_sim(duration=30*self.clock_period, quiet=1)
+        top_level_block.quit_sim()
+
+        self.assertTrue(len(set(int(each) for each in copied_output)) > 1)
+        self.assertEqual(len(set(id(each) for each in copied_output)),
+                         len(copied_output))
+
+        # Uncopied, the handler is always passed the same (updated in place)
+        # value object.
+        for each in uncopied_output:
+            self.assertIs(each, uncopied_output[0])
+
+    def test_edge_sensitivity(self):
+        '''It should be possible to set a clock edge sensitivity.
+        '''
+
+        # Check we have what we think we have
+        assert self.clock.val == 1 # clock starts at 1
+        assert self.clock_period % 2 == 0 # even period
+
+        test_signals = [Signal(intbv(0, min=-999, max=999)),
+                        Signal(intbv(0, min=-999, max=999))]
+        neg_edge_output = []
+        pos_edge_output = []
+
+        neg_edge_handler = lambda vals: neg_edge_output.append(vals)
+        pos_edge_handler = lambda vals: pos_edge_output.append(vals)
+
+        @block
+        def top():
+            # We require a negative edge source
+            sources = [random_source(each, self.clock, self.reset,
+                                     edge_sensitivity='negedge')
+                       for each in test_signals]
+
+            neg_edge_sink = bulk_handler_sink(
+                test_signals, self.clock, neg_edge_handler,
+                edge_sensitivity='negedge')
+            pos_edge_sink = bulk_handler_sink(
+                test_signals, self.clock, pos_edge_handler,
+                edge_sensitivity='posedge')
+            clockgen = clock_source(self.clock, self.clock_period)
+
+            return clockgen, sources, pos_edge_sink, neg_edge_sink
+
+        top_level_block = top()
+        top_level_block.run_sim(duration=30*self.clock_period, quiet=1)
+        top_level_block.quit_sim()
+
+        assert len(neg_edge_output) == len(pos_edge_output)
+        # Now we need to offset the results of the positive edge
+        # with respect to the negative edge. This is dictated by the starting
+        # conditions. This can be confirmed with a timing diagram.
+        self.assertEqual(neg_edge_output[1:], pos_edge_output[:-1])
+
+    def test_invalid_edge_arg_raises(self):
+        '''An invalid edge sensitivity should raise a ValueError.
+        '''
+        test_signal = Signal(intbv(0, min=-999, max=999))
+
+        self.assertRaisesRegex(
+            ValueError, 'Invalid edge sensitivity', bulk_handler_sink,
+            [test_signal], self.clock, self.handler,
+            edge_sensitivity='INVALID')
+
+    def test_non_signal_raises(self):
+        '''If any of the signals is not a Signal, a ValueError should be
+        raised.
+        '''
+        test_signal = Signal(intbv(0, min=-999, max=999))
+
+        self.assertRaisesRegex(
+            ValueError, 'should be instances of Signal', bulk_handler_sink,
+            [test_signal, 10], self.clock, self.handler)
+
+
 class TestRecorderSink(TestCase):
     '''There should be a block that records a signal. It should be
     constructed with a signal and a clock, and it should record every value
@@ -1806,3 +2118,304 @@ class TestLutSignalDriver(TestCase):
         finally:
             shutil.rmtree(tmp_dir)
 
+
+class TestFileSignalDriver(TestCase):
+    '''There should be a version of the lut signal driver whose converted
+    code reads the look-up table from a file, so the size of the converted
+    code does not depend on the length of the look-up table.
+    '''
+
+    def setUp(self):
+        self.clock = Signal(bool(1))
+        self.clock_period = 10
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'stimulus')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def driven_values(self, test_signal, lut, n_values, **kwargs):
+        '''Returns the first ``n_values`` values driven onto ``test_signal``
+        by a file_signal_driver, sampled on each positive clock edge.
+        '''
+        driven = []
+
+        @always(self.clock.posedge)
+        def output_check():
+            if len(driven) >= n_values:
+                raise StopSimulation
+
+            driven.append(copy.copy(test_signal.val))
+
+        dut = file_signal_driver(
+            test_signal, lut, self.clock, self.filename, **kwargs)
+        clockgen = clock_source(self.clock, self.clock_period)
+
+        sim = Simulation(clockgen, dut, output_check)
+        sim.run(quiet=1)
+
+        return driven
+
+    def test_same_as_lut_signal_driver(self):
+        '''The simulated outputs should be the same as those of the lut
+        signal driver, including wrapping around at the end of the look-up
+        table.
+        '''
+        test_signal = Signal(intbv(0, min=-1000, max=1024))
+
+        lut = [randrange(-1000, 1024) for each in range(100)]
+
+        self.assertEqual(
+            self.driven_values(test_signal, lut, 250),
+            (lut * 3)[:250])
+
+    def test_written_file(self):
+        '''The look-up table should be written to the file as hex, one value
+        per line, with negative values written in two's complement.
+        '''
+        for test_signal, lut, expected in (
+            (Signal(intbv(0, min=-8, max=8)), [-1, 7, -8, 0],
+             'f\n7\n8\n0\n'),
+            (Signal(intbv(0)[10:]), [0, 1023, 16],
+             '000\n3ff\n010\n'),
+            (Signal(bool(0)), [True, False, 1],
+             '1\n0\n1\n')):
+
+            file_signal_driver(test_signal, lut, self.clock, self.filename)
+
+            with open(self.filename) as f:
+                self.assertEqual(f.read(), expected)
+
+    def test_zero_length_luts_should_raise(self):
+        '''With a zero length lut, a ValueError should be raised.
+        '''
+        test_signal = Signal(intbv(0, min=-1000, max=1024))
+
+        self.assertRaisesRegex(
+            ValueError, 'Invalid zero length lut',
+            file_signal_driver, test_signal, (), self.clock, self.filename)
+
+    def test_invalid_edge_arg_raises(self):
+        '''An invalid edge sensitivity should raise a ValueError.
+        '''
+        test_signal = Signal(intbv(0, min=-1000, max=1024))
+
+        self.assertRaisesRegex(
+            ValueError, 'Invalid edge sensitivity',
+            file_signal_driver, test_signal, (1, 2, 3), self.clock,
+            self.filename, edge_sensitivity='INVALID')
+
+    def test_conversion(self):
+        '''The converted code should read the look-up table from the file,
+        so should not depend on the values or the length of the look-up
+        table. The name annotation should be written as with the lut signal
+        driver.
+        '''
+        for hdl, extension, annotation, file_read in (
+            ('VHDL', '.vhd', '-- <name_annotation> sig my_signal_name',
+             'hread('),
+            ('Verilog', '.v', '// <name_annotation> sig my_signal_name',
+             '$readmemh(')):
+
+            converted = []
+            for lut_length in (100, 10000):
+                test_signal = Signal(intbv(0, min=-1000, max=1024))
+                lut = [randrange(-1000, 1024) for each in range(lut_length)]
+
+                test_block = file_signal_driver(
+                    test_signal, lut, self.clock, self.filename,
+                    signal_name='my_signal_name')
+                test_block.convert(hdl=hdl, path=self.tmp_dir)
+
+                with open(os.path.join(
+                    self.tmp_dir, 'file_signal_driver' + extension)) as f:
+                    code = f.read()
+
+                self.assertIn(annotation, code)
+                self.assertIn(file_read, code)
+                self.assertIn(self.filename, code)
+
+                converted.append(code)
+
+            self.assertEqual(
+                len(converted[0].splitlines()),
+                len(converted[1].splitlines()))
+
+class TestFileRom(TestCase):
+    '''There should be a read only memory whose converted code loads its
+    values from a file.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'rom')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookup(self):
+        '''data should be set to the value at address. When the address is
+        beyond the end of the values, data should be unchanged.
+        '''
+        values = [3, 100, -5, 42]
+
+        address = Signal(intbv(0, min=0, max=8))
+        data = Signal(intbv(0, min=-128, max=128))
+
+        read_values = []
+
+        @instance
+        def check():
+            for n in range(6):
+                address.next = n
+                yield delay(1)
+                read_values.append(int(data.val))
+
+        dut = file_rom(address, data, values, self.filename)
+
+        sim = Simulation(dut, check)
+        sim.run(quiet=1)
+
+        self.assertEqual(read_values, values + [42, 42])
+
+        with open(self.filename) as f:
+            self.assertEqual(f.read(), '03\n64\nfb\n2a\n')
+
+    def test_zero_length_values_should_raise(self):
+        '''With no values, a ValueError should be raised.
+        '''
+        self.assertRaisesRegex(
+            ValueError, 'Invalid zero length values', file_rom,
+            Signal(intbv(0)[4:]), Signal(intbv(0)[4:]), [], self.filename)
+
+    def test_conversion(self):
+        '''The converted code should load the values from the file.
+        '''
+        for hdl, extension, file_read in (
+            ('VHDL', '.vhd', 'hread('), ('Verilog', '.v', '$readmemh(')):
+
+            address = Signal(intbv(0, min=0, max=8))
+            data = Signal(intbv(0, min=-128, max=128))
+
+            test_block = file_rom(address, data, [1, 2, 3], self.filename)
+            test_block.convert(hdl=hdl, path=self.tmp_dir)
+
+            with open(os.path.join(
+                self.tmp_dir, 'file_rom' + extension)) as f:
+                code = f.read()
+
+            self.assertIn(file_read, code)
+            self.assertIn(self.filename, code)
+
+class TestAxiMasterFilePlayback(TestCase):
+    '''There should be a version of axi_master_playback whose converted
+    code reads the signal record from files.
+    '''
+
+    def setUp(self):
+        self.clock = Signal(bool(1))
+        self.clock_period = 10
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename_prefix = os.path.join(self.tmp_dir, 'axi_stream_in_')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def signal_record(self, n_transactions):
+        signal_record = {'TDATA': [], 'TLAST': [], 'TID': [], 'TDEST': []}
+
+        for n in range(n_transactions):
+            if random.random() < 0.3:
+                signal_record['TDATA'].append(None)
+            else:
+                signal_record['TDATA'].append(randrange(2**32))
+
+            signal_record['TLAST'].append(randrange(2))
+            signal_record['TID'].append(randrange(4))
+            signal_record['TDEST'].append(randrange(8))
+
+        return signal_record
+
+    def played_back(self, playback, signal_record, TREADY_lut, *args):
+        '''Returns the state of the interface on each positive clock edge
+        when the signal_record is played back by ``playback``, with TREADY
+        driven from ``TREADY_lut``.
+        '''
+        from kea.hdl.axi import AxiStreamInterface
+
+        axi_interface = AxiStreamInterface(4, TID_width=2, TDEST_width=3)
+
+        recorded = []
+
+        @always(self.clock.posedge)
+        def recorder():
+            if len(recorded) >= len(TREADY_lut):
+                raise StopSimulation
+
+            recorded.append(
+                (bool(axi_interface.TVALID), bool(axi_interface.TREADY),
+                 int(axi_interface.TLAST), int(axi_interface.TID),
+                 int(axi_interface.TDEST),
+                 int(axi_interface.TDATA) if axi_interface.TVALID else None))
+
+        dut = playback(
+            self.clock, axi_interface, copy.deepcopy(signal_record), *args)
+        TREADY_driver = lut_signal_driver(
+            axi_interface.TREADY, TREADY_lut, self.clock)
+        clockgen = clock_source(self.clock, self.clock_period)
+
+        sim = Simulation(clockgen, dut, TREADY_driver, recorder)
+        sim.run(quiet=1)
+
+        return recorded
+
+    def test_same_as_axi_master_playback(self):
+        '''The interface should be driven in the same way as by
+        axi_master_playback.
+        '''
+        from kea.hdl.axi import axi_master_playback
+
+        signal_record = self.signal_record(50)
+        TREADY_lut = [randrange(2) for n in range(200)]
+
+        expected = self.played_back(
+            axi_master_playback, signal_record, TREADY_lut)
+
+        self.assertEqual(
+            self.played_back(
+                axi_master_file_playback, signal_record, TREADY_lut,
+                self.filename_prefix),
+            expected)
+
+        for signal_name in ('TDATA', 'TVALID', 'TLAST', 'TID', 'TDEST'):
+            self.assertTrue(
+                os.path.exists(self.filename_prefix + signal_name))
+
+    def test_conversion(self):
+        '''The converted code should read the signal record from files, so
+        should not depend on the length of the signal record.
+        '''
+        from kea.hdl.axi import AxiStreamInterface
+
+        for hdl, extension in (('VHDL', '.vhd'), ('Verilog', '.v')):
+
+            converted = []
+            for n_transactions in (10, 1000):
+                axi_interface = AxiStreamInterface(
+                    4, TID_width=2, TDEST_width=3)
+
+                test_block = axi_master_file_playback(
+                    self.clock, axi_interface,
+                    self.signal_record(n_transactions), self.filename_prefix)
+                test_block.convert(hdl=hdl, path=self.tmp_dir)
+
+                with open(os.path.join(
+                    self.tmp_dir,
+                    'axi_master_file_playback' + extension)) as f:
+                    converted.append(f.read())
+
+            self.assertEqual(
+                len(converted[0].splitlines()),
+                len(converted[1].splitlines()))
@@ -0,0 +1,211 @@
+from kea.testing.myhdl.tests.base_hdl_test import TestCase
+
+from kea.testing.myhdl import (
+    myhdl_cosimulation_sweep, SeedSweepResult, myhdl_cosimulation)
+from kea.testing.myhdl.seed_sweep import _reset_myhdl_simulator_state
+
+from myhdl import Signal, ResetSignal, intbv, enum, block, always_seq
+
+import myhdl._simulator
+
+import random
+
+import numpy as np
+
+
+@block
+def _identity(test_input, test_output, reset, clock):
+
+    @always_seq(clock.posedge, reset=reset)
+    def identity():
+        test_output.next = test_input
+
+    return identity
+
+@block
+def _faulty_identity(test_input, test_output, reset, clock):
+
+    @always_seq(clock.posedge, reset=reset)
+    def faulty_identity():
+        # Sets the bottom bit, so fails unless every input is odd
+        test_output.next = test_input | 1
+
+    return faulty_identity
+
+def _setup(dut_factory=_identity):
+    args = {'test_input': Signal(intbv(0)[10:]),
+            'test_output': Signal(intbv(0)[10:]),
+            'reset': ResetSignal(bool(0), active=1, isasync=False),
+            'clock': Signal(bool(1))}
+
+    arg_types = {'test_input': 'random',
+                 'test_output': 'output',
+                 'reset': 'init_reset',
+                 'clock': 'clock'}
+
+    return {'dut_factory': dut_factory,
+            'ref_factory': _identity,
+            'args': args,
+            'arg_types': arg_types}
+
+_states = enum('A', 'B', 'C')
+
+@block
+def _state_setter(state, reset, clock):
+
+    @always_seq(clock.posedge, reset=reset)
+    def state_setter():
+        state.next = _states.B
+
+    return state_setter
+
+@block
+def _faulty_state_setter(state, reset, clock):
+
+    @always_seq(clock.posedge, reset=reset)
+    def faulty_state_setter():
+        state.next = _states.C
+
+    return faulty_state_setter
+
+def _faulty_enum_setup():
+    args = {'state': Signal(_states.A),
+            'reset': ResetSignal(bool(0), active=1, isasync=False),
+            'clock': Signal(bool(1))}
+
+    arg_types = {'state': 'output',
+                 'reset': 'init_reset',
+                 'clock': 'clock'}
+
+    return {'dut_factory': _faulty_state_setter,
+            'ref_factory': _state_setter,
+            'args': args,
+            'arg_types': arg_types}
+
+def _faulty_setup():
+    return _setup(dut_factory=_faulty_identity)
+
+def _broken_setup():
+    raise RuntimeError('Broken setup')
+
+def _failing_check(dut_outputs, ref_outputs):
+    return False
+
+def _asserting_check(dut_outputs, ref_outputs):
+    assert dut_outputs['test_output'][-1] < 0, 'Asserting check'
+
+
+class TestMyHDLCosimulationSweep(TestCase):
+    '''There should be a function that runs many differently seeded
+    cosimulations of the same test configuration in parallel.
+    '''
+
+    def test_passing_sweep(self):
+        '''If ``seeds`` is an integer, that number of runs should be made,
+        each with a different random state. A passing run should have no
+        outputs or error.
+        '''
+        results = myhdl_cosimulation_sweep(_setup, 3, 20, max_workers=2)
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(set(result.random_state for result in results)),
+                         3)
+
+        for result in results:
+            self.assertIsInstance(result, SeedSweepResult)
+            self.assertTrue(result.passed)
+            self.assertIsNone(result.outputs)
+            self.assertIsNone(result.error)
+
+    def test_failing_runs(self):
+        '''A failing run should return the dut and ref outputs and the
+        ``random_state`` with which it can be reproduced, in the order of
+        the seeds. Integer seeds should be used for both parts of the
+        random state.
+        '''
+        seeds = [(10, 11), 12]
+        results = myhdl_cosimulation_sweep(_faulty_setup, seeds, 20)
+
+        self.assertEqual([result.random_state for result in results],
+                         [(10, 11), (12, 12)])
+
+        for result in results:
+            self.assertFalse(result.passed)
+            self.assertIsNone(result.error)
+
+            dut_outputs, ref_outputs = result.outputs
+            self.assertNotEqual(dut_outputs, ref_outputs)
+
+            self.assertIn(
+                'random_state = (%d, %d)' % result.random_state,
+                result.reproduction_message)
+
+    def test_failing_runs_with_unpicklable_outputs(self):
+        '''A failing run whose outputs cannot be pickled, such as those of
+        an enum signal, should fail with an error and no outputs, rather
+        than failing the sweep.
+        '''
+        results = myhdl_cosimulation_sweep(_faulty_enum_setup, [1, 2], 10)
+
+        for result in results:
+            self.assertFalse(result.passed)
+            self.assertIsNone(result.outputs)
+            self.assertIn('could not be returned', result.error)
+
+    def test_reproducible(self):
+        '''The outputs of a run should be reproducible from its random
+        state, the same way as ``KeaTestCase`` reproduces a test.
+        '''
+        result, = myhdl_cosimulation_sweep(
+            _faulty_setup, [(3, 4)], 20, max_workers=1)
+
+        np.random.seed(3)
+        random.seed(4)
+
+        dut_outputs, ref_outputs = myhdl_cosimulation(20, **_faulty_setup())
+
+        self.assertEqual(result.outputs[0], dut_outputs)
+        self.assertEqual(result.outputs[1], ref_outputs)
+
+    def test_check(self):
+        '''If ``check`` is passed, a run should fail if it returns ``False``
+        or raises an ``AssertionError``.
+        '''
+        result, = myhdl_cosimulation_sweep(
+            _setup, [1], 10, check=_failing_check)
+
+        self.assertFalse(result.passed)
+        self.assertIsNotNone(result.outputs)
+
+        result, = myhdl_cosimulation_sweep(
+            _setup, [1], 10, check=_asserting_check)
+
+        self.assertFalse(result.passed)
+        self.assertIsNotNone(result.outputs)
+        self.assertIn('Asserting check', result.error)
+
+    def test_errors(self):
+        '''A run that raises an error should fail with the traceback of the
+        error.
+        '''
+        result, = myhdl_cosimulation_sweep(_broken_setup, [1], 10)
+
+        self.assertFalse(result.passed)
+        self.assertIsNone(result.outputs)
+        self.assertIn('RuntimeError: Broken setup', result.error)
+
+    def test_reset_simulator_state(self):
+        '''Each run should start from the same simulator state as a new
+        test, including the cosimulation flag of the simulator.
+        '''
+        myhdl._simulator._time = 10
+        myhdl._simulator._cosim = 1
+        myhdl._simulator._tracing = 1
+
+        _reset_myhdl_simulator_state()
+
+        self.assertEqual(myhdl._simulator._time, 0)
+        self.assertEqual(myhdl._simulator._cosim, 0)
+        self.assertEqual(myhdl._simulator._tracing, 0)
+        self.assertIsNone(myhdl._simulator._tf)
+        self.assertEqual(myhdl._simulator._signals, [])
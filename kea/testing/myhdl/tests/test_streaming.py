@@ -0,0 +1,256 @@
+from kea.testing.myhdl.tests.base_hdl_test import TestCase
+
+from kea.testing.myhdl.streaming import (
+    SignalChunks, SignalSpool, AxiStreamPacketChunks, AxiStreamPacketSpool)
+
+from kea.hdl.axi import AxiStreamSlaveBFM
+
+from myhdl import intbv, enum
+
+import pickle
+import random
+import tempfile
+import shutil
+import os
+
+import numpy as np
+
+from collections import deque
+
+
+class StreamingTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+
+class TestSignalSpool(StreamingTestCase):
+    '''There should be a bounded-memory store of recorded signal values that
+    writes the values out in chunks.
+    '''
+
+    def test_chunks_written_to_directory(self):
+        '''Each time ``chunk_length`` values have been appended, they should
+        be written to a ``.npy`` file in ``directory``. The remaining values
+        should be written on ``close``, which should return a SignalChunks
+        object of all the values.
+        '''
+        test_values = [random.randrange(0, 2**20) for n in range(23)]
+
+        spool = SignalSpool('a.b', np.uint64, 5, directory=self.tmp_dir)
+
+        for n, value in enumerate(test_values):
+            spool.append(intbv(value)[20:])
+            self.assertEqual(len(spool), n + 1)
+
+        self.assertEqual(
+            len(os.listdir(self.tmp_dir)), len(test_values) // 5)
+
+        signal_chunks = spool.close()
+
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir)),
+            ['a.b.{:06d}.npy'.format(n) for n in range(5)])
+
+        self.assertIsInstance(signal_chunks, SignalChunks)
+        self.assertEqual(signal_chunks.to_array().tolist(), test_values)
+
+    def test_handler(self):
+        '''If a handler is passed, it should be called with the name and a
+        copy of each chunk.
+        '''
+        test_values = [random.randrange(-100, 100) for n in range(23)]
+        handled_chunks = []
+
+        def handler(name, values):
+            handled_chunks.append((name, values))
+
+        spool = SignalSpool('a', np.int64, 10, handler=handler)
+
+        for value in test_values:
+            spool.append(value)
+
+        self.assertIsNone(spool.close())
+
+        self.assertEqual([name for name, _ in handled_chunks], ['a'] * 3)
+        self.assertEqual([len(values) for _, values in handled_chunks],
+                         [10, 10, 3])
+        self.assertEqual(
+            np.concatenate([values for _, values in handled_chunks]).tolist(),
+            test_values)
+
+    def test_invalid_chunk_length(self):
+        '''A chunk length less than 1 should raise a ValueError.
+        '''
+        self.assertRaisesRegex(
+            ValueError, 'chunk_length', SignalSpool, 'a', np.int64, 0)
+
+
+class TestSignalChunks(StreamingTestCase):
+    '''There should be a read-only sequence that lazily reads the chunks
+    written by a SignalSpool.
+    '''
+
+    def create_chunks(self, test_values, chunk_length, dtype):
+        spool = SignalSpool('a', dtype, chunk_length, directory=self.tmp_dir)
+
+        for value in test_values:
+            spool.append(value)
+
+        return spool.close()
+
+    def test_indexing(self):
+        '''It should be possible to index the values with an integer or a
+        slice across any number of chunks.
+        '''
+        test_values = [random.randrange(0, 2**64) for n in range(47)]
+        signal_chunks = self.create_chunks(test_values, 6, np.uint64)
+
+        self.assertEqual(len(signal_chunks), len(test_values))
+
+        for n in (0, 5, 6, 46, -1, -47):
+            self.assertEqual(signal_chunks[n], test_values[n])
+
+        for each_slice in (slice(None), slice(3, 20), slice(5, 6),
+                           slice(2, 40, 7), slice(None, None, -3),
+                           slice(40, 2, -5), slice(20, 3)):
+            self.assertEqual(signal_chunks[each_slice].tolist(),
+                             test_values[each_slice])
+
+        self.assertRaises(IndexError, lambda: signal_chunks[47])
+        self.assertRaises(TypeError, lambda: signal_chunks['a'])
+
+        self.assertEqual(list(signal_chunks), test_values)
+        self.assertEqual(np.asarray(signal_chunks).tolist(), test_values)
+
+    def test_memory_mapped(self):
+        '''The chunks of integer values should be memory mapped.
+        '''
+        signal_chunks = self.create_chunks(list(range(20)), 8, np.int64)
+
+        for chunk in signal_chunks.chunks():
+            self.assertIsInstance(chunk, np.memmap)
+            self.assertFalse(chunk.flags.writeable)
+
+    def test_object_values(self):
+        '''Values that do not fit in 64 bits should be recorded as python
+        objects.
+        '''
+        test_values = [random.randrange(0, 2**100) for n in range(20)]
+        signal_chunks = self.create_chunks(test_values, 8, object)
+
+        self.assertEqual(signal_chunks.dtype, np.dtype(object))
+        self.assertEqual(signal_chunks.to_array().tolist(), test_values)
+        self.assertEqual(signal_chunks[13], test_values[13])
+
+    def test_enum_values(self):
+        '''The values of an enum signal should be written as the indices of
+        the items, and read back as the items of the enum. Once pickled and
+        unpickled, the items should be those of an equivalent enum.
+        '''
+        states = enum('A', 'B', 'C', encoding='one_hot')
+        test_values = [
+            random.choice((states.A, states.B, states.C)) for n in range(20)]
+
+        signal_chunks = self.create_chunks(test_values, 8, object)
+
+        for chunk_path in signal_chunks.chunk_paths:
+            self.assertEqual(np.load(chunk_path).dtype, np.dtype(np.int64))
+
+        self.assertEqual(signal_chunks.dtype, np.dtype(object))
+        self.assertTrue(all(
+            value is test_value for value, test_value in
+            zip(signal_chunks, test_values)))
+        self.assertTrue(signal_chunks == test_values)
+
+        unpickled_chunks = pickle.loads(pickle.dumps(signal_chunks))
+
+        self.assertEqual(
+            [str(value) for value in unpickled_chunks],
+            [str(value) for value in test_values])
+        self.assertEqual(
+            [int(value) for value in unpickled_chunks],
+            [int(value) for value in test_values])
+
+    def test_equality(self):
+        '''SignalChunks should compare equal to another sequence or array of
+        the same values.
+        '''
+        test_values = [random.randrange(-2**40, 2**40) for n in range(30)]
+        signal_chunks = self.create_chunks(test_values, 7, np.int64)
+
+        self.assertTrue(signal_chunks == test_values)
+        self.assertTrue(signal_chunks == np.array(test_values))
+        self.assertTrue(
+            signal_chunks == [intbv(val, min=-2**40, max=2**40)
+                              for val in test_values])
+
+        different_values = list(test_values)
+        different_values[-1] += 1
+
+        self.assertTrue(signal_chunks != different_values)
+        self.assertTrue(signal_chunks != test_values[:-1])
+
+
+class TestAxiStreamPacketSpool(StreamingTestCase):
+    '''There should be a bounded-memory store of the packets received by an
+    AXI stream slave BFM.
+    '''
+
+    def add_completed_packets(self, bfm, packets):
+        for stream in packets:
+            bfm._completed_packets.setdefault(stream, deque([])).extend(
+                deque(packet) for packet in packets[stream])
+
+    def test_drain_and_close(self):
+        '''Each call to ``drain`` should take the completed packets from the
+        BFM. ``close`` should return an AxiStreamPacketChunks mapping of all
+        the packets, without changing the current packets.
+        '''
+        bfm = AxiStreamSlaveBFM()
+        bfm._current_packets[(0, 0)] = deque([1, 2])
+
+        packets = [
+            {(0, 0): [[1, 2, 3], [4]], (1, 2): [[2**70, 5]]},
+            {},
+            {(0, 0): [[6, 7]], (3, 0): [[8, 9, 10]]}]
+
+        handled_packets = []
+        spool = AxiStreamPacketSpool(
+            'axi', bfm, directory=self.tmp_dir,
+            handler=lambda name, packets: handled_packets.append(packets))
+
+        for each_packets in packets:
+            self.add_completed_packets(bfm, each_packets)
+            spool.drain()
+            self.assertEqual(bfm.completed_packets, {})
+
+        packet_chunks = spool.close()
+
+        self.assertIsInstance(packet_chunks, AxiStreamPacketChunks)
+        self.assertEqual(len(os.listdir(self.tmp_dir)), 2)
+        self.assertEqual(len(handled_packets), 2)
+        self.assertEqual(bfm.current_packets, {(0, 0): deque([1, 2])})
+
+        expected_packets = {
+            (0, 0): [[1, 2, 3], [4], [6, 7]],
+            (1, 2): [[2**70, 5]],
+            (3, 0): [[8, 9, 10]]}
+
+        self.assertEqual(set(packet_chunks), set(expected_packets))
+
+        for stream in expected_packets:
+            self.assertEqual(len(packet_chunks[stream]),
+                             len(expected_packets[stream]))
+            self.assertEqual(list(packet_chunks[stream]),
+                             expected_packets[stream])
+            self.assertEqual(packet_chunks[stream][-1],
+                             expected_packets[stream][-1])
+
+        self.assertEqual(
+            packet_chunks,
+            {stream: deque(deque(packet) for packet in stream_packets)
+             for stream, stream_packets in expected_packets.items()})
@@ -4,7 +4,7 @@ from kea.testing.myhdl import myhdl_cosimulation
 from kea.xilinx.vivado_utils.cosimulation import (
     vivado_vhdl_cosimulation, vivado_verilog_cosimulation)
 
-from kea.xilinx.vivado_utils import VIVADO_EXECUTABLE
+import kea.xilinx.vivado_utils
 
 import unittest
 import os
@@ -124,7 +124,7 @@ class KeaVivadoVHDLTestCase(HDLTestCase):
             raise unittest.SkipTest(
                 'Vivado tests have been disabled: %s' % VIVADO_DISABLE_REASON)
 
-        if VIVADO_EXECUTABLE is None:
+        if kea.xilinx.vivado_utils.VIVADO_EXECUTABLE is None:
             raise unittest.SkipTest(
                 'Vivado executable not available: Running VHDL tests in '
                 'Vivado requires the Vivado executable to be in the path.')
@@ -143,7 +143,7 @@ class KeaVivadoVerilogTestCase(HDLTestCase):
             raise unittest.SkipTest(
                 'Vivado tests have been disabled: %s' % VIVADO_DISABLE_REASON)
 
-        if VIVADO_EXECUTABLE is None:
+        if kea.xilinx.vivado_utils.VIVADO_EXECUTABLE is None:
             raise unittest.SkipTest(
                 'Vivado executable not available: Running Verilog tests in '
                 'Vivado requires the Vivado executable to be in the path.')
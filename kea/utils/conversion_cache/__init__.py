@@ -0,0 +1,2 @@
+from .conversion_cache import ConversionCache, ConvertedHDL
+from .hierarchical_conversion import HierarchicalConversion
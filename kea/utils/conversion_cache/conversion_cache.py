@@ -0,0 +1,341 @@
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import types
+
+import myhdl
+import numpy as np
+
+from myhdl import toVHDL, toVerilog
+from myhdl._Signal import _Signal
+from myhdl._block import block_decorator
+
+from kea.testing.myhdl.hdl_blocks import _get_signal_names_to_port_names
+from kea.utils.pickle_cache import PickleCache
+
+_default_cache_directory = os.path.join(
+    os.path.expanduser('~'), '.cache', 'kea', 'conversions')
+
+# The module level settings of the converters, which change the converted
+# code as much as the arguments to convert do. The settings that the convert
+# method of a block sets on every conversion are left out, as their values
+# between conversions are whatever the last conversion left.
+_converter_settings = {
+    'VHDL': (toVHDL, ('initial_values', 'std_logic_ports', 'library',
+                      'use_clauses', 'architecture', 'component_declarations',
+                      'no_myhdl_header', 'no_myhdl_package')),
+    'Verilog': (toVerilog, ('initial_values', 'standard',
+                            'prefer_blocking_assignments', 'radix',
+                            'no_myhdl_header'))}
+
+# The arguments from which the convert method of a block sets the settings of
+# the converter on every conversion, with their defaults.
+_convert_defaults = {
+    'VHDL': {},
+    'Verilog': {'timescale': '1ns/10ps', 'trace': False, 'testbench': True}}
+
+# The comment strings of the converted files, by extension.
+_comment_strings = {'.vhd': '--', '.v': '//'}
+
+# The hashes of the source files, by the filename, modification time and
+# size of the file.
+_source_hashes = {}
+
+def _source_hash(filename):
+
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+
+    source_key = (filename, stat.st_mtime_ns, stat.st_size)
+
+    if source_key not in _source_hashes:
+        with open(filename, 'rb') as f:
+            _source_hashes[source_key] = hashlib.sha256(f.read()).hexdigest()
+
+    return _source_hashes[source_key]
+
+def _package_source(module_name):
+    '''Returns the names and hashes of the source of every loaded module of
+    the top level package of ``module_name``.
+
+    The blocks in a package are usually built from other blocks in the same
+    package, so a change to any of them can change the converted code.
+    '''
+    package_name = module_name.split('.')[0]
+
+    package_source = []
+    for name, module in sorted(sys.modules.items()):
+        if name != package_name and not name.startswith(package_name + '.'):
+            continue
+
+        filename = getattr(module, '__file__', None)
+
+        if filename is None or not filename.endswith('.py'):
+            continue
+
+        package_source.append((name, _source_hash(filename)))
+
+    return package_source
+
+def _shape(value, _parents=()):
+    '''Returns a representation of ``value`` that includes everything about
+    it that determines the converted code: the type, width, range and
+    initial value of signals, the shapes of the signals in lists and
+    interfaces, and the values of everything else.
+
+    Arrays are represented by their contents rather than by their ``repr``,
+    which NumPy truncates, and objects that have the default ``repr`` (which
+    includes their address) by the shapes of their attributes. A
+    ``ValueError`` is raised for a value that cannot be represented in the
+    same way each time it is built.
+    '''
+    if isinstance(value, _Signal):
+        val = value._init
+
+        if isinstance(val, myhdl.intbv):
+            val_shape = (type(val).__name__, int(val), len(val), val.min,
+                         val.max)
+        else:
+            val_shape = (type(val).__name__, repr(val))
+
+        if isinstance(value, myhdl.ResetSignal):
+            return ('ResetSignal', val_shape, value.active, value.isasync)
+
+        return ('Signal', val_shape)
+
+    elif isinstance(value, (bool, int, float, str, bytes, type(None))):
+        return repr(value)
+
+    if any(value is each for each in _parents):
+        raise ValueError(
+            'The conversion cannot be keyed, as %r refers to itself.' % value)
+
+    _parents = _parents + (value,)
+
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(
+            _shape(each, _parents) for each in value))
+
+    elif isinstance(value, dict):
+        return ('dict', tuple(
+            (repr(key), _shape(value[key], _parents))
+            for key in sorted(value, key=repr)))
+
+    elif isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return ('ndarray', value.dtype.str, value.shape,
+                    _shape(value.tolist(), _parents))
+
+        return ('ndarray', value.dtype.str, value.shape, hashlib.sha256(
+            np.ascontiguousarray(value).tobytes()).hexdigest())
+
+    elif isinstance(value, block_decorator):
+        return ('block', _shape(value.func, _parents))
+
+    elif isinstance(value, (type, types.FunctionType)):
+        if '<' in value.__qualname__:
+            # A lambda or a function or class defined in a function, which
+            # cannot be told apart from the others of the same name.
+            raise ValueError(
+                'The conversion cannot be keyed, as %r is not defined at '
+                'the top level of a module.' % value)
+
+        return (type(value).__name__, value.__module__, value.__qualname__)
+
+    elif hasattr(value, '__dict__') and (
+        type(value).__repr__ is object.__repr__ or any(
+            isinstance(each, _Signal) for each in vars(value).values())):
+        # An interface or another object without a repr of its own
+        return (
+            type(value).__module__, type(value).__qualname__,
+            tuple((name, _shape(each, _parents)) for name, each in
+                  sorted(vars(value).items())))
+
+    elif type(value).__repr__ is object.__repr__:
+        raise ValueError(
+            'The conversion cannot be keyed, as %r has neither a repr nor '
+            'attributes from which to key it.' % value)
+
+    else:
+        return repr(value)
+
+
+class ConvertedHDL(object):
+    '''The files written by a conversion, as a dict from the name of each
+    file to its contents in ``files``.
+
+    ``signal_name_mappings`` is a dict from the name of each file to a dict
+    of the internal names of the signals annotated in the file with
+    ``<name_annotation>`` comments to the names of the ports they connect
+    to.
+
+    ``cached`` is ``True`` if the files were read from the cache.
+    '''
+
+    def __init__(self, files, signal_name_mappings):
+        self.files = files
+        self.signal_name_mappings = signal_name_mappings
+        self.cached = False
+
+    def write(self, path):
+        '''Writes the files to ``path`` and returns their filenames.
+        '''
+        os.makedirs(path, exist_ok=True)
+
+        filenames = []
+        for name, content in sorted(self.files.items()):
+            filename = os.path.join(path, name)
+
+            with open(filename, 'wb') as f:
+                f.write(content)
+
+            filenames.append(filename)
+
+        return filenames
+
+
+class ConversionCache(PickleCache):
+    '''A cache on disk of the HDL converted from MyHDL blocks, keyed by
+    everything that determines the converted code (see :meth:`key`).
+
+    :meth:`convert` converts a block, or writes the files of the same
+    conversion from the cache, in which case the block is not elaborated
+    or converted at all.
+
+    The conversions are stored in a
+    :class:`kea.utils.pickle_cache.PickleCache`, so the cache is kept to at
+    most ``max_size`` bytes by removing the least recently used conversions
+    whenever a conversion is added. A conversion can be removed with
+    :meth:`invalidate`, or all of them with :meth:`clear`.
+    '''
+
+    def __init__(self, directory=None, max_size=256 * 1024**2):
+
+        if directory is None:
+            directory = _default_cache_directory
+
+        super(ConversionCache, self).__init__(directory, max_size)
+
+    def key(self, factory, hdl, args=(), kwargs=None, convert_kwargs=None):
+        '''Returns the key of the conversion to ``hdl`` of the block
+        returned by ``factory(*args, **kwargs)``, with the ``convert_kwargs``
+        passed to the ``convert`` method of the block.
+
+        The key is a hash of:
+
+        * The module and name of ``factory`` and the source of every loaded
+          module in the same top level package as ``factory`` (so a change
+          to any of the blocks in the package changes the key).
+        * The shapes of the arguments: the type, width, range and initial
+          value of each signal (including those in lists and interfaces),
+          the contents of arrays, the attributes of objects without a
+          ``repr`` of their own and the value of every other argument.
+        * ``hdl``, ``convert_kwargs`` (with the defaults of the arguments
+          of ``convert`` that set the settings of the converter, such as
+          the Verilog ``timescale``), the other module level settings of the
+          converter for ``hdl`` and the version of MyHDL.
+
+        Blocks from other packages on which ``factory`` depends are not
+        included, so when they change the cache should be invalidated
+        explicitly.
+
+        A ``ValueError`` is raised if an argument cannot be keyed in the
+        same way each time it is built, such as a lambda or an object with
+        neither a ``repr`` of its own nor attributes.
+        '''
+        if kwargs is None:
+            kwargs = {}
+
+        if convert_kwargs is None:
+            convert_kwargs = {}
+
+        if hdl not in _converter_settings:
+            raise ValueError('hdl should be \'VHDL\' or \'Verilog\'')
+
+        convert_kwargs = dict(_convert_defaults[hdl], **convert_kwargs)
+
+        if isinstance(factory, block_decorator):
+            func = factory.func
+        else:
+            func = factory
+
+        converter, setting_names = _converter_settings[hdl]
+        settings = tuple(
+            (name, repr(getattr(converter, name, None)))
+            for name in setting_names)
+
+        values = (
+            func.__module__, func.__qualname__,
+            _package_source(func.__module__),
+            _shape(list(args)), _shape(kwargs), hdl,
+            _shape(convert_kwargs), settings, myhdl.__version__)
+
+        return hashlib.sha256(repr(values).encode()).hexdigest()
+
+    def convert(self, factory, hdl='Verilog', path='.', args=(), kwargs=None,
+                **convert_kwargs):
+        '''Converts the block returned by ``factory(*args, **kwargs)`` to
+        ``hdl`` and writes the converted files to ``path``, in the same way
+        as ``factory(*args, **kwargs).convert(hdl=hdl, path=path,
+        **convert_kwargs)``.
+
+        If the same conversion is in the cache, the cached files are
+        written instead and ``factory`` is not called. No conversion
+        warnings are raised in that case.
+
+        Returns the :class:`ConvertedHDL` of the conversion.
+        '''
+        if kwargs is None:
+            kwargs = {}
+
+        conversion_key = self.key(factory, hdl, args, kwargs, convert_kwargs)
+
+        converted = self.get(conversion_key)
+
+        if converted is None:
+            conversion_directory = tempfile.mkdtemp()
+
+            try:
+                factory(*args, **kwargs).convert(
+                    hdl=hdl, path=conversion_directory, **convert_kwargs)
+
+                files = {}
+                signal_name_mappings = {}
+                for name in os.listdir(conversion_directory):
+                    with open(os.path.join(conversion_directory, name),
+                              'rb') as f:
+                        files[name] = f.read()
+
+                    comment_string = _comment_strings.get(
+                        os.path.splitext(name)[1])
+
+                    if comment_string is not None:
+                        signal_name_mappings[name] = (
+                            _get_signal_names_to_port_names(
+                                files[name].decode(errors='replace'),
+                                comment_string))
+
+            finally:
+                shutil.rmtree(conversion_directory)
+
+            converted = ConvertedHDL(files, signal_name_mappings)
+            self.put(conversion_key, converted)
+
+        converted.write(path)
+
+        return converted
+
+    def get(self, key):
+        '''Returns the :class:`ConvertedHDL` stored under ``key``, or
+        ``None`` if there is no such conversion.
+        '''
+        converted = super(ConversionCache, self).get(key)
+
+        if converted is not None:
+            converted.cached = True
+
+        return converted
@@ -0,0 +1,276 @@
+import os
+import re
+
+from myhdl import block
+from myhdl._Signal import _Signal
+
+from .conversion_cache import ConversionCache
+
+# The port declarations of the converted top level of a block.
+_vhdl_port = re.compile(
+    r'^\s*(\w+)\s*:\s*(in|out|inout)\s', re.MULTILINE | re.IGNORECASE)
+_verilog_port = re.compile(
+    r'^\s*(input|output|inout)\b[^;]*?(\w+)\s*;', re.MULTILINE)
+
+_vhdl_directions = {'in': 'input', 'out': 'output', 'inout': 'inout'}
+
+_file_extensions = {'VHDL': '.vhd', 'Verilog': '.v'}
+
+def _port_directions(content, hdl):
+    '''Returns a list of the ``(name, direction)`` of each port of the top
+    level of a converted file, with the directions given as ``'input'``,
+    ``'output'`` or ``'inout'``.
+    '''
+    if hdl == 'VHDL':
+        # Only the ports of the entity
+        entity = content[:content.lower().find('architecture')]
+
+        return [(name, _vhdl_directions[direction.lower()])
+                for name, direction in _vhdl_port.findall(entity)]
+
+    else:
+        # Only the ports of the module
+        module = content[:content.find(');') + 1]
+        module_body = content[len(module):]
+
+        port_names = set(re.findall(r'(\w+)\s*[,)]', module))
+
+        return [(name, direction) for direction, name in
+                _verilog_port.findall(module_body) if name in port_names]
+
+def _port_signals(args, kwargs, argnames):
+    '''Returns a dict from the name MyHDL gives to each port of a top level
+    block to the signal connected to it. Interfaces are expanded to a port
+    for each of their signals, named by the argument and the attribute.
+    '''
+    port_signals = {}
+
+    def add_port_signals(name, value):
+
+        if isinstance(value, _Signal):
+            port_signals[name] = value
+
+        elif hasattr(value, '__dict__'):
+            for attribute_name, attribute in vars(value).items():
+                if isinstance(attribute, _Signal) or (
+                    hasattr(attribute, '__dict__') and
+                    not isinstance(attribute, type)):
+
+                    add_port_signals(
+                        name + '_' + attribute_name, attribute)
+
+    for name, value in zip(argnames, args):
+        add_port_signals(name, value)
+
+    for name, value in kwargs.items():
+        add_port_signals(name, value)
+
+    return port_signals
+
+
+class HierarchicalConversion(object):
+    '''A context manager in which each of ``blocks`` is converted to
+    ``hdl`` in a module of its own, written to ``path``, rather than into
+    the module of the block that instantiates it.
+
+    MyHDL converts the whole hierarchy of a block into a single module, so
+    a change anywhere converts the whole design again, and a block that is
+    used many times is analysed and converted as many times. Inside the
+    context, every instance of one of ``blocks`` is converted separately,
+    once for each set of parameters (see :class:`ConversionCache`), and is
+    instantiated by the module of its parent by reference (as a VHDL
+    entity or a Verilog module instance). The conversions are kept in
+    ``cache``, so the blocks that have not changed are not converted
+    again when the design is next converted.
+
+    For example::
+
+        with HierarchicalConversion(
+            [axi_lite_handler, axis_chunker], 'VHDL', path) as conversion:
+
+            top = top_level(**args)
+            top.convert(hdl='VHDL', path=path)
+
+        vhdl_files = conversion.filenames + [
+            os.path.join(path, 'top_level.vhd')]
+
+    ``filenames`` lists the files of the separately converted blocks, with
+    those of each block after those of the blocks it instantiates.
+
+    The blocks behave as usual in simulation. The separately converted
+    module of a block is named after the block and the key of its
+    conversion, so each set of parameters has a module of its own. A
+    block that is converted separately should not itself have
+    user-defined code, and should only be elaborated inside the context
+    while it is being converted.
+    '''
+
+    def __init__(self, blocks, hdl, path, cache=None):
+
+        if hdl not in _file_extensions:
+            raise ValueError('hdl should be \'VHDL\' or \'Verilog\'')
+
+        if cache is None:
+            cache = ConversionCache()
+
+        self.blocks = list(blocks)
+        self.hdl = hdl
+        self.path = path
+        self.cache = cache
+
+        self.filenames = []
+        self.module_names = []
+
+        self._original_funcs = {}
+
+    def __enter__(self):
+
+        for each_block in self.blocks:
+            if hasattr(each_block, 'vhdl_code') or hasattr(
+                each_block, 'verilog_code'):
+
+                raise ValueError(
+                    'Blocks with user-defined code cannot be converted '
+                    'separately.')
+
+            self._original_funcs[each_block] = each_block.func
+            each_block.func = self._separately_converted(each_block)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        for each_block, func in self._original_funcs.items():
+            each_block.func = func
+
+            for attribute in ('vhdl_code', 'verilog_code'):
+                if hasattr(each_block, attribute):
+                    delattr(each_block, attribute)
+
+        self._original_funcs = {}
+
+        return False
+
+    def _convert(self, func, args, kwargs):
+        '''Converts ``func(*args, **kwargs)`` into a module of its own, and
+        returns the name of the module and its ports.
+        '''
+        factory = block(func)
+
+        key = self.cache.key(factory, self.hdl, args, kwargs)
+        module_name = '%s_%s' % (func.__name__, key[:12])
+
+        convert_kwargs = {'name': module_name}
+
+        if self.hdl == 'Verilog':
+            convert_kwargs['testbench'] = False
+
+        converted = self.cache.convert(
+            factory, self.hdl, self.path, args, kwargs, **convert_kwargs)
+
+        module_filename = module_name + _file_extensions[self.hdl]
+
+        if module_name not in self.module_names:
+            self.module_names.append(module_name)
+
+            for name in sorted(converted.files):
+                filename = os.path.join(self.path, name)
+
+                if filename not in self.filenames:
+                    # The MyHDL package is shared by all the modules, so it
+                    # goes first.
+                    if name == module_filename:
+                        self.filenames.append(filename)
+                    else:
+                        self.filenames.insert(0, filename)
+
+        ports = _port_directions(
+            converted.files[module_filename].decode(), self.hdl)
+
+        return module_name, ports
+
+    def _separately_converted(self, original_block):
+
+        original_func = self._original_funcs[original_block]
+
+        def separately_converted(*args, **kwargs):
+
+            # The block is elaborated as usual inside this one, so it can be
+            # simulated. Any of the blocks nested in it are converted
+            # separately as it is elaborated.
+            instance = block(original_func)(*args, **kwargs)
+
+            module_name, ports = self._convert(original_func, args, kwargs)
+
+            port_signals = _port_signals(
+                args, kwargs,
+                original_func.__code__.co_varnames[
+                    :original_func.__code__.co_argcount])
+
+            namespace = {}
+            vhdl_port_map = []
+            verilog_port_map = []
+
+            for n, (port_name, direction) in enumerate(ports):
+                try:
+                    signal = port_signals[port_name]
+                except KeyError:
+                    raise ValueError(
+                        'The port %s of %s could not be matched to a '
+                        'signal' % (port_name, original_func.__name__))
+
+                if direction in ('output', 'inout'):
+                    signal.driven = 'wire'
+
+                if direction in ('input', 'inout'):
+                    signal.read = True
+
+                namespace['port_%d' % n] = signal
+                vhdl_port_map.append('%s => $port_%d' % (port_name, n))
+                verilog_port_map.append('.%s($port_%d)' % (port_name, n))
+
+            instance_name = 'separately_converted_%s_%d' % (
+                original_func.__name__, original_block.calls)
+
+            original_block.vhdl_code = (
+                '%s: entity work.%s\n    port map (\n        %s\n    );\n' % (
+                    instance_name, module_name,
+                    ',\n        '.join(vhdl_port_map)))
+
+            original_block.verilog_code = (
+                '%s %s (\n    %s\n);\n' % (
+                    module_name, instance_name,
+                    ',\n    '.join(verilog_port_map)))
+
+            # The blocks nested in this one mark the signals connected to
+            # them as driven or read, which would make MyHDL declare the
+            # internal signals of this block in the parent.
+            port_signal_ids = set(id(each) for each in namespace.values())
+            for each_signal in _hierarchy_signals(instance):
+                if id(each_signal) not in port_signal_ids:
+                    each_signal._driven = None
+                    each_signal._read = False
+
+            # MyHDL substitutes the names in the user-defined code from the
+            # namespace in which the first instance was created.
+            instance.callinfo.symdict.update(namespace)
+
+            return instance
+
+        separately_converted.__name__ = original_func.__name__
+        separately_converted.__qualname__ = original_func.__qualname__
+        separately_converted.__module__ = original_func.__module__
+
+        return separately_converted
+
+def _hierarchy_signals(instance):
+    '''Returns the signals of every level of the hierarchy of the block
+    ``instance``.
+    '''
+    signals = list(instance.sigdict.values())
+
+    for sub in instance.subs:
+        if hasattr(sub, 'subs'):
+            signals.extend(_hierarchy_signals(sub))
+
+    return signals
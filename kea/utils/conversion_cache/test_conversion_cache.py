@@ -0,0 +1,279 @@
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase, mock
+
+import numpy as np
+
+from myhdl import (
+    Signal, ResetSignal, intbv, block, always_seq, always_comb)
+
+from . import conversion_cache as conversion_cache_module
+from .conversion_cache import ConversionCache
+
+@block
+def _counter(clock, reset, count, step=1):
+
+    @always_seq(clock.posedge, reset=reset)
+    def counter():
+        count.next = (count + step) % (count.max)
+
+    return counter
+
+@block
+def _name_annotation(signal, name):
+
+    @always_comb
+    def non_block():
+        signal
+
+    annotation = '<name_annotation> $signal %s' % name
+    _name_annotation.vhdl_code = '-- %s' % annotation
+    _name_annotation.verilog_code = '// %s' % annotation
+
+    return non_block
+
+@block
+def _annotated_counter(clock, reset, count):
+
+    return (_counter(clock, reset, count),
+            _name_annotation(count, 'count_port'))
+
+class _Parameters(object):
+    '''Parameters of a block with the default repr, which includes the
+    address of the object.
+    '''
+    def __init__(self, step, table):
+        self.step = step
+        self.table = table
+
+def _args(width=8):
+    return {'clock': Signal(False),
+            'reset': ResetSignal(False, active=True, isasync=False),
+            'count': Signal(intbv(0)[width:])}
+
+
+class TestConversionCache(TestCase):
+    '''There should be a cache of the HDL converted from blocks, keyed by
+    the block and the shapes of its arguments.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ConversionCache(os.path.join(self.tmp_dir, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def convert(self, hdl='VHDL', output_directory='out', **kwargs):
+        path = os.path.join(self.tmp_dir, output_directory)
+
+        return path, self.cache.convert(
+            _counter, hdl, path, kwargs=kwargs.pop('kwargs', _args()),
+            **kwargs)
+
+    def test_cached_conversion(self):
+        '''A conversion that is in the cache should write the same files
+        without the block being elaborated.
+        '''
+        for hdl, extension in (('VHDL', '.vhd'), ('Verilog', '.v')):
+            path, converted = self.convert(hdl, 'out_' + hdl)
+            self.assertFalse(converted.cached)
+
+            with open(os.path.join(path, '_counter' + extension)) as f:
+                code = f.read()
+
+            self.assertIn('_counter' + extension, converted.files)
+
+            # MyHDL counts the calls to a block
+            calls = _counter.calls
+            cached_path, cached = self.convert(hdl, 'cached_' + hdl)
+
+            self.assertTrue(cached.cached)
+            self.assertEqual(_counter.calls, calls)
+            self.assertEqual(
+                sorted(os.listdir(cached_path)), sorted(os.listdir(path)))
+
+            with open(os.path.join(cached_path, '_counter' + extension)) as f:
+                self.assertEqual(f.read(), code)
+
+    def test_conversion_after_verilog_timescale(self):
+        '''A Verilog conversion with a timescale other than the default,
+        which MyHDL leaves set on the converter, should not change the key
+        of the conversions after it.
+        '''
+        key = self.cache.key(_counter, 'Verilog', kwargs=_args())
+
+        _counter(**_args()).convert(
+            hdl='Verilog', path=self.tmp_dir,
+            timescale='1ns/1ns')
+
+        self.assertEqual(
+            self.cache.key(_counter, 'Verilog', kwargs=_args()), key)
+
+        _, converted = self.convert('Verilog', 'out')
+        self.assertFalse(converted.cached)
+
+        _, converted = self.convert('Verilog', 'cached')
+        self.assertTrue(converted.cached)
+
+        # The default timescale given explicitly is the same conversion
+        self.assertEqual(
+            self.cache.key(
+                _counter, 'Verilog', kwargs=_args(),
+                convert_kwargs={'timescale': '1ns/10ps'}), key)
+        self.assertNotEqual(
+            self.cache.key(
+                _counter, 'Verilog', kwargs=_args(),
+                convert_kwargs={'timescale': '1ns/1ns'}), key)
+
+    def test_key(self):
+        '''The key should change with the shapes of the signals, the other
+        arguments, the hdl, the arguments to convert and the source of the
+        package of the block, but not with the signal objects themselves.
+        '''
+        key = self.cache.key(_counter, 'VHDL', kwargs=_args())
+
+        self.assertEqual(self.cache.key(_counter, 'VHDL', kwargs=_args()), key)
+
+        wider_args = _args(width=16)
+        self.assertNotEqual(
+            self.cache.key(_counter, 'VHDL', kwargs=wider_args), key)
+
+        initial_value_args = _args()
+        initial_value_args['count'] = Signal(intbv(3)[8:])
+        self.assertNotEqual(
+            self.cache.key(_counter, 'VHDL', kwargs=initial_value_args), key)
+
+        step_args = _args()
+        step_args['step'] = 2
+        self.assertNotEqual(
+            self.cache.key(_counter, 'VHDL', kwargs=step_args), key)
+
+        self.assertNotEqual(
+            self.cache.key(_counter, 'Verilog', kwargs=_args()), key)
+        self.assertNotEqual(
+            self.cache.key(
+                _counter, 'VHDL', kwargs=_args(),
+                convert_kwargs={'name': 'other'}), key)
+
+        with mock.patch.object(
+            conversion_cache_module, '_source_hash', return_value='changed'):
+
+            self.assertNotEqual(
+                self.cache.key(_counter, 'VHDL', kwargs=_args()), key)
+
+        self.assertRaises(
+            ValueError, self.cache.key, _counter, 'SystemVerilog',
+            kwargs=_args())
+
+    def test_key_arrays(self):
+        '''The key should depend on the whole of an array argument, not on
+        its repr, which NumPy truncates for large arrays.
+        '''
+        def key(table):
+            args = _args()
+            args['table'] = table
+            return self.cache.key(_counter, 'VHDL', kwargs=args)
+
+        table = np.arange(2000)
+        changed_table = table.copy()
+        changed_table[1000] = -1
+
+        self.assertEqual(repr(table), repr(changed_table))
+
+        self.assertEqual(key(table), key(table.copy()))
+        self.assertNotEqual(key(table), key(changed_table))
+        self.assertNotEqual(key(table), key(table.astype('int32')))
+        self.assertNotEqual(key(table), key(table.reshape(2, 1000)))
+        self.assertEqual(
+            key(np.array([1, [2]], dtype=object)),
+            key(np.array([1, [2]], dtype=object)))
+
+    def test_key_objects(self):
+        '''The key of an object argument with the default repr should
+        depend on its type and attributes rather than its address, and
+        arguments that cannot be keyed in the same way each time should
+        raise a ValueError.
+        '''
+        def key(value):
+            args = _args()
+            args['parameters'] = value
+            return self.cache.key(_counter, 'VHDL', kwargs=args)
+
+        table = np.arange(4)
+        parameters_key = key(_Parameters(1, table))
+
+        self.assertEqual(key(_Parameters(1, table.copy())), parameters_key)
+        self.assertNotEqual(key(_Parameters(2, table)), parameters_key)
+        self.assertNotEqual(key(_Parameters(1, table + 1)), parameters_key)
+
+        counter_key = key(_counter)
+        _counter(**_args())
+        self.assertEqual(key(_counter), counter_key)
+        self.assertNotEqual(key(_counter.func), counter_key)
+        self.assertEqual(key(_Parameters), key(_Parameters))
+
+        cyclic = _Parameters(1, table)
+        cyclic.parent = cyclic
+
+        for value in (lambda: None, object(), cyclic):
+            self.assertRaises(ValueError, key, value)
+
+    def test_signal_name_mappings(self):
+        '''The name annotations in the converted files should be returned,
+        including from the cache.
+        '''
+        for hdl, extension in (('VHDL', '.vhd'), ('Verilog', '.v')):
+            path = os.path.join(self.tmp_dir, 'out_' + hdl)
+
+            for n in range(2):
+                converted = self.cache.convert(
+                    _annotated_counter, hdl, path, kwargs=_args())
+
+                mappings = converted.signal_name_mappings[
+                    '_annotated_counter' + extension]
+
+                self.assertEqual(list(mappings.values()), ['count_port'])
+
+            self.assertTrue(converted.cached)
+
+    def test_invalidate_and_clear(self):
+        '''invalidate should remove a conversion, and clear should remove
+        them all.
+        '''
+        self.convert()
+        self.convert(kwargs=_args(width=16))
+
+        key = self.cache.key(_counter, 'VHDL', kwargs=_args())
+
+        self.cache.invalidate(key)
+        self.assertIsNone(self.cache.get(key))
+        self.assertFalse(self.convert()[1].cached)
+
+        # Invalidating a missing conversion is not an error
+        self.cache.invalidate('missing')
+
+        self.cache.clear()
+        self.assertFalse(os.path.exists(self.cache.directory))
+        self.assertFalse(self.convert(kwargs=_args(width=16))[1].cached)
+
+    def test_size_limit(self):
+        '''The least recently used conversions should be removed to keep
+        the cache within its maximum size.
+        '''
+        self.convert()
+        conversion_size = sum(
+            os.path.getsize(os.path.join(self.cache.directory, filename))
+            for filename in os.listdir(self.cache.directory))
+
+        self.cache.max_size = int(conversion_size * 1.5)
+
+        self.convert(kwargs=_args(width=16))
+
+        key = self.cache.key(_counter, 'VHDL', kwargs=_args())
+        wider_key = self.cache.key(_counter, 'VHDL', kwargs=_args(width=16))
+
+        self.assertIsNone(self.cache.get(key))
+        self.assertIsNotNone(self.cache.get(wider_key))
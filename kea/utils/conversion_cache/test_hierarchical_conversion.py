@@ -0,0 +1,216 @@
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase, mock
+
+from myhdl import Signal, intbv, block, instance, delay
+
+from kea.hdl.axi import AxiStreamInterface, axis_chunker
+from kea.hdl.logic.asynchronous import and_gate, or_gate
+from kea.hdl.signal_handling.asynchronous import sig_assigner
+
+from .conversion_cache import ConversionCache
+from .hierarchical_conversion import HierarchicalConversion
+
+_extensions = {'VHDL': '.vhd', 'Verilog': '.v'}
+
+@block
+def _gates(a, b, c, d, e):
+
+    x = Signal(False)
+
+    return and_gate(a, b, x), and_gate(x, c, d), or_gate(a, x, e)
+
+@block
+def _chunker(clock, reset, n_words_per_chunk, axis_source, axis_sink):
+
+    return axis_chunker(
+        clock, reset, n_words_per_chunk, axis_source, axis_sink)
+
+def _chunker_args():
+
+    axis_args = {'bus_width': 4, 'TVALID_init': False, 'TREADY_init': False,
+                 'use_TLAST': True}
+
+    return {'clock': Signal(False),
+            'reset': Signal(False),
+            'n_words_per_chunk': Signal(intbv(0)[8:]),
+            'axis_source': AxiStreamInterface(**axis_args),
+            'axis_sink': AxiStreamInterface(**axis_args)}
+
+
+class TestHierarchicalConversion(TestCase):
+    '''In a HierarchicalConversion, the selected blocks should be converted
+    into modules of their own and instantiated by reference.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = ConversionCache(os.path.join(self.tmp_dir, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def convert(self, blocks, top, args, hdl):
+        path = os.path.join(self.tmp_dir, hdl)
+
+        with HierarchicalConversion(
+            blocks, hdl, path, self.cache) as conversion:
+
+            top(**args).convert(hdl=hdl, path=path)
+
+        with open(os.path.join(
+            path, top.func.__name__ + _extensions[hdl])) as f:
+
+            code = f.read()
+
+        return conversion, code
+
+    def test_separate_modules(self):
+        '''Each instance of the selected blocks should be an instance of a
+        module of the block for its parameters, and the other blocks should
+        be converted as usual.
+        '''
+        for hdl in ('VHDL', 'Verilog'):
+            args = dict(zip('abcde', [Signal(False) for n in range(5)]))
+
+            conversion, code = self.convert([and_gate], _gates, args, hdl)
+
+            self.assertEqual(len(conversion.module_names), 1)
+            module_name = conversion.module_names[0]
+
+            self.assertTrue(module_name.startswith('and_gate_'))
+            self.assertEqual(code.count(module_name), 2)
+
+            # The or gate is converted into the parent
+            self.assertNotIn('or_gate_', code)
+            self.assertIn('(a || x)' if hdl == 'Verilog' else 'bool(a) or',
+                          code)
+
+            module_filename = os.path.join(
+                self.tmp_dir, hdl, module_name + _extensions[hdl])
+
+            self.assertEqual(conversion.filenames[-1], module_filename)
+
+            with open(module_filename) as f:
+                module_code = f.read()
+
+            self.assertIn(module_name, module_code)
+
+            if hdl == 'VHDL':
+                self.assertIn('signal_out => d', code)
+                self.assertEqual(
+                    os.path.basename(conversion.filenames[0]),
+                    'pck_myhdl_011.vhd')
+            else:
+                self.assertIn('.signal_out(d)', code)
+                self.assertEqual(len(conversion.filenames), 1)
+                self.assertIn('wire x;', code)
+
+    def test_nested_blocks_and_interfaces(self):
+        '''Selected blocks nested in a selected block should be converted
+        into modules of their own, before the block that instantiates them,
+        and the signals of interfaces should be connected to the ports of
+        the module. The internal signals of the block should not be
+        declared in the parent.
+        '''
+        for hdl in ('VHDL', 'Verilog'):
+            conversion, code = self.convert(
+                [axis_chunker, and_gate, sig_assigner], _chunker,
+                _chunker_args(), hdl)
+
+            module_names = [
+                name.split('_')[0] + '_' + name.split('_')[1]
+                for name in conversion.module_names]
+
+            self.assertEqual(
+                module_names, ['sig_assigner', 'and_gate', 'axis_chunker'])
+
+            self.assertEqual(code.count(conversion.module_names[2]), 1)
+            self.assertIn('axis_sink_TDATA', code)
+            self.assertNotIn('valid_transaction', code)
+            self.assertNotIn('internal_source_tready', code)
+
+            with open(conversion.filenames[-1]) as f:
+                chunker_code = f.read()
+
+            self.assertIn(conversion.module_names[1], chunker_code)
+
+    def test_incremental_conversion(self):
+        '''Converting the design again should take the separately converted
+        modules from the cache.
+        '''
+        self.convert(
+            [axis_chunker, and_gate, sig_assigner], _chunker,
+            _chunker_args(), 'VHDL')
+
+        with mock.patch.object(
+            self.cache, 'put', wraps=self.cache.put) as mock_put:
+
+            conversion, _ = self.convert(
+                [axis_chunker, and_gate, sig_assigner], _chunker,
+                _chunker_args(), 'VHDL')
+
+        self.assertFalse(mock_put.called)
+        self.assertEqual(len(conversion.module_names), 3)
+
+        for filename in conversion.filenames:
+            self.assertTrue(os.path.exists(filename))
+
+    def test_simulation(self):
+        '''The selected blocks should simulate as usual inside the
+        context, and should be restored on leaving it.
+        '''
+        a, b, c, d, e = [Signal(False) for n in range(5)]
+        outputs = []
+
+        @block
+        def test_bench():
+
+            gates = _gates(a, b, c, d, e)
+
+            @instance
+            def stimulus():
+                for a_val, b_val, c_val in (
+                    (1, 1, 1), (1, 0, 1), (0, 1, 1), (1, 1, 0)):
+
+                    a.next, b.next, c.next = a_val, b_val, c_val
+                    yield delay(2)
+                    outputs.append((int(d), int(e)))
+
+            return gates, stimulus
+
+        original_func = and_gate.func
+
+        with HierarchicalConversion(
+            [and_gate], 'VHDL', self.tmp_dir, self.cache):
+
+            sim = test_bench()
+            sim.run_sim()
+            sim.quit_sim()
+
+        self.assertEqual(outputs, [(1, 1), (0, 1), (0, 0), (0, 1)])
+
+        self.assertIs(and_gate.func, original_func)
+        self.assertFalse(hasattr(and_gate, 'vhdl_code'))
+        self.assertFalse(hasattr(and_gate, 'verilog_code'))
+
+    def test_invalid_arguments(self):
+        '''An invalid hdl or a block with user-defined code should raise a
+        ValueError.
+        '''
+        self.assertRaises(
+            ValueError, HierarchicalConversion, [and_gate], 'SystemVerilog',
+            self.tmp_dir)
+
+        @block
+        def user_code_block(signal_in, signal_out):
+            return sig_assigner(signal_in, signal_out)
+
+        user_code_block.vhdl_code = ''
+
+        with self.assertRaises(ValueError):
+            with HierarchicalConversion(
+                [user_code_block], 'VHDL', self.tmp_dir, self.cache):
+                pass
@@ -0,0 +1 @@
+from .lazy_loading import lazy_loader
@@ -0,0 +1,112 @@
+'''Measures the time taken to import each subpackage of kea in a new Python
+process, so that the cost of importing kea at the start of each test
+process or worker can be kept down. Run it with::
+
+    python -m kea.utils.lazy_loading.import_times [package ...] [-r repeats]
+
+By default the subpackages of ``kea.hdl`` and ``kea.xilinx`` are measured.
+'''
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import subprocess
+import sys
+
+_default_packages = ('kea.hdl', 'kea.xilinx')
+
+_import_time_code = '''
+import json, sys, time
+start = time.perf_counter()
+%s
+seconds = time.perf_counter() - start
+print(json.dumps([seconds, sorted(sys.modules)]))
+'''
+
+def subpackages(package_names=_default_packages):
+    '''Returns the names of the subpackages of each of ``package_names``,
+    other than those of tests and examples.
+    '''
+    names = []
+    for package_name in package_names:
+        package = importlib.import_module(package_name)
+
+        for module_info in pkgutil.iter_modules(package.__path__):
+            if module_info.ispkg and module_info.name not in (
+                'tests', 'examples'):
+
+                names.append(package_name + '.' + module_info.name)
+
+    return names
+
+def import_time(module_name, repeats=5, import_all=False):
+    '''Imports ``module_name`` in ``repeats`` new Python processes, and
+    returns the shortest time the import took in seconds and the names of
+    the kea modules it loaded.
+
+    If ``import_all`` is ``True``, every name the module exports is
+    imported, with ``from module_name import *``.
+    '''
+    if import_all:
+        statement = 'from %s import *' % module_name
+    else:
+        statement = 'import %s' % module_name
+
+    kea_directory = os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [kea_directory] + [
+            path for path in env.get('PYTHONPATH', '').split(os.pathsep)
+            if path])
+
+    times = []
+    for n in range(repeats):
+        out = subprocess.check_output(
+            [sys.executable, '-c', _import_time_code % statement], env=env)
+
+        seconds, modules = json.loads(out.decode().splitlines()[-1])
+        times.append(seconds)
+
+    kea_modules = [
+        name for name in modules if name == 'kea' or name.startswith('kea.')]
+
+    return min(times), kea_modules
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description='Measures the cold import time of kea packages.')
+    parser.add_argument(
+        'packages', nargs='*',
+        help='The packages to measure. By default, the subpackages of %s.' %
+        ' and '.join(_default_packages))
+    parser.add_argument(
+        '-r', '--repeats', type=int, default=5,
+        help='The number of times to import each package. The shortest '
+        'time is given.')
+
+    args = parser.parse_args(argv)
+
+    module_names = args.packages or subpackages()
+    width = max(len(name) for name in module_names)
+
+    # The time to import the package alone, and to import every name it
+    # exports, with the number of kea modules loaded by each.
+    print('%-*s  %11s  %7s  %13s  %7s' % (
+        width, 'package', 'import (ms)', 'modules', 'import * (ms)',
+        'modules'))
+
+    for module_name in module_names:
+        seconds, kea_modules = import_time(module_name, args.repeats)
+        all_seconds, all_kea_modules = import_time(
+            module_name, args.repeats, import_all=True)
+
+        print('%-*s  %11.1f  %7d  %13.1f  %7d' % (
+            width, module_name, seconds * 1e3, len(kea_modules),
+            all_seconds * 1e3, len(all_kea_modules)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import importlib
+import sys
+
+def _public_names(module):
+
+    try:
+        return list(module.__all__)
+    except AttributeError:
+        return [name for name in vars(module) if not name.startswith('_')]
+
+def lazy_loader(package_name, attributes, star_modules=()):
+    '''Returns the module level ``__getattr__`` and ``__dir__`` (see PEP 562)
+    of the package ``package_name``, with which the names the package
+    exports are only imported from their modules when they are first used.
+
+    ``attributes`` is a dict from the name of each module of the package,
+    relative to the package (for example ``'._axis_chunker'``), to a list of
+    the names to import from it. It replaces::
+
+        from ._axis_chunker import axis_chunker
+
+    The package also gets the names of its submodules, as it would when
+    they were imported.
+
+    The public names of each of ``star_modules`` are also exported by the
+    package, as they would be by ``from .module import *``. They are looked
+    up in the order given, only for names that are not in ``attributes``,
+    so the names that are commonly used from those modules should still be
+    listed in ``attributes``.
+
+    A name is imported once, and is then an attribute of the package like
+    any other. ``from package import *`` imports all the names.
+    '''
+    name_modules = {}
+    for module_name, names in attributes.items():
+        for name in names:
+            name_modules[name] = module_name
+
+    submodule_names = set()
+    for module_name in list(attributes) + list(star_modules):
+        submodule_names.add(module_name.lstrip('.').split('.')[0])
+
+    def package_namespace():
+        return vars(sys.modules[package_name])
+
+    def import_module(module_name):
+        return importlib.import_module(module_name, package_name)
+
+    def __getattr__(name):
+
+        if name in name_modules:
+            value = getattr(import_module(name_modules[name]), name)
+
+        elif name in submodule_names:
+            value = import_module('.' + name)
+
+        elif name == '__all__':
+            value = list(name_modules)
+            for module_name in star_modules:
+                value.extend(
+                    each for each in _public_names(import_module(module_name))
+                    if each not in value)
+
+        else:
+            for module_name in star_modules:
+                module = import_module(module_name)
+
+                if name in _public_names(module):
+                    value = getattr(module, name)
+                    break
+
+            else:
+                raise AttributeError(
+                    'module %r has no attribute %r' % (package_name, name))
+
+        package_namespace()[name] = value
+
+        return value
+
+    def __dir__():
+        return sorted(
+            set(package_namespace()) | set(name_modules) | submodule_names)
+
+    return __getattr__, __dir__
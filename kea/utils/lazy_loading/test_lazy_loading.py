@@ -0,0 +1,160 @@
+import importlib
+import os
+import pkgutil
+import shutil
+import sys
+import tempfile
+
+from unittest import TestCase
+
+from .lazy_loading import lazy_loader
+from .import_times import import_time, subpackages
+
+_package_init = '''
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._first': ['first_value', 'FirstClass'],
+    '.nested': ['nested_value']}, ['._star'])
+'''
+
+_package_modules = {
+    '_first.py': 'first_value = 1\n\nclass FirstClass(object):\n    pass\n',
+    '_star.py': 'star_value = 3\n_private_star_value = 4\n',
+    os.path.join('nested', '__init__.py'): 'nested_value = 2\n'}
+
+
+class TestLazyLoader(TestCase):
+    '''lazy_loader should give a package the names of its modules, which
+    are only imported when they are first used.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.package_name = 'kea_lazy_loading_test_package'
+
+        package_directory = os.path.join(self.tmp_dir, self.package_name)
+        os.makedirs(os.path.join(package_directory, 'nested'))
+
+        with open(os.path.join(package_directory, '__init__.py'), 'w') as f:
+            f.write(_package_init)
+
+        for filename, content in _package_modules.items():
+            with open(os.path.join(package_directory, filename), 'w') as f:
+                f.write(content)
+
+        sys.path.insert(0, self.tmp_dir)
+
+        self.package = importlib.import_module(self.package_name)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp_dir)
+
+        for name in list(sys.modules):
+            if name.split('.')[0] == self.package_name:
+                del sys.modules[name]
+
+        shutil.rmtree(self.tmp_dir)
+
+    def loaded(self, module_name):
+        return self.package_name + module_name in sys.modules
+
+    def test_lazy_names(self):
+        '''The modules should only be imported when one of their names is
+        used, after which the name should be an attribute of the package.
+        '''
+        self.assertFalse(self.loaded('._first'))
+
+        self.assertEqual(self.package.first_value, 1)
+        self.assertTrue(self.loaded('._first'))
+        self.assertFalse(self.loaded('.nested'))
+
+        self.assertIn('first_value', vars(self.package))
+        self.assertIs(
+            self.package.FirstClass,
+            sys.modules[self.package_name + '._first'].FirstClass)
+
+        namespace = {}
+        exec('from %s import nested_value' % self.package_name, namespace)
+        self.assertEqual(namespace['nested_value'], 2)
+
+    def test_submodules(self):
+        '''The submodules should be attributes of the package.
+        '''
+        self.assertIs(
+            self.package.nested,
+            importlib.import_module(self.package_name + '.nested'))
+
+    def test_star_modules(self):
+        '''The public names of the star modules should be names of the
+        package.
+        '''
+        self.assertEqual(self.package.star_value, 3)
+
+        self.assertRaises(
+            AttributeError, getattr, self.package, '_private_star_value')
+        self.assertRaises(AttributeError, getattr, self.package, 'missing')
+
+    def test_import_all(self):
+        '''from package import * should import all the names, and dir should
+        list them.
+        '''
+        self.assertTrue(
+            {'first_value', 'FirstClass', 'nested_value', 'nested'} <=
+            set(dir(self.package)))
+
+        namespace = {}
+        exec('from %s import *' % self.package_name, namespace)
+
+        self.assertEqual(
+            {name: namespace[name] for name in
+             ('first_value', 'nested_value', 'star_value')},
+            {'first_value': 1, 'nested_value': 2, 'star_value': 3})
+        self.assertNotIn('_private_star_value', namespace)
+
+
+class TestKeaLazyLoading(TestCase):
+    '''The packages of kea.hdl and kea.xilinx should export their names
+    lazily.
+    '''
+
+    def test_names(self):
+        '''Every name exported by a package should be importable.
+        '''
+        for package_name in ('kea.hdl', 'kea.xilinx'):
+            package = importlib.import_module(package_name)
+
+            for module_info in pkgutil.walk_packages(
+                package.__path__, package_name + '.'):
+
+                if not module_info.ispkg:
+                    continue
+
+                module = importlib.import_module(module_info.name)
+
+                for name in getattr(module, '__all__', []):
+                    self.assertTrue(
+                        hasattr(module, name),
+                        '%s.%s' % (module_info.name, name))
+
+    def test_unused_modules_not_imported(self):
+        '''Importing a package should not import the modules of its names,
+        and importing all its names should.
+        '''
+        _, kea_modules = import_time('kea.hdl.axi_lite_registers', 1)
+        self.assertNotIn('kea.hdl.axi_lite_registers._registers', kea_modules)
+        self.assertNotIn('kea.hdl.axi.axi_stream', kea_modules)
+
+        _, kea_modules = import_time('kea.hdl.axi', 1, import_all=True)
+        self.assertIn('kea.hdl.axi.axi_stream', kea_modules)
+        self.assertIn('kea.hdl.axi.axi_lite', kea_modules)
+
+    def test_subpackages(self):
+        '''The import times should be measured for each subpackage of
+        kea.hdl and kea.xilinx other than those of tests.
+        '''
+        names = subpackages()
+
+        self.assertIn('kea.hdl.axi', names)
+        self.assertIn('kea.xilinx.vivado_utils', names)
+        self.assertFalse(any(name.endswith('.tests') for name in names))
@@ -0,0 +1 @@
+from .pickle_cache import PickleCache
@@ -0,0 +1,110 @@
+import os
+import pickle
+import shutil
+import tempfile
+
+_value_suffix = '.pickle'
+
+
+class PickleCache(object):
+    '''A cache on disk of picklable values, each stored in its own file in
+    ``directory`` under a string key.
+
+    Values are written atomically, so a partially written value is never
+    read, and a value that cannot be read is treated as missing. The cache
+    is kept to at most ``max_size`` bytes by removing the least recently
+    used values whenever a value is added.
+    '''
+
+    def __init__(self, directory, max_size):
+
+        self.directory = directory
+        self.max_size = max_size
+
+    def _value_filename(self, key):
+        return os.path.join(self.directory, key + _value_suffix)
+
+    def get(self, key):
+        '''Returns the value stored under ``key``, or ``None`` if there is
+        no such value.
+        '''
+        value_filename = self._value_filename(key)
+
+        try:
+            with open(value_filename, 'rb') as f:
+                value = pickle.load(f)
+
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        # The modification time records when the value was last used.
+        try:
+            os.utime(value_filename)
+        except OSError:
+            pass
+
+        return value
+
+    def put(self, key, value):
+        '''Stores ``value`` under ``key``, then removes the least recently
+        used values until the cache is no larger than ``max_size``.
+        '''
+        os.makedirs(self.directory, exist_ok=True)
+
+        # The value is written to a temporary file that is moved into
+        # place, so a partially written value is never read.
+        value_file, temporary_filename = tempfile.mkstemp(
+            dir=self.directory, suffix='.tmp')
+
+        try:
+            with os.fdopen(value_file, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            os.replace(temporary_filename, self._value_filename(key))
+
+        except BaseException:
+            os.remove(temporary_filename)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+
+        values = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(_value_suffix):
+                continue
+
+            try:
+                stat = os.stat(os.path.join(self.directory, filename))
+            except OSError:
+                continue
+
+            values.append((stat.st_mtime, stat.st_size, filename))
+
+        cache_size = sum(size for _, size, _ in values)
+
+        for _, size, filename in sorted(values):
+            if cache_size <= self.max_size:
+                break
+
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except OSError:
+                pass
+
+            cache_size -= size
+
+    def invalidate(self, key):
+        '''Removes the value stored under ``key``, if there is one.
+        '''
+        try:
+            os.remove(self._value_filename(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        '''Removes all the cached values.
+        '''
+        if os.path.exists(self.directory):
+            shutil.rmtree(self.directory)
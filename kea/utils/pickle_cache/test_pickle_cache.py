@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from .pickle_cache import PickleCache
+
+
+class TestPickleCache(TestCase):
+    '''There should be a size-bounded cache of pickled values on disk.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = PickleCache(
+            os.path.join(self.tmp_dir, 'cache'), 1024**2)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_and_put(self):
+        '''A value that is put in the cache should be returned by get, also
+        by a new cache on the same directory, and a missing value should
+        return None.
+        '''
+        self.assertIsNone(self.cache.get('a_key'))
+
+        self.cache.put('a_key', {'a': [1, 2, 3]})
+        self.assertEqual(self.cache.get('a_key'), {'a': [1, 2, 3]})
+        self.assertEqual(
+            PickleCache(self.cache.directory, 1024**2).get('a_key'),
+            {'a': [1, 2, 3]})
+
+        # No temporary files should be left behind
+        self.assertEqual(os.listdir(self.cache.directory), ['a_key.pickle'])
+
+    def test_unpicklable_value(self):
+        '''A value that cannot be pickled should not be stored, and should
+        not leave a partially written file.
+        '''
+        self.assertRaises(Exception, self.cache.put, 'a_key', lambda: None)
+
+        self.assertIsNone(self.cache.get('a_key'))
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_corrupt_value(self):
+        '''A value that cannot be read should be treated as missing.
+        '''
+        self.cache.put('a_key', [1, 2, 3])
+
+        with open(os.path.join(
+            self.cache.directory, 'a_key.pickle'), 'wb') as f:
+            f.write(b'garbage')
+
+        self.assertIsNone(self.cache.get('a_key'))
+
+    def test_lru_eviction(self):
+        '''When the cache is larger than max_size, the least recently used
+        values should be removed.
+        '''
+        self.cache.put('a', b'a' * 1000)
+        value_size = os.path.getsize(
+            os.path.join(self.cache.directory, 'a.pickle'))
+
+        self.cache.max_size = 2 * value_size
+
+        self.cache.put('b', b'b' * 1000)
+        for n, key in enumerate(('a', 'b')):
+            os.utime(
+                os.path.join(self.cache.directory, key + '.pickle'),
+                (n, n))
+
+        # Using a should make b the least recently used
+        self.assertIsNotNone(self.cache.get('a'))
+
+        self.cache.put('c', b'c' * 1000)
+
+        self.assertIsNone(self.cache.get('b'))
+        for key in ('a', 'c'):
+            self.assertEqual(self.cache.get(key), key.encode() * 1000)
+
+    def test_invalidate_and_clear(self):
+        '''invalidate should remove a value, and clear should remove all of
+        them.
+        '''
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+
+        self.cache.invalidate('a')
+        self.cache.invalidate('missing')
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), 2)
+
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('b'))
+        self.assertFalse(os.path.exists(self.cache.directory))
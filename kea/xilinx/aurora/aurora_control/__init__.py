@@ -1 +1,4 @@
-from ._aurora_64b_66b_control import aurora_64b_66b_control
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._aurora_64b_66b_control': ['aurora_64b_66b_control']})
@@ -1,4 +1,8 @@
-from .buffers import xil_ibufds, xil_bufio, xil_bufr, xil_bufmr, xil_iobuf
-from .input_delay import xil_input_delay, xil_input_delay_control
-from .serdes import xil_serdes
-from .oddr import xil_oddr
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '.buffers': [
+        'xil_ibufds', 'xil_bufio', 'xil_bufr', 'xil_bufmr', 'xil_iobuf'],
+    '.input_delay': ['xil_input_delay', 'xil_input_delay_control'],
+    '.serdes': ['xil_serdes'],
+    '.oddr': ['xil_oddr']})
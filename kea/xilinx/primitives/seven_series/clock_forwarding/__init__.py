@@ -1 +1,4 @@
-from ._clock_forwarding_oddr import clock_forwarding_oddr
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._clock_forwarding_oddr': ['clock_forwarding_oddr']})
@@ -1,2 +1,5 @@
-from ._n_bit_tri_state_buffers import n_bit_tri_state_buffers
-from .interfaces import NBitsTriStateBuffersIOInterface
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '._n_bit_tri_state_buffers': ['n_bit_tri_state_buffers'],
+    '.interfaces': ['NBitsTriStateBuffersIOInterface']})
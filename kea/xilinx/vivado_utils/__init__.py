@@ -1,3 +1,18 @@
-from .utils import VIVADO_EXECUTABLE, VIVADO_VERSION, KeaConversionError
-from .cosimulation import *
-from .vivado_ip import *
+from kea.utils.lazy_loading import lazy_loader
+
+__getattr__, __dir__ = lazy_loader(__name__, {
+    '.utils': [
+        'VIVADO_EXECUTABLE', 'VIVADO_VERSION', 'KeaConversionError',
+        'VivadoTimeoutError'],
+    '.session': ['VivadoSession', 'VivadoTclError', 'get_vivado_session'],
+    '.xsim': ['XsimFlow'],
+    '.result_cache': ['CosimulationResultCache'],
+    '.timings': ['CosimulationTimings'],
+    '.output_parsing': [
+        'VivadoSignalValues', 'read_signal_outputs', 'read_axi_stream_output'],
+    '.cosimulation': [
+        'vivado_vhdl_cosimulation', 'vivado_verilog_cosimulation',
+        'vivado_vhdl_batch_cosimulation', 'vivado_verilog_batch_cosimulation',
+        'VivadoError'],
+    '.scheduler': ['VivadoCosimulationScheduler'],
+    '.vivado_ip': ['VivadoIP', 'PortDirection']})
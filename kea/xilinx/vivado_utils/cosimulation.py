@@ -2,25 +2,36 @@
 from kea.testing.myhdl import (
     SynchronousTest, AxiStreamOutput, SignalOutput, AVAILABLE_TIME_UNITS,
     cosimulation)
+from kea.testing.myhdl.cosimulation import _online_mismatch_error
+from kea.testing.myhdl.hdl_blocks import _get_signal_names_to_port_names
 
 import kea
 
+from .utils import VivadoError, _start_process, _communicate
+from .session import VivadoTclError, get_vivado_session
+from .xsim import XsimFlow
+from .result_cache import CosimulationResultCache
+from .timings import CosimulationTimings
+from .output_parsing import (
+    VivadoSignalValues, read_signal_outputs, read_axi_stream_output,
+    _OutputFileReader,
+    _signal_values, _axi_stream_transactions)
+
 from myhdl import *
 import myhdl
 from myhdl.conversion._toVHDL import _shortversion
 myhdl_vhdl_package_filename = "pck_myhdl_%s.vhd" % _shortversion
 
-from collections import deque
-
 import tempfile
 import os
 import string
 import shutil
 import subprocess
-import csv
-import copy
-import re
 import collections
+import contextlib
+
+import numpy as np
+import threading
 import warnings
 
 try: # pragma: no branch
@@ -31,7 +42,13 @@ except ImportError:
     from configparser import RawConfigParser
 
 __all__ = ['vivado_vhdl_cosimulation', 'vivado_verilog_cosimulation',
-           'VivadoError']
+           'vivado_vhdl_batch_cosimulation',
+           'vivado_verilog_batch_cosimulation', 'VivadoError']
+
+# MyHDL keeps the state of simulations and conversions in globals, so only
+# one cosimulation in the process can be simulating or converting at a time.
+# The Vivado simulations are run outside the lock.
+_myhdl_lock = threading.Lock()
 
 _simulate_tcl_template = string.Template('''
 create_project $project_name $project_path -part $part
@@ -80,56 +97,242 @@ def _populate_vivado_ip_list(block, hdl):
 
     return vivado_ip_list
 
-def _get_signal_names_to_port_names(filename, comment_string):
+def _get_file_signal_names_to_port_names(filename, comment_string):
 
     with open(filename) as f:
-        code = f.read()
+        return _get_signal_names_to_port_names(f.read(), comment_string)
 
-    signal_name_mappings = {}
-    for each in re.finditer(
-        '^%s <name_annotation>.*?$' % comment_string, code, re.MULTILINE):
-        vals = code[each.start():each.end()].split()
 
-        signal_name_mappings[vals[2]] = vals[3]
+def _read_vivado_outputs(
+    signal_output_path, tmp_dir, axi_stream_out_interfaces):
+    '''Reads the outputs of the dut that were written to file by the Vivado
+    simulation.
+    '''
+    vivado_outputs = read_signal_outputs(signal_output_path)
 
-    return signal_name_mappings
+    for each_interface in axi_stream_out_interfaces:
+        axi_out_filename = os.path.join(
+            tmp_dir, 'axi_stream_out' + '_' + each_interface)
 
+        vivado_outputs[each_interface] = read_axi_stream_output(
+            axi_out_filename)
 
-class VivadoError(RuntimeError):
-    pass
+    return vivado_outputs
 
-def _vivado_generic_cosimulation(
-    target_language, cycles, dut_factory, ref_factory, args,
-    arg_types, period, custom_sources,
-    enforce_convertible_top_level_interfaces, keep_temp_files, config_file,
-    template_path_prefix, vcd_name, time_units):
+class _OnlineComparator(object):
+    '''Compares the outputs of the dut that are written to file by a Vivado
+    simulation with the outputs of the ref, while the simulation runs.
 
-    if kea.xilinx.vivado_utils.VIVADO_EXECUTABLE is None:
-        raise EnvironmentError('Vivado executable not in path')
+    Each call to :meth:`poll` compares the rows that have been written to
+    the files since the last call. ``compared_signals`` are the names of the
+    signals that are compared on every cycle, and the completed packets on
+    the ``axi_stream_out_interfaces`` are compared as they are written.
 
-    if period is None:
-        period = cosimulation.PERIOD
+    Once a divergence is found, the rows for ``mismatch_window`` more cycles
+    are read before a :class:`CosimulationMismatchError` is raised, so the
+    error reports the values around the divergence just as the online
+    comparison of :meth:`SynchronousTest.cosimulate` does.
+    '''
 
-    if time_units not in AVAILABLE_TIME_UNITS:
-        raise ValueError(
-            'Invalid time unit. Please select from: ' +
-            ', '.join(AVAILABLE_TIME_UNITS))
+    def __init__(self, signal_output_path, tmp_dir, axi_stream_out_interfaces,
+                 compared_signals, dut_outputs, ref_outputs, outputs_length,
+                 mismatch_window):
+
+        self.signal_output_path = signal_output_path
+        self.tmp_dir = tmp_dir
+        self.axi_stream_out_interfaces = axi_stream_out_interfaces
+        self.compared_signals = compared_signals
+        self.dut_outputs = dut_outputs
+        self.ref_outputs = ref_outputs
+        self.outputs_length = outputs_length
+        self.mismatch_window = mismatch_window
+
+        self.mismatch = None
+
+        self._signal_reader = _OutputFileReader(signal_output_path)
+        self._axi_readers = {
+            each_interface: _OutputFileReader(
+                os.path.join(tmp_dir, 'axi_stream_out_' + each_interface))
+            for each_interface in axi_stream_out_interfaces}
+
+        # The packet currently being written and the number of completed
+        # packets on each stream of each interface.
+        self._current_packets = {
+            each_interface: {} for each_interface in axi_stream_out_interfaces}
+        self._packet_counts = {
+            each_interface: {} for each_interface in axi_stream_out_interfaces}
+
+    def poll(self):
+        '''Compares the rows written since the last call. Raises a
+        :class:`CosimulationMismatchError` once ``mismatch_window`` cycles
+        have been written after a divergence.
+        '''
+        self._read()
+
+        if self.mismatch is not None and (
+            self._signal_reader.n_rows >
+            self.mismatch['cycle'] + self.mismatch_window):
+
+            raise self._mismatch_error()
+
+    def finish(self):
+        '''Compares the rest of the rows once the simulation has finished,
+        and raises a :class:`CosimulationMismatchError` if the dut diverged
+        from the ref.
+        '''
+        self._read()
+
+        if self.mismatch is not None:
+            raise self._mismatch_error()
+
+    def compare_outputs(self, vivado_outputs):
+        '''Compares all of ``vivado_outputs``, the outputs of a simulation
+        that has already been run (for example, a cached result), and raises
+        a :class:`CosimulationMismatchError` if the dut diverged from the
+        ref.
+        '''
+        self._compare_signals(vivado_outputs, 0)
+
+        for each_interface in self.axi_stream_out_interfaces:
+            packets = vivado_outputs[each_interface]['packets']
+
+            for stream in sorted(packets):
+                for packet in packets[stream]:
+                    self._compare_packet(each_interface, stream, packet)
+
+        if self.mismatch is not None:
+            raise self._mismatch_error(vivado_outputs)
+
+    def _read(self):
+
+        start_cycle = self._signal_reader.n_rows
+        signal_values = _signal_values(*self._signal_reader.read())
+
+        if self.mismatch is None:
+            self._compare_signals(signal_values, start_cycle)
+
+        for each_interface in self.axi_stream_out_interfaces:
+            transactions = _axi_stream_transactions(
+                *self._axi_readers[each_interface].read())
+
+            if transactions is None:
+                continue
 
-    config = RawConfigParser()
-    with open(config_file) as f:
-        config.read_file(f)
+            current_packets = self._current_packets[each_interface]
+
+            for tdata, tlast, stream in zip(
+                transactions[0], transactions[1].tolist(),
+                transactions[2].tolist()):
+
+                stream = tuple(stream)
+                current_packets.setdefault(stream, []).append(tdata)
 
-    sim_object = SynchronousTest(
-        dut_factory, ref_factory, args, arg_types, period, custom_sources,
-        enforce_convertible_top_level_interfaces, time_units=time_units)
+                if tlast:
+                    self._compare_packet(
+                        each_interface, stream, current_packets.pop(stream))
 
-    # We need to create the test data
-    myhdl_outputs = sim_object.cosimulate(cycles, vcd_name=vcd_name)
+    def _compare_signals(self, signal_values, start_cycle):
+        '''Compares the values of the signals from ``start_cycle`` with those
+        of the ref, recording the earliest divergence.
+        '''
+        n_cycles = self.outputs_length - start_cycle
+
+        for name in self.compared_signals:
+            if name not in signal_values or n_cycles <= 0:
+                continue
+
+            values = signal_values[name][:n_cycles]
+            ref_values = self.ref_outputs[name][
+                start_cycle:start_cycle + len(values)]
+
+            ref_values = np.array(
+                [int(value) for value in ref_values],
+                dtype=values.values.dtype)
+
+            diverged = np.flatnonzero(
+                values.undefined | (values.values != ref_values))
+
+            if len(diverged) == 0:
+                continue
+
+            cycle = start_cycle + int(diverged[0])
+
+            if self.mismatch is None or cycle < self.mismatch['cycle']:
+                self.mismatch = {
+                    'type': 'signal', 'name': name, 'cycle': cycle}
+
+    def _compare_packet(self, interface, stream, packet):
+        '''Compares a completed packet with the ref packet in the same
+        position on the same stream.
+        '''
+        packet_index = self._packet_counts[interface].get(stream, 0)
+        self._packet_counts[interface][stream] = packet_index + 1
+
+        if self.mismatch is not None:
+            return
+
+        ref_packets = self.ref_outputs[interface]['packets'].get(stream, [])
+
+        if packet_index < len(ref_packets):
+            ref_packet = list(ref_packets[packet_index])
+        else:
+            ref_packet = None
+
+        if ref_packet != list(packet):
+            self.mismatch = {
+                'type': 'axi_stream', 'name': interface,
+                'cycle': self._signal_reader.n_rows, 'stream': stream,
+                'packet_index': packet_index, 'ref_packet': ref_packet,
+                'dut_packet': list(packet)}
+
+    def _mismatch_error(self, vivado_outputs=None):
+
+        if vivado_outputs is None:
+            vivado_outputs = _read_vivado_outputs(
+                self.signal_output_path, self.tmp_dir,
+                self.axi_stream_out_interfaces)
+
+        dut_outputs = self.dut_outputs.copy()
+        dut_outputs.update(vivado_outputs)
+
+        return _online_mismatch_error(
+            self.mismatch, (dut_outputs, self.ref_outputs),
+            self.mismatch_window)
+
+# The types of the dut arguments that are not played back by the convertible
+# top level from look-up tables (or files).
+_unplayed_arg_types = (
+    'non-signal', 'clock', 'output', 'axi_stream_out', 'axi_stream_in')
+
+def _stimulus_entries(sim_object, outputs_length):
+    '''Returns the number of stimulus values that are played back by the
+    convertible top level of ``sim_object``.
+    '''
+    n_played_back_signals = sum(
+        1 for each_signal in sim_object.elaborated_dut_args
+        if each_signal.type not in _unplayed_arg_types)
 
+    stimulus_entries = n_played_back_signals * outputs_length
 
+    for axi_bfm in sim_object.axi_stream_in_ref_bfms.values():
+        stimulus_entries += len(axi_bfm.signal_record['TDATA'])
+
+    return stimulus_entries
+
+def _total_file_size(filenames):
+    return sum(
+        os.path.getsize(filename) for filename in filenames
+        if os.path.exists(filename))
+
+def _myhdl_case_outputs(sim_object, myhdl_outputs):
+    '''Returns the dut and ref outputs of a MyHDL simulation of a case,
+    along with the number of cycles that were recorded and the names of the
+    output signals.
+    '''
     # Most of the dut outputs will be the same as ref, we then overwrite
-    # the others from the written file.
-    dut_outputs = copy.deepcopy(myhdl_outputs[1])
+    # the others from the written file. Only the mapping is copied; the
+    # overwritten values are replaced rather than modified in place.
+    dut_outputs = myhdl_outputs[1].copy()
     ref_outputs = myhdl_outputs[1]
 
     # StopSimulation might be been called, so we should handle that.
@@ -137,6 +340,7 @@ def _vivado_generic_cosimulation(
     # outputs_length is the number of cycles we use for the vivado
     # cosimulation
     outputs_length = None
+    compared_signals = []
     for each_signal in ref_outputs:
 
         if not isinstance(ref_outputs[each_signal], SignalOutput):
@@ -148,6 +352,7 @@ def _vivado_generic_cosimulation(
         if sim_object.elaborated_args[each_signal].type == 'output':
             # We also delete outputs which again should be added back in
             del dut_outputs[each_signal]
+            compared_signals.append(each_signal)
 
         _length = len(ref_outputs[each_signal])
 
@@ -158,9 +363,100 @@ def _vivado_generic_cosimulation(
 
     assert outputs_length is not None
 
+    return dut_outputs, ref_outputs, outputs_length, compared_signals
+
+def _vivado_generic_cosimulation(
+    target_language, cycles, dut_factory, ref_factory, cases,
+    arg_types, period,
+    enforce_convertible_top_level_interfaces, keep_temp_files, config_file,
+    template_path_prefix, vcd_name, time_units, persistent_session=False,
+    non_project_flow=False, library_cache_directory=None,
+    cache_results=False, result_cache_directory=None,
+    output_format='binary', file_stimulus=False, timeout=None,
+    timing_handler=None, compare_online=False, mismatch_window=5,
+    reset_cycles_between_cases=2):
+    '''Runs a Vivado cosimulation of each of ``cases``, a list of
+    ``(args, custom_sources, cycles)`` tuples, and returns a list of the
+    ``(dut_outputs, ref_outputs)`` of each case. All the cases are run in a
+    single Vivado simulation.
+    '''
+
+    if kea.xilinx.vivado_utils.VIVADO_EXECUTABLE is None:
+        raise EnvironmentError('Vivado executable not in path')
+
+    if period is None:
+        period = cosimulation.PERIOD
+
+    if time_units not in AVAILABLE_TIME_UNITS:
+        raise ValueError(
+            'Invalid time unit. Please select from: ' +
+            ', '.join(AVAILABLE_TIME_UNITS))
+
+    if persistent_session and non_project_flow:
+        raise ValueError(
+            'The non-project flow does not run in a Vivado session, so '
+            'persistent_session and non_project_flow cannot both be set.')
+
+    if persistent_session and timeout is not None:
+        raise ValueError(
+            'A timeout cannot be set on a simulation in the persistent '
+            'session.')
+
+    if compare_online and len(cases) > 1:
+        raise ValueError(
+            'Online comparison is not supported for a batch of cases.')
+
+    config = RawConfigParser()
+    with open(config_file) as f:
+        config.read_file(f)
+
+    timings = CosimulationTimings()
+
+    sim_objects = []
+    case_outputs = []
+    for args, custom_sources, case_cycles in cases:
+        with _myhdl_lock, timings.phase('myhdl_simulation'):
+            sim_object = SynchronousTest(
+                dut_factory, ref_factory, args, arg_types, period,
+                custom_sources, enforce_convertible_top_level_interfaces,
+                time_units=time_units)
+
+            # We need to create the test data
+            myhdl_outputs = sim_object.cosimulate(
+                case_cycles, vcd_name=vcd_name)
+
+        sim_objects.append(sim_object)
+        case_outputs.append(_myhdl_case_outputs(sim_object, myhdl_outputs))
+
+    # The first case is converted, with the stimulus of every case played
+    # back in turn.
+    sim_object = sim_objects[0]
+    dut_outputs, ref_outputs, outputs_length, compared_signals = (
+        case_outputs[0])
+
+    if len(sim_objects) > 1:
+        stimulus_tests = sim_objects
+    else:
+        stimulus_tests = None
+
+    # The cycle on which the outputs of each case start in the Vivado
+    # simulation.
+    case_offsets = []
+    playback_length = 0
+    for _, _, each_outputs_length, _ in case_outputs:
+        if len(case_offsets) > 0:
+            playback_length += reset_cycles_between_cases
+
+        case_offsets.append(playback_length)
+        playback_length += each_outputs_length
+
     # One cycle is lost in the vivado simulation for the propagation
     # delay between reading and writing.
-    _cycles = outputs_length + 1
+    _cycles = playback_length + 1
+
+    timings.cycles = _cycles
+    timings.sizes['stimulus_entries'] = _stimulus_entries(
+        sim_object, playback_length)
 
     # FIXME
     tmp_dir = tempfile.mkdtemp()
@@ -168,7 +464,19 @@ def _vivado_generic_cosimulation(
     signal_output_filename = 'signal_outputs'
     signal_output_path = os.path.join(tmp_dir, signal_output_filename)
 
+    if file_stimulus:
+        stimulus_filename_prefix = 'stimulus'
+    else:
+        stimulus_filename_prefix = None
+
+    # The lock is held from the conversion until the converted files have
+    # been written.
+    conversion_lock = contextlib.ExitStack()
+
     try:
+        conversion_lock.enter_context(_myhdl_lock)
+        conversion_lock.enter_context(timings.phase('conversion'))
+
         project_name = 'tmp_project'
         project_path = os.path.join(tmp_dir, project_name)
 
@@ -208,6 +516,7 @@ def _vivado_generic_cosimulation(
                  'time_units': time_units,})
 
         else:
+            vcd_filename = None
             vcd_capture_script = ''
 
         if target_language == 'VHDL':
@@ -228,7 +537,11 @@ def _vivado_generic_cosimulation(
             # Generate the output VHDL files
             convertible_top = sim_object.dut_convertible_top(
                 tmp_dir, signal_output_filename=signal_output_filename,
-                axi_stream_packets_filename_prefix='axi_stream_out')
+                axi_stream_packets_filename_prefix='axi_stream_out',
+                output_format=output_format,
+                stimulus_filename_prefix=stimulus_filename_prefix,
+                stimulus_tests=stimulus_tests,
+                reset_cycles_between_tests=reset_cycles_between_cases)
 
             ip_list = set(_populate_vivado_ip_list(convertible_top, 'VHDL'))
 
@@ -274,7 +587,7 @@ def _vivado_generic_cosimulation(
 
                 vhdl_conversion_warnings = w
 
-            signal_name_mappings = _get_signal_names_to_port_names(
+            signal_name_mappings = _get_file_signal_names_to_port_names(
                 convertible_top_filename, '--')
 
             for warning in vhdl_conversion_warnings:
@@ -307,7 +620,11 @@ def _vivado_generic_cosimulation(
             # Generate the output Verilog files
             convertible_top = sim_object.dut_convertible_top(
                 tmp_dir, signal_output_filename=signal_output_filename,
-                axi_stream_packets_filename_prefix='axi_stream_out')
+                axi_stream_packets_filename_prefix='axi_stream_out',
+                output_format=output_format,
+                stimulus_filename_prefix=stimulus_filename_prefix,
+                stimulus_tests=stimulus_tests,
+                reset_cycles_between_tests=reset_cycles_between_cases)
 
             ip_list = set(_populate_vivado_ip_list(convertible_top, 'Verilog'))
 
@@ -343,7 +660,7 @@ def _vivado_generic_cosimulation(
 
                 verilog_conversion_warnings = w
 
-            signal_name_mappings = _get_signal_names_to_port_names(
+            signal_name_mappings = _get_file_signal_names_to_port_names(
                 convertible_top_filename, '//')
 
             for warning in verilog_conversion_warnings:
@@ -365,6 +682,13 @@ def _vivado_generic_cosimulation(
             raise ValueError('Target language must be \'Verilog\' or '
                              '\'VHDL\'')
 
+        conversion_lock.close()
+
+        if non_project_flow and len(ip_list) > 0:
+            raise ValueError(
+                'The non-project flow does not support Vivado IP. Use the '
+                'project flow to simulate a dut that uses Vivado IP.')
+
         for each_hdl_file in (vhdl_files + verilog_files +
                               ip_additional_hdl_files):
             # The files should all now exist
@@ -373,333 +697,224 @@ def _vivado_generic_cosimulation(
                     'An expected HDL file is missing: %s'
                     % (each_hdl_file))
 
-        vhdl_files_string = ' '.join(vhdl_files)
-        verilog_files_string = ' '.join(verilog_files)
-        ip_additional_hdl_files_string = ' '.join(ip_additional_hdl_files)
-
-        template_substitutions = {
-            'target_language': target_language,
-            'part': config.get('General', 'part'),
-            'project_name': project_name,
-            'project_path': project_path,
-            'time': time,
-            'load_and_configure_ips': load_and_configure_ips_tcl_string,
-            'vhdl_files': vhdl_files_string,
-            'verilog_files': verilog_files_string,
-            'ip_additional_hdl_files': ip_additional_hdl_files_string,
-            'vcd_capture_script': vcd_capture_script,
-            'time_units': time_units,}
-
-        simulate_script = _simulate_tcl_template.safe_substitute(
-            template_substitutions)
-
-        simulate_script_filename = os.path.join(
-            tmp_dir, 'simulate_script.tcl')
-
-        with open(simulate_script_filename, 'w') as simulate_script_file:
-            simulate_script_file.write(simulate_script)
-
-        vivado_process = subprocess.Popen(
-            [kea.xilinx.vivado_utils.VIVADO_EXECUTABLE, '-nolog',
-             '-nojournal', '-mode', 'batch', '-source',
-             simulate_script_filename],
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE)
-
-        out, err = vivado_process.communicate()
-
-        if err != b'':
-            if target_language == 'VHDL':
-                xvhdl_log_filename = os.path.join(
-                    tmp_dir, 'tmp_project', 'tmp_project.sim', 'sim_1',
-                    'behav', 'xvhdl.log')
-
-                if xvhdl_log_filename.encode() in err:
-                    with open(xvhdl_log_filename, 'r') as log_file:
-                        err += '\n'
-                        err += 'xvhdl.log:\n'
-                        err += log_file.read()
-
-                raise VivadoError(
-                    'Error running the Vivado VHDL simulator:\n%s' % err)
-
-            elif target_language == 'Verilog':
-                xvhdl_log_filename = os.path.join(
-                    tmp_dir, 'tmp_project', 'tmp_project.sim', 'sim_1',
-                    'behav', 'xvlog.log')
-
-                if xvhdl_log_filename.encode() in err:
-                    with open(xvhdl_log_filename, 'r') as log_file:
-                        err += '\n'
-                        err += 'xvlog.log:\n'
-                        err += log_file.read()
-
-                raise VivadoError(
-                    'Error running the Vivado Verilog simulator:\n%s' % err)
-
-        with open(signal_output_path, 'r') as signal_output_file:
-            signal_reader = csv.DictReader(signal_output_file, delimiter=',')
-
-            vivado_signals = [row for row in signal_reader]
-
-        vivado_signal_keys = vivado_signals[0].keys()
-
-        # Rearrange the output signals into the correct form
-        _vivado_signals = {key: [] for key in vivado_signals[0].keys()}
-
-        for each_row in vivado_signals:
-            for each_key in vivado_signal_keys:
-                _vivado_signals[each_key].append(each_row[each_key])
-
-        vivado_signals = _vivado_signals
-
-        interface_outputs = {}
-        siglist_outputs = {}
-        for each_signal_name_str in vivado_signals:
-
-            each_dut_outputs = []
-
-            sig_container, signal_type, each_signal = (
-                each_signal_name_str.split(' '))
-
-            for dut_str_value in vivado_signals[each_signal_name_str]:
-                try:
-                    if signal_type == 'bool':
-                        each_value = bool(int(dut_str_value))
-                    else:
-                        # We assume an intbv
-                        _each_value = (
-                            intbv(dut_str_value)[len(dut_str_value):])
-
-                        if signal_type =='signed':
-                            each_value = _each_value.signed()
-                        else:
-                            each_value = _each_value
-
-                except ValueError:
-                    # Probably an undefined.
-                    each_value = None
-
-                each_dut_outputs.append(each_value)
-
-            dut_outputs[each_signal] = each_dut_outputs
-
-#            # add each per-signal list into a data structure that
-#            # can be easily turned into the correct output when it is not
-#            # possible to add it directly.
-#            if sig_container == 'interface':
-#                output_name_list = each_signal.split('.')
-#
-#                # We have an interface, so group the recorded signals
-#                # of the interface together.
-#
-#                # FIXME Only one level of interface supported
-#                interface_outputs.setdefault(
-#                    output_name_list[0], {})[output_name_list[1]] = (
-#                        each_dut_outputs)
-#
-#            elif sig_container == 'list':
-#                # We have a list
-#                parsed_header = re.search(
-#                    '(?P<list_name>.*)\[(?P<index>.*)\]', each_signal)
-#
-#                siglist_name = parsed_header.group('list_name')
-#                siglist_index = int(parsed_header.group('index'))
-#
-#                siglist_outputs.setdefault(
-#                    siglist_name, {})[siglist_index] = each_dut_outputs
-#
-#            else:
-#                # We have a normal signal
-#                dut_outputs[each_signal] = each_dut_outputs
-
-        # Now convert the data structures into suitable outputs.
-
-#        for each_siglist in siglist_outputs:
-#
-#            # Order the values by the siglist_index
-#            ordered_siglist_output = collections.OrderedDict(sorted(
-#                siglist_outputs[each_siglist].items(), key=lambda t: t[0]))
-#
-#            new_dut_output = []
-#
-#            for each_list_out in zip(*ordered_siglist_output.values()):
-#                new_dut_output.append(list(each_list_out))
-#
-#            dut_outputs[each_siglist] = new_dut_output
-#
-#        for each_interface in interface_outputs:
-#
-#            signal_type = arg_types[each_interface]
-#
-#            attr_names = interface_outputs[each_interface].keys()
-#
-#            reordered_interface_outputs =  zip(
-#                *(interface_outputs[each_interface][key] for
-#                  key in attr_names))
-#
-#            # We need to write the interface values to dut_outputs, but
-#            # taking the values from ref_outputs if the interface signal was
-#            # not an output.
-#            new_dut_output = []
-#
-#            if signal_type == 'axi_stream_out':
-#                for ref_output, simulated_output in zip(
-#                    ref_outputs[each_interface]['signals'],
-#                    reordered_interface_outputs):
-#
-#                    new_interface_out = ref_output.copy()
-#                    new_interface_out.update(
-#                        dict(zip(attr_names, simulated_output)))
-#
-#                    new_dut_output.append(new_interface_out)
-#
-#                    dut_outputs[each_interface] = {'signals': new_dut_output}
-#            else:
-#                for ref_output, simulated_output in zip(
-#                    ref_outputs[each_interface], reordered_interface_outputs):
-#
-#                    new_interface_out = ref_output.copy()
-#                    new_interface_out.update(
-#                        dict(zip(attr_names, simulated_output)))
-#
-#                    new_dut_output.append(new_interface_out)
-#
-#                    dut_outputs[each_interface] = new_dut_output
-
-        # Now extract the axi signals
-        for each_interface in (
-            sim_object.elaborated_args.axi_stream_out_interfaces):
-
-            completed_packets = {}
+        if stimulus_filename_prefix is not None:
+            stimulus_files = sorted(
+                os.path.join(tmp_dir, filename) for filename in
+                os.listdir(tmp_dir) if
+                filename.startswith(stimulus_filename_prefix))
+        else:
+            stimulus_files = []
+
+        timings.sizes['hdl_bytes'] = _total_file_size(
+            (vhdl_dut_files if target_language == 'VHDL' else
+             verilog_dut_files) + ip_additional_hdl_files)
+        timings.sizes['stimulus_file_bytes'] = _total_file_size(
+            stimulus_files)
+
+        if cache_results and vcd_name is None:
+            # The stimulus is in the converted top level or in the stimulus
+            # files, so those files, the part and the length of the
+            # simulation determine the outputs.
+            with timings.phase('cache_lookup'):
+                result_cache = CosimulationResultCache(result_cache_directory)
+                result_key = result_cache.key(
+                    vhdl_files + verilog_files + ip_additional_hdl_files +
+                    stimulus_files,
+                    (target_language, config.get('General', 'part'), time,
+                     time_units, load_and_configure_ips_tcl_string,
+                     kea.xilinx.vivado_utils.VIVADO_VERSION),
+                    temporary_directory=tmp_dir)
+
+                vivado_outputs = result_cache.get(result_key)
+
+            timings.cached = vivado_outputs is not None
 
-            axi_out_filename = os.path.join(
-                tmp_dir, 'axi_stream_out' + '_' + each_interface)
+        else:
+            result_cache = None
+            vivado_outputs = None
 
-            with open(axi_out_filename, 'r') as axi_out_file:
-                axi_packet_reader = csv.DictReader(
-                    axi_out_file, delimiter=',')
-                vivado_axi_packet = [row for row in axi_packet_reader]
+        if compare_online:
+            online_comparator = _OnlineComparator(
+                signal_output_path, tmp_dir,
+                sim_object.elaborated_args.axi_stream_out_interfaces,
+                compared_signals, dut_outputs, ref_outputs, outputs_length,
+                mismatch_window)
 
-            current_packets = {}
-            for transaction in vivado_axi_packet:
+            if vivado_outputs is not None:
+                online_comparator.compare_outputs(vivado_outputs)
 
-                if 'TID' in transaction.keys():
-                    stream_id = int(transaction['TID'], 2)
-                else:
-                    stream_id = 0
+            monitor = online_comparator.poll
 
-                if 'TDEST' in transaction.keys():
-                    stream_dest = int(transaction['TDEST'], 2)
+        else:
+            online_comparator = None
+            monitor = None
+
+        if vivado_outputs is None:
+            with timings.phase('tcl_generation'):
+                vhdl_files_string = ' '.join(vhdl_files)
+                verilog_files_string = ' '.join(verilog_files)
+                ip_additional_hdl_files_string = ' '.join(
+                    ip_additional_hdl_files)
+
+                template_substitutions = {
+                    'target_language': target_language,
+                    'part': config.get('General', 'part'),
+                    'project_name': project_name,
+                    'project_path': project_path,
+                    'time': time,
+                    'load_and_configure_ips': (
+                        load_and_configure_ips_tcl_string),
+                    'vhdl_files': vhdl_files_string,
+                    'verilog_files': verilog_files_string,
+                    'ip_additional_hdl_files': ip_additional_hdl_files_string,
+                    'vcd_capture_script': vcd_capture_script,
+                    'time_units': time_units,}
+
+                simulate_script = _simulate_tcl_template.safe_substitute(
+                    template_substitutions)
+
+                simulate_script_filename = os.path.join(
+                    tmp_dir, 'simulate_script.tcl')
+
+                with open(simulate_script_filename, 'w') as f:
+                    f.write(simulate_script)
+
+            if non_project_flow:
+                if target_language == 'VHDL':
+                    # The MyHDL package is the same for every conversion, so
+                    # it is compiled into the cached library with the
+                    # dependencies.
+                    dependency_files = [
+                        os.path.join(tmp_dir, myhdl_vhdl_package_filename)] + (
+                            vhdl_dependencies)
                 else:
-                    stream_dest = 0
-
-                stream = (stream_id, stream_dest)
-                if stream not in current_packets.keys():
-                    current_packets[stream] = deque([])
+                    dependency_files = verilog_dependencies
 
-                current_packets[stream].append(
-                    int(transaction['TDATA'], 2))
-                try:
-                    if int(transaction['TLAST']):
+                xsim_run_path = os.path.join(tmp_dir, 'xsim_run')
+                os.mkdir(xsim_run_path)
 
-                        if stream not in completed_packets.keys():
-                            completed_packets[stream] = deque([])
+                xsim_flow = XsimFlow(cache_directory=library_cache_directory)
+                xsim_flow.simulate(
+                    target_language, dependency_files,
+                    [convertible_top_filename],
+                    'dut_convertible_top', xsim_run_path, time, time_units,
+                    vcd_filename=vcd_filename, timeout=timeout,
+                    timings=timings, monitor=monitor)
 
-                        completed_packets[stream].append(
-                            current_packets[stream])
+                err = b''
 
-                        del(current_packets[stream])
-                except KeyError:
-                    pass
+            elif persistent_session:
+                session = get_vivado_session()
 
-            for stream in completed_packets.keys():
-                if len(completed_packets[stream]) == 0:
-                    del(completed_packets[stream])
-
-            for stream in current_packets.keys():
-                if len(current_packets[stream]) == 0:
-                    del(current_packets[stream])
-
-            axi_signal_output = AxiStreamOutput({
-                'packets': completed_packets,
-                'incomplete_packet': current_packets})
-
-            dut_outputs[each_interface] = axi_signal_output
-
-#        for each_signal in ref_outputs:
-#
-#            completed_packets = {}
-#            if arg_types[each_signal] == 'axi_stream_out':
-#                axi_out_filename = os.path.join(
-#                    tmp_dir, 'axi_stream_out' + '_' + each_signal)
-#
-#                with open(axi_out_filename, 'r') as axi_out_file:
-#                    axi_packet_reader = csv.DictReader(
-#                        axi_out_file, delimiter=',')
-#                    vivado_axi_packet = [row for row in axi_packet_reader]
-#
-#                current_packets = {}
-#                for transaction in vivado_axi_packet:
-#
-#                    if 'TID' in transaction.keys():
-#                        stream_id = int(transaction['TID'], 2)
-#                    else:
-#                        stream_id = 0
-#
-#                    if 'TDEST' in transaction.keys():
-#                        stream_dest = int(transaction['TDEST'], 2)
-#                    else:
-#                        stream_dest = 0
-#
-#                    stream = (stream_id, stream_dest)
-#                    if stream not in current_packets.keys():
-#                        current_packets[stream] = deque([])
-#
-#                    current_packets[stream].append(
-#                        int(transaction['TDATA'], 2))
-#                    try:
-#                        if int(transaction['TLAST']):
-#
-#                            if stream not in completed_packets.keys():
-#                                completed_packets[stream] = deque([])
-#
-#                            completed_packets[stream].append(
-#                                current_packets[stream])
-#
-#                            del(current_packets[stream])
-#                    except KeyError:
-#                        pass
-#
-#                for stream in completed_packets.keys():
-#                    if len(completed_packets[stream]) == 0:
-#                        del(completed_packets[stream])
-#
-#                for stream in current_packets.keys():
-#                    if len(current_packets[stream]) == 0:
-#                        del(current_packets[stream])
-#
-#                dut_outputs[each_signal]['packets'] = completed_packets
-#                dut_outputs[each_signal]['incomplete_packet'] = (
-#                    current_packets)
-        for each_signal in ref_outputs:
-            if not isinstance(ref_outputs[each_signal], SignalOutput):
-                continue
-
-            # Now only output the correct number of cycles
-            ref_outputs[each_signal] = (
-                ref_outputs[each_signal][:outputs_length])
-            dut_outputs[each_signal] = (
-                dut_outputs[each_signal][:outputs_length])
+                try:
+                    with timings.phase('vivado'):
+                        session.source(simulate_script_filename)
+                    err = b''
+                except VivadoTclError as e:
+                    # The log includes the output of the simulator tools.
+                    err = ('%s\n%s' % (e, e.log)).encode()
+                except VivadoError as e:
+                    err = str(e).encode()
+                finally:
+                    # Leave the session ready for the next test, whatever state
+                    # the script left it in.
+                    if session.running:
+                        session.reset()
+
+            else:
+                with timings.phase('vivado'):
+                    vivado_process = _start_process(
+                        [kea.xilinx.vivado_utils.VIVADO_EXECUTABLE, '-nolog',
+                         '-nojournal', '-mode', 'batch', '-source',
+                         simulate_script_filename],
+                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE)
+
+                    out, err = _communicate(
+                        vivado_process, timeout, monitor)
+
+            if err != b'':
+                if target_language == 'VHDL':
+                    xvhdl_log_filename = os.path.join(
+                        tmp_dir, 'tmp_project', 'tmp_project.sim', 'sim_1',
+                        'behav', 'xvhdl.log')
+
+                    if xvhdl_log_filename.encode() in err:
+                        with open(xvhdl_log_filename, 'r') as log_file:
+                            err += b'\n'
+                            err += b'xvhdl.log:\n'
+                            err += log_file.read().encode()
+
+                    raise VivadoError(
+                        'Error running the Vivado VHDL simulator:\n%s' %
+                        err)
+
+                elif target_language == 'Verilog':
+                    xvhdl_log_filename = os.path.join(
+                        tmp_dir, 'tmp_project', 'tmp_project.sim', 'sim_1',
+                        'behav', 'xvlog.log')
+
+                    if xvhdl_log_filename.encode() in err:
+                        with open(xvhdl_log_filename, 'r') as log_file:
+                            err += b'\n'
+                            err += b'xvlog.log:\n'
+                            err += log_file.read().encode()
+
+                    raise VivadoError(
+                        'Error running the Vivado Verilog simulator:\n%s' %
+                        err)
+
+            if online_comparator is not None:
+                online_comparator.finish()
+
+            with timings.phase('result_parsing'):
+                vivado_outputs = _read_vivado_outputs(
+                    signal_output_path, tmp_dir,
+                    sim_object.elaborated_args.axi_stream_out_interfaces)
+
+            timings.sizes['output_file_bytes'] = _total_file_size(
+                [signal_output_path] + [
+                    os.path.join(tmp_dir, 'axi_stream_out_' + each_interface)
+                    for each_interface in
+                    sim_object.elaborated_args.axi_stream_out_interfaces])
+
+            if result_cache is not None:
+                with timings.phase('cache_store'):
+                    result_cache.put(result_key, vivado_outputs)
+
+        for (case_dut_outputs, case_ref_outputs, case_outputs_length, _), (
+            case_offset) in zip(case_outputs, case_offsets):
+
+            for each_signal, values in vivado_outputs.items():
+                if isinstance(values, VivadoSignalValues):
+                    values = values[case_offset:]
+
+                case_dut_outputs[each_signal] = values
+
+            for each_signal in case_ref_outputs:
+                if not isinstance(case_ref_outputs[each_signal], SignalOutput):
+                    continue
+
+                # Now only output the correct number of cycles
+                case_ref_outputs[each_signal] = (
+                    case_ref_outputs[each_signal][:case_outputs_length])
+                case_dut_outputs[each_signal] = (
+                    case_dut_outputs[each_signal][:case_outputs_length])
 
     finally:
+        conversion_lock.close()
+
         if not keep_temp_files:
             shutil.rmtree(tmp_dir)
         else:
             print('As requested, the temporary files have not been deleted.'
                   '\nThey can be found in %s.' % (tmp_dir,))
 
-    return dut_outputs, ref_outputs
+    if timing_handler is not None:
+        timing_handler(timings)
+
+    return [(case_dut_outputs, case_ref_outputs) for
+            case_dut_outputs, case_ref_outputs, _, _ in case_outputs]
 
 
 def vivado_vhdl_cosimulation(
@@ -707,7 +922,11 @@ def vivado_vhdl_cosimulation(
     period=None, custom_sources=None,
     enforce_convertible_top_level_interfaces=True, keep_temp_files=False,
     config_file='kea-testing.cfg', template_path_prefix='', vcd_name=None,
-    time_units='ns'):
+    time_units='ns', persistent_session=False, non_project_flow=False,
+    library_cache_directory=None, cache_results=False,
+    result_cache_directory=None, output_format='binary',
+    file_stimulus=False, timeout=None, timing_handler=None,
+    compare_online=False, mismatch_window=5):
     '''Run a cosimulation in which the device under test is simulated inside
     Vivado, using VHDL as the intermediate language.
 
@@ -722,15 +941,78 @@ def vivado_vhdl_cosimulation(
 
     By default, all the temporary files are cleaned up after use. This
     behaviour can be turned off by settings ``keep_temp_files`` to ``True``.
+
+    If ``persistent_session`` is ``True``, the simulation is run in the
+    long-lived :class:`VivadoSession` of this process (see
+    :func:`get_vivado_session`) rather than in a new Vivado process, so the
+    startup time of Vivado is only paid once per process.
+
+    If ``non_project_flow`` is ``True``, the Vivado simulator tools are run
+    directly rather than through a Vivado project (see :class:`XsimFlow`).
+    The dependencies are compiled once into a library that is cached in
+    ``library_cache_directory`` (by default in ``~/.cache/kea``), so only
+    the converted top level is compiled for each test. Vivado IP is not
+    supported by the non-project flow.
+
+    If ``cache_results`` is ``True``, the outputs of the dut are cached in
+    ``result_cache_directory`` (by default in ``~/.cache/kea``), keyed by a
+    hash of the converted HDL (which includes the stimulus), the
+    dependencies and the part. If the same cosimulation is run again, the
+    cached outputs are used and Vivado is not run. Results are not cached
+    when a vcd file is requested.
+
+    ``output_format`` sets the format in which the simulation writes the
+    outputs of the dut to file (see
+    :meth:`SynchronousTest.dut_convertible_top`). ``'hex'`` writes smaller
+    files and buffers the writes, which makes long simulations faster.
+
+    If ``file_stimulus`` is ``True``, the stimulus is written to files
+    that are read by the simulation, rather than into the converted HDL
+    (see :meth:`SynchronousTest.dut_convertible_top`). The size of the HDL,
+    and so the time taken to convert and compile it, then does not depend
+    on the number of cycles.
+
+    If ``timeout`` is not ``None``, the Vivado simulation is killed
+    (along with any simulator processes it started) if it has not finished
+    after ``timeout`` seconds, and a :class:`VivadoTimeoutError` is raised.
+    The timeout is not supported with ``persistent_session``.
+
+    If ``timing_handler`` is not ``None``, it is called at the end of the
+    cosimulation with a :class:`CosimulationTimings` of the wall time spent
+    in each phase of the cosimulation (the MyHDL simulation, the
+    conversion, the Vivado run, the parsing of the results and so on) and
+    of the sizes of the generated HDL, the stimulus and the output files.
+
+    If ``compare_online`` is ``True``, the outputs that the simulation
+    writes to file are compared with those of the ref while Vivado runs.
+    The `'output'` signals are compared on every cycle and the packets on
+    the `'axi_stream_out'` interfaces as they complete (undefined values
+    are treated as a divergence). On the first divergence, the simulation is
+    run on for ``mismatch_window`` cycles and then Vivado is killed, and a
+    :class:`CosimulationMismatchError` is raised, just as with the
+    ``compare_online`` option of :func:`myhdl_cosimulation`. The outputs
+    are compared as the simulator flushes them to file, so the simulation
+    may run on for more cycles before it is stopped. In the persistent
+    session and for cached results, the outputs are compared once the
+    simulation has finished.
+
+    The simulation and conversion in MyHDL are serialised between threads,
+    so cosimulations can be run concurrently from multiple threads (see
+    :class:`VivadoCosimulationScheduler`), with only the Vivado simulations
+    running in parallel.
     '''
 
     target_language = 'VHDL'
 
-    dut_outputs, ref_outputs = _vivado_generic_cosimulation(
-        target_language, cycles, dut_factory, ref_factory, args,
-        arg_types, period, custom_sources,
+    [(dut_outputs, ref_outputs)] = _vivado_generic_cosimulation(
+        target_language, cycles, dut_factory, ref_factory,
+        [(args, custom_sources, cycles)], arg_types, period,
         enforce_convertible_top_level_interfaces, keep_temp_files,
-        config_file, template_path_prefix, vcd_name, time_units)
+        config_file, template_path_prefix, vcd_name, time_units,
+        persistent_session, non_project_flow, library_cache_directory,
+        cache_results, result_cache_directory, output_format,
+        file_stimulus, timeout, timing_handler, compare_online,
+        mismatch_window)
 
     return dut_outputs, ref_outputs
 
@@ -739,7 +1021,11 @@ def vivado_verilog_cosimulation(
     period=None, custom_sources=None,
     enforce_convertible_top_level_interfaces=True, keep_temp_files=False,
     config_file='kea-testing.cfg', template_path_prefix='', vcd_name=None,
-    time_units='ns'):
+    time_units='ns', persistent_session=False, non_project_flow=False,
+    library_cache_directory=None, cache_results=False,
+    result_cache_directory=None, output_format='binary',
+    file_stimulus=False, timeout=None, timing_handler=None,
+    compare_online=False, mismatch_window=5):
     '''Run a cosimulation in which the device under test is simulated inside
     Vivado, using Verilog as the intermediate language.
 
@@ -754,15 +1040,161 @@ def vivado_verilog_cosimulation(
 
     By default, all the temporary files are cleaned up after use. This
     behaviour can be turned off by settings ``keep_temp_files`` to ``True``.
+
+    If ``persistent_session`` is ``True``, the simulation is run in the
+    long-lived :class:`VivadoSession` of this process (see
+    :func:`get_vivado_session`) rather than in a new Vivado process, so the
+    startup time of Vivado is only paid once per process.
+
+    If ``non_project_flow`` is ``True``, the Vivado simulator tools are run
+    directly rather than through a Vivado project (see :class:`XsimFlow`).
+    The dependencies are compiled once into a library that is cached in
+    ``library_cache_directory`` (by default in ``~/.cache/kea``), so only
+    the converted top level is compiled for each test. Vivado IP is not
+    supported by the non-project flow.
+
+    If ``cache_results`` is ``True``, the outputs of the dut are cached in
+    ``result_cache_directory`` (by default in ``~/.cache/kea``), keyed by a
+    hash of the converted HDL (which includes the stimulus), the
+    dependencies and the part. If the same cosimulation is run again, the
+    cached outputs are used and Vivado is not run. Results are not cached
+    when a vcd file is requested.
+
+    ``output_format`` sets the format in which the simulation writes the
+    outputs of the dut to file (see
+    :meth:`SynchronousTest.dut_convertible_top`). ``'hex'`` writes smaller
+    files and buffers the writes, which makes long simulations faster.
+
+    If ``file_stimulus`` is ``True``, the stimulus is written to files
+    that are read by the simulation, rather than into the converted HDL
+    (see :meth:`SynchronousTest.dut_convertible_top`). The size of the HDL,
+    and so the time taken to convert and compile it, then does not depend
+    on the number of cycles.
+
+    If ``timeout`` is not ``None``, the Vivado simulation is killed
+    (along with any simulator processes it started) if it has not finished
+    after ``timeout`` seconds, and a :class:`VivadoTimeoutError` is raised.
+    The timeout is not supported with ``persistent_session``.
+
+    If ``timing_handler`` is not ``None``, it is called at the end of the
+    cosimulation with a :class:`CosimulationTimings` of the wall time spent
+    in each phase of the cosimulation (the MyHDL simulation, the
+    conversion, the Vivado run, the parsing of the results and so on) and
+    of the sizes of the generated HDL, the stimulus and the output files.
+
+    If ``compare_online`` is ``True``, the outputs that the simulation
+    writes to file are compared with those of the ref while Vivado runs.
+    The `'output'` signals are compared on every cycle and the packets on
+    the `'axi_stream_out'` interfaces as they complete (undefined values
+    are treated as a divergence). On the first divergence, the simulation is
+    run on for ``mismatch_window`` cycles and then Vivado is killed, and a
+    :class:`CosimulationMismatchError` is raised, just as with the
+    ``compare_online`` option of :func:`myhdl_cosimulation`. The outputs
+    are compared as the simulator flushes them to file, so the simulation
+    may run on for more cycles before it is stopped. In the persistent
+    session and for cached results, the outputs are compared once the
+    simulation has finished.
+
+    The simulation and conversion in MyHDL are serialised between threads,
+    so cosimulations can be run concurrently from multiple threads (see
+    :class:`VivadoCosimulationScheduler`), with only the Vivado simulations
+    running in parallel.
     '''
 
     target_language = 'Verilog'
 
-    dut_outputs, ref_outputs = _vivado_generic_cosimulation(
-        target_language, cycles, dut_factory, ref_factory, args,
-        arg_types, period, custom_sources,
+    [(dut_outputs, ref_outputs)] = _vivado_generic_cosimulation(
+        target_language, cycles, dut_factory, ref_factory,
+        [(args, custom_sources, cycles)], arg_types, period,
         enforce_convertible_top_level_interfaces, keep_temp_files,
-        config_file, template_path_prefix, vcd_name, time_units)
+        config_file, template_path_prefix, vcd_name, time_units,
+        persistent_session, non_project_flow, library_cache_directory,
+        cache_results, result_cache_directory, output_format,
+        file_stimulus, timeout, timing_handler, compare_online,
+        mismatch_window)
 
     return dut_outputs, ref_outputs
 
+
+def _batch_cases(cycles, cases):
+    '''Returns the ``(args, custom_sources, cycles)`` of each case of a batch
+    cosimulation.
+    '''
+    if len(cases) == 0:
+        raise ValueError('A batch cosimulation needs at least one case.')
+
+    return [(case['args'], case.get('custom_sources', None),
+             case.get('cycles', cycles)) for case in cases]
+
+def vivado_vhdl_batch_cosimulation(
+    cycles, dut_factory, ref_factory, cases, arg_types,
+    period=None, enforce_convertible_top_level_interfaces=True,
+    keep_temp_files=False, config_file='kea-testing.cfg',
+    template_path_prefix='', time_units='ns', persistent_session=False,
+    non_project_flow=False, library_cache_directory=None,
+    cache_results=False, result_cache_directory=None,
+    output_format='binary', file_stimulus=True, timeout=None,
+    timing_handler=None, reset_cycles_between_cases=2):
+    '''Run a cosimulation of each of a batch of test cases, in which the
+    device under test is simulated inside Vivado using VHDL as the
+    intermediate language. All the cases are run in a single Vivado
+    simulation, so Vivado, the compilation and the elaboration are only run
+    once for the whole batch.
+
+    ``cases`` is a list of dicts, one for each case, with the ``'args'`` of
+    the case and optionally its ``'custom_sources'`` and its number of
+    ``'cycles'`` (which defaults to ``cycles``). The dut and the ref are
+    simulated in MyHDL for each case, and the stimulus of the cases is then
+    played back in turn, with the reset held active for
+    ``reset_cycles_between_cases`` cycles between each case (see
+    :meth:`SynchronousTest.dut_convertible_top`). The cases should all
+    have the same interface, with a reset (if there is more than one case)
+    and no AXI stream interfaces.
+
+    Returns a list of the ``(dut_outputs, ref_outputs)`` of each case, in
+    the order of ``cases``. The outputs of each case are as from
+    :func:`vivado_vhdl_cosimulation`, which also describes the other
+    arguments. ``file_stimulus`` defaults to ``True``, as the stimulus of
+    a batch is usually long.
+    '''
+
+    target_language = 'VHDL'
+
+    return _vivado_generic_cosimulation(
+        target_language, cycles, dut_factory, ref_factory,
+        _batch_cases(cycles, cases), arg_types, period,
+        enforce_convertible_top_level_interfaces, keep_temp_files,
+        config_file, template_path_prefix, None, time_units,
+        persistent_session, non_project_flow, library_cache_directory,
+        cache_results, result_cache_directory, output_format,
+        file_stimulus, timeout, timing_handler,
+        reset_cycles_between_cases=reset_cycles_between_cases)
+
+def vivado_verilog_batch_cosimulation(
+    cycles, dut_factory, ref_factory, cases, arg_types,
+    period=None, enforce_convertible_top_level_interfaces=True,
+    keep_temp_files=False, config_file='kea-testing.cfg',
+    template_path_prefix='', time_units='ns', persistent_session=False,
+    non_project_flow=False, library_cache_directory=None,
+    cache_results=False, result_cache_directory=None,
+    output_format='binary', file_stimulus=True, timeout=None,
+    timing_handler=None, reset_cycles_between_cases=2):
+    '''Run a cosimulation of each of a batch of test cases, in which the
+    device under test is simulated inside Vivado using Verilog as the
+    intermediate language.
+
+    This function has exactly the same interface as
+    :func:`vivado_vhdl_batch_cosimulation`.
+    '''
+
+    target_language = 'Verilog'
+
+    return _vivado_generic_cosimulation(
+        target_language, cycles, dut_factory, ref_factory,
+        _batch_cases(cycles, cases), arg_types, period,
+        enforce_convertible_top_level_interfaces, keep_temp_files,
+        config_file, template_path_prefix, None, time_units,
+        persistent_session, non_project_flow, library_cache_directory,
+        cache_results, result_cache_directory, output_format,
+        file_stimulus, timeout, timing_handler,
+        reset_cycles_between_cases=reset_cycles_between_cases)
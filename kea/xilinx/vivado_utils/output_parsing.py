@@ -0,0 +1,489 @@
+from collections import deque
+from collections.abc import Sequence
+
+import numpy as np
+
+from myhdl import intbv
+
+from kea.testing.myhdl import AxiStreamOutput
+
+__all__ = ['VivadoSignalValues', 'read_signal_outputs',
+           'read_axi_stream_output']
+
+_zero = ord('0')
+_one = ord('1')
+_separator = ord(',')
+_newline = ord('\n')
+
+_word_length = 64
+
+# The bits of each hex digit (as characters), with any other character
+# giving undefined bits.
+_hex_digit_bits = np.full((256, 4), ord('X'), dtype=np.uint8)
+for _digit in '0123456789abcdefABCDEF':
+    _hex_digit_bits[ord(_digit)] = np.frombuffer(
+        format(int(_digit, 16), '04b').encode(), dtype=np.uint8)
+
+
+class VivadoSignalValues(Sequence):
+    '''A read-only sequence of the values on a single signal that were
+    written to file by a Vivado simulation.
+
+    The values are held in the NumPy array ``values``, alongside the boolean
+    mask ``undefined`` of the values that were not ``0`` or ``1`` in every
+    bit (for example ``U`` or ``X``). The values are ``bool`` for bool
+    signals, and integers for unsigned and signed signals. Signals of up to
+    64 bits are held in ``uint64`` or ``int64`` arrays, and wider signals in
+    arrays of Python integers. Undefined values are ``0`` in ``values``.
+
+    Indexing with an integer returns the value as it would be recorded by
+    MyHDL: a ``bool``, an ``intbv`` of ``width`` bits (which is signed for
+    signed signals) or ``None`` if the value is undefined.
+    Each value is only converted when it is accessed. Indexing with a slice
+    returns a :class:`VivadoSignalValues` of the selected values.
+    '''
+
+    def __init__(self, values, undefined, width, signal_type):
+
+        if len(values) != len(undefined):
+            raise ValueError(
+                'values and undefined should be the same length')
+
+        self._values = np.asarray(values)
+        self._values.flags.writeable = False
+
+        self._undefined = np.asarray(undefined, dtype=bool)
+        self._undefined.flags.writeable = False
+
+        self.width = width
+        self.signal_type = signal_type
+
+    @property
+    def values(self):
+        return self._values
+
+    @property
+    def undefined(self):
+        return self._undefined
+
+    def to_masked_array(self):
+        '''Returns the values as a NumPy masked array, in which the
+        undefined values are masked.
+        '''
+        return np.ma.masked_array(self._values, mask=self._undefined)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return 'VivadoSignalValues({})'.format(list(self))
+
+    def _convert(self, value):
+
+        if self.signal_type == 'bool':
+            return bool(value)
+
+        elif self.signal_type == 'signed':
+            # Converted from the bit pattern just as MyHDL would be
+            return intbv(int(value) % (1 << self.width))[self.width:].signed()
+
+        else:
+            return intbv(int(value))[self.width:]
+
+    def __getitem__(self, index):
+
+        if isinstance(index, slice):
+            return VivadoSignalValues(
+                self._values[index], self._undefined[index], self.width,
+                self.signal_type)
+
+        elif isinstance(index, (int, np.integer)):
+            if self._undefined[index]:
+                return None
+
+            return self._convert(self._values[index])
+
+        else:
+            raise TypeError('indices must be integers or slices')
+
+    def __iter__(self):
+        convert = self._convert
+
+        for value, undefined in zip(
+            self._values.tolist(), self._undefined.tolist()):
+
+            if undefined:
+                yield None
+            else:
+                yield convert(value)
+
+    def __eq__(self, other):
+
+        if isinstance(other, VivadoSignalValues):
+            return (
+                len(self) == len(other) and
+                bool(np.array_equal(self._undefined, other._undefined)) and
+                bool(np.all(
+                    (self._values == other._values) | self._undefined)))
+
+        if isinstance(other, np.ndarray):
+            other = other.tolist()
+
+        elif not isinstance(other, Sequence):
+            return NotImplemented
+
+        if len(self) != len(other):
+            return False
+
+        return all(value == other_value
+                   for value, other_value in zip(self, other))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+
+        if equal is NotImplemented:
+            return equal
+
+        return not equal
+
+    __hash__ = None
+
+def _bits_to_values(bits, signal_type):
+    '''Converts an ``(n, width)`` array of the characters of ``n`` binary
+    strings into an array of their values and the mask of the undefined
+    values.
+    '''
+    n_values, width = bits.shape
+
+    undefined = ((bits != _zero) & (bits != _one)).any(axis=1)
+    ones = bits == _one
+
+    if width == 0:
+        if signal_type == 'bool':
+            return np.zeros(n_values, dtype=bool), undefined
+
+        elif signal_type == 'signed':
+            return np.zeros(n_values, dtype=np.int64), undefined
+
+        return np.zeros(n_values, dtype=np.uint64), undefined
+
+    if signal_type == 'bool':
+        return ones[:, -1].copy(), undefined
+
+    # The bits are combined into words of up to 64 bits, starting with the
+    # most significant word.
+    n_words = -(-width // _word_length)
+    first_word_length = width - (n_words - 1) * _word_length
+
+    words = []
+    word_start = 0
+    for word_length in (
+        [first_word_length] + [_word_length] * (n_words - 1)):
+
+        word_bits = ones[:, word_start:word_start + word_length]
+        weights = np.left_shift(np.uint64(1), np.arange(
+            word_length - 1, -1, -1, dtype=np.uint64))
+
+        words.append(
+            (word_bits.astype(np.uint64) * weights).sum(
+                axis=1, dtype=np.uint64))
+
+        word_start += word_length
+
+    if n_words == 1:
+        values = words[0]
+
+        if signal_type == 'signed':
+            if width == _word_length:
+                values = values.view(np.int64)
+            else:
+                values = values.astype(np.int64)
+                negative = values >= (1 << (width - 1))
+                values[negative] -= 1 << width
+
+    else:
+        # Too wide for a single NumPy integer, so python integers are used.
+        values = words[0].astype(object)
+        for word in words[1:]:
+            values = (values << _word_length) | word.astype(object)
+
+        if signal_type == 'signed':
+            negative = values >= (1 << (width - 1))
+            values[negative] -= 1 << width
+
+    values[undefined] = 0
+
+    return values, undefined
+
+def _hex_to_bits(digits, width):
+    '''Converts an ``(n, n_digits)`` array of the characters of ``n`` hex
+    strings into an ``(n, width)`` array of the characters of their bits.
+    '''
+    if len(digits) == 0:
+        return np.empty((0, width), dtype=np.uint8)
+
+    bits = _hex_digit_bits[digits].reshape(len(digits), -1)
+
+    return bits[:, bits.shape[1] - width:]
+
+def _parse_header(header):
+    '''Returns the names in a header row and the width of each column that
+    is written in the ``'hex'`` output format (``None`` for binary columns).
+    '''
+    names = []
+    hex_widths = []
+    for name in header.rstrip(b'\r').decode().split(','):
+        name, separator, hex_width = name.rpartition(':')
+
+        if separator == '':
+            names.append(hex_width)
+            hex_widths.append(None)
+        else:
+            names.append(name)
+            hex_widths.append(int(hex_width))
+
+    return names, hex_widths
+
+def _read_body_columns(filename, body, hex_widths):
+    '''Returns an ``(n_rows, width)`` array of the characters of the bits in
+    each column of the complete rows in ``body``.
+    '''
+    columns = _read_column_characters(filename, body, len(hex_widths))
+
+    return [
+        column if hex_width is None else _hex_to_bits(column, hex_width)
+        for column, hex_width in zip(columns, hex_widths)]
+
+def _read_columns(filename):
+    '''Reads a file of comma separated binary strings with a header row.
+    Returns the names in the header and, for each column, an
+    ``(n_rows, width)`` array of the characters of the bits in the column.
+
+    Files written in the ``'hex'`` output format are recognised by the width
+    of each column in the header (as ``name:width``), and their values are
+    converted to bits.
+    '''
+    with open(filename, 'rb') as f:
+        content = f.read()
+
+    header, _, body = content.partition(b'\n')
+
+    if header.rstrip(b'\r') == b'':
+        # Nothing was written
+        return [], []
+
+    names, hex_widths = _parse_header(header)
+
+    return names, _read_body_columns(filename, body, hex_widths)
+
+
+class _OutputFileReader(object):
+    '''Reads the rows of an output file while it is being written by a
+    simulation. Each call to :meth:`read` returns the complete rows that
+    have been written since the last call.
+    '''
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.n_rows = 0
+
+        self._offset = 0
+        self._names = None
+        self._hex_widths = None
+
+    def read(self):
+        '''Returns the names of the columns and, for each column, an
+        ``(n_rows, width)`` array of the characters of the bits in the
+        column of the rows that have been completed since the last call.
+        Until the header has been written, no columns are returned.
+        '''
+        try:
+            with open(self.filename, 'rb') as f:
+                f.seek(self._offset)
+                content = f.read()
+
+        except FileNotFoundError:
+            return [], []
+
+        if self._names is None:
+            header, separator, content = content.partition(b'\n')
+
+            if separator == b'':
+                return [], []
+
+            self._names, self._hex_widths = _parse_header(header)
+            self._offset += len(header) + 1
+
+        # Anything after the last newline is an incomplete row.
+        body = content[:content.rfind(b'\n') + 1]
+        self._offset += len(body)
+
+        columns = _read_body_columns(self.filename, body, self._hex_widths)
+
+        if len(columns) > 0:
+            self.n_rows += len(columns[0])
+
+        return self._names, columns
+
+def _read_column_characters(filename, body, n_columns):
+    '''Returns an ``(n_rows, width)`` array of the characters in each
+    column of the rows in ``body``.
+
+    Every row of these files is the same length, so the rows are read as a
+    single 2D array of characters which is sliced into the columns. If that
+    is not possible, the rows are split one by one.
+    '''
+    # Anything after the last newline is an incomplete row.
+    body = body[:body.rfind(b'\n') + 1]
+
+    if len(body) == 0:
+        return [np.empty((0, 0), dtype=np.uint8) for _ in range(n_columns)]
+
+    first_row = body[:body.find(b'\n')]
+    row_length = len(first_row) + 1
+    widths = [len(field) for field in first_row.split(b',')]
+
+    if len(widths) != n_columns:
+        raise ValueError(
+            'The rows of %s do not match the header' % filename)
+
+    characters = None
+
+    if len(body) % row_length == 0:
+        characters = np.frombuffer(body, dtype=np.uint8).reshape(
+            -1, row_length)
+
+        separators = np.cumsum(np.array(widths[:-1], dtype=int) + 1) - 1
+
+        if not ((characters[:, separators] == _separator).all() and
+                (characters[:, -1] == _newline).all()):
+            characters = None
+
+    columns = []
+    column_start = 0
+    if characters is not None:
+        for width in widths:
+            columns.append(characters[:, column_start:column_start + width])
+            column_start += width + 1
+
+    else:
+        # The rows are not all the same length, so each column is padded
+        # with zeros to its longest value.
+        rows = [row.rstrip(b'\r').split(b',')
+                for row in body.split(b'\n')[:-1]]
+
+        for n in range(n_columns):
+            fields = [row[n] for row in rows]
+            width = max(len(field) for field in fields)
+            columns.append(
+                np.frombuffer(
+                    b''.join(field.rjust(width, b'0') for field in fields),
+                    dtype=np.uint8).reshape(-1, width))
+
+    return columns
+
+def read_signal_outputs(filename):
+    '''Reads the signal outputs file written by the ``file_writer`` of a
+    Vivado simulation.
+
+    Returns a dictionary from the name of each signal to a
+    :class:`VivadoSignalValues` of the values written to the file.
+    '''
+    return _signal_values(*_read_columns(filename))
+
+def _signal_values(names, columns):
+    '''Returns a dictionary from the name of each signal to a
+    :class:`VivadoSignalValues` of the values in ``columns``.
+    '''
+    signal_outputs = {}
+    for name, bits in zip(names, columns):
+        _, signal_type, signal_name = name.split(' ')
+
+        values, undefined = _bits_to_values(bits, signal_type)
+
+        signal_outputs[signal_name] = VivadoSignalValues(
+            values, undefined, bits.shape[1], signal_type)
+
+    return signal_outputs
+
+def read_axi_stream_output(filename):
+    '''Reads the file written by the ``axi_stream_file_writer`` of a Vivado
+    simulation and returns the packets as an :class:`AxiStreamOutput`.
+    '''
+    transactions = _axi_stream_transactions(*_read_columns(filename))
+
+    if transactions is None:
+        # The VHDL writer only writes the header with the first transaction
+        return AxiStreamOutput({'packets': {}, 'incomplete_packet': {}})
+
+    tdata, tlast, streams = transactions
+
+    completed_packets = {}
+    current_packets = {}
+
+    for stream in np.unique(streams, axis=0):
+        stream_transactions = np.flatnonzero(
+            (streams == stream).all(axis=1))
+
+        # The index of the transaction after each TLAST
+        packet_ends = np.flatnonzero(tlast[stream_transactions]) + 1
+
+        packets = deque([])
+        packet_start = 0
+        for packet_end in packet_ends.tolist():
+            packets.append(deque(
+                tdata[n] for n in
+                stream_transactions[packet_start:packet_end].tolist()))
+            packet_start = packet_end
+
+        stream = tuple(int(each) for each in stream)
+
+        if len(packets) > 0:
+            completed_packets[stream] = packets
+
+        if packet_start < len(stream_transactions):
+            current_packets[stream] = deque(
+                tdata[n] for n in
+                stream_transactions[packet_start:].tolist())
+
+    return AxiStreamOutput({
+        'packets': completed_packets,
+        'incomplete_packet': current_packets})
+
+def _axi_stream_transactions(names, columns):
+    '''Returns the TDATA of each transaction in ``columns`` as a list (with
+    ``None`` for undefined values), whether each transaction has TLAST set
+    as a boolean array, and an ``(n, 2)`` array of the TID and TDEST of each
+    transaction. Returns ``None`` if there is no TDATA column.
+    '''
+    columns = dict(zip(names, columns))
+
+    if 'TDATA' not in columns:
+        return None
+
+    n_transactions = len(columns['TDATA'])
+
+    def column_values(name):
+        if name not in columns:
+            return np.zeros(n_transactions, dtype=np.uint64)
+
+        values, _ = _bits_to_values(columns[name], 'unsigned')
+        return values
+
+    tdata, tdata_undefined = _bits_to_values(columns['TDATA'], 'unsigned')
+
+    if tdata_undefined.any():
+        tdata = tdata.astype(object)
+        tdata[tdata_undefined] = None
+
+    tdata = tdata.tolist()
+
+    if 'TLAST' in columns:
+        tlast = column_values('TLAST') != 0
+    else:
+        tlast = np.zeros(n_transactions, dtype=bool)
+
+    streams = np.stack(
+        [column_values('TID'), column_values('TDEST')], axis=1)
+
+    return tdata, tlast, streams
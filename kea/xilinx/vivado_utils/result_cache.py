@@ -0,0 +1,136 @@
+import hashlib
+import os
+import re
+
+from kea.utils.pickle_cache import PickleCache
+
+__all__ = ['CosimulationResultCache']
+
+_default_cache_directory = os.path.join(
+    os.path.expanduser('~'), '.cache', 'kea', 'cosimulation_results')
+
+# The date line of the header MyHDL writes to every converted file.
+_myhdl_date_header = re.compile(rb'^(--|//) Date: .*$', re.MULTILINE)
+
+# The names declared in converted files, by the extension of the file: the
+# signals, variables, functions and labels of Verilog and VHDL.
+_declared_names = {
+    '.v': re.compile(
+        rb'^\s*(?:reg|wire|integer|input|output|inout)\b[^;=]*?\b(\w+)\s*'
+        rb'(?:\[[^\]]*\]\s*)?(?:=[^;]*)?;'
+        rb'|\bbegin\s*:\s*(\w+)'
+        rb'|\b(?:function|task)\b[^;(]*?\b(\w+)\s*[;(]', re.MULTILINE),
+    '.vhd': re.compile(
+        rb'\b(?:signal|variable|constant|type|subtype|function|procedure)'
+        rb'\s+(\w+)'
+        rb'|^\s*(\w+)\s*:\s*(?:process|block|entity|component|for|if)\b',
+        re.MULTILINE | re.IGNORECASE)}
+
+# The string literals of converted files, which are left as they are.
+_string_literals = {
+    '.v': re.compile(rb'"(?:\\.|[^"\\\n])*"'),
+    '.vhd': re.compile(rb'"[^"\n]*"')}
+
+_identifier = re.compile(rb'\b\w+\b')
+
+def _normalise_generated_names(content, extension):
+    '''Returns ``content``, the HDL of a file with ``extension``, with every
+    name declared in the file that contains a digit replaced by a name
+    numbered in the order the names first appear.
+
+    MyHDL numbers the names of the blocks, signals and labels it converts
+    by how many blocks the process has already built, so the same
+    conversion gives different names in a process that has built other
+    blocks. Renaming the names declared in the file consistently does not
+    change what the HDL does.
+    '''
+    if extension not in _declared_names:
+        return content
+
+    declared_names = set()
+    for each in _declared_names[extension].finditer(content):
+        declared_names.update(
+            name for name in each.groups()
+            if name is not None and re.search(rb'\d', name))
+
+    if len(declared_names) == 0:
+        return content
+
+    normalised_names = {}
+
+    def normalise_name(match):
+        name = match.group()
+
+        if name not in declared_names:
+            return name
+
+        if name not in normalised_names:
+            # No identifier contains a null byte, so the normalised names
+            # are distinct from every other name in the file.
+            normalised_names[name] = b'\x00%d' % len(normalised_names)
+
+        return normalised_names[name]
+
+    normalised_content = []
+    position = 0
+    for each in _string_literals[extension].finditer(content):
+        normalised_content.append(_identifier.sub(
+            normalise_name, content[position:each.start()]))
+        normalised_content.append(each.group())
+        position = each.end()
+
+    normalised_content.append(
+        _identifier.sub(normalise_name, content[position:]))
+
+    return b''.join(normalised_content)
+
+
+class CosimulationResultCache(PickleCache):
+    '''A cache of the outputs of Vivado cosimulations on disk, keyed by a
+    hash of everything that determines the outputs (see :meth:`key`).
+
+    The results are stored in a :class:`kea.utils.pickle_cache.PickleCache`,
+    so the cache is kept to at most ``max_size`` bytes by removing the least
+    recently used results whenever a result is added.
+    '''
+
+    def __init__(self, directory=None, max_size=512 * 1024**2):
+
+        if directory is None:
+            directory = _default_cache_directory
+
+        super(CosimulationResultCache, self).__init__(directory, max_size)
+
+    def key(self, filenames, values, temporary_directory=None):
+        '''Returns the key of the result of a cosimulation of the HDL in
+        ``filenames`` (in the order given). ``values`` is any other input
+        to the cosimulation that can be represented with ``repr``.
+
+        Files generated for a cosimulation contain the path of the
+        ``temporary_directory`` they were written to and the date MyHDL
+        converted them, neither of which changes the result, so both are
+        removed before the files are hashed. The names MyHDL generates also
+        depend on the blocks the process built before the conversion, so
+        the names declared in each Verilog and VHDL file that contain
+        digits are renumbered in the order they appear in the file.
+        '''
+        key = hashlib.sha256()
+        key.update(repr(values).encode())
+
+        for filename in filenames:
+            with open(filename, 'rb') as f:
+                content = f.read()
+
+            content = _myhdl_date_header.sub(b'', content)
+            content = _normalise_generated_names(
+                content, os.path.splitext(filename)[1])
+
+            if temporary_directory is not None:
+                content = content.replace(
+                    os.fsencode(temporary_directory), b'')
+
+            key.update(repr(
+                (os.path.basename(filename),
+                 hashlib.sha256(content).hexdigest())).encode())
+
+        return key.hexdigest()
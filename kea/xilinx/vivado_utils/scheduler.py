@@ -0,0 +1,116 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from configparser import RawConfigParser
+
+from .cosimulation import (
+    vivado_vhdl_cosimulation, vivado_verilog_cosimulation)
+
+__all__ = ['VivadoCosimulationScheduler']
+
+_config_section = 'Scheduler'
+
+
+class VivadoCosimulationScheduler(object):
+    '''Runs Vivado cosimulations concurrently, each in its own temporary
+    directory and Vivado process.
+
+    At most ``max_concurrency`` cosimulations run at once. Each Vivado
+    process takes a licence seat and a few GB of memory, so the limit
+    should suit the machine. If ``max_concurrency`` or ``timeout`` is
+    ``None``, it is read from the ``[Scheduler]`` section of
+    ``config_file``, for example::
+
+        [Scheduler]
+        max_concurrency=4
+        timeout=600
+
+    ``max_concurrency`` defaults to 1 if it is not set in either place.
+
+    If ``timeout`` is set, any cosimulation whose Vivado simulation runs
+    for longer than ``timeout`` seconds is killed (along with the simulator
+    processes it started) and its future raises a
+    :class:`VivadoTimeoutError`.
+
+    The MyHDL simulation and conversion of each cosimulation are serialised
+    (MyHDL is not thread-safe), so the time saved is in the Vivado
+    simulations, which dominate the run time of most cosimulations.
+
+    The scheduler can be used as a context manager, which waits for all the
+    cosimulations to finish on exit.
+    '''
+
+    def __init__(self, max_concurrency=None, timeout=None,
+                 config_file='kea-testing.cfg'):
+
+        config = RawConfigParser()
+        if os.path.exists(config_file):
+            with open(config_file) as f:
+                config.read_file(f)
+
+        if max_concurrency is None:
+            max_concurrency = config.getint(
+                _config_section, 'max_concurrency', fallback=1)
+
+        if timeout is None:
+            timeout = config.getfloat(
+                _config_section, 'timeout', fallback=None)
+
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency should be at least 1')
+
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.config_file = config_file
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='VivadoCosimulationScheduler')
+
+    def submit(self, target_language, cycles, dut_factory, ref_factory,
+               args, arg_types, **kwargs):
+        '''Queues a cosimulation in ``target_language`` (``'VHDL'`` or
+        ``'Verilog'``) and returns a :class:`concurrent.futures.Future` of
+        its ``(dut_outputs, ref_outputs)``.
+
+        The other arguments are those of :func:`vivado_vhdl_cosimulation`.
+        The ``timeout`` and ``config_file`` of the scheduler are used unless
+        they are given. The persistent session is a single Vivado process,
+        so it cannot be used by the scheduled cosimulations.
+
+        The signals in ``args`` are used by the cosimulation while it runs,
+        so each cosimulation should be given its own signals.
+        '''
+        if target_language == 'VHDL':
+            cosimulation = vivado_vhdl_cosimulation
+
+        elif target_language == 'Verilog':
+            cosimulation = vivado_verilog_cosimulation
+
+        else:
+            raise ValueError(
+                'Target language must be \'Verilog\' or \'VHDL\'')
+
+        if kwargs.get('persistent_session', False):
+            raise ValueError(
+                'Scheduled cosimulations cannot use the persistent session.')
+
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('config_file', self.config_file)
+
+        return self._executor.submit(
+            cosimulation, cycles, dut_factory, ref_factory, args, arg_types,
+            **kwargs)
+
+    def shutdown(self, wait=True):
+        '''Stops accepting cosimulations. If ``wait`` is ``True``, this
+        waits for the queued cosimulations to finish.
+        '''
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown(wait=True)
+        return False
@@ -0,0 +1,220 @@
+import atexit
+import os
+import re
+import subprocess
+import uuid
+
+import kea
+
+from .utils import VivadoError
+
+__all__ = ['VivadoSession', 'VivadoTclError', 'get_vivado_session']
+
+# The Tcl wrapper around each command sent to the session. The whole thing
+# is a single Tcl command so that Vivado prints no prompts in the middle of
+# the result. The status and result of the command are printed between
+# markers, so they can be separated from the log output of the command.
+_command_wrapper = (
+    'set kea_session_status [catch {{{command}}} kea_session_result]; '
+    'puts "{marker}_RESULT $kea_session_status"; '
+    'puts $kea_session_result; '
+    'puts "{marker}_END"; '
+    'flush stdout\n')
+
+# Closes the simulation and the project if they are open, so the session can
+# be used for the next test whatever state the previous one left it in.
+_reset_command = (
+    'catch {close_sim -force -quiet}; catch {close_project -quiet}')
+
+
+class VivadoTclError(VivadoError):
+    '''Raised when a command run in a :class:`VivadoSession` returns a Tcl
+    error. ``result`` is the error message returned by the command and
+    ``log`` is everything Vivado printed while running it.
+    '''
+
+    def __init__(self, message, result, log):
+        super(VivadoTclError, self).__init__(message)
+        self.result = result
+        self.log = log
+
+
+class VivadoSession(object):
+    '''A long-lived Vivado process running in Tcl mode, which is driven by
+    sending Tcl commands to its stdin and reading the results from its
+    stdout. This means the startup time of Vivado is only paid once, rather
+    than for every script that is run.
+
+    ``executable`` is the Vivado executable, defaulting to the Vivado found
+    in the path. It can also be a list, in which case it is the command
+    (for example an interpreter and a script) to which the Vivado arguments
+    are appended. Anything that speaks the same protocol on its stdin and
+    stdout can stand in for Vivado.
+
+    The process is started on the first command and restarted if it exits.
+    It is closed with :meth:`close`, or on leaving a ``with`` block.
+    '''
+
+    def __init__(self, executable=None):
+
+        if executable is None:
+            executable = kea.xilinx.vivado_utils.VIVADO_EXECUTABLE
+
+            if executable is None:
+                raise EnvironmentError('Vivado executable not in path')
+
+        if isinstance(executable, str):
+            executable = [executable]
+
+        self.command = (
+            list(executable) + ['-nolog', '-nojournal', '-mode', 'tcl'])
+
+        self._process = None
+        self._marker_prefix = 'KEA_SESSION_' + uuid.uuid4().hex
+        self._commands_run = 0
+
+    @property
+    def running(self):
+        '''``True`` if the Vivado process is running.
+        '''
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        '''Starts the Vivado process, if it is not already running.
+        '''
+        if self.running:
+            return
+
+        self._process = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, universal_newlines=True, bufsize=1)
+
+    def run(self, command):
+        '''Runs the Tcl ``command`` in the session and returns its result as
+        a string.
+
+        If the command returns a Tcl error, a :class:`VivadoTclError` is
+        raised. If the Vivado process exits while running the command, a
+        :class:`VivadoError` is raised and the process is started again on
+        the next command.
+        '''
+        self.start()
+
+        self._commands_run += 1
+        marker = '%s_%d' % (self._marker_prefix, self._commands_run)
+
+        try:
+            self._process.stdin.write(
+                _command_wrapper.format(command=command, marker=marker))
+            self._process.stdin.flush()
+
+        except (BrokenPipeError, OSError):
+            log = self._close_exited_process()
+            raise VivadoError(
+                'The Vivado session exited unexpectedly:\n%s' % log)
+
+        # The markers are matched at the end of the line, as Vivado might
+        # prefix them with a prompt.
+        result_marker = re.compile(marker + r'_RESULT (\d+)$')
+        end_marker = marker + '_END'
+
+        log = []
+        for line in self._process.stdout:
+            result_match = result_marker.search(line.rstrip())
+            if result_match is not None:
+                status = int(result_match.group(1))
+                break
+
+            log.append(line)
+
+        else:
+            log.append(self._close_exited_process())
+            raise VivadoError(
+                'The Vivado session exited unexpectedly:\n%s' % ''.join(log))
+
+        result = []
+        for line in self._process.stdout:
+            if line.rstrip().endswith(end_marker):
+                break
+
+            result.append(line)
+
+        result = ''.join(result).rstrip('\n')
+        log = ''.join(log)
+
+        if status != 0:
+            raise VivadoTclError(
+                'Error running a command in the Vivado session:\n%s' %
+                result, result, log)
+
+        return result
+
+    def source(self, script_filename):
+        '''Runs the Tcl script in ``script_filename`` in the session and
+        returns its result.
+        '''
+        return self.run('source {%s}' % script_filename)
+
+    def reset(self):
+        '''Closes any simulation and project left open in the session.
+        '''
+        self.run(_reset_command)
+
+    def _close_exited_process(self):
+        # Collects any remaining output of a process that has exited (or is
+        # about to) and forgets it, so the next command starts a new one.
+        try:
+            remaining_output, _ = self._process.communicate(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            remaining_output, _ = self._process.communicate()
+
+        self._process = None
+
+        return remaining_output or ''
+
+    def close(self):
+        '''Exits the Vivado process.
+        '''
+        if self._process is None:
+            return
+
+        if self.running:
+            try:
+                self._process.stdin.write('exit\n')
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+
+        self._close_exited_process()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# The sessions are keyed by the process id, so a worker process that is
+# forked from a process with a session creates its own.
+_sessions = {}
+
+def get_vivado_session():
+    '''Returns the :class:`VivadoSession` of this process, creating it if
+    necessary. It is closed when the process exits.
+    '''
+    pid = os.getpid()
+
+    try:
+        session = _sessions[pid]
+    except KeyError:
+        session = VivadoSession()
+        _sessions[pid] = session
+
+    return session
+
+@atexit.register
+def _close_vivado_session():
+    session = _sessions.pop(os.getpid(), None)
+
+    if session is not None:
+        session.close()
@@ -0,0 +1,59 @@
+'''A stand-in for Vivado in batch mode, for testing
+``VivadoCosimulationScheduler``.
+
+Rather than running the script given with ``-source``, it writes the signal
+outputs file to the directory of the script, with the content given by
+``KEA_VIVADO_STAND_IN_OUTPUTS``. Before writing it, it sleeps for
+``KEA_VIVADO_STAND_IN_SLEEP`` seconds. If ``KEA_VIVADO_STAND_IN_LOG`` is
+set, the times it started and finished are appended to the file it names.
+If ``KEA_VIVADO_STAND_IN_ROW_DELAY`` is set, the outputs are written a row
+at a time (after the header), flushing each row and sleeping for that many
+seconds after it, as a running simulation would write them.
+If ``KEA_VIVADO_STAND_IN_CHILD_PID`` is set, it first starts a child
+process (as Vivado starts ``xsim``) that sleeps for a minute and writes its
+pid to the file that is named.
+'''
+import json
+import os
+import subprocess
+import sys
+import time
+
+def main():
+    start_time = time.time()
+
+    arguments = sys.argv[1:]
+    script_filename = arguments[arguments.index('-source') + 1]
+    run_directory = os.path.dirname(script_filename)
+
+    child_pid_filename = os.environ.get('KEA_VIVADO_STAND_IN_CHILD_PID')
+    if child_pid_filename is not None:
+        child = subprocess.Popen(
+            [sys.executable, '-c', 'import time; time.sleep(60)'])
+
+        with open(child_pid_filename, 'w') as f:
+            f.write(str(child.pid))
+
+    time.sleep(float(os.environ.get('KEA_VIVADO_STAND_IN_SLEEP', 0)))
+
+    row_delay = os.environ.get('KEA_VIVADO_STAND_IN_ROW_DELAY')
+
+    with open(os.path.join(run_directory, 'signal_outputs'), 'w') as f:
+        if row_delay is None:
+            f.write(os.environ['KEA_VIVADO_STAND_IN_OUTPUTS'])
+
+        else:
+            for row in os.environ['KEA_VIVADO_STAND_IN_OUTPUTS'].splitlines(
+                keepends=True):
+
+                f.write(row)
+                f.flush()
+                time.sleep(float(row_delay))
+
+    log_filename = os.environ.get('KEA_VIVADO_STAND_IN_LOG')
+    if log_filename is not None:
+        with open(log_filename, 'a') as log_file:
+            log_file.write(json.dumps([start_time, time.time()]) + '\n')
+
+if __name__ == '__main__':
+    main()
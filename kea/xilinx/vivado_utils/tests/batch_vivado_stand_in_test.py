@@ -0,0 +1,87 @@
+'''The base test case and dut of the tests that run cosimulations with the
+batch mode stand-in for Vivado (see ``batch_vivado_stand_in.py``).
+'''
+from .base_hdl_test import TestCase
+
+import json
+import os
+import stat
+import sys
+import tempfile
+import shutil
+
+from unittest import mock
+
+from myhdl import Signal, ResetSignal, intbv, always_seq, block
+
+import kea
+
+_stand_in_script = os.path.join(
+    os.path.dirname(__file__), 'batch_vivado_stand_in.py')
+
+constant_value = 5
+
+
+@block
+def constant(test_output, reset, clock):
+
+    @always_seq(clock.posedge, reset=reset)
+    def constant_output():
+        test_output.next = constant_value
+
+    return constant_output
+
+def constant_args():
+    return {'test_output': Signal(intbv(0)[8:]),
+            'reset': ResetSignal(bool(0), active=1, isasync=False),
+            'clock': Signal(bool(0))}
+
+constant_arg_types = {'test_output': 'output', 'reset': 'init_reset',
+                      'clock': 'clock'}
+
+
+class BatchVivadoStandInTestCase(TestCase):
+    '''Runs the tests with the batch mode stand-in for Vivado, in which the
+    dut gives a constant output.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_filename = os.path.join(self.tmp_dir, 'runs')
+
+        # VIVADO_EXECUTABLE is a single executable, so the stand in is run
+        # from a shell script.
+        executable = os.path.join(self.tmp_dir, 'vivado')
+        with open(executable, 'w') as f:
+            f.write('#!/bin/sh\nexec "%s" "%s" "$@"\n' % (
+                sys.executable, _stand_in_script))
+
+        os.chmod(executable, os.stat(executable).st_mode | stat.S_IEXEC)
+
+        self.config_file = os.path.join(self.tmp_dir, 'kea-testing.cfg')
+        self.write_config('')
+
+        for patcher in (
+            mock.patch.object(
+                kea.xilinx.vivado_utils, 'VIVADO_EXECUTABLE', executable),
+            mock.patch.dict(
+                os.environ,
+                {'KEA_VIVADO_STAND_IN_LOG': self.log_filename,
+                 'KEA_VIVADO_STAND_IN_SLEEP': '1',
+                 'KEA_VIVADO_STAND_IN_OUTPUTS': (
+                     'simple unsigned test_output\n' +
+                     (format(constant_value, '08b') + '\n') * 50)})):
+
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_config(self, scheduler_config):
+        with open(self.config_file, 'w') as f:
+            f.write('[General]\npart=xc7z020clg484-1\n' + scheduler_config)
+
+    def runs(self):
+        with open(self.log_filename) as f:
+            return [json.loads(line) for line in f]
@@ -0,0 +1,76 @@
+from .batch_vivado_stand_in_test import (
+    BatchVivadoStandInTestCase, constant, constant_args, constant_arg_types)
+
+import os
+
+from unittest import mock
+
+from kea.xilinx.vivado_utils import (
+    vivado_vhdl_batch_cosimulation, vivado_verilog_batch_cosimulation)
+
+
+class TestVivadoBatchCosimulation(BatchVivadoStandInTestCase):
+    '''There should be batch cosimulation functions that run several test
+    cases in a single Vivado simulation, and split the outputs of the
+    simulation into the outputs of each case.
+    '''
+
+    def setUp(self):
+        super().setUp()
+
+        # Each row of the outputs is the cycle on which it was written.
+        patcher = mock.patch.dict(
+            os.environ,
+            {'KEA_VIVADO_STAND_IN_SLEEP': '0',
+             'KEA_VIVADO_STAND_IN_OUTPUTS': (
+                 'simple unsigned test_output\n' +
+                 ''.join(format(n, '08b') + '\n' for n in range(70)))})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_split_outputs(self):
+        '''The outputs of each case should start after those of the
+        previous case and the reset cycles between the cases, and there
+        should be one Vivado run for the batch.
+        '''
+        cases = [{'args': constant_args()},
+                 {'args': constant_args(), 'cycles': 30},
+                 {'args': constant_args(), 'cycles': 5}]
+
+        for n, cosimulation in enumerate((
+            vivado_vhdl_batch_cosimulation,
+            vivado_verilog_batch_cosimulation)):
+
+            results = cosimulation(
+                20, constant, constant, cases, constant_arg_types,
+                config_file=self.config_file, reset_cycles_between_cases=3)
+
+            self.assertEqual(len(results), 3)
+
+            for (dut_outputs, ref_outputs), start, length in zip(
+                results, (0, 23, 56), (20, 30, 5)):
+
+                self.assertEqual(
+                    dut_outputs['test_output'],
+                    list(range(start, start + length)))
+                self.assertEqual(len(ref_outputs['test_output']), length)
+                self.assertEqual(ref_outputs['test_output'][-1], 5)
+
+            self.assertEqual(len(self.runs()), n + 1)
+
+    def test_single_case(self):
+        '''A batch of one case should give the same outputs as a
+        cosimulation of the case.
+        '''
+        [(dut_outputs, ref_outputs)] = vivado_vhdl_batch_cosimulation(
+            20, constant, constant, [{'args': constant_args()}],
+            constant_arg_types, config_file=self.config_file)
+
+        self.assertEqual(dut_outputs['test_output'], list(range(20)))
+
+    def test_no_cases(self):
+        '''An empty batch should raise a ValueError.
+        '''
+        self.assertRaises(
+            ValueError, vivado_vhdl_batch_cosimulation, 20, constant,
+            constant, [], constant_arg_types, config_file=self.config_file)
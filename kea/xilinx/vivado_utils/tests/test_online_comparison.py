@@ -0,0 +1,206 @@
+from .base_hdl_test import TestCase
+from .batch_vivado_stand_in_test import (
+    BatchVivadoStandInTestCase, constant, constant_args, constant_arg_types)
+
+import os
+import tempfile
+import time
+import shutil
+
+from collections import deque
+from unittest import mock
+
+from kea.testing.myhdl import (
+    myhdl_cosimulation, AxiStreamOutput, CosimulationMismatchError)
+from kea.xilinx.vivado_utils import (
+    vivado_vhdl_cosimulation, vivado_verilog_cosimulation)
+from kea.xilinx.vivado_utils.cosimulation import _OnlineComparator
+
+
+class TestVivadoOnlineComparison(BatchVivadoStandInTestCase):
+    '''With compare_online, the outputs written by the Vivado simulation
+    should be compared with the ref while it runs, and Vivado should be
+    stopped on the first divergence.
+    '''
+
+    def setUp(self):
+        super().setUp()
+
+        _, ref_outputs = myhdl_cosimulation(
+            200, constant, constant, constant_args(), constant_arg_types)
+
+        self.ref_values = [int(value) for value in ref_outputs['test_output']]
+
+    def set_outputs(self, values, row_delay=None):
+        rows = [format(value, '08b') if isinstance(value, int) else value
+                for value in values]
+
+        environment = {
+            'KEA_VIVADO_STAND_IN_SLEEP': '0',
+            'KEA_VIVADO_STAND_IN_OUTPUTS': (
+                'simple unsigned test_output\n' +
+                ''.join(row + '\n' for row in rows))}
+
+        if row_delay is not None:
+            environment['KEA_VIVADO_STAND_IN_ROW_DELAY'] = str(row_delay)
+
+        patcher = mock.patch.dict(os.environ, environment)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cosimulate(self, cosimulation=vivado_vhdl_cosimulation, cycles=200,
+                   **kwargs):
+
+        return cosimulation(
+            cycles, constant, constant, constant_args(), constant_arg_types,
+            config_file=self.config_file, compare_online=True, **kwargs)
+
+    def test_early_abort(self):
+        '''Vivado should be killed soon after the first divergence, and the
+        error should report the cycle and the values around it.
+        '''
+        values = list(self.ref_values) + [self.ref_values[-1]]
+        values[10] = 6
+
+        # The stand in would take 4 seconds to write all the rows.
+        self.set_outputs(values, row_delay=0.02)
+
+        start = time.time()
+
+        for cosimulation in (
+            vivado_vhdl_cosimulation, vivado_verilog_cosimulation):
+
+            with self.assertRaises(CosimulationMismatchError) as cm:
+                self.cosimulate(cosimulation, mismatch_window=3)
+
+            error = cm.exception
+
+            self.assertEqual(error.cycle, 10)
+            self.assertEqual(error.signal_name, 'test_output')
+            self.assertEqual(error.window_start, 7)
+            self.assertEqual(error.ref_values, self.ref_values[7:14])
+            self.assertEqual(error.dut_values, values[7:14])
+            self.assertIn('at cycle 10', str(error))
+
+        # Neither run was allowed to finish.
+        self.assertLess(time.time() - start, 6)
+        self.assertFalse(os.path.exists(self.log_filename))
+
+    def test_no_divergence(self):
+        '''If the dut does not diverge from the ref, the outputs should be
+        returned as usual.
+        '''
+        self.set_outputs(self.ref_values + [0], row_delay=0.001)
+
+        dut_outputs, ref_outputs = self.cosimulate()
+
+        self.assertEqual(dut_outputs['test_output'], self.ref_values)
+        self.assertEqual(ref_outputs['test_output'], self.ref_values)
+
+    def test_divergence_at_the_end(self):
+        '''A divergence in the rows written after the last poll should be
+        found once the simulation has finished.
+        '''
+        values = list(self.ref_values)
+        values[-1] = 7
+        self.set_outputs(values)
+
+        with self.assertRaises(CosimulationMismatchError) as cm:
+            self.cosimulate()
+
+        self.assertEqual(cm.exception.cycle, 199)
+
+    def test_undefined_values(self):
+        '''Undefined values should be treated as a divergence.
+        '''
+        values = list(self.ref_values)
+        values[50] = 'XXXXXXXX'
+        self.set_outputs(values)
+
+        with self.assertRaises(CosimulationMismatchError) as cm:
+            self.cosimulate()
+
+        self.assertEqual(cm.exception.cycle, 50)
+        self.assertIsNone(cm.exception.dut_values[5])
+
+    def test_rows_after_the_last_cycle(self):
+        '''The rows written after the last cycle of the ref should not be
+        compared.
+        '''
+        self.set_outputs(self.ref_values[:20] + [6, 6])
+
+        dut_outputs, _ = self.cosimulate(cycles=20)
+
+        self.assertEqual(dut_outputs['test_output'], self.ref_values[:20])
+
+
+class TestOnlineComparatorAxiStreams(TestCase):
+    '''The online comparator should compare the packets on the AXI stream
+    output interfaces as they are completed.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+        self.signal_output_path = os.path.join(self.tmp_dir, 'signal_outputs')
+        with open(self.signal_output_path, 'w') as f:
+            f.write('simple unsigned test_output\n')
+
+        self.axi_filename = os.path.join(self.tmp_dir, 'axi_stream_out_axi')
+
+        ref_outputs = {'axi': AxiStreamOutput({
+            'packets': {(0, 0): deque([deque([1, 2]), deque([3])]),
+                        (1, 0): deque([deque([4])])},
+            'incomplete_packet': {}})}
+
+        self.comparator = _OnlineComparator(
+            self.signal_output_path, self.tmp_dir, ['axi'], [], {},
+            ref_outputs, 10, 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_rows(self, rows):
+        with open(self.axi_filename, 'a') as f:
+            f.write(''.join(row + '\n' for row in rows))
+
+    def test_packets(self):
+        '''A packet that differs from the ref packet in the same position on
+        its stream should be reported.
+        '''
+        # Nothing has been written yet
+        self.comparator.poll()
+
+        self.write_rows(['TDATA:8,TLAST:1,TID:1', '01,0,0', '04,1,1'])
+        self.comparator.poll()
+
+        # The second transaction of the first packet is split across polls
+        with open(self.axi_filename, 'a') as f:
+            f.write('02,1')
+
+        self.comparator.poll()
+
+        self.write_rows([',0', '05,1,0'])
+        self.comparator.poll()
+
+        self.assertIsNotNone(self.comparator.mismatch)
+
+        with self.assertRaises(CosimulationMismatchError) as cm:
+            self.comparator.finish()
+
+        self.assertEqual(cm.exception.signal_name, 'axi')
+        self.assertEqual(cm.exception.ref_values, [3])
+        self.assertEqual(cm.exception.dut_values, [5])
+        self.assertIn('packet 1 on stream (TID, TDEST) = (0, 0)',
+                      str(cm.exception))
+
+    def test_extra_packet(self):
+        '''A packet beyond the packets of the ref should be reported.
+        '''
+        self.write_rows(['TDATA:8,TLAST:1,TID:1', '04,1,1', '04,1,1'])
+
+        with self.assertRaises(CosimulationMismatchError) as cm:
+            self.comparator.finish()
+
+        self.assertIsNone(cm.exception.ref_values)
+        self.assertEqual(cm.exception.dut_values, [4])
@@ -0,0 +1,362 @@
+from .base_hdl_test import TestCase
+
+import os
+import pickle
+import random
+import tempfile
+import shutil
+
+from collections import deque
+
+import numpy as np
+
+from myhdl import intbv
+
+from kea.testing.myhdl import AxiStreamOutput
+from kea.xilinx.vivado_utils import (
+    VivadoSignalValues, read_signal_outputs, read_axi_stream_output)
+
+
+def _expected_value(bit_string, signal_type):
+    # The conversion of each value as it was done before the parser was
+    # vectorised.
+    try:
+        if signal_type == 'bool':
+            return bool(int(bit_string))
+
+        value = intbv(bit_string)[len(bit_string):]
+
+        if signal_type == 'signed':
+            return value.signed()
+
+        return value
+
+    except ValueError:
+        return None
+
+
+class TestReadSignalOutputs(TestCase):
+    '''The signal outputs file written by a Vivado simulation should be read
+    column-wise into NumPy arrays.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'signal_outputs')
+
+        random.seed(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_signal_outputs(self, signals, n_rows, undefined_rate=0.1,
+                             trailing=''):
+        '''Writes a file of random values for ``signals``, a list of
+        ``(signal_type, width)`` pairs. Returns the names of the signals and
+        the written values as strings.
+        '''
+        names = ['signal_%d' % n for n in range(len(signals))]
+        columns = []
+
+        for signal_type, width in signals:
+            column = []
+            for n in range(n_rows):
+                bits = [random.choice('01') for _ in range(width)]
+
+                if random.random() < undefined_rate:
+                    bits[random.randrange(width)] = random.choice('UXxz')
+
+                column.append(''.join(bits))
+
+            columns.append(column)
+
+        with open(self.filename, 'w') as f:
+            f.write(','.join(
+                'signal %s %s' % (signal_type, name) for
+                (signal_type, _), name in zip(signals, names)) + '\n')
+
+            for row in zip(*columns):
+                f.write(','.join(row) + '\n')
+
+            f.write(trailing)
+
+        return names, columns
+
+    def check_values(self, signals, names, columns, outputs):
+
+        self.assertEqual(set(outputs), set(names))
+
+        for (signal_type, width), name, column in zip(
+            signals, names, columns):
+
+            expected = [_expected_value(value, signal_type)
+                        for value in column]
+
+            values = outputs[name]
+            self.assertIsInstance(values, VivadoSignalValues)
+            self.assertEqual(values.width, width)
+            self.assertEqual(len(values), len(expected))
+
+            # Compared value by value, with the types checked too
+            for value, expected_value in zip(values, expected):
+                self.assertEqual(value, expected_value)
+                self.assertIs(type(value), type(expected_value))
+
+                if isinstance(value, intbv):
+                    self.assertEqual(len(value), width)
+
+            self.assertEqual(
+                values.undefined.tolist(),
+                [value is None for value in expected])
+
+    def test_values(self):
+        '''The values should be the same as those converted individually,
+        for bool, unsigned and signed signals, including signals wider than
+        64 bits.
+        '''
+        signals = [('bool', 1), ('unsigned', 8), ('signed', 8),
+                   ('unsigned', 64), ('signed', 64), ('unsigned', 1),
+                   ('signed', 2), ('unsigned', 100), ('signed', 130)]
+
+        names, columns = self.write_signal_outputs(signals, 200)
+        outputs = read_signal_outputs(self.filename)
+
+        self.check_values(signals, names, columns, outputs)
+
+        self.assertEqual(outputs['signal_0'].values.dtype, bool)
+        self.assertEqual(outputs['signal_1'].values.dtype, np.uint64)
+        self.assertEqual(outputs['signal_2'].values.dtype, np.int64)
+        self.assertEqual(outputs['signal_7'].values.dtype, object)
+
+    def test_incomplete_last_row(self):
+        '''A row without a newline at the end of the file should be
+        ignored.
+        '''
+        signals = [('unsigned', 4), ('bool', 1)]
+        names, columns = self.write_signal_outputs(
+            signals, 10, trailing='01')
+
+        outputs = read_signal_outputs(self.filename)
+
+        self.check_values(signals, names, columns, outputs)
+
+    def test_irregular_rows(self):
+        '''If the rows are not all the same length, the values should be
+        read row by row.
+        '''
+        with open(self.filename, 'w') as f:
+            f.write('signal unsigned a,signal bool b\n'
+                    '0101,1\n'
+                    '11,0\n'
+                    'X0,1\n')
+
+        outputs = read_signal_outputs(self.filename)
+
+        self.assertEqual(outputs['a'], [5, 3, None])
+        self.assertEqual(outputs['b'], [True, False, True])
+
+    def test_no_rows(self):
+        '''A file with only a header should give empty values.
+        '''
+        with open(self.filename, 'w') as f:
+            f.write('signal unsigned a,signal bool b\n')
+
+        outputs = read_signal_outputs(self.filename)
+
+        self.assertEqual(len(outputs['a']), 0)
+        self.assertEqual(list(outputs['b']), [])
+
+    def test_hex_output_format(self):
+        '''Files written in the hex output format should give the same
+        values as those written in binary, whether the digits are written by
+        VHDL (upper case and padded to a whole number of digits) or by
+        Verilog (lower case, with x and z).
+        '''
+        with open(self.filename, 'w') as f:
+            f.write('signal unsigned a,signal signed b,signal bool c\n'
+                    '0101,11111110,1\n'
+                    '1111,00000011,0\n'
+                    '0X01,10000000,1\n')
+
+        binary_outputs = read_signal_outputs(self.filename)
+
+        for rows in (
+            ['05,FE,1', '0F,03,0', 'XX,80,1'],
+            ['5,fe,1', 'f,03,0', 'x,80,1'],
+            ['5,fe,1', 'f,03,0', 'z,80,1']):
+
+            with open(self.filename, 'w') as f:
+                f.write('signal unsigned a:4,signal signed b:8,'
+                        'signal bool c:1\n')
+                f.write(''.join(row + '\n' for row in rows))
+
+            outputs = read_signal_outputs(self.filename)
+
+            self.assertEqual(outputs, binary_outputs)
+            self.assertEqual(outputs['a'].width, 4)
+            self.assertEqual(outputs['b'], [-2, 3, -128])
+            self.assertEqual(outputs['c'], [True, False, True])
+
+
+class TestVivadoSignalValues(TestCase):
+    '''VivadoSignalValues should present the parsed values as a sequence,
+    converting each value only when it is accessed.
+    '''
+
+    def setUp(self):
+        self.values = VivadoSignalValues(
+            np.array([3, 0, 15, 7], dtype=np.uint64),
+            np.array([False, True, False, False]), 4, 'unsigned')
+
+    def test_indexing(self):
+        '''Integer indexing should return a single value. Slicing should
+        return another VivadoSignalValues.
+        '''
+        self.assertEqual(self.values[0], intbv(3)[4:])
+        self.assertEqual(len(self.values[0]), 4)
+        self.assertIsNone(self.values[1])
+        self.assertEqual(self.values[-1], 7)
+
+        sliced = self.values[1:3]
+        self.assertIsInstance(sliced, VivadoSignalValues)
+        self.assertEqual(list(sliced), [None, 15])
+        self.assertEqual(sliced.width, 4)
+
+        self.assertRaises(TypeError, self.values.__getitem__, 'a')
+
+    def test_equality(self):
+        '''The values should compare equal to lists, arrays and other
+        VivadoSignalValues with the same values.
+        '''
+        self.assertEqual(self.values, [3, None, 15, 7])
+        self.assertEqual([3, None, 15, 7], self.values)
+        self.assertNotEqual(self.values, [3, 0, 15, 7])
+        self.assertNotEqual(self.values, [3, None, 15])
+
+        self.assertEqual(
+            self.values, np.array([3, None, 15, 7], dtype=object))
+
+        self.assertEqual(
+            self.values, VivadoSignalValues(
+                np.array([3, 0, 15, 7]), np.array([0, 1, 0, 0]), 4,
+                'unsigned'))
+        self.assertNotEqual(
+            self.values, VivadoSignalValues(
+                np.array([3, 0, 15, 7]), np.array([0, 0, 0, 0]), 4,
+                'unsigned'))
+
+    def test_read_only(self):
+        '''The arrays should be read-only.
+        '''
+        self.assertRaises(
+            ValueError, self.values.values.__setitem__, 0, 1)
+        self.assertRaises(
+            ValueError, self.values.undefined.__setitem__, 0, False)
+
+    def test_masked_array(self):
+        '''to_masked_array should mask the undefined values.
+        '''
+        masked = self.values.to_masked_array()
+
+        self.assertEqual(masked.tolist(), [3, None, 15, 7])
+
+    def test_pickle(self):
+        '''The values should survive pickling.
+        '''
+        self.assertEqual(
+            pickle.loads(pickle.dumps(self.values)), [3, None, 15, 7])
+
+
+class TestReadAxiStreamOutput(TestCase):
+    '''The AXI stream output file written by a Vivado simulation should be
+    read into the completed and incomplete packets on each stream.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'axi_stream_out_axi')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_transactions(self, names, transactions):
+        with open(self.filename, 'w') as f:
+            f.write(','.join(names) + '\n')
+
+            for transaction in transactions:
+                f.write(','.join(transaction) + '\n')
+
+    def test_packets(self):
+        '''The transactions should be grouped into packets by TLAST on each
+        stream given by TID and TDEST.
+        '''
+        self.write_transactions(
+            ['TDATA', 'TLAST', 'TID', 'TDEST'],
+            [('00000001', '0', '00', '0'),
+             ('00000010', '0', '01', '1'),
+             ('00000011', '1', '00', '0'),
+             ('00000100', '1', '01', '1'),
+             ('00000101', '1', '00', '0'),
+             ('00000110', '0', '00', '0'),
+             ('0000XX11', '0', '10', '0')])
+
+        output = read_axi_stream_output(self.filename)
+
+        self.assertIsInstance(output, AxiStreamOutput)
+        self.assertEqual(
+            output,
+            {'packets': {
+                (0, 0): deque([deque([1, 3]), deque([5])]),
+                (1, 1): deque([deque([2, 4])])},
+             'incomplete_packet': {
+                 (0, 0): deque([6]),
+                 (2, 0): deque([None])}})
+
+    def test_no_tlast(self):
+        '''Without TLAST, all the transactions should be in an incomplete
+        packet.
+        '''
+        self.write_transactions(
+            ['TDATA'], [('0001',), ('0010',), ('0011',)])
+
+        self.assertEqual(
+            read_axi_stream_output(self.filename),
+            {'packets': {},
+             'incomplete_packet': {(0, 0): deque([1, 2, 3])}})
+
+    def test_no_transactions(self):
+        '''A file with only a header should give no packets.
+        '''
+        self.write_transactions(['TDATA', 'TLAST'], [])
+
+        self.assertEqual(
+            read_axi_stream_output(self.filename),
+            {'packets': {}, 'incomplete_packet': {}})
+
+    def test_empty_file(self):
+        '''An empty file, written when there were no transactions at all,
+        should give no packets.
+        '''
+        open(self.filename, 'w').close()
+
+        self.assertEqual(
+            read_axi_stream_output(self.filename),
+            {'packets': {}, 'incomplete_packet': {}})
+
+    def test_hex_output_format(self):
+        '''Transactions written in the hex output format should be read in
+        the same way.
+        '''
+        self.write_transactions(
+            ['TDATA:8', 'TLAST:1', 'TID:2'],
+            [('01', '0', '0'),
+             ('02', '1', '1'),
+             ('FF', '1', '0'),
+             ('xx', '0', '0')])
+
+        self.assertEqual(
+            read_axi_stream_output(self.filename),
+            {'packets': {
+                (0, 0): deque([deque([1, 255])]),
+                (1, 0): deque([deque([2])])},
+             'incomplete_packet': {(0, 0): deque([None])}})
@@ -0,0 +1,204 @@
+from .base_hdl_test import TestCase
+
+import os
+import random
+import tempfile
+import shutil
+
+from collections import deque
+
+from myhdl import block, always_seq, Signal, ResetSignal, intbv
+
+from kea.testing.myhdl import AxiStreamOutput, SynchronousTest
+from kea.xilinx.vivado_utils import CosimulationResultCache
+
+
+@block
+def offset_register(clock, reset, input_value, output_value, offset):
+
+    @always_seq(clock.posedge, reset=reset)
+    def register():
+        output_value.next = (input_value + offset) % 256
+
+    return register
+
+
+class TestCosimulationResultCache(TestCase):
+    '''There should be a cache of the outputs of cosimulations, keyed by a
+    hash of their inputs.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = CosimulationResultCache(
+            os.path.join(self.tmp_dir, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_file(self, filename, content):
+        filename = os.path.join(self.tmp_dir, filename)
+        with open(filename, 'w') as f:
+            f.write(content)
+
+        return filename
+
+    def test_key(self):
+        '''The key should depend on the content and order of the files and
+        on the values.
+        '''
+        a = self.write_file('a.vhd', 'entity a')
+        b = self.write_file('b.vhd', 'entity b')
+
+        key = self.cache.key([a, b], ('VHDL', 'a_part', 100))
+
+        self.assertEqual(key, self.cache.key([a, b], ('VHDL', 'a_part', 100)))
+        self.assertNotEqual(
+            key, self.cache.key([b, a], ('VHDL', 'a_part', 100)))
+        self.assertNotEqual(
+            key, self.cache.key([a, b], ('VHDL', 'another_part', 100)))
+        self.assertNotEqual(
+            key, self.cache.key([a, b], ('VHDL', 'a_part', 101)))
+
+        self.write_file('b.vhd', 'entity b -- changed')
+        self.assertNotEqual(
+            key, self.cache.key([a, b], ('VHDL', 'a_part', 100)))
+
+    def test_key_ignores_generation_details(self):
+        '''The key should not depend on the directory the files were
+        generated in or on the date of the MyHDL header.
+        '''
+        keys = []
+        for n, date in enumerate(('Mon Oct 12 10:00:00 2026',
+                                  'Fri Oct 16 11:30:00 2026')):
+
+            temporary_directory = os.path.join(self.tmp_dir, 'tmp%d' % n)
+            os.mkdir(temporary_directory)
+
+            top = os.path.join(temporary_directory, 'dut_convertible_top.vhd')
+            with open(top, 'w') as f:
+                f.write('-- File: dut_convertible_top.vhd\n'
+                        '-- Generated by MyHDL 0.11\n'
+                        '-- Date: %s UTC\n'
+                        'file_open(f, "%s");\n' % (
+                            date, os.path.join(
+                                temporary_directory, 'signal_outputs')))
+
+            keys.append(self.cache.key(
+                [top], ('VHDL',), temporary_directory=temporary_directory))
+
+        self.assertEqual(keys[0], keys[1])
+
+    def converted_key(self, hdl, offset=1, seed=0):
+        '''Converts a test of offset_register to ``hdl`` and returns the key
+        of the converted files.
+        '''
+        args = {
+            'clock': Signal(False),
+            'reset': ResetSignal(False, active=True, isasync=False),
+            'input_value': Signal(intbv(0)[8:]),
+            'output_value': Signal(intbv(0)[8:]),
+            'offset': offset}
+
+        arg_types = {
+            'clock': 'clock', 'reset': 'custom_reset',
+            'input_value': 'random', 'output_value': 'output',
+            'offset': 'non-signal'}
+
+        random.seed(seed)
+        test = SynchronousTest(
+            offset_register, offset_register, args, arg_types)
+        test.cosimulate(20)
+
+        temporary_directory = tempfile.mkdtemp(dir=self.tmp_dir)
+        test.dut_convertible_top(temporary_directory).convert(
+            hdl=hdl, path=temporary_directory)
+
+        filenames = sorted(
+            os.path.join(temporary_directory, filename) for filename in
+            os.listdir(temporary_directory)
+            if filename.endswith(('.v', '.vhd')))
+
+        return self.cache.key(
+            filenames, (hdl,), temporary_directory=temporary_directory)
+
+    def test_key_ignores_generated_names(self):
+        '''The key should be the same for the same test converted twice in
+        one process, though MyHDL names the blocks, signals and labels of
+        the second conversion differently.
+        '''
+        for hdl in ('VHDL', 'Verilog'):
+            key = self.converted_key(hdl)
+
+            self.assertEqual(key, self.converted_key(hdl))
+            self.assertNotEqual(key, self.converted_key(hdl, offset=2))
+            self.assertNotEqual(key, self.converted_key(hdl, seed=1))
+
+    def test_get_and_put(self):
+        '''A result that is put in the cache should be returned by get, and
+        a missing result should return None.
+        '''
+        result = {
+            'output': [intbv(3)[4:], None, intbv(5)[4:]],
+            'axi_out': AxiStreamOutput({
+                'packets': {(0, 0): deque([deque([1, 2, 3])])},
+                'incomplete_packet': {}})}
+
+        self.assertIsNone(self.cache.get('a_key'))
+
+        self.cache.put('a_key', result)
+        self.assertEqual(self.cache.get('a_key'), result)
+        self.assertIsInstance(
+            self.cache.get('a_key')['axi_out'], AxiStreamOutput)
+
+        # A new cache on the same directory should find the result
+        self.assertEqual(
+            CosimulationResultCache(self.cache.directory).get('a_key'),
+            result)
+
+    def test_corrupt_result(self):
+        '''A result that cannot be read should be treated as missing.
+        '''
+        self.cache.put('a_key', [1, 2, 3])
+
+        with open(os.path.join(
+            self.cache.directory, 'a_key.pickle'), 'wb') as f:
+            f.write(b'garbage')
+
+        self.assertIsNone(self.cache.get('a_key'))
+
+    def test_lru_eviction(self):
+        '''When the cache is larger than max_size, the least recently used
+        results should be removed.
+        '''
+        self.cache.put('a', b'a' * 1000)
+        result_size = os.path.getsize(
+            os.path.join(self.cache.directory, 'a.pickle'))
+
+        self.cache.max_size = 3 * result_size
+
+        for n, key in enumerate(('a', 'b', 'c')):
+            if key != 'a':
+                self.cache.put(key, key.encode() * 1000)
+
+            os.utime(
+                os.path.join(self.cache.directory, key + '.pickle'),
+                (n, n))
+
+        # Using a should make b the least recently used
+        self.assertIsNotNone(self.cache.get('a'))
+
+        self.cache.put('d', b'd' * 1000)
+
+        self.assertIsNone(self.cache.get('b'))
+        for key in ('a', 'c', 'd'):
+            self.assertEqual(self.cache.get(key), key.encode() * 1000)
+
+    def test_clear(self):
+        '''clear should remove all the results.
+        '''
+        self.cache.put('a_key', [1, 2, 3])
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get('a_key'))
+        self.assertFalse(os.path.exists(self.cache.directory))
@@ -0,0 +1,159 @@
+from .batch_vivado_stand_in_test import (
+    BatchVivadoStandInTestCase, constant, constant_args, constant_arg_types,
+    constant_value)
+
+import os
+import time
+
+from unittest import mock
+
+from kea.xilinx.vivado_utils import (
+    VivadoCosimulationScheduler, VivadoTimeoutError)
+
+def _process_running(pid):
+
+    try:
+        with open('/proc/%d/status' % pid) as f:
+            # A zombie has finished but not been reaped.
+            return not any(
+                line.startswith('State:') and 'Z' in line for line in f)
+
+    except FileNotFoundError:
+        return False
+
+    except OSError:
+        pass
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+
+    return True
+
+
+class TestVivadoCosimulationScheduler(BatchVivadoStandInTestCase):
+    '''There should be a scheduler that runs Vivado cosimulations
+    concurrently, up to a maximum number at once.
+    '''
+
+    def max_concurrent_runs(self):
+        runs = self.runs()
+
+        return max(
+            sum(1 for start, end in runs if start <= run_start < end)
+            for run_start, _ in runs)
+
+    def submit(self, scheduler, n_cosimulations, target_language='VHDL'):
+        return [
+            scheduler.submit(
+                target_language, 20, constant, constant, constant_args(),
+                constant_arg_types)
+            for n in range(n_cosimulations)]
+
+    def test_concurrency(self):
+        '''The cosimulations should run concurrently, with no more than
+        max_concurrency running at once, and each future should give the
+        outputs of its cosimulation.
+        '''
+        with VivadoCosimulationScheduler(
+            max_concurrency=2, config_file=self.config_file) as scheduler:
+
+            futures = self.submit(scheduler, 4)
+
+        for future in futures:
+            dut_outputs, ref_outputs = future.result()
+
+            self.assertEqual(
+                dut_outputs['test_output'], [constant_value] * 20)
+            self.assertEqual(ref_outputs['test_output'][-1], constant_value)
+
+        self.assertEqual(len(self.runs()), 4)
+        self.assertEqual(self.max_concurrent_runs(), 2)
+
+    def test_max_concurrency_from_config(self):
+        '''max_concurrency and timeout should be read from the Scheduler
+        section of the config file, and max_concurrency should default to 1.
+        '''
+        scheduler = VivadoCosimulationScheduler(config_file=self.config_file)
+        self.assertEqual(scheduler.max_concurrency, 1)
+        self.assertIsNone(scheduler.timeout)
+        scheduler.shutdown()
+
+        self.write_config('[Scheduler]\nmax_concurrency=3\ntimeout=10.5\n')
+
+        with VivadoCosimulationScheduler(
+            config_file=self.config_file) as scheduler:
+
+            self.assertEqual(scheduler.max_concurrency, 3)
+            self.assertEqual(scheduler.timeout, 10.5)
+
+            futures = self.submit(scheduler, 3, target_language='Verilog')
+
+        for future in futures:
+            future.result()
+
+        self.assertEqual(self.max_concurrent_runs(), 3)
+
+    def test_timeout(self):
+        '''A cosimulation that runs for longer than the timeout should be
+        killed, along with the processes it started, and its future should
+        raise a VivadoTimeoutError. The other cosimulations should not be
+        affected.
+        '''
+        child_pid_filename = os.path.join(self.tmp_dir, 'child_pid')
+
+        with VivadoCosimulationScheduler(
+            max_concurrency=2, config_file=self.config_file) as scheduler:
+
+            with mock.patch.dict(
+                os.environ,
+                {'KEA_VIVADO_STAND_IN_SLEEP': '60',
+                 'KEA_VIVADO_STAND_IN_CHILD_PID': child_pid_filename}):
+
+                hung_future = scheduler.submit(
+                    'VHDL', 20, constant, constant, constant_args(),
+                    constant_arg_types, timeout=2)
+
+                # Waits for the hung simulation to start before the
+                # environment is restored.
+                while not (os.path.exists(child_pid_filename) or
+                           hung_future.done()):
+                    time.sleep(0.05)
+
+            future = scheduler.submit(
+                'VHDL', 20, constant, constant, constant_args(),
+                constant_arg_types)
+
+        self.assertRaises(VivadoTimeoutError, hung_future.result)
+        future.result()
+
+        with open(child_pid_filename) as f:
+            child_pid = int(f.read())
+
+        for n in range(50):
+            if not _process_running(child_pid):
+                break
+
+            time.sleep(0.1)
+
+        self.assertFalse(_process_running(child_pid))
+
+    def test_invalid_arguments(self):
+        '''An invalid target language, the persistent session or a
+        max_concurrency of less than 1 should raise a ValueError.
+        '''
+        self.assertRaises(
+            ValueError, VivadoCosimulationScheduler, max_concurrency=0,
+            config_file=self.config_file)
+
+        with VivadoCosimulationScheduler(
+            config_file=self.config_file) as scheduler:
+
+            self.assertRaises(
+                ValueError, scheduler.submit, 'VHDL2', 20, constant,
+                constant, constant_args(), constant_arg_types)
+            self.assertRaises(
+                ValueError, scheduler.submit, 'VHDL', 20, constant,
+                constant, constant_args(), constant_arg_types,
+                persistent_session=True)
@@ -0,0 +1,183 @@
+from .base_hdl_test import TestCase
+
+import os
+import sys
+import tempfile
+import shutil
+import unittest
+
+from unittest import mock
+
+import kea
+from kea.xilinx.vivado_utils import (
+    VivadoSession, VivadoTclError, VivadoError, get_vivado_session)
+
+try:
+    import tkinter
+    tkinter.Tcl()
+except Exception:
+    tkinter = None
+
+_stand_in_executable = [
+    sys.executable,
+    os.path.join(os.path.dirname(__file__), 'vivado_stand_in.py')]
+
+
+@unittest.skipIf(tkinter is None, 'Tcl is not available')
+class TestVivadoSession(TestCase):
+    '''There should be a long-lived Vivado session, which runs Tcl commands
+    sent to a single Vivado process.
+    '''
+
+    def setUp(self):
+        self.session = VivadoSession(_stand_in_executable)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.session.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_run(self):
+        '''``run`` should return the result of the command. The process
+        should be started on the first command and kept running between
+        commands.
+        '''
+        self.assertFalse(self.session.running)
+
+        self.assertEqual(self.session.run('expr {6 * 7}'), '42')
+        self.assertTrue(self.session.running)
+
+        process = self.session._process
+
+        self.session.run('set a_variable {multiple\nlines}')
+        self.assertEqual(
+            self.session.run('set a_variable'), 'multiple\nlines')
+        self.assertIs(self.session._process, process)
+
+    def test_log_output_is_not_in_result(self):
+        '''Anything printed by the command should not be included in the
+        result.
+        '''
+        self.session.run('create_project a_project')
+        self.assertEqual(self.session.run('launch_simulation; expr 1'), '1')
+
+    def test_tcl_error(self):
+        '''A Tcl error should raise a VivadoTclError with the error message
+        and the log of the command, and the session should remain usable.
+        '''
+        with self.assertRaises(VivadoTclError) as cm:
+            self.session.run('puts {Some log}; close_project')
+
+        self.assertIn('No open project', cm.exception.result)
+        self.assertIn('No open project', str(cm.exception))
+        self.assertIn('Some log', cm.exception.log)
+        self.assertIsInstance(cm.exception, VivadoError)
+
+        self.assertEqual(self.session.run('expr 1'), '1')
+
+    def test_source_and_reset(self):
+        '''It should be possible to source a script. ``reset`` should close
+        any open simulation and project, so the next script can create a
+        project whatever state the previous one left the session in.
+        '''
+        script_filename = os.path.join(self.tmp_dir, 'script.tcl')
+        with open(script_filename, 'w') as f:
+            f.write('create_project tmp_project\n'
+                    'launch_simulation\n'
+                    'error {Something went wrong}\n')
+
+        self.assertRaisesRegex(
+            VivadoTclError, 'Something went wrong', self.session.source,
+            script_filename)
+
+        self.assertRaisesRegex(
+            VivadoTclError, 'already open', self.session.source,
+            script_filename)
+
+        self.session.reset()
+        self.assertEqual(self.session.run('list $::project_open $::sim_open'),
+                         '0 0')
+        self.assertEqual(
+            self.session.run('lrange $::stand_in_calls end-1 end'),
+            '{close_sim -force -quiet} {close_project -quiet}')
+
+        self.assertRaisesRegex(
+            VivadoTclError, 'Something went wrong', self.session.source,
+            script_filename)
+
+        # Resetting a session with nothing open should be fine too
+        self.session.reset()
+        self.session.reset()
+
+    def test_process_exit(self):
+        '''If the process exits while running a command, a VivadoError
+        should be raised, and the process should be restarted on the next
+        command.
+        '''
+        self.session.run('set a_variable 10')
+
+        self.assertRaisesRegex(
+            VivadoError, 'exited unexpectedly', self.session.run,
+            'puts {Last words}; exit')
+        self.assertFalse(self.session.running)
+
+        self.assertEqual(
+            self.session.run('info exists a_variable'), '0')
+
+    def test_close(self):
+        '''``close`` should exit the process. It should also be closed on
+        leaving a ``with`` block.
+        '''
+        self.session.run('expr 1')
+        process = self.session._process
+
+        self.session.close()
+        self.assertFalse(self.session.running)
+        self.assertEqual(process.returncode, 0)
+
+        with VivadoSession(_stand_in_executable) as session:
+            session.run('expr 1')
+            process = session._process
+
+        self.assertFalse(session.running)
+        self.assertEqual(process.returncode, 0)
+
+    def test_arguments(self):
+        '''The executable should be run in Tcl mode without a log or a
+        journal.
+        '''
+        session = VivadoSession('vivado')
+        self.assertEqual(
+            session.command,
+            ['vivado', '-nolog', '-nojournal', '-mode', 'tcl'])
+
+
+class TestGetVivadoSession(TestCase):
+    '''There should be a function returning a single session per process.
+    '''
+
+    def test_single_session(self):
+        '''The same session should be returned on every call, using the
+        Vivado executable in the path.
+        '''
+        with mock.patch.object(
+            kea.xilinx.vivado_utils, 'VIVADO_EXECUTABLE', 'vivado'), \
+                mock.patch.dict(
+                    kea.xilinx.vivado_utils.session._sessions, clear=True):
+
+            session = get_vivado_session()
+            self.assertIs(get_vivado_session(), session)
+            self.assertEqual(session.command[0], 'vivado')
+
+    def test_no_vivado(self):
+        '''If Vivado is not in the path, an EnvironmentError should be
+        raised.
+        '''
+        with mock.patch.object(
+            kea.xilinx.vivado_utils, 'VIVADO_EXECUTABLE', None), \
+                mock.patch.dict(
+                    kea.xilinx.vivado_utils.session._sessions, clear=True):
+
+            self.assertRaisesRegex(
+                EnvironmentError, 'Vivado executable not in path',
+                get_vivado_session)
@@ -0,0 +1,158 @@
+from .base_hdl_test import TestCase
+from .batch_vivado_stand_in_test import (
+    BatchVivadoStandInTestCase, constant, constant_args, constant_arg_types)
+
+import json
+import os
+import time
+
+from unittest import mock
+
+from kea.xilinx.vivado_utils import (
+    CosimulationTimings, CosimulationResultCache, vivado_vhdl_cosimulation,
+    vivado_verilog_cosimulation)
+
+
+class TestCosimulationTimings(TestCase):
+    '''There should be a record of the time spent in each phase of a
+    cosimulation.
+    '''
+
+    def test_phase(self):
+        '''The time spent in a phase should be added to it, including when
+        the phase raises, and the phases should be kept in order.
+        '''
+        timings = CosimulationTimings()
+
+        with timings.phase('a'):
+            time.sleep(0.01)
+
+        with self.assertRaises(RuntimeError):
+            with timings.phase('b'):
+                raise RuntimeError
+
+        with timings.phase('a'):
+            time.sleep(0.01)
+
+        self.assertEqual(list(timings.phases), ['a', 'b'])
+        self.assertGreaterEqual(timings.phases['a'], 0.02)
+        self.assertAlmostEqual(
+            timings.total_time, timings.phases['a'] + timings.phases['b'])
+
+    def test_to_dict(self):
+        '''to_dict should return the timings as values that can be written
+        as JSON.
+        '''
+        timings = CosimulationTimings()
+
+        with timings.phase('conversion'):
+            pass
+
+        timings.sizes['hdl_bytes'] = 100
+        timings.cycles = 10
+
+        timings_dict = json.loads(json.dumps(timings.to_dict()))
+
+        self.assertEqual(
+            timings_dict,
+            {'phases': {'conversion': timings.phases['conversion']},
+             'sizes': {'hdl_bytes': 100},
+             'cycles': 10,
+             'cached': False,
+             'total_time': timings.total_time})
+
+        self.assertIn('conversion', timings.summary())
+        self.assertIn('hdl_bytes', timings.summary())
+
+
+class TestCosimulationTimingHandler(BatchVivadoStandInTestCase):
+    '''The timing handler of a Vivado cosimulation should be called with the
+    timings of the cosimulation.
+    '''
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = mock.patch.dict(
+            os.environ, {'KEA_VIVADO_STAND_IN_SLEEP': '0'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def cosimulate(self, cosimulation, **kwargs):
+        timings = []
+
+        cosimulation(
+            20, constant, constant, constant_args(), constant_arg_types,
+            config_file=self.config_file, timing_handler=timings.append,
+            **kwargs)
+
+        self.assertEqual(len(timings), 1)
+        self.assertIsInstance(timings[0], CosimulationTimings)
+
+        return timings[0]
+
+    def test_phases_and_sizes(self):
+        '''The timings should include the phases of the project flow and the
+        sizes of what was generated.
+        '''
+        for cosimulation in (
+            vivado_vhdl_cosimulation, vivado_verilog_cosimulation):
+
+            timings = self.cosimulate(cosimulation)
+
+            self.assertEqual(
+                list(timings.phases),
+                ['myhdl_simulation', 'conversion', 'tcl_generation',
+                 'vivado', 'result_parsing'])
+
+            self.assertEqual(timings.cycles, 21)
+            self.assertFalse(timings.cached)
+
+            # The reset is the only signal that is played back.
+            self.assertEqual(timings.sizes['stimulus_entries'], 20)
+            self.assertGreater(timings.sizes['hdl_bytes'], 0)
+            self.assertEqual(timings.sizes['stimulus_file_bytes'], 0)
+            self.assertEqual(
+                timings.sizes['output_file_bytes'],
+                len(os.environ['KEA_VIVADO_STAND_IN_OUTPUTS']))
+
+    def test_file_stimulus(self):
+        '''With file stimulus, the size of the stimulus files should be
+        given.
+        '''
+        timings = self.cosimulate(
+            vivado_vhdl_cosimulation, file_stimulus=True)
+
+        self.assertGreater(timings.sizes['stimulus_file_bytes'], 0)
+
+    def test_cached_result(self):
+        '''A cached result should have the cache phases and no Vivado
+        phase.
+        '''
+        result_cache_directory = os.path.join(self.tmp_dir, 'results')
+
+        # MyHDL names some of the converted code differently on each
+        # conversion in a process, so the key is fixed to get a cache hit.
+        patcher = mock.patch.object(
+            CosimulationResultCache, 'key', return_value='a_key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        timings = self.cosimulate(
+            vivado_vhdl_cosimulation, cache_results=True,
+            result_cache_directory=result_cache_directory)
+
+        self.assertFalse(timings.cached)
+        self.assertIn('vivado', timings.phases)
+        self.assertIn('cache_lookup', timings.phases)
+        self.assertIn('cache_store', timings.phases)
+
+        timings = self.cosimulate(
+            vivado_vhdl_cosimulation, cache_results=True,
+            result_cache_directory=result_cache_directory)
+
+        self.assertTrue(timings.cached)
+        self.assertEqual(
+            list(timings.phases),
+            ['myhdl_simulation', 'conversion', 'cache_lookup'])
+        self.assertNotIn('output_file_bytes', timings.sizes)
@@ -0,0 +1,120 @@
+from .base_hdl_test import TestCase
+
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import shutil
+import unittest
+
+from unittest import mock
+
+from kea.xilinx.vivado_utils import utils
+
+_package_directory = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+
+@unittest.skipUnless(os.name == 'posix', 'The stand in is a shell script')
+class TestVivadoDetection(TestCase):
+    '''VIVADO_EXECUTABLE and VIVADO_VERSION should only be found when they
+    are first used, and the version should be cached on disk by the
+    executable.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log_filename = os.path.join(self.tmp_dir, 'runs')
+
+        self.bin_directory = os.path.join(self.tmp_dir, 'bin')
+        os.mkdir(self.bin_directory)
+
+        self.executable = os.path.join(self.bin_directory, 'vivado')
+        self.write_executable('v2019.2')
+
+        self.cache_filename = os.path.join(
+            self.tmp_dir, 'cache', 'vivado_versions.json')
+
+        patcher = mock.patch.object(
+            utils, '_vivado_version_cache_filename', self.cache_filename)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_executable(self, version):
+        with open(self.executable, 'w') as f:
+            f.write('#!/bin/sh\necho run >> "%s"\necho "Vivado %s (64-bit)"\n'
+                    % (self.log_filename, version))
+
+        os.chmod(
+            self.executable, os.stat(self.executable).st_mode | stat.S_IEXEC)
+
+    def runs(self):
+        try:
+            with open(self.log_filename) as f:
+                return len(f.readlines())
+        except FileNotFoundError:
+            return 0
+
+    def run_python(self, code):
+        env = dict(os.environ)
+        env['PATH'] = self.bin_directory + os.pathsep + env.get('PATH', '')
+        env['HOME'] = self.tmp_dir
+        env['PYTHONPATH'] = _package_directory
+
+        return subprocess.check_output(
+            [sys.executable, '-c', code], env=env,
+            cwd=self.tmp_dir).decode().strip()
+
+    def test_lazy_detection(self):
+        '''Importing vivado_utils should not run Vivado. Using
+        VIVADO_VERSION should, once, and the version should be read from
+        the cache on disk in later processes.
+        '''
+        self.run_python('import kea.xilinx.vivado_utils')
+        self.assertEqual(self.runs(), 0)
+
+        code = (
+            'import kea.xilinx.vivado_utils as vivado_utils\n'
+            'print(vivado_utils.VIVADO_EXECUTABLE)\n'
+            'print(vivado_utils.VIVADO_VERSION)\n'
+            'print(vivado_utils.VIVADO_VERSION)\n')
+
+        self.assertEqual(
+            self.run_python(code).split(),
+            [self.executable, '2019.2', '2019.2'])
+        self.assertEqual(self.runs(), 1)
+
+        self.assertEqual(
+            self.run_python(code).split(),
+            [self.executable, '2019.2', '2019.2'])
+        self.assertEqual(self.runs(), 1)
+
+    def test_version_cache(self):
+        '''The version should be found again when the executable changes.
+        '''
+        self.assertEqual(utils._get_vivado_version(self.executable), '2019.2')
+        self.assertEqual(utils._get_vivado_version(self.executable), '2019.2')
+        self.assertEqual(self.runs(), 1)
+
+        self.write_executable('v2020.1.1')
+        os.utime(self.executable, ns=(0, 0))
+
+        self.assertEqual(
+            utils._get_vivado_version(self.executable), '2020.1.1')
+        self.assertEqual(self.runs(), 2)
+
+        self.assertIsNone(utils._get_vivado_version(None))
+
+    def test_unwritable_cache(self):
+        '''A cache that cannot be written should not be an error.
+        '''
+        with open(os.path.join(self.tmp_dir, 'cache'), 'w') as f:
+            f.write('not a directory')
+
+        self.assertEqual(utils._get_vivado_version(self.executable), '2019.2')
+        self.assertEqual(utils._get_vivado_version(self.executable), '2019.2')
+        self.assertEqual(self.runs(), 2)
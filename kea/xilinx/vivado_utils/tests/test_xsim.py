@@ -0,0 +1,323 @@
+from .base_hdl_test import TestCase
+
+import json
+import os
+import sys
+import tempfile
+import shutil
+
+from unittest import mock
+
+import kea
+from kea.xilinx.vivado_utils import XsimFlow, VivadoError
+
+_stand_in_script = os.path.join(
+    os.path.dirname(__file__), 'xsim_stand_in.py')
+
+_stand_in_tools = {
+    tool: [sys.executable, _stand_in_script, tool] for
+    tool in ('xvhdl', 'xvlog', 'xelab', 'xsim')}
+
+
+class TestXsimFlow(TestCase):
+    '''There should be a non-project flow that runs the Vivado simulator
+    tools directly, compiling the dependencies into a cached library.
+    '''
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_directory = os.path.join(self.tmp_dir, 'cache')
+        self.log_filename = os.path.join(self.tmp_dir, 'calls')
+
+        patcher = mock.patch.dict(
+            os.environ, {'KEA_XSIM_STAND_IN_LOG': self.log_filename})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.flow = XsimFlow(
+            tools=_stand_in_tools, cache_directory=self.cache_directory)
+
+        self.dependencies = [
+            self.write_file('pck_myhdl_011.vhd', 'package pck_myhdl'),
+            self.write_file('dependency.vhd', 'entity dependency')]
+        self.top = self.write_file(
+            'dut_convertible_top.vhd', 'entity dut_convertible_top')
+
+        self.run_count = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_file(self, filename, content):
+        filename = os.path.join(self.tmp_dir, filename)
+        with open(filename, 'w') as f:
+            f.write(content)
+
+        return filename
+
+    def simulate(self, language='VHDL', vcd_filename=None):
+        self.run_count += 1
+        run_directory = os.path.join(self.tmp_dir, 'run%d' % self.run_count)
+        os.mkdir(run_directory)
+
+        self.flow.simulate(
+            language, self.dependencies, [self.top], 'dut_convertible_top',
+            run_directory, 100, 'ns', vcd_filename=vcd_filename)
+
+        return run_directory
+
+    def calls(self):
+        if not os.path.exists(self.log_filename):
+            return []
+
+        with open(self.log_filename) as f:
+            calls = [json.loads(line) for line in f]
+
+        os.remove(self.log_filename)
+        return calls
+
+    def compiled_files(self, calls):
+        return [os.path.basename(argument)
+                for tool, cwd, arguments in calls if tool == 'xvhdl'
+                for argument in arguments if argument.endswith('.vhd')]
+
+    def test_commands(self):
+        '''The compile, elaborate and simulate commands should be built from
+        the tool commands.
+        '''
+        self.assertEqual(
+            self.flow.compile_command('VHDL', ['a.vhd', 'b.vhd']),
+            _stand_in_tools['xvhdl'] + [
+                '--2008', '--relax', '--work', 'work', 'a.vhd', 'b.vhd'])
+        self.assertEqual(
+            self.flow.compile_command('Verilog', ['a.v']),
+            _stand_in_tools['xvlog'] + ['--relax', '--work', 'work', 'a.v'])
+        self.assertEqual(
+            self.flow.elaborate_command('top'),
+            _stand_in_tools['xelab'] + [
+                '--relax', '--debug', 'off', '-L', 'unisims_ver', '-L',
+                'unisim', '--snapshot', 'kea_snapshot', 'work.top'])
+        self.assertEqual(
+            self.flow.elaborate_command('top', debug=True)[-8],
+            'typical')
+        self.assertEqual(
+            self.flow.elaborate_command('top', glbl=True)[-2:],
+            ['work.top', 'work.glbl'])
+        self.assertEqual(
+            self.flow.simulate_command('run.tcl'),
+            _stand_in_tools['xsim'] + [
+                'kea_snapshot', '--tclbatch', 'run.tcl'])
+
+        self.assertRaisesRegex(
+            ValueError, 'Target language must be', self.flow.compile_command,
+            'SystemC', ['a.v'])
+
+    def test_default_tools(self):
+        '''By default, the tools should be run from the directory of the
+        Vivado executable. If Vivado is not in the path, an
+        EnvironmentError should be raised.
+        '''
+        with mock.patch.object(
+            kea.xilinx.vivado_utils, 'VIVADO_EXECUTABLE',
+            os.path.join('/opt', 'vivado', 'bin', 'vivado')):
+
+            flow = XsimFlow(tools={'xsim': 'a_simulator'})
+
+        self.assertEqual(
+            flow.tools['xvhdl'], [os.path.join('/opt', 'vivado', 'bin', 'xvhdl')])
+        self.assertEqual(flow.tools['xsim'], ['a_simulator'])
+
+        # There is no glbl.v in the installation
+        self.assertIsNone(flow.glbl_filename)
+
+        vivado_directory = os.path.join(self.tmp_dir, 'vivado')
+        glbl_filename = os.path.join(
+            vivado_directory, 'data', 'verilog', 'src', 'glbl.v')
+        os.makedirs(os.path.dirname(glbl_filename))
+        self.write_file(glbl_filename, 'module glbl')
+
+        with mock.patch.object(
+            kea.xilinx.vivado_utils, 'VIVADO_EXECUTABLE',
+            os.path.join(vivado_directory, 'bin', 'vivado')):
+
+            flow = XsimFlow()
+
+        self.assertEqual(flow.glbl_filename, glbl_filename)
+
+        with mock.patch.object(
+            kea.xilinx.vivado_utils, 'VIVADO_EXECUTABLE', None):
+
+            self.assertRaisesRegex(
+                EnvironmentError, 'Vivado executable not in path', XsimFlow)
+
+    def test_simulate(self):
+        '''The top level should be compiled on top of the dependencies,
+        elaborated and simulated for the given time.
+        '''
+        run_directory = self.simulate()
+
+        calls = self.calls()
+        self.assertEqual(
+            [tool for tool, cwd, arguments in calls],
+            ['xvhdl', 'xvhdl', 'xelab', 'xsim'])
+        self.assertEqual(
+            self.compiled_files(calls),
+            ['pck_myhdl_011.vhd', 'dependency.vhd',
+             'dut_convertible_top.vhd'])
+
+        for tool, cwd, arguments in calls[1:]:
+            self.assertEqual(cwd, run_directory)
+
+        snapshot = os.path.join(run_directory, 'xsim.dir', 'kea_snapshot')
+        with open(os.path.join(snapshot, 'units')) as f:
+            self.assertEqual(
+                f.read().split(),
+                ['dependency.vhd', 'dut_convertible_top.vhd',
+                 'pck_myhdl_011.vhd'])
+
+        with open(os.path.join(snapshot, 'simulated')) as f:
+            run_tcl = f.read()
+
+        self.assertIn('run 100ns', run_tcl)
+        self.assertNotIn('open_vcd', run_tcl)
+
+    def test_vcd(self):
+        '''If a VCD filename is given, the design should be elaborated with
+        debug access and the simulation should write the VCD file.
+        '''
+        run_directory = self.simulate(vcd_filename='/tmp/a_file.vcd')
+
+        calls = self.calls()
+        self.assertIn('typical', calls[2][2])
+
+        with open(os.path.join(
+            run_directory, 'xsim.dir', 'kea_snapshot', 'simulated')) as f:
+            run_tcl = f.read()
+
+        self.assertIn('open_vcd {/tmp/a_file.vcd}', run_tcl)
+
+    def test_verilog_primitives(self):
+        '''A Verilog design should be elaborated against the libraries of
+        the primitives, with glbl compiled into the cached library and
+        elaborated alongside the top level.
+        '''
+        self.flow = XsimFlow(
+            tools=_stand_in_tools, cache_directory=self.cache_directory,
+            glbl_filename=self.write_file('glbl.v', 'module glbl'))
+
+        self.dependencies = [self.write_file('dependency.v', 'module dep')]
+        self.top = self.write_file(
+            'dut_convertible_top.v', 'module dut_convertible_top')
+
+        run_directory = self.simulate('Verilog')
+
+        calls = self.calls()
+        self.assertEqual(
+            [tool for tool, cwd, arguments in calls],
+            ['xvlog', 'xvlog', 'xelab', 'xsim'])
+        self.assertEqual(
+            [os.path.basename(argument) for argument in calls[0][2][3:]],
+            ['glbl.v', 'dependency.v'])
+
+        elaborate_arguments = calls[2][2]
+        self.assertIn('unisims_ver', elaborate_arguments)
+        self.assertEqual(
+            elaborate_arguments[-2:],
+            ['work.dut_convertible_top', 'work.glbl'])
+
+        with open(os.path.join(
+            run_directory, 'xsim.dir', 'kea_snapshot', 'units')) as f:
+            self.assertIn('glbl.v', f.read().split())
+
+        # glbl is only needed by Verilog
+        self.simulate('VHDL')
+        calls = self.calls()
+        self.assertNotIn('work.glbl', calls[-2][2])
+        self.assertIn('unisim', calls[-2][2])
+
+    def test_cached_dependencies(self):
+        '''The dependencies should only be compiled once, and only the top
+        level should be compiled for subsequent simulations.
+        '''
+        self.simulate()
+        self.calls()
+
+        self.simulate()
+        self.assertEqual(
+            self.compiled_files(self.calls()), ['dut_convertible_top.vhd'])
+
+        # A new flow should use the same cache
+        self.flow = XsimFlow(
+            tools=_stand_in_tools, cache_directory=self.cache_directory)
+        self.simulate()
+        self.assertEqual(
+            self.compiled_files(self.calls()), ['dut_convertible_top.vhd'])
+
+        # As should a change to the top level
+        self.write_file('dut_convertible_top.vhd', 'entity changed')
+        self.simulate()
+        self.assertEqual(
+            self.compiled_files(self.calls()), ['dut_convertible_top.vhd'])
+
+    def test_cache_invalidation(self):
+        '''The dependencies should be compiled again if their content, their
+        order or the language changes.
+        '''
+        self.simulate()
+        key = self.flow.library_key('VHDL', self.dependencies)
+        self.calls()
+
+        self.write_file('dependency.vhd', 'entity dependency -- changed')
+        self.assertNotEqual(
+            self.flow.library_key('VHDL', self.dependencies), key)
+
+        self.simulate()
+        self.assertEqual(
+            self.compiled_files(self.calls()),
+            ['pck_myhdl_011.vhd', 'dependency.vhd',
+             'dut_convertible_top.vhd'])
+
+        key = self.flow.library_key('VHDL', self.dependencies)
+        self.assertNotEqual(
+            self.flow.library_key('VHDL', self.dependencies[::-1]), key)
+        self.assertNotEqual(
+            self.flow.library_key('Verilog', self.dependencies), key)
+
+        # The previous library is kept in the cache
+        self.assertEqual(len(os.listdir(self.cache_directory)), 2)
+
+        self.flow.clear_cache()
+        self.assertFalse(os.path.exists(self.cache_directory))
+
+        self.simulate()
+        self.assertEqual(
+            self.compiled_files(self.calls()),
+            ['pck_myhdl_011.vhd', 'dependency.vhd',
+             'dut_convertible_top.vhd'])
+
+    def test_no_dependencies(self):
+        '''It should be possible to simulate without any dependencies.
+        '''
+        self.dependencies = []
+        self.simulate()
+
+        self.assertEqual(
+            self.compiled_files(self.calls()), ['dut_convertible_top.vhd'])
+
+    def test_tool_error(self):
+        '''If a tool fails, a VivadoError should be raised with its output.
+        A library that fails to compile should not be left in the cache.
+        '''
+        self.write_file('dependency.vhd', 'syntax error')
+
+        self.assertRaisesRegex(
+            VivadoError, 'syntax error in .*dependency.vhd', self.simulate)
+        self.assertEqual(os.listdir(self.cache_directory), [])
+
+        self.write_file('dependency.vhd', 'entity dependency')
+        self.write_file('dut_convertible_top.vhd', 'syntax error')
+
+        self.assertRaisesRegex(
+            VivadoError, 'syntax error in .*dut_convertible_top.vhd',
+            self.simulate)
+        self.assertEqual(len(os.listdir(self.cache_directory)), 1)
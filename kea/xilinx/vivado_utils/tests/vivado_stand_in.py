@@ -0,0 +1,99 @@
+'''A stand-in for Vivado in Tcl mode, for testing ``VivadoSession``.
+
+It reads Tcl commands from stdin and evaluates them in a Tcl interpreter,
+printing a prompt before reading each command as Vivado does. The Vivado
+project commands are stubs that track whether a project or simulation is
+open, and every call to them is recorded in the ``::stand_in_calls`` list.
+'''
+import os
+import sys
+import tkinter
+
+_stubs = '''
+set ::stand_in_calls {}
+set ::project_open 0
+set ::sim_open 0
+
+proc _record {name arguments} {
+    lappend ::stand_in_calls [concat $name $arguments]
+}
+
+proc create_project {args} {
+    _record create_project $args
+    if {$::project_open} {
+        error "ERROR: \\[Vivado 12-1\\] A project is already open"
+    }
+    set ::project_open 1
+}
+
+proc close_project {args} {
+    _record close_project $args
+    if {!$::project_open} {
+        error "ERROR: \\[Vivado 12-2\\] No open project"
+    }
+    set ::project_open 0
+}
+
+proc launch_simulation {args} {
+    _record launch_simulation $args
+    if {!$::project_open} {
+        error "ERROR: \\[Vivado 12-2\\] No open project"
+    }
+    puts "INFO: \\[Vivado 12-3\\] Simulation launched"
+    set ::sim_open 1
+}
+
+proc close_sim {args} {
+    _record close_sim $args
+    if {!$::sim_open} {
+        error "ERROR: \\[Vivado 12-4\\] No open simulation"
+    }
+    set ::sim_open 0
+}
+
+foreach name {add_files set_property set_param get_files current_project
+              current_fileset update_compile_order} {
+    proc $name {args} "_record $name \\$args"
+}
+'''
+
+def main():
+    interpreter = tkinter.Tcl()
+    interpreter.eval(_stubs)
+
+    def exit_command(code=0):
+        # The exit command is removed from the interpreter of tkinter.
+        interpreter.eval('flush stdout')
+        sys.stdout.flush()
+        os._exit(int(code))
+
+    interpreter.createcommand('exit', exit_command)
+
+    command = ''
+    while True:
+        if command == '':
+            sys.stdout.write('Vivado% ')
+            sys.stdout.flush()
+
+        line = sys.stdin.readline()
+
+        if line == '':
+            break
+
+        command += line
+
+        if not interpreter.call('info', 'complete', command):
+            continue
+
+        try:
+            interpreter.eval(command)
+        except tkinter.TclError as e:
+            sys.stdout.write('%s\n' % e)
+
+        # Anything written by the Tcl interpreter is flushed before the next
+        # prompt.
+        interpreter.eval('flush stdout')
+        command = ''
+
+if __name__ == '__main__':
+    main()
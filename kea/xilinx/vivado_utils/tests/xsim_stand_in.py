@@ -0,0 +1,75 @@
+'''A stand-in for the Vivado simulator tools, for testing ``XsimFlow``.
+
+The first argument is the name of the tool to stand in for. The compilers
+copy each file into the library in ``xsim.dir``, failing on any file that
+contains ``syntax error``. The elaborator checks the units it is given are
+in the library and writes a snapshot, and the simulator writes the Tcl
+batch file it is given into the snapshot. If ``KEA_XSIM_STAND_IN_LOG`` is
+set, every call is appended to the file it names.
+'''
+import json
+import os
+import shutil
+import sys
+
+def _argument_value(arguments, name):
+    return arguments[arguments.index(name) + 1]
+
+def main():
+    tool = sys.argv[1]
+    arguments = sys.argv[2:]
+
+    log_filename = os.environ.get('KEA_XSIM_STAND_IN_LOG')
+    if log_filename is not None:
+        with open(log_filename, 'a') as log_file:
+            log_file.write(
+                json.dumps([tool, os.getcwd(), arguments]) + '\n')
+
+    if tool in ('xvhdl', 'xvlog'):
+        library = os.path.join(
+            'xsim.dir', _argument_value(arguments, '--work'))
+        os.makedirs(library, exist_ok=True)
+
+        for filename in arguments:
+            if not os.path.isfile(filename):
+                continue
+
+            with open(filename) as f:
+                if 'syntax error' in f.read():
+                    print('ERROR: [VRFC 10-1] syntax error in %s' % filename)
+                    sys.exit(1)
+
+            shutil.copy(filename, library)
+
+    elif tool == 'xelab':
+        snapshot = _argument_value(arguments, '--snapshot')
+
+        # The units to elaborate follow the snapshot name.
+        for each in arguments[arguments.index('--snapshot') + 2:]:
+            library, top_name = each.split('.')
+
+            units = sorted(os.listdir(os.path.join('xsim.dir', library)))
+            if not any(unit.startswith(top_name + '.') for unit in units):
+                print('ERROR: [XSIM 43-1] %s not found' % top_name)
+                sys.exit(1)
+
+        os.makedirs(os.path.join('xsim.dir', snapshot))
+        with open(os.path.join('xsim.dir', snapshot, 'units'), 'w') as f:
+            f.write('\n'.join(units))
+
+    elif tool == 'xsim':
+        snapshot = os.path.join('xsim.dir', arguments[0])
+        if not os.path.exists(snapshot):
+            print('ERROR: [XSIM 43-2] No snapshot %s' % arguments[0])
+            sys.exit(1)
+
+        shutil.copy(
+            _argument_value(arguments, '--tclbatch'),
+            os.path.join(snapshot, 'simulated'))
+
+    else:
+        print('Unknown tool: %s' % tool)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import contextlib
+import time
+
+__all__ = ['CosimulationTimings']
+
+
+class CosimulationTimings(object):
+    '''The wall times of the phases of a Vivado cosimulation, and the sizes
+    of what was generated for it (see :func:`vivado_vhdl_cosimulation`).
+
+    ``phases`` is a dict from the name of each phase to the wall time in
+    seconds spent in it, in the order the phases were run. The phases are:
+
+    * ``'myhdl_simulation'``: the MyHDL simulation of the ref and the dut
+      that generates the stimulus.
+    * ``'conversion'``: building and converting the convertible top level
+      (including writing any stimulus files).
+    * ``'cache_lookup'``: hashing the inputs and reading the result cache.
+    * ``'tcl_generation'``: writing the Tcl script for Vivado.
+    * ``'vivado'``: the Vivado run of the project flow, which includes
+      the compilation, elaboration and simulation.
+    * ``'dependency_library'``, ``'compile'``, ``'elaborate'`` and
+      ``'simulate'``: the steps of the non-project flow (see
+      :class:`XsimFlow`), in place of ``'vivado'``.
+    * ``'result_parsing'``: reading the files written by the simulation.
+    * ``'cache_store'``: writing the result to the result cache.
+
+    Only the phases that were run are included, so a cached result has no
+    Vivado phases.
+
+    ``sizes`` is a dict of the sizes of what was generated:
+
+    * ``'hdl_bytes'``: the converted HDL files (not including the
+      dependencies).
+    * ``'stimulus_entries'``: the number of stimulus values played back,
+      which is the number of look-up table entries in the converted HDL
+      unless the stimulus is played back from files.
+    * ``'stimulus_file_bytes'``: the files of stimulus played back by the
+      simulation.
+    * ``'output_file_bytes'``: the files of the outputs written by the
+      simulation.
+
+    ``cycles`` is the number of clock cycles simulated by Vivado, and
+    ``cached`` is ``True`` if the result was read from the result cache.
+    '''
+
+    def __init__(self):
+        self.phases = {}
+        self.sizes = {}
+        self.cycles = None
+        self.cached = False
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''A context manager that adds the wall time spent in it to the
+        phase ``name``.
+        '''
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.phases[name] = (
+                self.phases.get(name, 0.0) + time.perf_counter() - start)
+
+    @property
+    def total_time(self):
+        '''The total wall time in seconds of all the phases.
+        '''
+        return sum(self.phases.values())
+
+    def to_dict(self):
+        '''Returns the timings as a dict of plain values (that can be
+        written as JSON, for example to track them between runs).
+        '''
+        return {
+            'phases': dict(self.phases),
+            'sizes': dict(self.sizes),
+            'cycles': self.cycles,
+            'cached': self.cached,
+            'total_time': self.total_time}
+
+    def summary(self):
+        '''Returns a string of a table of the phases and the sizes.
+        '''
+        lines = ['Cosimulation of {} cycles in {:.3f}s{}'.format(
+            self.cycles, self.total_time,
+            ' (cached result)' if self.cached else '')]
+
+        for name, phase_time in self.phases.items():
+            lines.append('{:<20} {:>10.3f}s'.format(name, phase_time))
+
+        for name, size in self.sizes.items():
+            lines.append('{:<20} {:>11}'.format(name, size))
+
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return (
+            'CosimulationTimings(phases={!r}, sizes={!r}, cycles={}, '
+            'cached={})'.format(
+                self.phases, self.sizes, self.cycles, self.cached))
@@ -1,22 +1,190 @@
-from distutils import spawn as _spawn
+import json as _json
+import os as _os
+import shutil as _shutil
+import signal as _signal
 import subprocess as _subprocess
+import sys as _sys
+import tempfile as _tempfile
+import time as _time
 import myhdl as _myhdl
 
-VIVADO_EXECUTABLE = _spawn.find_executable('vivado')
+# The versions of the Vivado executables that have been found, by the path,
+# modification time and size of the executable.
+_vivado_version_cache_filename = _os.path.join(
+    _os.path.expanduser('~'), '.cache', 'kea', 'vivado_versions.json')
 
-if VIVADO_EXECUTABLE is not None:
+def _find_vivado_executable():
+    return _shutil.which('vivado')
+
+def _run_vivado_version(executable):
+    '''Runs ``executable -version`` and returns the version it reports, or
+    ``None`` if it cannot be read from the output.
+    '''
     vivado_version_exe = _subprocess.Popen(
-        [VIVADO_EXECUTABLE, '-version'], stdin=_subprocess.PIPE,
+        [executable, '-version'], stdin=_subprocess.PIPE,
         stdout=_subprocess.PIPE, stderr=_subprocess.PIPE)
 
+    out, err = vivado_version_exe.communicate()
+
     try:
-        out, err = vivado_version_exe.communicate()
-        VIVADO_VERSION = (out.split()[1][1:]).decode('utf8')
+        return (out.split()[1][1:]).decode('utf8')
     except IndexError:
-        VIVADO_VERSION = None
+        return None
+
+def _get_vivado_version(executable):
+    '''Returns the version of the Vivado ``executable``.
+
+    Running Vivado to find its version takes several seconds, so the version
+    is kept in a small cache on disk, keyed by the path, modification time
+    and size of the executable, and Vivado is only run when the executable
+    has not been seen before or has changed.
+    '''
+    if executable is None:
+        return None
+
+    try:
+        stat = _os.stat(executable)
+    except OSError:
+        return _run_vivado_version(executable)
+
+    version_key = '%s:%d:%d' % (
+        _os.path.realpath(executable), stat.st_mtime_ns, stat.st_size)
+
+    try:
+        with open(_vivado_version_cache_filename) as f:
+            versions = _json.load(f)
+
+    except (OSError, ValueError):
+        versions = {}
+
+    if not isinstance(versions, dict):
+        versions = {}
+
+    if version_key in versions:
+        return versions[version_key]
+
+    version = _run_vivado_version(executable)
+    versions[version_key] = version
+
+    # The cache is written to a temporary file that is moved into place, so
+    # a partially written cache is never read. Failing to write it is not an
+    # error.
+    try:
+        cache_directory = _os.path.dirname(_vivado_version_cache_filename)
+        _os.makedirs(cache_directory, exist_ok=True)
+
+        cache_file, temporary_filename = _tempfile.mkstemp(
+            dir=cache_directory, suffix='.tmp')
+
+        try:
+            with _os.fdopen(cache_file, 'w') as f:
+                _json.dump(versions, f)
+
+            _os.replace(temporary_filename, _vivado_version_cache_filename)
+
+        except BaseException:
+            _os.remove(temporary_filename)
+            raise
+
+    except OSError:
+        pass
+
+    return version
+
+def __getattr__(name):
+    # VIVADO_EXECUTABLE and VIVADO_VERSION are only looked for when they are
+    # first used, so importing kea does not run Vivado. They are then kept for
+    # the rest of the process.
+    if name == 'VIVADO_EXECUTABLE':
+        value = _find_vivado_executable()
 
-else:
-    VIVADO_VERSION = None
+    elif name == 'VIVADO_VERSION':
+        value = _get_vivado_version(
+            getattr(_sys.modules[__name__], 'VIVADO_EXECUTABLE'))
+
+    else:
+        raise AttributeError(
+            'module %r has no attribute %r' % (__name__, name))
+
+    globals()[name] = value
+
+    return value
 
 class KeaConversionError(_myhdl.ConversionError):
     pass
+
+class VivadoError(RuntimeError):
+    pass
+
+class VivadoTimeoutError(VivadoError):
+    pass
+
+def _start_process(command, **kwargs):
+    '''Starts ``command`` with ``subprocess.Popen`` in a new process group,
+    so that it can be killed along with any processes it starts (for
+    example, Vivado starts ``xsim``) by :func:`_communicate`.
+    '''
+    if _os.name == 'posix':
+        kwargs['start_new_session'] = True
+
+    return _subprocess.Popen(command, **kwargs)
+
+def _kill_process_group(process):
+    '''Kills ``process`` and every process in its group, and waits for it to
+    finish.
+    '''
+    if _os.name == 'posix':
+        try:
+            _os.killpg(process.pid, _signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        process.kill()
+
+    process.communicate()
+
+def _communicate(process, timeout=None, monitor=None, poll_interval=0.5):
+    '''Waits for ``process`` to finish and returns its stdout and stderr.
+
+    If it has not finished after ``timeout`` seconds, the process and every
+    process in its group are killed and a :class:`VivadoTimeoutError` is
+    raised.
+
+    If ``monitor`` is not ``None``, it is called every ``poll_interval``
+    seconds while the process runs. If it raises, the process and every
+    process in its group are killed and the exception is raised.
+    '''
+    if timeout is not None:
+        deadline = _time.monotonic() + timeout
+
+    while True:
+        if monitor is None:
+            wait_time = timeout
+        elif timeout is None:
+            wait_time = poll_interval
+        else:
+            wait_time = max(
+                min(poll_interval, deadline - _time.monotonic()), 0)
+
+        try:
+            return process.communicate(timeout=wait_time)
+
+        except _subprocess.TimeoutExpired:
+            pass
+
+        if timeout is not None and _time.monotonic() >= deadline:
+            _kill_process_group(process)
+
+            raise VivadoTimeoutError(
+                '%s did not finish within %s seconds and was killed' %
+                (_os.path.basename(process.args[0]), timeout))
+
+        if monitor is None:
+            continue
+
+        try:
+            monitor()
+
+        except BaseException:
+            _kill_process_group(process)
+            raise
@@ -0,0 +1,328 @@
+import hashlib
+import os
+import shutil
+import string
+import subprocess
+import tempfile
+
+import kea
+
+from .utils import VivadoError, _start_process, _communicate
+from .timings import CosimulationTimings
+
+__all__ = ['XsimFlow']
+
+_xsim_tools = ('xvhdl', 'xvlog', 'xelab', 'xsim')
+
+# The compiled libraries are written by the tools to xsim.dir in their
+# working directory.
+_xsim_directory_name = 'xsim.dir'
+_work_library = 'work'
+_snapshot_name = 'kea_snapshot'
+
+# The precompiled libraries of the Xilinx primitives (such as ODDR), in
+# Verilog and in VHDL, that the design is elaborated against.
+_primitive_libraries = ('unisims_ver', 'unisim')
+
+# The module that drives the global set/reset and tristate signals of the
+# Verilog primitives, relative to the Vivado installation.
+_glbl_path = ('data', 'verilog', 'src', 'glbl.v')
+_glbl_module = 'glbl'
+
+_default_cache_directory = os.path.join(
+    os.path.expanduser('~'), '.cache', 'kea', 'xsim_libraries')
+
+_run_tcl_template = string.Template('''
+run ${time}${time_units}
+quit
+''')
+
+_vcd_capture_run_tcl_template = string.Template('''
+open_vcd {${vcd_filename}}
+log_vcd
+run ${time}${time_units}
+close_vcd
+quit
+''')
+
+def _file_hash(filename):
+
+    file_hash = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+class XsimFlow(object):
+    '''Runs simulations by calling the Vivado simulator tools (``xvhdl``,
+    ``xvlog``, ``xelab`` and ``xsim``) directly, rather than through a
+    Vivado project.
+
+    The dependencies of a simulation are compiled into a work library that
+    is cached in ``cache_directory``, keyed by the content of the
+    dependency files (along with the language, the tools and the Vivado
+    version). Subsequent simulations with the same dependencies start from
+    a copy of the cached library, so only the files that change between
+    simulations (the top level) need to be compiled.
+
+    ``tools`` is an optional dictionary from the tool names to the command
+    that runs them. A command can be a string or a list (for example an
+    interpreter and a script), to which the arguments are appended. Any
+    tool that is not given is looked for in the directory of the Vivado
+    executable.
+
+    Designs are elaborated against the libraries of the Xilinx primitives.
+    The Verilog primitives also need the ``glbl`` module, which is compiled
+    from ``glbl_filename`` into the work library of every Verilog
+    simulation and elaborated alongside the top level. By default it is
+    found in the installation of the Vivado executable. If it is not
+    found, ``glbl`` is left out, so Verilog designs that use the
+    primitives cannot be elaborated.
+    '''
+
+    def __init__(self, tools=None, cache_directory=None, glbl_filename=None):
+
+        if tools is None:
+            tools = {}
+
+        self.tools = {}
+        for tool in _xsim_tools:
+            if tool in tools:
+                command = tools[tool]
+
+            else:
+                vivado_executable = kea.xilinx.vivado_utils.VIVADO_EXECUTABLE
+
+                if vivado_executable is None:
+                    raise EnvironmentError('Vivado executable not in path')
+
+                command = os.path.join(
+                    os.path.dirname(vivado_executable), tool)
+
+            if isinstance(command, str):
+                command = [command]
+
+            self.tools[tool] = list(command)
+
+        if cache_directory is None:
+            cache_directory = _default_cache_directory
+
+        self.cache_directory = cache_directory
+
+        if glbl_filename is None:
+            vivado_executable = kea.xilinx.vivado_utils.VIVADO_EXECUTABLE
+
+            if vivado_executable is not None:
+                default_glbl_filename = os.path.join(
+                    os.path.dirname(os.path.dirname(vivado_executable)),
+                    *_glbl_path)
+
+                if os.path.exists(default_glbl_filename):
+                    glbl_filename = default_glbl_filename
+
+        self.glbl_filename = glbl_filename
+
+    def compile_command(self, target_language, filenames):
+        '''Returns the command that compiles ``filenames`` into the work
+        library.
+        '''
+        if target_language == 'VHDL':
+            return self.tools['xvhdl'] + (
+                ['--2008', '--relax', '--work', _work_library] +
+                list(filenames))
+
+        elif target_language == 'Verilog':
+            return self.tools['xvlog'] + (
+                ['--relax', '--work', _work_library] + list(filenames))
+
+        else:
+            raise ValueError('Target language must be \'Verilog\' or '
+                             '\'VHDL\'')
+
+    def elaborate_command(self, top_name, debug=False, glbl=False):
+        '''Returns the command that elaborates ``top_name`` from the work
+        library into a simulation snapshot, against the libraries of the
+        Xilinx primitives. If ``glbl`` is ``True``, the ``glbl`` module in
+        the work library is elaborated too.
+        '''
+        if debug:
+            debug_level = 'typical'
+        else:
+            debug_level = 'off'
+
+        library_switches = []
+        for library in _primitive_libraries:
+            library_switches += ['-L', library]
+
+        top_names = [top_name]
+        if glbl:
+            top_names.append(_glbl_module)
+
+        return self.tools['xelab'] + (
+            ['--relax', '--debug', debug_level] + library_switches +
+            ['--snapshot', _snapshot_name] +
+            ['%s.%s' % (_work_library, name) for name in top_names])
+
+    def simulate_command(self, tcl_batch_filename):
+        '''Returns the command that runs the simulation snapshot with the
+        commands in ``tcl_batch_filename``.
+        '''
+        return self.tools['xsim'] + [
+            _snapshot_name, '--tclbatch', tcl_batch_filename]
+
+    def library_key(self, target_language, filenames):
+        '''Returns the key under which the work library compiled from
+        ``filenames`` is cached. It changes if the content or the order of
+        the files changes, or if the tools change.
+        '''
+        key = hashlib.sha256()
+
+        key.update(repr(
+            (target_language, kea.xilinx.vivado_utils.VIVADO_VERSION,
+             self.compile_command(target_language, []))).encode())
+
+        for filename in filenames:
+            key.update(repr(
+                (os.path.basename(filename), _file_hash(filename))).encode())
+
+        return key.hexdigest()
+
+    def cached_library(self, target_language, filenames):
+        '''Returns the directory of the cached work library compiled from
+        ``filenames``, compiling it if it is not in the cache.
+        '''
+        library_directory = os.path.join(
+            self.cache_directory, '%s_%s' % (
+                target_language.lower(),
+                self.library_key(target_language, filenames)))
+
+        if os.path.exists(library_directory):
+            return library_directory
+
+        if not os.path.exists(self.cache_directory):
+            os.makedirs(self.cache_directory, exist_ok=True)
+
+        # The library is compiled in a temporary directory that is moved
+        # into place when it is complete, so an interrupted compilation (or
+        # another process compiling the same library) never leaves a partial
+        # library in the cache.
+        compile_directory = tempfile.mkdtemp(dir=self.cache_directory)
+
+        try:
+            os.makedirs(os.path.join(
+                compile_directory, _xsim_directory_name, _work_library))
+
+            if len(filenames) > 0:
+                self._run(
+                    self.compile_command(target_language, filenames),
+                    compile_directory)
+
+            try:
+                os.rename(compile_directory, library_directory)
+            except OSError:
+                if not os.path.exists(library_directory):
+                    raise
+
+        finally:
+            if os.path.exists(compile_directory):
+                shutil.rmtree(compile_directory)
+
+        return library_directory
+
+    def clear_cache(self):
+        '''Removes all the cached libraries.
+        '''
+        if os.path.exists(self.cache_directory):
+            shutil.rmtree(self.cache_directory)
+
+    def simulate(
+        self, target_language, dependency_filenames, top_filenames, top_name,
+        run_directory, time, time_units, vcd_filename=None, timeout=None,
+        timings=None, monitor=None):
+        '''Simulates ``top_name`` for ``time`` ``time_units`` in
+        ``run_directory``.
+
+        ``dependency_filenames`` are compiled into the cached work library
+        (in the order given) and ``top_filenames`` are compiled on top of a
+        copy of it. If ``vcd_filename`` is not ``None``, a VCD file of the
+        simulation is written to it.
+
+        If ``timeout`` is not ``None``, each of the tools run for the
+        simulation is killed if it runs for longer than ``timeout`` seconds,
+        and a :class:`VivadoTimeoutError` is raised.
+
+        If ``timings`` is a :class:`CosimulationTimings`, the time spent in
+        each step of the simulation is added to it.
+
+        If ``monitor`` is not ``None``, it is called periodically while
+        ``xsim`` runs. If it raises, ``xsim`` is killed and the exception is
+        raised.
+
+        The ``glbl`` module is compiled into the library of a Verilog
+        simulation ahead of the dependencies (see :class:`XsimFlow`).
+        '''
+        if timings is None:
+            timings = CosimulationTimings()
+
+        glbl = target_language == 'Verilog' and self.glbl_filename is not None
+
+        if glbl:
+            dependency_filenames = (
+                [self.glbl_filename] + list(dependency_filenames))
+
+        with timings.phase('dependency_library'):
+            library_directory = self.cached_library(
+                target_language, dependency_filenames)
+
+            shutil.copytree(
+                os.path.join(library_directory, _xsim_directory_name),
+                os.path.join(run_directory, _xsim_directory_name))
+
+        if vcd_filename is not None:
+            run_tcl = _vcd_capture_run_tcl_template.safe_substitute(
+                {'vcd_filename': vcd_filename,
+                 'time': time,
+                 'time_units': time_units,})
+
+        else:
+            run_tcl = _run_tcl_template.safe_substitute(
+                {'time': time,
+                 'time_units': time_units,})
+
+        run_tcl_filename = os.path.join(run_directory, 'run.tcl')
+        with open(run_tcl_filename, 'w') as run_tcl_file:
+            run_tcl_file.write(run_tcl)
+
+        with timings.phase('compile'):
+            self._run(
+                self.compile_command(target_language, top_filenames),
+                run_directory, timeout=timeout)
+
+        with timings.phase('elaborate'):
+            self._run(
+                self.elaborate_command(
+                    top_name, debug=(vcd_filename is not None), glbl=glbl),
+                run_directory, timeout=timeout)
+
+        with timings.phase('simulate'):
+            self._run(
+                self.simulate_command(run_tcl_filename), run_directory,
+                timeout=timeout, monitor=monitor)
+
+    def _run(self, command, working_directory, timeout=None, monitor=None):
+
+        process = _start_process(
+            command, cwd=working_directory, stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            universal_newlines=True)
+
+        out, _ = _communicate(process, timeout, monitor)
+
+        if process.returncode != 0:
+            raise VivadoError(
+                'Error running the Vivado simulator command:\n%s\n%s' %
+                (' '.join(command), out))
+
+        return out